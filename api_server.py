@@ -102,6 +102,10 @@ def analyze():
         is_male: 是否男性 true/false（必需）
         base_year: 服务器本地年份（可选，默认使用当前年份）
         target_year: 目标年份（可选，用于获取 year_detail）
+        event_refs: 是否返回打包的 facts（可选，默认 false；流年事件存编号，
+            事件表在 facts["events"]，用 bazi.event_store.expand_facts 展开）
+        hint_codes: 是否返回提示编码（可选，默认 false；默认把 facts 中的 hints 渲染成文案，
+            为 true 时保留 {"code": ...} 编码，用 bazi.hint_codes.render_hint 渲染）
     
     返回:
         {
@@ -119,6 +123,8 @@ def analyze():
         is_male = data.get('is_male', True)
         base_year = data.get('base_year', datetime.now().year)
         target_year = data.get('target_year')  # 可选：目标年份
+        event_refs = bool(data.get('event_refs', False))  # 可选：打包 facts
+        hint_codes = bool(data.get('hint_codes', False))  # 可选：hints 保留编码
         
         # 验证必需参数
         if not birth_date or not birth_time:
@@ -156,6 +162,13 @@ def analyze():
         if target_year:
             year_detail = generate_year_detail(facts, int(target_year))
         
+        if not hint_codes:
+            from bazi.hint_codes import render_facts_hints
+            facts = render_facts_hints(facts)
+        if event_refs:
+            from bazi.event_store import pack_facts
+            facts = pack_facts(facts)
+        
         return jsonify({
             "index": index,
             "facts": facts,
@@ -0,0 +1,442 @@
+# -*- coding: utf-8 -*-
+"""表驱动排盘：节气时刻表 + 二分查找 + 算术，排出四柱。
+
+与 lunar_python EightChar（默认流派）的口径完全一致：
+- 年柱：以立春交接时刻换年（精确到秒）；
+- 月柱：以「节」交接时刻换月（精确到秒）；
+- 日柱：按公历日换日，23 点不换日（EightChar sect=2）；
+- 时柱：23:00–00:59 为子时；晚子时（23 点）的时干按次日日干起。
+
+节气时刻表见 jieqi_table.py（由 tools/build_jieqi_table.py 生成），覆盖 1899–2101 年。
+超出时刻表范围的时间自动回退到 lunar_python 参考后端。
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .codes import JIA_ZI, JIA_ZI_PAIRS, jiazi_code
+from .config import GAN_LIST, ZHI_LIST
+from .jieqi_table import JIE_FIRST_YEAR, JIE_TABLE
+
+
+# 排盘后端：table = 节气时刻表（默认），lunar = lunar_python（参考实现）
+BACKEND_TABLE = "table"
+BACKEND_LUNAR = "lunar"
+DEFAULT_BACKEND = BACKEND_TABLE
+
+# 时刻表第一个节（1899 年小寒，丑月）所在月柱的甲子序号：乙丑
+_FIRST_JIE_MONTH_JIAZI = 1
+
+# 公历日序（date.toordinal）→ 日柱甲子序号的偏移：int(正午儒略日) - 11 = toordinal + 1721414
+_DAY_JIAZI_OFFSET = 1721414
+
+
+def _dt_key(dt: datetime) -> int:
+    """datetime → YYYYMMDDhhmmss 整数，与 jieqi_table 中的时刻同一口径。"""
+    return (
+        dt.year * 10000000000
+        + dt.month * 100000000
+        + dt.day * 1000000
+        + dt.hour * 10000
+        + dt.minute * 100
+        + dt.second
+    )
+
+
+def in_table_range(dt: datetime) -> bool:
+    """时刻是否落在节气时刻表覆盖范围内（首个节 ≤ dt < 最后一个节）。"""
+    key = _dt_key(dt)
+    return JIE_TABLE[0] <= key < JIE_TABLE[-1]
+
+
+def _time_zhi_index(hour: int) -> int:
+    """小时 → 时支序号（23、0 点为子）。"""
+    return ((hour + 1) // 2) % 12
+
+
+def year_jiazi(year: int) -> int:
+    """干支纪年：公历年 year 的立春起至次年立春前，对应的甲子序号（1984 年为甲子）。"""
+    return (year - 4) % 60
+
+
+def year_ganzhi(year: int) -> Tuple[str, str]:
+    """流年干支：返回公历年 year 的 (年干, 年支)。
+
+    year 指「该干支年的立春所在的公历年」，结果只取决于 year，不看月日：
+    year_ganzhi(2024) = ("甲", "辰")，管 2024 年立春至 2025 年立春前。
+
+    一月一日至立春前的时刻仍属上一干支年（例如 2024-01-15 属 癸卯），
+    这一边界由 lichun_year(dt) 处理：year_ganzhi(lichun_year(dt)) 即 dt 所在的干支年。
+    与 lunar_python LiuNian.getGanZhi() 的结果一致。
+    """
+    return JIA_ZI_PAIRS[(year - 4) % 60]
+
+
+def _lichun_year_key(year: int, key: int) -> int:
+    """按时刻表判断：key 早于本公历年立春（每年第 2 个节）时算上一年。"""
+    if key < JIE_TABLE[(year - JIE_FIRST_YEAR) * 12 + 1]:
+        return year - 1
+    return year
+
+
+def lichun_year(dt: datetime) -> int:
+    """时刻 dt 所属干支年的公历年号（以立春交接时刻换年，精确到秒）。"""
+    if in_table_range(dt):
+        return _lichun_year_key(dt.year, _dt_key(dt))
+    # 时刻表范围之外：以 lunar_python 排出的年柱判断
+    year_pillar = _pillars_lunar(dt)["year"]
+    if JIA_ZI_PAIRS[year_jiazi(dt.year)] == (year_pillar["gan"], year_pillar["zhi"]):
+        return dt.year
+    return dt.year - 1
+
+
+def pillar_jiazi(birth_dt: datetime) -> Tuple[int, int, int, int]:
+    """表驱动计算四柱的甲子序号 (年, 月, 日, 时)。
+
+    调用方需保证 birth_dt 在时刻表范围内（见 in_table_range）。
+    """
+    key = _dt_key(birth_dt)
+
+    # 年柱：立春之前算上一年
+    year_jz = year_jiazi(_lichun_year_key(birth_dt.year, key))
+
+    # 月柱：已过的节的个数即为从首个节起算的月序
+    jie_pos = bisect_right(JIE_TABLE, key) - 1
+    month_jz = (_FIRST_JIE_MONTH_JIAZI + jie_pos) % 60
+
+    # 日柱
+    day_jz = (birth_dt.toordinal() + _DAY_JIAZI_OFFSET) % 60
+
+    # 时柱：晚子时按次日日干起时干
+    zhi = _time_zhi_index(birth_dt.hour)
+    day_gan = (day_jz + 1) % 10 if birth_dt.hour == 23 else day_jz % 10
+    gan = (day_gan % 5 * 2 + zhi) % 10
+    hour_jz = jiazi_code(gan, zhi)
+
+    return year_jz, month_jz, day_jz, hour_jz
+
+
+def _pillars_table(birth_dt: datetime) -> Dict[str, Dict[str, str]]:
+    year_jz, month_jz, day_jz, hour_jz = pillar_jiazi(birth_dt)
+    return {
+        "year":  {"gan": GAN_LIST[year_jz % 10],  "zhi": ZHI_LIST[year_jz % 12]},
+        "month": {"gan": GAN_LIST[month_jz % 10], "zhi": ZHI_LIST[month_jz % 12]},
+        "day":   {"gan": GAN_LIST[day_jz % 10],   "zhi": ZHI_LIST[day_jz % 12]},
+        "hour":  {"gan": GAN_LIST[hour_jz % 10],  "zhi": ZHI_LIST[hour_jz % 12]},
+    }
+
+
+def _pillars_lunar(birth_dt: datetime) -> Dict[str, Dict[str, str]]:
+    from lunar_python import Solar  # 依赖：pip install lunar_python
+
+    solar = Solar(birth_dt.year, birth_dt.month, birth_dt.day,
+                  birth_dt.hour, birth_dt.minute, birth_dt.second)
+    ec = solar.getLunar().getEightChar()
+    return {
+        "year":  {"gan": ec.getYearGan(),  "zhi": ec.getYearZhi()},
+        "month": {"gan": ec.getMonthGan(), "zhi": ec.getMonthZhi()},
+        "day":   {"gan": ec.getDayGan(),   "zhi": ec.getDayZhi()},
+        "hour":  {"gan": ec.getTimeGan(),  "zhi": ec.getTimeZhi()},
+    }
+
+
+def get_pillars(birth_dt: datetime, backend: Optional[str] = None) -> Dict[str, Dict[str, str]]:
+    """排四柱，返回 {"year": {"gan", "zhi"}, "month": ..., "day": ..., "hour": ...}。
+
+    参数:
+        birth_dt: 出生时间（当地时间，不做时辰纠正）
+        backend: "table"（默认）或 "lunar"；None 时使用 DEFAULT_BACKEND
+
+    table 后端在时刻表范围之外自动回退到 lunar 后端。
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend == BACKEND_TABLE:
+        if in_table_range(birth_dt):
+            return _pillars_table(birth_dt)
+        return _pillars_lunar(birth_dt)
+    if backend == BACKEND_LUNAR:
+        return _pillars_lunar(birth_dt)
+    raise ValueError(f"未知排盘后端: {backend}")
+
+
+# ============================================================
+# 大运 / 起运
+# ============================================================
+
+def _key_to_datetime(key: int) -> datetime:
+    """YYYYMMDDhhmmss 整数 → datetime。"""
+    date_part, time_part = divmod(key, 1000000)
+    year, md = divmod(date_part, 10000)
+    month, day = divmod(md, 100)
+    hour, ms = divmod(time_part, 10000)
+    minute, second = divmod(ms, 100)
+    return datetime(year, month, day, hour, minute, second)
+
+
+def adjacent_jie(dt: datetime) -> Tuple[datetime, datetime]:
+    """dt 前后最近的两个「节」的交接时刻 (上一节, 下一节)。
+
+    上一节取 ≤ dt 的最后一个节，下一节取 > dt 的第一个节（与 Lunar.getPrevJie / getNextJie 一致）。
+    调用方需保证 dt 在时刻表范围内。
+    """
+    pos = bisect_right(JIE_TABLE, _dt_key(dt))
+    return _key_to_datetime(JIE_TABLE[pos - 1]), _key_to_datetime(JIE_TABLE[pos])
+
+
+def _yun_zhi_index(dt: datetime) -> int:
+    """起运计算用的时辰序号：23 点按亥时（11）计，其余同时支序号。"""
+    return 11 if dt.hour == 23 else _time_zhi_index(dt.hour)
+
+
+def _days_in_month(year: int, month: int) -> int:
+    if month == 12:
+        return 31
+    return (datetime(year, month + 1, 1) - datetime(year, month, 1)).days
+
+
+def _add_years_months_days(dt: datetime, years: int, months: int, days: int) -> datetime:
+    """依次加年、加月、加日（月末日期按目标月天数截断，与 lunar_python Solar 一致）。"""
+    year = dt.year + years
+    day = dt.day
+    if dt.month == 2 and day > 28 and _days_in_month(year, 2) == 28:
+        day = 28
+    year += (dt.month - 1 + months) // 12
+    month = (dt.month - 1 + months) % 12 + 1
+    day = min(day, _days_in_month(year, month))
+    return dt.replace(year=year, month=month, day=day) + timedelta(days=days)
+
+
+def _build_dayun_steps(
+    birth_year: int,
+    qiyun_year: int,
+    month_jz: int,
+    forward: bool,
+    n: int,
+) -> List[Dict[str, Any]]:
+    """按起运年与月柱推出 n 步大运（含第 0 步「起运前」）及每步的流年年份。"""
+    steps: List[Dict[str, Any]] = []
+    for index in range(n):
+        if index < 1:
+            # 第 0 步：出生年至起运前一年，无大运干支
+            start_year = birth_year
+            start_age = 1
+            end_year = qiyun_year - 1
+            jiazi = None
+            count = end_year - start_year + 1
+        else:
+            start_year = qiyun_year + (index - 1) * 10
+            start_age = start_year - birth_year + 1
+            end_year = start_year + 9
+            jiazi = (month_jz + (index if forward else -index)) % 60
+            count = 10
+        steps.append({
+            "index": index,
+            "gan_zhi": JIA_ZI[jiazi] if jiazi is not None else "",
+            "jiazi": jiazi,
+            "start_year": start_year,
+            "start_age": start_age,
+            "end_year": end_year,
+            "liunian": [{"year": start_year + i, "age": start_age + i} for i in range(count)],
+        })
+    return steps
+
+
+def _dayun_sequence_lunar(birth_dt: datetime, is_male: bool, n: int) -> Dict[str, Any]:
+    """lunar_python Yun / DaYun 参考实现，输出结构同 dayun_sequence。"""
+    from lunar_python import Solar  # 依赖：pip install lunar_python
+
+    solar = Solar(birth_dt.year, birth_dt.month, birth_dt.day,
+                  birth_dt.hour, birth_dt.minute, birth_dt.second)
+    # sex 参数：以 lunar 官方 demo 习惯，1=男, 0=女
+    yun = solar.getLunar().getEightChar().getYun(1 if is_male else 0)
+    start = yun.getStartSolar()
+    steps = []
+    for dy in yun.getDaYun(n):
+        steps.append({
+            "index": dy.getIndex(),
+            "gan_zhi": dy.getGanZhi(),
+            "jiazi": JIA_ZI.index(dy.getGanZhi()) if dy.getGanZhi() else None,
+            "start_year": dy.getStartYear(),
+            "start_age": dy.getStartAge(),
+            "end_year": dy.getEndYear(),
+            "liunian": [{"year": ln.getYear(), "age": ln.getAge()} for ln in dy.getLiuNian()],
+        })
+    return {
+        "forward": yun.isForward(),
+        "start_offset": {
+            "years": yun.getStartYear(),
+            "months": yun.getStartMonth(),
+            "days": yun.getStartDay(),
+        },
+        "start_solar": datetime(start.getYear(), start.getMonth(), start.getDay(),
+                                start.getHour(), start.getMinute(), start.getSecond()),
+        "start_year": start.getYear(),
+        "dayun": steps,
+    }
+
+
+def dayun_sequence(
+    month_gz: str,
+    year_gan: str,
+    is_male: bool,
+    birth_dt: datetime,
+    n: int = 10,
+    backend: Optional[str] = None,
+) -> Dict[str, Any]:
+    """纯算术推大运：起运时间 + 每步大运干支 / 起止年 / 流年年份。
+
+    参数:
+        month_gz: 月柱干支，如 "乙酉"
+        year_gan: 年干（阳年男、阴年女顺排，反之逆排）
+        is_male: 是否男性
+        birth_dt: 出生时间
+        n: 大运步数（含第 0 步「起运前」，与 lunar_python getDaYun() 默认一致为 10）
+        backend: "table"（默认）或 "lunar"；None 时使用 DEFAULT_BACKEND
+
+    起运（与 lunar_python Yun sect=1 一致）：顺排取出生到下一节、逆排取上一节到出生，
+    按「三天一年、一天四个月、一个时辰十天」折算；起运日期 = 出生时间依次加年、月、日。
+
+    返回:
+    {
+      "forward": True,
+      "start_offset": {"years": 3, "months": 4, "days": 10},
+      "start_solar": datetime(...),        # 起运时间
+      "start_year": 2009,                  # 起运公历年
+      "dayun": [
+        {"index": 0, "gan_zhi": "", "jiazi": None, "start_year": ..., "start_age": 1, "end_year": ...,
+         "liunian": [{"year": ..., "age": ...}, ...]},
+        {"index": 1, "gan_zhi": "丙戌", "jiazi": 22, ...},
+        ...
+      ]
+    }
+
+    table 后端在出生时间不在节气时刻表范围内时回退到 lunar 后端。
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in (BACKEND_TABLE, BACKEND_LUNAR):
+        raise ValueError(f"未知排盘后端: {backend}")
+    if backend == BACKEND_LUNAR or not in_table_range(birth_dt):
+        return _dayun_sequence_lunar(birth_dt, is_male, n)
+
+    yang = GAN_LIST.index(year_gan) % 2 == 0
+    forward = yang == is_male
+
+    prev_jie, next_jie = adjacent_jie(birth_dt)
+    start = birth_dt if forward else prev_jie
+    end = next_jie if forward else birth_dt
+
+    # 时辰差、天数差
+    hour_diff = _yun_zhi_index(end) - _yun_zhi_index(start)
+    day_diff = (end.date() - start.date()).days
+    if hour_diff < 0:
+        hour_diff += 12
+        day_diff -= 1
+    month_diff = hour_diff * 10 // 30
+    months = day_diff * 4 + month_diff
+    days = hour_diff * 10 - month_diff * 30
+    years, months = divmod(months, 12)
+
+    start_solar = _add_years_months_days(birth_dt.replace(microsecond=0), years, months, days)
+    month_jz = JIA_ZI.index(month_gz)
+
+    return {
+        "forward": forward,
+        "start_offset": {"years": years, "months": months, "days": days},
+        "start_solar": start_solar,
+        "start_year": start_solar.year,
+        "dayun": _build_dayun_steps(birth_dt.year, start_solar.year, month_jz, forward, n),
+    }
+
+
+# ============================================================
+# 批量排盘（numpy 向量化）
+# ============================================================
+
+# batch_pillars 输出的结构化数组字段：天干 0–9（GAN_LIST 下标）、地支 0–11（ZHI_LIST 下标）
+BATCH_PILLAR_FIELDS = (
+    "year_gan", "year_zhi",
+    "month_gan", "month_zhi",
+    "day_gan", "day_zhi",
+    "hour_gan", "hour_zhi",
+)
+
+# 1970-01-01 的公历日序（date.toordinal），用于 Unix 秒 → 日柱
+_EPOCH_ORDINAL = 719163
+
+# 日干 × 时支 → 时干（五鼠遁）
+HOUR_GAN_TABLE = tuple(
+    tuple((day_gan % 5 * 2 + zhi) % 10 for zhi in range(12))
+    for day_gan in range(10)
+)
+
+_jie_seconds_cache = None
+
+
+def _jie_seconds():
+    """节气时刻表 → Unix 秒（int64 数组，按当地时间的钟面读数计），首次调用时构建。"""
+    global _jie_seconds_cache
+    if _jie_seconds_cache is None:
+        import numpy as np  # 依赖：pip install numpy
+
+        epoch = datetime(1970, 1, 1)
+        _jie_seconds_cache = np.array(
+            [int((_key_to_datetime(key) - epoch).total_seconds()) for key in JIE_TABLE],
+            dtype=np.int64,
+        )
+    return _jie_seconds_cache
+
+
+def batch_pillars(timestamps):
+    """批量排四柱：datetime64 数组 → 结构化整数数组。
+
+    参数:
+        timestamps: numpy datetime64 数组（任意精度，按出生地当地时间的钟面读数，秒以下截断）；
+                    也可传入 datetime 列表，会先转换为 datetime64[s]。
+
+    返回:
+        与输入同形状的结构化数组，字段见 BATCH_PILLAR_FIELDS（int8）。
+        结果与逐条调用 get_pillars / get_bazi 一致：
+        - 年柱、月柱：在节气时刻表上 searchsorted，已过的节数即月序，立春前归上一年；
+        - 日柱：按公历日序算术；
+        - 时柱：日干 × 时支查 HOUR_GAN_TABLE，晚子时按次日日干起。
+
+    时刻超出节气时刻表范围时抛出 ValueError（批量路径不回退 lunar_python）。
+    """
+    import numpy as np  # 依赖：pip install numpy
+
+    seconds = np.asarray(timestamps, dtype="datetime64[s]").astype(np.int64)
+    jie_seconds = _jie_seconds()
+
+    out_of_range = (seconds < jie_seconds[0]) | (seconds >= jie_seconds[-1])
+    if out_of_range.any():
+        raise ValueError(f"时刻超出节气时刻表范围: {int(out_of_range.sum())} 条")
+
+    # 年柱 / 月柱：jie_pos 为已过的节的序号；每年第 0 个节（小寒）到立春之间仍属上一年
+    jie_pos = np.searchsorted(jie_seconds, seconds, side="right") - 1
+    year = JIE_FIRST_YEAR + jie_pos // 12 - (jie_pos % 12 == 0)
+    year_jz = (year - 4) % 60
+    month_jz = (_FIRST_JIE_MONTH_JIAZI + jie_pos) % 60
+
+    # 日柱
+    days, secs_of_day = np.divmod(seconds, 86400)
+    day_jz = (days + (_EPOCH_ORDINAL + _DAY_JIAZI_OFFSET)) % 60
+
+    # 时柱
+    hour = secs_of_day // 3600
+    hour_zhi = ((hour + 1) // 2) % 12
+    hour_day_gan = (day_jz + (hour == 23)) % 10
+    hour_gan = np.asarray(HOUR_GAN_TABLE, dtype=np.int8)[hour_day_gan, hour_zhi]
+
+    result = np.empty(seconds.shape, dtype=[(name, np.int8) for name in BATCH_PILLAR_FIELDS])
+    result["year_gan"] = year_jz % 10
+    result["year_zhi"] = year_jz % 12
+    result["month_gan"] = month_jz % 10
+    result["month_zhi"] = month_jz % 12
+    result["day_gan"] = day_jz % 10
+    result["day_zhi"] = day_jz % 12
+    result["hour_gan"] = hour_gan
+    result["hour_zhi"] = hour_zhi
+    return result
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""单次请求的盘面上下文：一次排盘，各阶段共享。
+
+analyze_basic / analyze_luck / get_yun_info 原先各自从出生时间重新排盘
+（各建一次 Solar → Lunar → EightChar）。ChartContext 由 (birth_dt, is_male) 创建一次，
+持有四柱、八字编码与大运序列，按需计算并缓存，供各阶段复用；原局响应表、原局模式等
+按八字编码缓存在各自模块里（跨请求共享），不挂在 ChartContext 上。
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ChartContext:
+    """一张命盘在一次请求内的共享状态。
+
+    属性:
+        birth_dt: 出生时间（当地时间）
+        is_male: 是否男性
+        bazi: 四柱 {"year": {"gan", "zhi"}, ...}
+        day_gan: 日干
+
+    惰性属性（首次访问时计算，之后复用）:
+        bazi_key: 四柱的整数编码（codes.encode_bazi），用作各层缓存的键
+        dayun: 起运与大运序列（calendar.dayun_sequence 结果）
+        dayun_steps: dayun["dayun"]，每步大运及其流年年份
+    """
+
+    def __init__(self, birth_dt: datetime, is_male: bool, bazi: Optional[Dict[str, Dict[str, str]]] = None):
+        from .lunar_engine import get_bazi
+
+        self.birth_dt = birth_dt
+        self.is_male = is_male
+        self.bazi = bazi if bazi is not None else get_bazi(birth_dt)
+        self.day_gan = self.bazi["day"]["gan"]
+
+        self._bazi_key: Optional[Tuple[int, ...]] = None
+        self._dayun: Optional[Dict[str, Any]] = None
+
+    @property
+    def bazi_key(self) -> Tuple[int, ...]:
+        if self._bazi_key is None:
+            from .codes import encode_bazi
+
+            self._bazi_key = encode_bazi(self.bazi)
+        return self._bazi_key
+
+    @property
+    def dayun(self) -> Dict[str, Any]:
+        if self._dayun is None:
+            from .calendar import dayun_sequence
+
+            month = self.bazi["month"]
+            self._dayun = dayun_sequence(
+                month["gan"] + month["zhi"],
+                self.bazi["year"]["gan"],
+                self.is_male,
+                self.birth_dt,
+            )
+        return self._dayun
+
+    @property
+    def dayun_steps(self) -> List[Dict[str, Any]]:
+        return self.dayun["dayun"]
+
+
+def ensure_context(
+    birth_dt: datetime,
+    is_male: bool = True,
+    ctx: Optional[ChartContext] = None,
+) -> ChartContext:
+    """复用传入的 ChartContext；未传入时按 (birth_dt, is_male) 新建一个。"""
+    if ctx is not None:
+        return ctx
+    return ChartContext(birth_dt, is_male)
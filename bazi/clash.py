@@ -3,7 +3,8 @@
 
 from typing import Dict, Any, List, Optional
 
-from .config import POSITION_WEIGHTS, PILLAR_PALACE, ZHI_CHONG, GAN_WUXING, KE_MAP, TIAN_KE_DI_CHONG_EXTRA_RISK
+from .codes import GAN_CODE, GAN_ELEMENT, ZHI_CODE, ZHI_CHONG_OF, elements_clash
+from .config import POSITION_WEIGHTS, PILLAR_PALACE, ZHI_LIST, TIAN_KE_DI_CHONG_EXTRA_RISK
 from .shishen import get_branch_shishen
 
 
@@ -77,23 +78,18 @@ def _check_tian_ke_di_chong(
         True 如果满足天克地冲条件，否则 False
     """
     # 检查地支是否互冲
-    clash_target = ZHI_CHONG.get(flow_branch)
-    if clash_target != target_branch:
+    flow_code = ZHI_CODE.get(flow_branch)
+    if flow_code is None or ZHI_CODE.get(target_branch) != ZHI_CHONG_OF[flow_code]:
         return False
     
     # 检查天干是否互克
-    if not flow_gan or not target_gan:
+    flow_gan_code = GAN_CODE.get(flow_gan) if flow_gan else None
+    target_gan_code = GAN_CODE.get(target_gan) if target_gan else None
+    if flow_gan_code is None or target_gan_code is None:
         return False
     
-    flow_element = GAN_WUXING.get(flow_gan)
-    target_element = GAN_WUXING.get(target_gan)
-    
-    if not flow_element or not target_element:
-        return False
-    
-    # 检查是否互克：KE_MAP[e1] == e2 或 KE_MAP[e2] == e1
-    return (KE_MAP.get(flow_element) == target_element or 
-            KE_MAP.get(target_element) == flow_element)
+    # 五行互克：任一方克另一方
+    return elements_clash(GAN_ELEMENT[flow_gan_code], GAN_ELEMENT[target_gan_code])
 
 
 def detect_branch_clash(
@@ -128,9 +124,10 @@ def detect_branch_clash(
     }
     没有冲则返回 None。
     """
-    target_branch = ZHI_CHONG.get(flow_branch)
-    if not target_branch:
+    flow_code = ZHI_CODE.get(flow_branch)
+    if flow_code is None:
         return None
+    target_branch = ZHI_LIST[ZHI_CHONG_OF[flow_code]]
 
     targets: List[Dict[str, Any]] = []
     base_total = 0.0
@@ -276,8 +273,6 @@ def detect_natal_tian_ke_di_chong(bazi: Dict[str, Dict[str, str]]) -> List[Dict[
       ...
     ]
     """
-    from .config import PILLAR_PALACE, GAN_WUXING, KE_MAP
-    
     events = []
     pillars = ["year", "month", "day", "hour"]
     
@@ -288,21 +283,8 @@ def detect_natal_tian_ke_di_chong(bazi: Dict[str, Dict[str, str]]) -> List[Dict[
             gan2 = bazi[pillar2]["gan"]
             zhi2 = bazi[pillar2]["zhi"]
             
-            # 检查地支是否互冲
-            clash_target = ZHI_CHONG.get(zhi1)
-            if clash_target != zhi2:
-                continue
-            
-            # 检查天干是否互克
-            gan1_element = GAN_WUXING.get(gan1)
-            gan2_element = GAN_WUXING.get(gan2)
-            
-            if not gan1_element or not gan2_element:
-                continue
-            
-            # 检查是否互克：KE_MAP[e1] == e2 或 KE_MAP[e2] == e1
-            is_ke = (KE_MAP.get(gan1_element) == gan2_element or 
-                     KE_MAP.get(gan2_element) == gan1_element)
+            # 天克地冲：地支互冲 + 天干五行互克
+            is_ke = _check_tian_ke_di_chong(gan1, zhi1, gan2, zhi2)
             
             if is_ke:
                 events.append({
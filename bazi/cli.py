@@ -9,6 +9,7 @@ from typing import Any, Dict, List, Optional
 from .compute_facts import compute_facts
 from .config import ZHI_WUXING
 from .dayun_snapshot import build_dayun_snapshot
+from .hint_codes import render_hints
 
 
 # ============================================================
@@ -1356,7 +1357,7 @@ def _print_liunian_v2(
         print(line)
 
     # 3. 收集并打印提示汇总
-    liunian_hints = ln.get("hints", []) or []
+    liunian_hints = render_hints(ln.get("hints"))
 
     # 收集模式提示
     all_events = ln.get("all_events", [])
@@ -1498,7 +1499,7 @@ def _print_dayun_v2(
                 hint_lines.append(f"[感情] 夫妻宫被冲: {clash_name} → 单身更易暧昧/受阻；有伴侣争执起伏")
 
     # 2. 天干五合婚恋提醒（从hints读取）
-    dayun_hints = dy.get("hints", []) or []
+    dayun_hints = render_hints(dy.get("hints"))
     for hint in dayun_hints:
         if "婚恋变化提醒" in hint:
             # 提取关键信息
@@ -1698,7 +1699,7 @@ def _print_liunian_v3(
     print(f"后期标签: {zhi_label}")
 
     # ========== HINTS ==========
-    liunian_hints = ln.get("hints", []) or []
+    liunian_hints = render_hints(ln.get("hints"))
     all_events = ln.get("all_events", [])
     static_events = [ev for ev in all_events if ev.get("type") in (
         "static_clash_activation", "static_punish_activation", "pattern_static_activation", "static_tkdc_activation"
@@ -1931,7 +1932,7 @@ def _print_debug_events_v3(
             print(f"天克地冲: 流年 {flow_gan}{flow_branch} 与 命局{pillar} {target_gan}{target_zhi} 天克地冲")
 
     # 运年天克地冲（从 hints 读取）
-    for hint in (ln.get("hints", []) or []):
+    for hint in render_hints(ln.get("hints")):
         if "运年天克地冲" in hint:
             print(f"运年天克地冲: (见 HINTS)")
 
@@ -3691,7 +3692,7 @@ def run_cli(birth_dt: datetime = None, is_male: bool = None) -> None:
         marriage_structure_list.append(f"{marriage_hint}，桃花多，易再婚，找不对配偶难走下去")
     
     # 2. 从 natal 的 hints 中读取五合提醒（原局层），去掉"婚恋结构提示："前缀
-    natal_hints = result.get("hints", [])
+    natal_hints = render_hints(result.get("hints"))
     for hint in natal_hints:
         if "婚恋结构提示：" in hint:
             # 去掉前缀，只保留内容
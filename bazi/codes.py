@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""干支整数编码：天干 0–9、地支 0–11、六十甲子 0–59、五行 0–4、十神 0–9。
+
+编码用于缓存键（encode_bazi 的 8 元组、甲子序号、yongshen_key）和按编码下标的查表
+（十神、冲、五行、预计算表记录）；analyze_luck 按甲子序号排运。
+clash / punishment / harmony / patterns / strength 的检测函数仍以汉字四柱 dict 为输入，
+缓存内核拿到 bazi_key 后先 decode_bazi 还原成汉字，再调用这些检测函数。
+编码顺序与 config.GAN_LIST / ZHI_LIST / ELEMENTS 一致：
+- 天干：甲0 乙1 丙2 丁3 戊4 己5 庚6 辛7 壬8 癸9（偶数为阳）
+- 地支：子0 丑1 寅2 … 亥11
+- 五行：木0 火1 土2 金3 水4（相生顺序，e 生 (e+1)%5，e 克 (e+2)%5）
+- 甲子：甲子0 乙丑1 … 癸亥59，天干 = jz % 10，地支 = jz % 12
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+from .config import GAN_LIST, ZHI_LIST, ELEMENTS, GAN_WUXING, ZHI_WUXING
+
+
+GAN_CODE: Dict[str, int] = {g: i for i, g in enumerate(GAN_LIST)}
+ZHI_CODE: Dict[str, int] = {z: i for i, z in enumerate(ZHI_LIST)}
+ELEMENT_CODE: Dict[str, int] = {e: i for i, e in enumerate(ELEMENTS)}
+
+# 六十甲子（下标即甲子序号）
+JIA_ZI = [GAN_LIST[i % 10] + ZHI_LIST[i % 12] for i in range(60)]
+
+# 六十甲子的 (天干, 地支) 拆分形式，与 JIA_ZI 同序
+JIA_ZI_PAIRS = tuple((GAN_LIST[i % 10], ZHI_LIST[i % 12]) for i in range(60))
+
+# 天干 / 地支 → 五行编码
+GAN_ELEMENT: Tuple[int, ...] = tuple(ELEMENT_CODE[GAN_WUXING[g]] for g in GAN_LIST)
+ZHI_ELEMENT: Tuple[int, ...] = tuple(ELEMENT_CODE[ZHI_WUXING[z]] for z in ZHI_LIST)
+
+# 天干阴阳：True 为阳
+GAN_YANG: Tuple[bool, ...] = tuple(i % 2 == 0 for i in range(10))
+
+# 地支六冲：子午、丑未 … 相隔 6 位
+ZHI_CHONG_OF: Tuple[int, ...] = tuple((z + 6) % 12 for z in range(12))
+
+# 地支主气代表天干（与 shishen.ZHI_MAIN_GAN 一致）：子癸 丑己 寅甲 卯乙 辰戊 巳丙 午丁 未己 申庚 酉辛 戌戊 亥壬
+ZHI_MAIN_GAN_CODE: Tuple[int, ...] = (9, 5, 0, 1, 4, 2, 3, 5, 6, 7, 4, 8)
+
+# 十神编码：(五行关系 × 2) + (阴阳不同 ? 1 : 0)
+# 五行关系 = (他五行 - 我五行) % 5：0 同我、1 我生、2 我克、3 克我、4 生我
+SHISHEN_NAMES: Tuple[str, ...] = (
+    "比肩", "劫财",
+    "食神", "伤官",
+    "偏财", "正财",
+    "七杀", "正官",
+    "偏印", "正印",
+)
+
+PILLAR_NAMES: Tuple[str, ...] = ("year", "month", "day", "hour")
+
+
+def encode_gan(gan: str) -> int:
+    """天干 → 0–9；未知天干抛出 ValueError。"""
+    code = GAN_CODE.get(gan)
+    if code is None:
+        raise ValueError(f"未知天干: {gan}")
+    return code
+
+
+def encode_zhi(zhi: str) -> int:
+    """地支 → 0–11；未知地支抛出 ValueError。"""
+    code = ZHI_CODE.get(zhi)
+    if code is None:
+        raise ValueError(f"未知地支: {zhi}")
+    return code
+
+
+def decode_gan(code: int) -> str:
+    return GAN_LIST[code]
+
+
+def decode_zhi(code: int) -> str:
+    return ZHI_LIST[code]
+
+
+def jiazi_code(gan_code: int, zhi_code: int) -> int:
+    """天干编码 + 地支编码 → 甲子序号（两者奇偶必须一致）。"""
+    if gan_code % 2 != zhi_code % 2:
+        raise ValueError(f"干支阴阳不配: {GAN_LIST[gan_code]}{ZHI_LIST[zhi_code]}")
+    return (6 * gan_code - 5 * zhi_code) % 60
+
+
+def encode_ganzhi(gan: str, zhi: str) -> int:
+    """干支汉字 → 甲子序号，如 ("甲", "子") → 0。"""
+    return jiazi_code(encode_gan(gan), encode_zhi(zhi))
+
+
+def decode_ganzhi(jz: int) -> Tuple[str, str]:
+    """甲子序号 → (天干, 地支)。"""
+    return JIA_ZI_PAIRS[jz]
+
+
+def split_jiazi(jz: int) -> Tuple[int, int]:
+    """甲子序号 → (天干编码, 地支编码)。"""
+    return jz % 10, jz % 12
+
+
+def encode_bazi(bazi: Dict[str, Dict[str, str]]) -> Tuple[int, ...]:
+    """四柱字典 → 8 个整数 (年干, 年支, 月干, 月支, 日干, 日支, 时干, 时支)。
+
+    结果可直接作为命盘缓存 / 索引的键。
+    """
+    codes = []
+    for pillar in PILLAR_NAMES:
+        codes.append(encode_gan(bazi[pillar]["gan"]))
+        codes.append(encode_zhi(bazi[pillar]["zhi"]))
+    return tuple(codes)
+
+
+def decode_bazi(codes: Tuple[int, ...]) -> Dict[str, Dict[str, str]]:
+    """encode_bazi 的逆过程。"""
+    return {
+        pillar: {"gan": GAN_LIST[codes[i * 2]], "zhi": ZHI_LIST[codes[i * 2 + 1]]}
+        for i, pillar in enumerate(PILLAR_NAMES)
+    }
+
+
+def shishen_code(day_gan_code: int, other_gan_code: int) -> int:
+    """十神编码：其它天干对日主的十神（见 SHISHEN_NAMES）。"""
+    relation = (GAN_ELEMENT[other_gan_code] - GAN_ELEMENT[day_gan_code]) % 5
+    return relation * 2 + (day_gan_code + other_gan_code) % 2
+
+
+def element_ke(attacker: int, target: int) -> bool:
+    """五行编码：attacker 是否克 target。"""
+    return (target - attacker) % 5 == 2
+
+
+def elements_clash(e1: int, e2: int) -> bool:
+    """两个五行是否互克（任一方克另一方）。"""
+    return (e2 - e1) % 5 in (2, 3)
+
+
+def yongshen_flags(yongshen_elements) -> Tuple[Tuple[bool, ...], Tuple[bool, ...]]:
+    """用神五行 → (天干是否用神[10], 地支是否用神[12])，供逐年判断时按编码查表。"""
+    yong = {ELEMENT_CODE[e] for e in (yongshen_elements or []) if e in ELEMENT_CODE}
+    return (
+        tuple(GAN_ELEMENT[g] in yong for g in range(10)),
+        tuple(ZHI_ELEMENT[z] in yong for z in range(12)),
+    )
+
+
+def yongshen_key(yongshen_elements) -> Tuple[int, ...]:
+    """用神列表 → 五行编码元组（去重、按编码排序），作为缓存键。
+
+    各检测只做“五行是否在用神里”的判断，带层级前缀的项（如“天干土”）不参与，
+    所以顺序与前缀不影响结果；用 yongshen_elements_of 还原成五行列表。
+    """
+    return tuple(sorted({ELEMENT_CODE[e] for e in (yongshen_elements or []) if e in ELEMENT_CODE}))
+
+
+def yongshen_elements_of(key: Tuple[int, ...]) -> List[str]:
+    """yongshen_key 的逆过程。"""
+    return [ELEMENTS[c] for c in key]
+
+
+def try_encode_gan(gan: Optional[str]) -> Optional[int]:
+    """天干 → 编码；空值或未知天干返回 None（用于可选参数）。"""
+    if not gan:
+        return None
+    return GAN_CODE.get(gan)
@@ -4,6 +4,8 @@
 规则：
 - facts = compute_facts(...) 的返回必须等同于打印层展示的结构化输出（同一次运行结果）
 - Router/API/LLM 只能从这个 facts 取事实内容
+- lazy=True 时流年按需计算（见 lazy_facts），读法不变；整份序列化前先 materialize_facts
+- compact=True 时流年存成紧凑的整数列（LiunianRows），各项是只读视图，适合缓存大量命盘
 """
 
 from datetime import datetime
@@ -12,9 +14,19 @@ from typing import Any, Dict
 from .lunar_engine import analyze_complete
 
 
-def compute_facts(birth_dt: datetime, is_male: bool, max_dayun: int = 15) -> Dict[str, Any]:
-    """生成 facts（唯一真相源）。"""
-    facts = analyze_complete(birth_dt, is_male, max_dayun=max_dayun)
+def compute_facts(
+    birth_dt: datetime,
+    is_male: bool,
+    max_dayun: int = 15,
+    lazy: bool = False,
+    compact: bool = False,
+) -> Dict[str, Any]:
+    """生成 facts（唯一真相源）。
+
+    lazy=True 时 luck.groups[i].liunian 的各项第一次访问时才计算并丰富；
+    compact=True 时各项是只读的 LiunianView，按需重建并冻结（嵌套值也只读），只留最近读过的几年。
+    """
+    facts = analyze_complete(birth_dt, is_male, max_dayun=max_dayun, lazy=lazy, compact=compact)
     return facts
 
 
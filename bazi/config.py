@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 """日主强弱 + 用神 + 冲 相关配置。"""
 
-from typing import Dict, FrozenSet, List
+import os
+from typing import Dict, FrozenSet, List, Set, Tuple
 
 # 位置权重（总和约 1.0）
 POSITION_WEIGHTS: Dict[str, float] = {
@@ -112,6 +113,34 @@ GAN_WUHE: Dict[FrozenSet[str], str] = {
     frozenset({"戊", "癸"}): "戊癸合火",
 }
 
+# 原局分析缓存容量（lunar_engine.analyze_natal 的 LRU 条目数，按八字缓存）
+NATAL_CACHE_SIZE = 4096
+
+# 大运层缓存容量（luck.evaluate_dayun 的 LRU 条目数，按 八字 × 大运干支 × 用神 缓存）
+DAYUN_CACHE_SIZE = 16384
+
+# 流年层缓存容量（luck.evaluate_liunian 的 LRU 条目数，按 八字 × 大运 × 流年干支 × 线运宫位 × 用神 缓存）
+LIUNIAN_CACHE_SIZE = 16384
+
+# 流年天干五合 / 婚恋五合提醒缓存容量（enrich._liunian_wuhe，按 原局四干 × 性别 × 大运干 × 流年干 缓存）
+LIUNIAN_WUHE_CACHE_SIZE = 16384
+
+# 原局响应表缓存容量（natal_response.get_response_table，按八字缓存）
+RESPONSE_TABLE_CACHE_SIZE = 512
+
+# 流年模式表缓存容量（pattern_table.get_pattern_table，按八字缓存）
+PATTERN_TABLE_CACHE_SIZE = 512
+
+# 紧凑 facts 每张盘留着的已重建流年条数（lazy_facts.LiunianRows，按行号 LRU）
+LIUNIAN_VIEW_CACHE_SIZE = 12
+
+# 提示文案渲染缓存容量（hint_codes.render_hint，按 提示编码 × 参数 缓存）
+HINT_RENDER_CACHE_SIZE = 1024
+
+# 原局数值预计算表（tools/build_natal_table.py 生成，不入库；不存在时走 Python 计算）
+# 环境变量 BAZI_NATAL_TABLE 可覆盖该路径
+NATAL_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "natal_table.bin")
+
 # ===== 风险系数常量 =====
 
 # 十神模式风险（流年自己触发的）
@@ -192,3 +221,54 @@ ZHI_SANHE: Dict[str, List[str]] = {
     "酉": ["巳", "酉", "丑"],
     "丑": ["巳", "酉", "丑"],
 }
+
+# 三会（地支三会局）
+ZHI_SANHUI: Dict[str, List[str]] = {
+    "寅": ["寅", "卯", "辰"],  # 寅卯辰（春木会）
+    "卯": ["寅", "卯", "辰"],
+    "辰": ["寅", "卯", "辰"],
+    "巳": ["巳", "午", "未"],  # 巳午未（夏火会）
+    "午": ["巳", "午", "未"],
+    "未": ["巳", "午", "未"],
+    "申": ["申", "酉", "戌"],  # 申酉戌（秋金会）
+    "酉": ["申", "酉", "戌"],
+    "戌": ["申", "酉", "戌"],
+    "亥": ["亥", "子", "丑"],  # 亥子丑（冬水会）
+    "子": ["亥", "子", "丑"],
+    "丑": ["亥", "子", "丑"],
+}
+
+# 普通刑的组合（子卯、寅巳、巳申、申寅）
+NORMAL_PUNISH_PAIRS: Set[Tuple[str, str]] = {
+    ("子", "卯"),
+    ("卯", "子"),
+    ("寅", "巳"),
+    ("巳", "寅"),
+    ("巳", "申"),
+    ("申", "巳"),
+    ("申", "寅"),
+    ("寅", "申"),
+}
+
+# 墓库刑的组合（丑戌未三刑）
+# 注意：辰未不刑，所以不包含 ("辰","未") 和 ("未","辰")
+# 丑戌未三刑：丑-戌、戌-未、未-丑
+GRAVE_PUNISH_PAIRS: Set[Tuple[str, str]] = {
+    ("丑", "戌"),
+    ("戌", "丑"),
+    ("戌", "未"),
+    ("未", "戌"),
+    ("未", "丑"),
+    ("丑", "未"),
+}
+
+# 自刑的组合（辰辰、午午、酉酉、亥亥）
+SELF_PUNISH_PAIRS: Set[Tuple[str, str]] = {
+    ("辰", "辰"),
+    ("午", "午"),
+    ("酉", "酉"),
+    ("亥", "亥"),
+}
+
+# 所有刑的组合
+ALL_PUNISH_PAIRS = NORMAL_PUNISH_PAIRS | GRAVE_PUNISH_PAIRS | SELF_PUNISH_PAIRS
@@ -3,14 +3,17 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 
+from .events import FrozenEvent, FrozenList, freeze, thaw
 from .gan_wuhe import GanPosition, detect_gan_wuhe
+from .hint_codes import make_hint
 from .marriage_wuhe import detect_marriage_wuhe_hints
 from .yongshen_swap import should_print_yongshen_swap_hint
 from .shishen import get_shishen, get_branch_main_gan
-from .config import ZHI_WUXING
+from .config import DAYUN_CACHE_SIZE, LIUNIAN_WUHE_CACHE_SIZE, ZHI_WUXING
 # 从 cli 模块复制 _generate_marriage_suggestion 的逻辑（避免循环依赖）
 def _generate_marriage_suggestion(yongshen_elements: list[str]) -> str:
     """根据用神五行生成婚配倾向。"""
@@ -154,8 +157,8 @@ def enrich_natal(
     natal_wuhe_events_raw = detect_gan_wuhe(natal_gan_positions)
     natal_wuhe_events = _serialize_gan_wuhe_events(natal_wuhe_events_raw)
     
-    # 4. hints：原局提示列表（唯一真相源，不包含婚配倾向）
-    hints: List[str] = []
+    # 4. hints：原局提示列表（唯一真相源，不包含婚配倾向；存提示编码，文案由 hint_codes 渲染）
+    hints: List[Dict[str, Any]] = []
     # 注意：婚配倾向不再放入 hints，而是单独存储为 marriage_hint
     
     # 5. 原局层婚恋提醒（从 marriage_wuhe_hints 中提取）
@@ -169,7 +172,7 @@ def enrich_natal(
     # 注意：婚恋结构提示不再放入 hints，而是单独存储为 marriage_structure_hints
     # 这里暂时保留在 hints 中，但会在 CLI 层去掉前缀后放入婚恋结构 section
     for hint in natal_wuhe_hints:
-        hints.append(f"婚恋结构提示：{hint['hint_text']}")
+        hints.append(_marriage_wuhe_hint("natal_wuhe", hint, is_male))
     
     # 返回新增字段（不修改原字典，由调用者合并）
     return {
@@ -246,11 +249,10 @@ def enrich_dayun(
         
         dayun_wuhe_events = _serialize_gan_wuhe_events(dayun_wuhe_events)
     
-    # 3. hints：大运提示列表（唯一真相源）
-    hints: List[str] = []
+    # 3. hints：大运提示列表（唯一真相源；存提示编码）
+    hints: List[Dict[str, Any]] = []
     if yongshen_swap_hint:
-        from .yongshen_swap import format_yongshen_swap_hint
-        hints.append(format_yongshen_swap_hint(yongshen_swap_hint))
+        hints.append(make_hint("yongshen_swap", **yongshen_swap_hint))
     
     # 4. 大运层婚恋提醒（从 marriage_wuhe_hints 中提取）
     dayun_gan = dayun.get("gan", "")
@@ -274,7 +276,7 @@ def enrich_dayun(
             trigger_gans=trigger_gans_dayun if trigger_gans_dayun else None,
         )
         for hint in dayun_wuhe_hints:
-            hints.append(f"婚恋变化提醒（如恋爱）：{hint['hint_text']}")
+            hints.append(_marriage_wuhe_hint("wuhe_change", hint, is_male))
     
     return {
         "yongshen_swap_hint": yongshen_swap_hint,
@@ -283,6 +285,57 @@ def enrich_dayun(
     }
 
 
+def enrich_dayun_cached(
+    dayun: Dict[str, Any],
+    bazi: Dict[str, Dict[str, str]],
+    day_gan: str,
+    strength_percent: float,
+    support_percent: float,
+    yongshen_elements: List[str],
+    is_male: bool,
+) -> Dict[str, Any]:
+    """enrich_dayun 的缓存版本（参数与返回值相同，返回解冻后的新对象）。
+
+    enrich_dayun 只读大运的干支，其余参数都由命盘决定，
+    按 八字 × 大运干支 × 强弱 × 用神 × 性别 缓存。
+    """
+    from .codes import encode_bazi
+
+    return thaw(_enrich_dayun_cached(
+        encode_bazi(bazi),
+        dayun.get("gan", ""),
+        dayun.get("zhi", ""),
+        strength_percent,
+        support_percent,
+        tuple(yongshen_elements),
+        is_male,
+    ))
+
+
+@lru_cache(maxsize=DAYUN_CACHE_SIZE)
+def _enrich_dayun_cached(
+    bazi_key: Tuple[int, ...],
+    dayun_gan: str,
+    dayun_zhi: str,
+    strength_percent: float,
+    support_percent: float,
+    yongshen_elements: Tuple[str, ...],
+    is_male: bool,
+) -> FrozenEvent:
+    from .codes import decode_bazi
+
+    bazi = decode_bazi(bazi_key)
+    return freeze(enrich_dayun(
+        dayun={"gan": dayun_gan, "zhi": dayun_zhi},
+        bazi=bazi,
+        day_gan=bazi["day"]["gan"],
+        strength_percent=strength_percent,
+        support_percent=support_percent,
+        yongshen_elements=list(yongshen_elements),
+        is_male=is_male,
+    ))
+
+
 def enrich_liunian(
     liunian: Dict[str, Any],
     bazi: Dict[str, Dict[str, str]],
@@ -305,73 +358,18 @@ def enrich_liunian(
     liunian_gan = liunian.get("gan", "")
     
     # 1. wuhe_events：流年层天干五合（只包含涉及流年天干的）
-    liunian_wuhe_events = []
-    if liunian_gan:
-        liunian_shishen = get_shishen(day_gan, liunian_gan) or "-"
-        liunian_gan_positions = []
-        pillar_labels = {"year": "年干", "month": "月干", "day": "日干", "hour": "时干"}
-        for pillar in ["year", "month", "day", "hour"]:
-            gan = bazi[pillar]["gan"]
-            shishen = get_shishen(day_gan, gan) or "-"
-            liunian_gan_positions.append(GanPosition(
-                source="natal",
-                label=pillar_labels[pillar],
-                gan=gan,
-                shishen=shishen
-            ))
-        if dayun_gan:
-            dayun_shishen = get_shishen(day_gan, dayun_gan) or "-"
-            liunian_gan_positions.append(GanPosition(
-                source="dayun",
-                label="大运天干",
-                gan=dayun_gan,
-                shishen=dayun_shishen
-            ))
-        liunian_gan_positions.append(GanPosition(
-            source="liunian",
-            label="流年天干",
-            gan=liunian_gan,
-            shishen=liunian_shishen
-        ))
-        
-        liunian_wuhe_events_raw = detect_gan_wuhe(liunian_gan_positions)
-        # 只保留涉及流年天干的五合
-        for ev in liunian_wuhe_events_raw:
-            if any(pos.source == "liunian" for pos in ev["many_side"] + ev["few_side"]):
-                liunian_wuhe_events.append(ev)
-        
-        liunian_wuhe_events = _serialize_gan_wuhe_events(liunian_wuhe_events)
-    
     # 2. marriage_wuhe_hints：流年层天干五合婚恋提醒
-    liunian_layer_gans = [
-        bazi["year"]["gan"],
-        bazi["month"]["gan"],
-        bazi["day"]["gan"],
-        bazi["hour"]["gan"],
-    ]
-    trigger_gans_liunian = []
-    if dayun_gan:
-        liunian_layer_gans.append(dayun_gan)
-    if liunian_gan:
-        liunian_layer_gans.append(liunian_gan)
-        trigger_gans_liunian.append(liunian_gan)  # 只检查流年天干引动
-    
-    marriage_wuhe_hints = detect_marriage_wuhe_hints(
-        gan_list=liunian_layer_gans,
-        day_gan=day_gan,
-        is_male=is_male,
-        trigger_gans=trigger_gans_liunian if trigger_gans_liunian else None,
-    )
+    liunian_wuhe_events, marriage_wuhe_hints = _liunian_wuhe(bazi, day_gan, is_male, dayun_gan, liunian_gan)
     
     # 3. love_signals：感情信号（合冲同现等）
     love_signals = _compute_love_signals(liunian, bazi, day_gan, is_male, liunian_gan)
     
-    # 4. hints：流年提示列表（唯一真相源）
-    hints: List[str] = []
+    # 4. hints：流年提示列表（唯一真相源；存提示编码）
+    hints: List[Dict[str, Any]] = []
     
     # 4.1 婚恋变化提醒（从 marriage_wuhe_hints）
     for hint in marriage_wuhe_hints:
-        hints.append(f"婚恋变化提醒（如恋爱）：{hint['hint_text']}")
+        hints.append(_marriage_wuhe_hint("wuhe_change", hint, is_male))
     
     # 4.2 缘分提示（从 love_signals）
     liunian_zhi = liunian.get("zhi", "")
@@ -380,10 +378,10 @@ def enrich_liunian(
         if gan_shishen:
             if is_male:
                 if gan_shishen in ("正财", "偏财"):
-                    hints.append("提示：缘分（天干）：暧昧推进")
+                    hints.append(make_hint("yuanfen_gan"))
             else:
                 if gan_shishen in ("正官", "七杀"):
-                    hints.append("提示：缘分（天干）：暧昧推进")
+                    hints.append(make_hint("yuanfen_gan"))
     
     if liunian_zhi:
         main_gan = get_branch_main_gan(liunian_zhi)
@@ -392,14 +390,14 @@ def enrich_liunian(
             if zhi_shishen:
                 if is_male:
                     if zhi_shishen in ("正财", "偏财"):
-                        hints.append("提示：缘分（地支）：易遇合适伴侣（良缘）")
+                        hints.append(make_hint("yuanfen_zhi"))
                 else:
                     if zhi_shishen in ("正官", "七杀"):
-                        hints.append("提示：缘分（地支）：易遇合适伴侣（良缘）")
+                        hints.append(make_hint("yuanfen_zhi"))
     
     # 4.3 合冲同现提示
     if love_signals.get("he_and_chong_coexist"):
-        hints.append("提示：感情线合冲同现（进展易受阻/反复拉扯；仓促定论的稳定性更低）")
+        hints.append(make_hint("love_he_chong"))
     
     # 4.4 天克地冲提示（从 liunian 数据中提取）
     # 检查运年天克地冲（从 clashes_dayun 中检查）
@@ -408,7 +406,7 @@ def enrich_liunian(
         if not ev_clash:
             continue
         if ev_clash.get("is_tian_ke_di_chong", False):
-            hints.append("提示：运年天克地冲（家人去世/生活环境变化剧烈，如出国上学打工）")
+            hints.append(make_hint("yun_nian_tkdc"))
             break  # 每年只加一次
     
     # 检查时柱天克地冲（用于后续互斥判断，实际提示由 cli.py 生成）
@@ -430,7 +428,7 @@ def enrich_liunian(
     # 4.5 风险管理选项（从 total_risk_percent 判断，>= 40% 时添加）
     total_risk = liunian.get("total_risk_percent", 0.0)
     if total_risk >= 40.0:
-        hints.append("风险管理选项（供参考）：保险/预案；投机回撤风险更高；合规优先；职业变动成本更高；情绪波动时更易误判；重大决定适合拉长周期")
+        hints.append(make_hint("risk_options"))
     
     # 4.6 其他提示（从 clashes_natal 和 harmonies_natal 中提取）
     # 婚姻宫/夫妻宫被冲
@@ -445,7 +443,7 @@ def enrich_liunian(
                 clash_palaces_hit.add(palace)
     
     if clash_palaces_hit:
-        hints.append("提示：感情（单身：更易暧昧/受阻；有伴侣：争执起伏）")
+        hints.append(make_hint("love_clash"))
     
     # 婚姻宫/夫妻宫被合（六合/半合）
     harmonies_natal = liunian.get("harmonies_natal", [])
@@ -463,11 +461,11 @@ def enrich_liunian(
                 harmony_palaces_hit.add(palace)
     
     for palace in harmony_palaces_hit:
-        hints.append(f"提示：{palace}引动（单身：更容易出现暧昧/推进；有伴侣：关系推进或波动）")
+        hints.append(make_hint("palace_harmony", palace=palace))
     
     # 事业家庭宫被冲（且未命中时柱天克地冲）
     if "事业家庭宫" in clash_palaces_hit and not has_hour_tkdc:
-        hints.append("提示：家庭变动（搬家/换工作/家庭节奏变化）")
+        hints.append(make_hint("family_change"))
     
     return {
         "wuhe_events": liunian_wuhe_events,
@@ -477,6 +475,99 @@ def enrich_liunian(
     }
 
 
+def _marriage_wuhe_hint(prefix: str, hint: Dict[str, Any], is_male: bool) -> Dict[str, Any]:
+    """婚恋五合提醒（detect_marriage_wuhe_hints 的一项）→ 提示编码。
+
+    prefix: "natal_wuhe"（原局：婚恋结构提示）或 "wuhe_change"（大运 / 流年：婚恋变化提醒）
+    """
+    kind = "contested" if hint["type"] == "他人争合" else "double"
+    star = "财星" if is_male else "官杀星"
+    return make_hint(f"{prefix}_{kind}", star=star, wuhe_name=hint["wuhe_name"])
+
+
+def _liunian_wuhe(
+    bazi: Dict[str, Dict[str, str]],
+    day_gan: str,
+    is_male: bool,
+    dayun_gan: Optional[str],
+    liunian_gan: str,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """流年层天干五合事件与婚恋五合提醒（返回解冻后的新对象）。
+
+    两者只取决于原局四干、日主、性别、大运天干与流年天干：一张盘同一性别下
+    只有 11 × 10 种组合，按此缓存，逐年只做查表和拷贝。
+    """
+    natal_gans = tuple(bazi[pillar]["gan"] for pillar in ("year", "month", "day", "hour"))
+    wuhe_events, marriage_hints = thaw(
+        _liunian_wuhe_cached(natal_gans, day_gan, is_male, dayun_gan or "", liunian_gan or "")
+    )
+    return wuhe_events, marriage_hints
+
+
+@lru_cache(maxsize=LIUNIAN_WUHE_CACHE_SIZE)
+def _liunian_wuhe_cached(
+    natal_gans: Tuple[str, ...],
+    day_gan: str,
+    is_male: bool,
+    dayun_gan: str,
+    liunian_gan: str,
+) -> FrozenList:
+    # 返回冻结的 [五合事件列表, 婚恋提醒列表]（_liunian_wuhe 解冻后拆开）
+    # 1. wuhe_events：流年层天干五合（只包含涉及流年天干的）
+    liunian_wuhe_events = []
+    if liunian_gan:
+        liunian_shishen = get_shishen(day_gan, liunian_gan) or "-"
+        liunian_gan_positions = []
+        pillar_labels = ("年干", "月干", "日干", "时干")
+        for label, gan in zip(pillar_labels, natal_gans):
+            shishen = get_shishen(day_gan, gan) or "-"
+            liunian_gan_positions.append(GanPosition(
+                source="natal",
+                label=label,
+                gan=gan,
+                shishen=shishen
+            ))
+        if dayun_gan:
+            dayun_shishen = get_shishen(day_gan, dayun_gan) or "-"
+            liunian_gan_positions.append(GanPosition(
+                source="dayun",
+                label="大运天干",
+                gan=dayun_gan,
+                shishen=dayun_shishen
+            ))
+        liunian_gan_positions.append(GanPosition(
+            source="liunian",
+            label="流年天干",
+            gan=liunian_gan,
+            shishen=liunian_shishen
+        ))
+        
+        liunian_wuhe_events_raw = detect_gan_wuhe(liunian_gan_positions)
+        # 只保留涉及流年天干的五合
+        for ev in liunian_wuhe_events_raw:
+            if any(pos.source == "liunian" for pos in ev["many_side"] + ev["few_side"]):
+                liunian_wuhe_events.append(ev)
+        
+        liunian_wuhe_events = _serialize_gan_wuhe_events(liunian_wuhe_events)
+    
+    # 2. marriage_wuhe_hints：流年层天干五合婚恋提醒
+    liunian_layer_gans = list(natal_gans)
+    trigger_gans_liunian = []
+    if dayun_gan:
+        liunian_layer_gans.append(dayun_gan)
+    if liunian_gan:
+        liunian_layer_gans.append(liunian_gan)
+        trigger_gans_liunian.append(liunian_gan)  # 只检查流年天干引动
+    
+    marriage_wuhe_hints = detect_marriage_wuhe_hints(
+        gan_list=liunian_layer_gans,
+        day_gan=day_gan,
+        is_male=is_male,
+        trigger_gans=trigger_gans_liunian if trigger_gans_liunian else None,
+    )
+    return freeze([liunian_wuhe_events, marriage_wuhe_hints])
+
+
 def _compute_love_signals(
     liunian: Dict[str, Any],
     bazi: Dict[str, Dict[str, str]],
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""事件表：facts 中的流年事件只存一份，按编号引用（用于缩小序列化后的 facts）。
+
+一条流年的同一个冲事件同时出现在 clashes_natal 与 all_events 里，刑、模式同理；
+静态模式激活事件里还嵌着整份原局 / 大运模式 pair 和触发它的流年模式事件。序列化时这些都会重复展开。
+pack_facts 把一张盘全部流年里的事件放进 EventStore：内容相同的只存一份，流年各事件字段改存编号列表；
+expand_facts 把编号展开回原来的结构（与 materialize_facts 后的 facts 相同，即现有 JSON 契约）。
+
+打包后的 facts 多一个顶层字段 "events"（事件表），其余结构不变。
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from .lazy_facts import materialize
+from .luck import _LIUNIAN_EVENT_FIELDS
+
+# 流年里单个事件（或 None）的字段
+_LIUNIAN_SINGLE_EVENT_FIELDS = ("sanhe_sanhui_clash_bonus_event",)
+
+# 事件内部引用其他事件 / 模式 pair 的列表字段（静态模式激活事件）
+_NESTED_EVENT_FIELDS = (
+    "activated_natal_gan_pairs",
+    "activated_dayun_gan_pairs",
+    "activated_natal_zhi_pairs",
+    "activated_dayun_zhi_pairs",
+    "liunian_pairs_trigger_gan",
+    "liunian_pairs_trigger_zhi",
+)
+
+
+class EventStore:
+    """一张盘的事件表：内容相同的事件只存一份，编号即在 events 中的下标。
+
+    events 中的事件已打包：嵌套的事件字段（_NESTED_EVENT_FIELDS）存编号列表。
+    """
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self._by_content: Dict[str, int] = {}
+        # id(事件) → (编号, 事件)；同时持有事件本身，免得对象释放后 id 被复用
+        self._by_object: Dict[int, Tuple[int, Dict[str, Any]]] = {}
+
+    def add(self, event: Dict[str, Any]) -> int:
+        """登记一个事件（同一对象 / 内容相同的事件返回同一个编号）。"""
+        known = self._by_object.get(id(event))
+        if known is not None:
+            return known[0]
+        packed = dict(event)
+        for field_name in _NESTED_EVENT_FIELDS:
+            if field_name in packed:
+                packed[field_name] = [self.add(nested) for nested in packed[field_name]]
+        # 键顺序参与比较：展开后的 JSON 与原来逐字相同
+        content = json.dumps(packed, ensure_ascii=False, default=str)
+        event_id = self._by_content.get(content)
+        if event_id is None:
+            event_id = len(self.events)
+            self.events.append(packed)
+            self._by_content[content] = event_id
+        self._by_object[id(event)] = (event_id, event)
+        return event_id
+
+
+def pack_facts(facts: Dict[str, Any]) -> Dict[str, Any]:
+    """facts → 打包的 facts（流年事件字段存编号，事件在顶层 "events"）。不修改传入的 facts。
+
+    惰性 / 紧凑模式的流年和索引在这里一并算出。
+    """
+    store = EventStore()
+    groups = []
+    for group in facts.get("luck", {}).get("groups", []):
+        liunian_list = []
+        for liunian in group.get("liunian", []):
+            packed = dict(materialize(liunian))
+            for field_name in _LIUNIAN_EVENT_FIELDS:
+                if field_name in packed:
+                    packed[field_name] = [store.add(ev) for ev in packed[field_name]]
+            for field_name in _LIUNIAN_SINGLE_EVENT_FIELDS:
+                if packed.get(field_name) is not None:
+                    packed[field_name] = store.add(packed[field_name])
+            liunian_list.append(packed)
+        groups.append(dict(group, liunian=liunian_list))
+
+    result = dict(facts)
+    result["luck"] = dict(facts.get("luck", {}), groups=groups)
+    if "indexes" in facts:
+        result["indexes"] = {name: materialize(index) for name, index in facts["indexes"].items()}
+    result["events"] = store.events
+    return result
+
+
+def expand_facts(packed: Dict[str, Any]) -> Dict[str, Any]:
+    """打包的 facts → 原结构的 facts（现有 JSON 契约）。同一编号展开为同一个 dict。"""
+    events = packed.get("events", [])
+    expanded: List[Optional[Dict[str, Any]]] = [None] * len(events)
+
+    def expand_event(event_id: int) -> Dict[str, Any]:
+        event = expanded[event_id]
+        if event is None:
+            event = dict(events[event_id])
+            for field_name in _NESTED_EVENT_FIELDS:
+                if field_name in event:
+                    event[field_name] = [expand_event(nested_id) for nested_id in event[field_name]]
+            expanded[event_id] = event
+        return event
+
+    groups = []
+    for group in packed.get("luck", {}).get("groups", []):
+        liunian_list = []
+        for liunian in group.get("liunian", []):
+            liunian = dict(liunian)
+            for field_name in _LIUNIAN_EVENT_FIELDS:
+                if field_name in liunian:
+                    liunian[field_name] = [expand_event(event_id) for event_id in liunian[field_name]]
+            for field_name in _LIUNIAN_SINGLE_EVENT_FIELDS:
+                if liunian.get(field_name) is not None:
+                    liunian[field_name] = expand_event(liunian[field_name])
+            liunian_list.append(liunian)
+        groups.append(dict(group, liunian=liunian_list))
+
+    facts = {key: value for key, value in packed.items() if key != "events"}
+    facts["luck"] = dict(packed.get("luck", {}), groups=groups)
+    return facts
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""只读事件记录：缓存层共享的结果冻结起来，按年的调整以叠加字段表达（写时复制）。
+
+原局 / 大运 / 流年内核 / 丰富化各层的缓存结果，以及原局响应表、流年模式表，在年份、请求、
+命盘之间共享。原先靠每次取出时 deepcopy 防止调用方改坏缓存；现在缓存里存 freeze 后的只读结构
+（FrozenEvent / FrozenList），谁写它都会直接报 TypeError。逐年的 flow_year / flow_type、
+冲叠模式的 risk_percent 加成、大运序号等用 overlay 得到新记录（底层字段共享、不拷贝）；
+只在结果进入 facts（evaluate_liunian / _stamp_dayun / evaluate_dayun 等对外返回）时 thaw 一次，
+换成可写的普通 dict / list。
+
+FrozenEvent 的读法与 dict 一致（[] / get / in / items / ==），字段顺序与原 dict 相同，
+overlay 新增的字段排在最后（与 dict 赋值新键的顺序一致）。
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional
+
+_NO_OVERLAY: Dict[str, Any] = {}
+
+# 不可变的标量类型：冻结 / 解冻时原样保留（按具体类型判断，省掉逐层递归）
+_SCALARS = frozenset({str, int, float, bool, type(None)})
+
+
+class FrozenEvent(Mapping):
+    """只读事件记录。
+
+    参数:
+        fields: 底层字段（构造后不再修改，可在多个记录之间共享）
+        overlay: 叠加字段，同名时覆盖底层字段
+    """
+
+    __slots__ = ("_fields", "_overlay")
+
+    def __init__(self, fields: Dict[str, Any], overlay: Optional[Dict[str, Any]] = None):
+        self._fields = fields
+        self._overlay = overlay or _NO_OVERLAY
+
+    def overlay(self, **fields: Any) -> "FrozenEvent":
+        """叠加若干字段，返回新记录（原记录不变，底层字段共享）。"""
+        merged = dict(self._overlay)
+        for key, value in fields.items():
+            merged[key] = value if type(value) in _SCALARS else freeze(value)
+        return FrozenEvent(self._fields, merged)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """换成可写的普通 dict（嵌套的只读结构一并换成 dict / list）。"""
+        return thaw(self)
+
+    def __getitem__(self, key: str) -> Any:
+        overlay = self._overlay
+        if key in overlay:
+            return overlay[key]
+        return self._fields[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._fields
+        for key in self._overlay:
+            if key not in self._fields:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self._fields) + sum(1 for key in self._overlay if key not in self._fields)
+
+    def __repr__(self) -> str:
+        return f"FrozenEvent({dict(self._items())!r})"
+
+    def _items(self):
+        if not self._overlay:
+            return self._fields.items()
+        # dict.update：已有的键保持原位置、值被覆盖，新键排在最后（与 __iter__ 的顺序一致）
+        merged = dict(self._fields)
+        merged.update(self._overlay)
+        return merged.items()
+
+
+class FrozenList(tuple):
+    """只读列表（freeze 对 list 的替身；thaw 时换回 list，普通 tuple 原样保留）。"""
+
+    __slots__ = ()
+
+    # 与内容相同的 list 相等（FrozenEvent 与原 dict 比较时嵌套的列表也要相等）
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, list):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other: object) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = tuple.__hash__
+
+    def __repr__(self) -> str:
+        return f"FrozenList({list(self)!r})"
+
+
+def freeze(value: Any) -> Any:
+    """dict / list（递归）→ FrozenEvent / FrozenList；同一个对象出现多次时冻结后仍是同一个对象。"""
+    return _freeze(value, {})
+
+
+def _freeze(value: Any, memo: Dict[int, Any]) -> Any:
+    # 先按具体类型判断（FrozenEvent 是 Mapping 的子类，isinstance 走 ABC 检查较慢）
+    cls = type(value)
+    if cls in _SCALARS or cls is FrozenEvent or cls is FrozenList or not isinstance(value, (dict, list)):
+        return value
+    frozen = memo.get(id(value))
+    if frozen is None:
+        if isinstance(value, dict):
+            frozen = FrozenEvent({key: _freeze(item, memo) for key, item in value.items()})
+        else:
+            frozen = FrozenList(_freeze(item, memo) for item in value)
+        memo[id(value)] = frozen
+    return frozen
+
+
+def thaw(value: Any) -> Any:
+    """只读结构（及其中的 dict / list）→ 新的普通 dict / list；同一个对象出现多次时解冻后仍是同一个对象。"""
+    return _thaw(value, {})
+
+
+def _thaw(value: Any, memo: Dict[int, Any]) -> Any:
+    cls = type(value)
+    if cls in _SCALARS:
+        return value
+    if cls is FrozenEvent:
+        items = value._items()
+    elif isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):  # FrozenList 是 tuple 的子类，单独判断
+        items = None
+    elif cls is FrozenList:
+        items = None
+    else:
+        return value
+    thawed = memo.get(id(value))
+    if thawed is None:
+        if items is not None:
+            thawed = {key: item if type(item) in _SCALARS else _thaw(item, memo) for key, item in items}
+        else:
+            thawed = [item if type(item) in _SCALARS else _thaw(item, memo) for item in value]
+        memo[id(value)] = thawed
+    return thawed
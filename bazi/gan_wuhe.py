@@ -4,7 +4,7 @@
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 
-from .config import GAN_WUHE
+from .relations import gan_wuhe_name
 from .shishen import get_shishen
 
 
@@ -54,10 +54,10 @@ def detect_gan_wuhe(positions: List[GanPosition]) -> List[Dict[str, Any]]:
             if pair_key in checked_pairs:
                 continue
             
-            # 检查是否是五合
-            if pair_key in GAN_WUHE:
+            # 检查是否是五合（10×10 查表）
+            wuhe_name = gan_wuhe_name(gan_a, gan_b)
+            if wuhe_name:
                 checked_pairs.add(pair_key)
-                wuhe_name = GAN_WUHE[pair_key]
                 
                 pos_a = gan_to_positions[gan_a]
                 pos_b = gan_to_positions[gan_b]
@@ -3,7 +3,17 @@
 
 from typing import Dict, Any, List, Optional
 
-from .config import ZHI_LIUHE, ZHI_SANHE, PILLAR_PALACE_CN, POSITION_WEIGHTS
+from .codes import ZHI_CODE
+from .config import PILLAR_PALACE_CN, POSITION_WEIGHTS
+from .relations import (
+    SANHE_GROUPS,
+    SANHUI_GROUPS,
+    ZHI_SANHE_GROUP,
+    ZHI_SANHUI_GROUP,
+    liuhe_partner,
+    sanhe_group_index,
+    sanhui_group_index,
+)
 from .shishen import get_branch_shishen
 
 
@@ -15,22 +25,6 @@ SANHE_ELEMENT_MAP: Dict[str, str] = {
     "巳": "金", "酉": "金", "丑": "金",  # 巳酉丑金局
 }
 
-# 三会局定义
-ZHI_SANHUI: Dict[str, List[str]] = {
-    "寅": ["寅", "卯", "辰"],  # 寅卯辰（春木会）
-    "卯": ["寅", "卯", "辰"],
-    "辰": ["寅", "卯", "辰"],
-    "巳": ["巳", "午", "未"],  # 巳午未（夏火会）
-    "午": ["巳", "午", "未"],
-    "未": ["巳", "午", "未"],
-    "申": ["申", "酉", "戌"],  # 申酉戌（秋金会）
-    "酉": ["申", "酉", "戌"],
-    "戌": ["申", "酉", "戌"],
-    "亥": ["亥", "子", "丑"],  # 亥子丑（冬水会）
-    "子": ["亥", "子", "丑"],
-    "丑": ["亥", "子", "丑"],
-}
-
 # 三会局名称
 SANHUI_NAME_MAP: Dict[str, str] = {
     "寅": "木会", "卯": "木会", "辰": "木会",
@@ -39,6 +33,19 @@ SANHUI_NAME_MAP: Dict[str, str] = {
     "亥": "水会", "子": "水会", "丑": "水会",
 }
 
+# 柱位中文名称（三合 / 三会来源标注用）
+PILLAR_NAME_CN: Dict[str, str] = {
+    "year": "年柱",
+    "month": "月柱",
+    "day": "日柱",
+    "hour": "时柱",
+}
+
+
+def _present_groups(group_index, branches) -> set:
+    """给定地支（可含 None）所涉及的三合 / 三会局编号。"""
+    return {group_index[ZHI_CODE[z]] for z in branches if z in ZHI_CODE}
+
 
 def _get_position_weight(pillar: str, kind: str) -> float:
     """获取位置权重。"""
@@ -83,7 +90,7 @@ def detect_natal_harmonies(bazi: Dict[str, Dict[str, str]]) -> List[Dict[str, An
     seen_liuhe: set = set()
     for i, pillar1 in enumerate(pillars):
         zhi1 = branches[pillar1]
-        partner = ZHI_LIUHE.get(zhi1)
+        partner = liuhe_partner(zhi1)
         if not partner:
             continue
 
@@ -121,14 +128,12 @@ def detect_natal_harmonies(bazi: Dict[str, Dict[str, str]]) -> List[Dict[str, An
                     "targets": targets,
                 })
 
-    # 2. 检测三合局（完整三合 + 半合）
-    seen_sanhe: set = set()
-    for _, group in ZHI_SANHE.items():
+    # 2. 检测三合局（完整三合 + 半合），只看命局地支涉及的局
+    present_sanhe = _present_groups(ZHI_SANHE_GROUP, branches.values())
+    for group_idx, group in enumerate(SANHE_GROUPS):
         # group 形如 ["申", "子", "辰"]，中间一支 = group[1]
-        group_key = tuple(sorted(group))
-        if group_key in seen_sanhe:
+        if group_idx not in present_sanhe:
             continue
-        seen_sanhe.add(group_key)
 
         # 找出命局中属于该三合局的所有柱位（允许同一支重复出现在多宫位）
         found_pillars: List[str] = []
@@ -235,12 +240,10 @@ def detect_natal_harmonies(bazi: Dict[str, Dict[str, str]]) -> List[Dict[str, An
                     })
 
     # 3. 检测三会（只检测完整三会，三支齐）
-    seen_sanhui: set = set()
-    for zhi, group in ZHI_SANHUI.items():
-        group_key = tuple(sorted(group))
-        if group_key in seen_sanhui:
+    present_sanhui = _present_groups(ZHI_SANHUI_GROUP, branches.values())
+    for group_idx, group in enumerate(SANHUI_GROUPS):
+        if group_idx not in present_sanhui:
             continue
-        seen_sanhui.add(group_key)
 
         found_pillars: List[str] = []
         found_branches: List[str] = []
@@ -323,7 +326,7 @@ def detect_flow_harmonies(
     branches = {p: bazi[p]["zhi"] for p in pillars}
 
     # 1. 检测六合
-    partner = ZHI_LIUHE.get(flow_branch)
+    partner = liuhe_partner(flow_branch)
     if partner:
         for pillar in pillars:
             natal_zhi = branches[pillar]
@@ -352,8 +355,9 @@ def detect_flow_harmonies(
                 })
 
     # 2. 检测三合局（完整三合 + 半合）
-    flow_group = ZHI_SANHE.get(flow_branch)
-    if flow_group:
+    flow_group_idx = sanhe_group_index(flow_branch)
+    if flow_group_idx is not None:
+        flow_group = SANHE_GROUPS[flow_group_idx]
         # 收集命局中属于该三合局的地支（允许同一支出现在多个宫位）
         found_pillars_by_zhi: Dict[str, List[str]] = {}  # zhi -> [pillars]
         for pillar in pillars:
@@ -450,8 +454,9 @@ def detect_flow_harmonies(
             _emit_banhe(center)
 
     # 3. 检测三会（流年/大运 + 命局两个地支 = 完整三会）
-    flow_sanhui_group = ZHI_SANHUI.get(flow_branch)
-    if flow_sanhui_group:
+    flow_sanhui_idx = sanhui_group_index(flow_branch)
+    if flow_sanhui_idx is not None:
+        flow_sanhui_group = SANHUI_GROUPS[flow_sanhui_idx]
         # 收集命局中属于该三会的地支（去重）
         found_pillars_by_zhi: Dict[str, List[str]] = {}  # zhi -> [pillars]
         for pillar in pillars:
@@ -526,21 +531,11 @@ def detect_sanhe_complete(
     pillars = ["year", "month", "day", "hour"]
     branches = {p: bazi[p]["zhi"] for p in pillars}
     
-    # 柱位中文名称映射
-    PILLAR_NAME_CN = {
-        "year": "年柱",
-        "month": "月柱",
-        "day": "日柱",
-        "hour": "时柱",
-    }
-    
-    # 遍历所有三合局
-    seen_groups: set = set()
-    for _, group in ZHI_SANHE.items():
-        group_key = tuple(sorted(group))
-        if group_key in seen_groups:
+    # 只遍历原局 / 大运 / 流年地支涉及的三合局（按局的固定顺序）
+    present = _present_groups(ZHI_SANHE_GROUP, [*branches.values(), dayun_branch, liunian_branch])
+    for group_idx, group in enumerate(SANHE_GROUPS):
+        if group_idx not in present:
             continue
-        seen_groups.add(group_key)
         
         element = SANHE_ELEMENT_MAP.get(group[0])
         group_name = f"{element}局" if element else ""
@@ -633,21 +628,11 @@ def detect_sanhui_complete(
     pillars = ["year", "month", "day", "hour"]
     branches = {p: bazi[p]["zhi"] for p in pillars}
     
-    # 柱位中文名称映射
-    PILLAR_NAME_CN = {
-        "year": "年柱",
-        "month": "月柱",
-        "day": "日柱",
-        "hour": "时柱",
-    }
-    
-    # 遍历所有三会局（去重，每个三会局只检测一次）
-    seen_groups: set = set()
-    for zhi, group in ZHI_SANHUI.items():
-        group_key = tuple(sorted(group))
-        if group_key in seen_groups:
+    # 只遍历原局 / 大运 / 流年地支涉及的三会局（按局的固定顺序）
+    present = _present_groups(ZHI_SANHUI_GROUP, [*branches.values(), dayun_branch, liunian_branch])
+    for group_idx, group in enumerate(SANHUI_GROUPS):
+        if group_idx not in present:
             continue
-        seen_groups.add(group_key)
         
         hui_name = SANHUI_NAME_MAP.get(group[0])
         
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""提示编码：facts 里的 hints 存编码 + 参数，文案到出口（CLI / year_detail / API）再渲染。
+
+enrich_natal / enrich_dayun / enrich_liunian 原先往 hints 里追加整句文案，
+同样的句子（如每个 total_risk ≥ 40 年份的风险管理选项）在年份、命盘之间反复出现，占了 facts 的大头。
+现在每条提示是 {"code": 编码, 参数...} 的小 dict；文案模板集中在 HINT_TEMPLATES（进程内共享），
+render_hint / render_hints 按模板还原出与原先逐字相同的文案，已经是字符串的提示原样返回。
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .config import HINT_RENDER_CACHE_SIZE
+
+Hint = Union[str, Dict[str, Any]]
+
+# 天干五合婚恋提醒的正文（marriage_wuhe 的 hint_text）
+_WUHE_CONTESTED = "天干{star}被争合，{wuhe_name}合走{star}：感情竞争/第三者介入的风险上升"
+_WUHE_DOUBLE = "命主合两个{star}，{wuhe_name}：更容易出现三方拉扯/三角关系倾向"
+_NATAL_WUHE_PREFIX = "婚恋结构提示："
+_WUHE_CHANGE_PREFIX = "婚恋变化提醒（如恋爱）："
+
+# 编码 → 文案模板（str.format，占位符即参数名）
+HINT_TEMPLATES: Dict[str, str] = {
+    # 原局
+    "natal_wuhe_contested": _NATAL_WUHE_PREFIX + _WUHE_CONTESTED,
+    "natal_wuhe_double": _NATAL_WUHE_PREFIX + _WUHE_DOUBLE,
+    # 大运 / 流年
+    "wuhe_change_contested": _WUHE_CHANGE_PREFIX + _WUHE_CONTESTED,
+    "wuhe_change_double": _WUHE_CHANGE_PREFIX + _WUHE_DOUBLE,
+    "yongshen_swap": (
+        "【用神互换提示】原局用神：{yongshen_list}；{shen_status}；生扶力量={support_percent:.0f}%；"
+        "运支={dayun_zhi}({yun_type}) → 更匹配的行业方向：{target_industry}。职业路径上更可能出现调整/变动窗口。"
+    ),
+    # 流年
+    "yuanfen_gan": "提示：缘分（天干）：暧昧推进",
+    "yuanfen_zhi": "提示：缘分（地支）：易遇合适伴侣（良缘）",
+    "love_he_chong": "提示：感情线合冲同现（进展易受阻/反复拉扯；仓促定论的稳定性更低）",
+    "yun_nian_tkdc": "提示：运年天克地冲（家人去世/生活环境变化剧烈，如出国上学打工）",
+    "risk_options": (
+        "风险管理选项（供参考）：保险/预案；投机回撤风险更高；合规优先；"
+        "职业变动成本更高；情绪波动时更易误判；重大决定适合拉长周期"
+    ),
+    "love_clash": "提示：感情（单身：更易暧昧/受阻；有伴侣：争执起伏）",
+    "palace_harmony": "提示：{palace}引动（单身：更容易出现暧昧/推进；有伴侣：关系推进或波动）",
+    "family_change": "提示：家庭变动（搬家/换工作/家庭节奏变化）",
+}
+
+
+def make_hint(code: str, **params: Any) -> Dict[str, Any]:
+    """构造一条提示编码：{"code": code, 参数...}。"""
+    if code not in HINT_TEMPLATES:
+        raise ValueError(f"未知的提示编码：{code}")
+    return {"code": code, **params}
+
+
+def render_hint(hint: Hint) -> str:
+    """提示编码 → 文案（字符串提示原样返回）。"""
+    if isinstance(hint, str):
+        return hint
+    params = tuple((key, value) for key, value in hint.items() if key != "code")
+    return _render(hint["code"], params)
+
+
+def render_hints(hints: Optional[List[Hint]]) -> List[str]:
+    """提示列表 → 文案列表（None 视为空列表）。"""
+    return [render_hint(hint) for hint in hints or []]
+
+
+@lru_cache(maxsize=HINT_RENDER_CACHE_SIZE)
+def _render(code: str, params: Tuple[Tuple[str, Any], ...]) -> str:
+    # 相同的提示在各年份 / 各命盘之间共用同一个字符串
+    template = HINT_TEMPLATES.get(code)
+    if template is None:
+        raise ValueError(f"未知的提示编码：{code}")
+    return template.format(**dict(params))
+
+
+def render_facts_hints(facts: Dict[str, Any]) -> Dict[str, Any]:
+    """facts 中原局 / 大运 / 流年的 hints 全部换成文案（现有 JSON 契约）。不修改传入的 facts。
+
+    惰性 / 紧凑模式的流年在这里一并算出。
+    """
+    from .lazy_facts import materialize
+
+    def with_text(record):
+        if record is None or "hints" not in record:
+            return record
+        return dict(record, hints=render_hints(record["hints"]))
+
+    groups = []
+    for group in facts.get("luck", {}).get("groups", []):
+        group = dict(group, liunian=[with_text(materialize(liunian)) for liunian in group.get("liunian", [])])
+        if "dayun" in group:
+            group["dayun"] = with_text(group["dayun"])
+        groups.append(group)
+
+    result = dict(facts)
+    if "natal" in facts:
+        result["natal"] = with_text(facts["natal"])
+    if "luck" in facts:
+        result["luck"] = dict(facts["luck"], groups=groups)
+    return result
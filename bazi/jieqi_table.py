@@ -0,0 +1,825 @@
+# -*- coding: utf-8 -*-
+"""节气交接时刻表（自动生成，请勿手工修改）。
+
+由 tools/build_jieqi_table.py 用 lunar_python 生成。
+覆盖 1899–2101 年，每年 12 个节：小寒、立春、惊蛰、清明、立夏、芒种、小暑、立秋、白露、寒露、立冬、大雪。
+每个元素为 YYYYMMDDhhmmss 形式的整数（北京时间，秒级）。
+"""
+
+JIE_FIRST_YEAR = 1899
+JIE_LAST_YEAR = 2101
+
+JIE_TABLE = (
+    # 1899
+    18990105201727, 18990204080656, 18990306023811, 18990405080849,
+    18990506021028, 18990606065238, 18990707172127, 18990808025933,
+    18990908052358, 18991008201942, 18991107224649, 18991207150433,
+    # 1900
+    19000106020357, 19000204135131, 19000306082152, 19000405135241,
+    19000506075512, 19000606123855, 19000707231008, 19000808085034,
+    19000908111638, 19001009021309, 19001108043944, 19001207205550,
+    # 1901
+    19010106075323, 19010204193952, 19010306141053, 19010405194421,
+    19010506135024, 19010606183627, 19010708050734, 19010808144606,
+    19010908171015, 19011009080628, 19011108103429, 19011208025237,
+    # 1902
+    19020106135133, 19020205013810, 19020306200732, 19020406013726,
+    19020506193848, 19020607001947, 19020708104619, 19020808202216,
+    19020908224625, 19021009134510, 19021108161746, 19021208084101,
+    # 1903
+    19030106194343, 19030205073117, 19030307015852, 19030406072553,
+    19030507012522, 19030607060707, 19030708163636, 19030809021550,
+    19030909044221, 19031009194144, 19031108221323, 19031208143519,
+    # 1904
+    19040107013702, 19040205132407, 19040306075139, 19040405131851,
+    19040506071834, 19040606120058, 19040707223141, 19040808081151,
+    19040908103758, 19041009013534, 19041108040458, 19041207202520,
+    # 1905
+    19050106072706, 19050204191549, 19050306134536, 19050405191428,
+    19050506131404, 19050606175333, 19050708041959, 19050808135657,
+    19050908162146, 19051009071936, 19051108094946, 19051208021047,
+    # 1906
+    19060106131327, 19060205010354, 19060306193606, 19060406010716,
+    19060506190829, 19060606234854, 19060708101516, 19060808195134,
+    19060908221612, 19061009131453, 19061108154654, 19061208080925,
+    # 1907
+    19070106191125, 19070205065849, 19070307012705, 19070406065447,
+    19070507005335, 19070607053256, 19070708155910, 19070809013558,
+    19070909040202, 19071009190242, 19071108213617, 19071208135926,
+    # 1908
+    19080107010107, 19080205124713, 19080306071334, 19080405123946,
+    19080506063820, 19080606111903, 19080707214800, 19080808072642,
+    19080908095216, 19081009005051, 19081108032201, 19081207194337,
+    # 1909
+    19090106064513, 19090204183231, 19090306130047, 19090405182925,
+    19090506123050, 19090606171356, 19090708034357, 19090808132228,
+    19090908154635, 19091009064308, 19091108091303, 19091208013449,
+    # 1910
+    19100106123757, 19100205002722, 19100306185630, 19100406002255,
+    19100506181920, 19100606225620, 19100708092102, 19100808185708,
+    19100908212210, 19101009122105, 19101108145323, 19101208071653,
+    # 1911
+    19110106182052, 19110205061016, 19110307003850, 19110406060432,
+    19110507000018, 19110607043752, 19110708150455, 19110809004425,
+    19110909031316, 19111009181456, 19111108204700, 19111208130734,
+    # 1912
+    19120107000729, 19120205115331, 19120306062059, 19120405114815,
+    19120506054703, 19120606102729, 19120707205642, 19120808063710,
+    19120908090539, 19121009000642, 19121108023838, 19121207185853,
+    # 1913
+    19130106055754, 19130204174238, 19130306120858, 19130405173551,
+    19130506113439, 19130606161324, 19130708023852, 19130808121547,
+    19130908144224, 19131009054340, 19131108081742, 19131208004101,
+    # 1914
+    19140106114251, 19140204232916, 19140306175548, 19140405232150,
+    19140506172003, 19140606215956, 19140708082712, 19140808180511,
+    19140908203226, 19141009113447, 19141108141101, 19141208063705,
+    # 1915
+    19150106174016, 19150205052526, 19150306234816, 19150406050915,
+    19150506230244, 19150607034007, 19150708140745, 19150808234741,
+    19150909021705, 19151009172052, 19151108195738, 19151208122353,
+    # 1916
+    19160106232747, 19160205111358, 19160306053721, 19160405105749,
+    19160506044945, 19160606092539, 19160707195333, 19160808053455,
+    19160908080459, 19161008230751, 19161108014215, 19161207180609,
+    # 1917
+    19170106050927, 19170204165732, 19170306112448, 19170405164954,
+    19170506104542, 19170606152310, 19170708015013, 19170808113007,
+    19170908135921, 19171009050208, 19171108073654, 19171208000059,
+    # 1918
+    19180106110423, 19180204225305, 19180306172055, 19180405224512,
+    19180506163811, 19180606211057, 19180708073207, 19180808170724,
+    19180908193526, 19181009104017, 19181108131852, 19181208054629,
+    # 1919
+    19190106165128, 19190205043923, 19190306230529, 19190406042844,
+    19190506222200, 19190607025636, 19190708132030, 19190808225801,
+    19190909012737, 19191009163320, 19191108191130, 19191208113747,
+    # 1920
+    19200106224047, 19200205102626, 19200306045102, 19200405101454,
+    19200506041117, 19200606085022, 19200707191836, 19200808045814,
+    19200908072632, 19201008222908, 19201108010454, 19201207173016,
+    # 1921
+    19210106043340, 19210204162012, 19210306104509, 19210405160841,
+    19210506100417, 19210606144125, 19210708010634, 19210808104325,
+    19210908130939, 19211009041036, 19211108064530, 19211207231125,
+    # 1922
+    19220106101655, 19220204220624, 19220306163349, 19220405215800,
+    19220506155250, 19220606203015, 19220708065725, 19220808163708,
+    19220908190619, 19221009100925, 19221108124512, 19221208051038,
+    # 1923
+    19230106161400, 19230205040017, 19230306222426, 19230406034547,
+    19230506213814, 19230607021418, 19230708124211, 19230808222429,
+    19230909005709, 19231009160322, 19231108184020, 19231208110433,
+    # 1924
+    19240106220533, 19240205094932, 19240306041212, 19240405093307,
+    19240506032539, 19240606080131, 19240707182924, 19240808041214,
+    19240908064530, 19241008215209, 19241108002911, 19241207165259,
+    # 1925
+    19250106035314, 19250204153645, 19250306095950, 19250405152227,
+    19250506091751, 19250606135622, 19250708002454, 19250808100705,
+    19250908124001, 19251009034722, 19251108062613, 19251207225217,
+    # 1926
+    19260106095417, 19260204213816, 19260306155941, 19260405211817,
+    19260506150820, 19260606194137, 19260708060536, 19260808154412,
+    19260908181551, 19261009092451, 19261108120742, 19261208043839,
+    # 1927
+    19270106154437, 19270205033002, 19270306215016, 19270406030606,
+    19270506205304, 19270607012445, 19270708114955, 19270808213123,
+    19270909000525, 19271009151505, 19271108175654, 19271208102618,
+    # 1928
+    19280106213111, 19280205091622, 19280306033714, 19280405085431,
+    19280506024329, 19280606071709, 19280707174415, 19280808032730,
+    19280908060145, 19281008210951, 19281107234930, 19281207161716,
+    # 1929
+    19290106032201, 19290204150843, 19290306093157, 19290405145113,
+    19290506084020, 19290606131047, 19290707233138, 19290808090841,
+    19290908113934, 19291009024702, 19291108052727, 19291207215624,
+    # 1930
+    19300106090232, 19300204205107, 19300306151633, 19300405203722,
+    19300506142659, 19300606185802, 19300708051940, 19300808145658,
+    19300908172822, 19301009083728, 19301108112012, 19301208035037,
+    # 1931
+    19310106145535, 19310205024038, 19310306210206, 19310406022026,
+    19310506200935, 19310607004145, 19310708110534, 19310808204452,
+    19310908231715, 19311009142651, 19311108170951, 19311208094015,
+    # 1932
+    19320106204503, 19320205082920, 19320306024919, 19320405080619,
+    19320506015508, 19320606062743, 19320707165215, 19320808023148,
+    19320908050252, 19321008200938, 19321107224940, 19321207151822,
+    # 1933
+    19330106022320, 19330204140916, 19330306083124, 19330405135029,
+    19330506074145, 19330606121719, 19330707224417, 19330808082530,
+    19330908105726, 19331009020353, 19331108044258, 19331207211105,
+    # 1934
+    19340106081627, 19340204200337, 19340306142620, 19340405194339,
+    19340506133044, 19340606180121, 19340708042425, 19340808140338,
+    19340908163608, 19341009074459, 19341108102641, 19341208025631,
+    # 1935
+    19350106140219, 19350205014841, 19350306201010, 19350406012621,
+    19350506191202, 19350606234135, 19350708100532, 19350808194748,
+    19350908222404, 19351009133540, 19351108161731, 19351208084450,
+    # 1936
+    19360106194637, 19360205072916, 19360306014906, 19360405070644,
+    19360506005630, 19360606053040, 19360707155818, 19360808014310,
+    19360908042035, 19361008193225, 19361107221438, 19361207144213,
+    # 1937
+    19370106014344, 19370204132533, 19370306074424, 19370405130122,
+    19370506065035, 19370606112248, 19370707214555, 19370808072520,
+    19370908095923, 19371009011054, 19371108035515, 19371207202616,
+    # 1938
+    19380106073108, 19380204191458, 19380306133346, 19380405184839,
+    19380506123509, 19380606170637, 19380708033121, 19380808131241,
+    19380908154808, 19381009070124, 19381108094819, 19381208022158,
+    # 1939
+    19390106132751, 19390205011026, 19390306192611, 19390406003724,
+    19390506182102, 19390606225138, 19390708091820, 19390808190327,
+    19390908214201, 19391009125636, 19391108154330, 19391208081700,
+    # 1940
+    19400106192340, 19400205070732, 19400306012358, 19400405063434,
+    19400506001616, 19400606044402, 19400707150801, 19400808005129,
+    19400908032914, 19401008184223, 19401107212646, 19401207135751,
+    # 1941
+    19410106010354, 19410204124944, 19410306071004, 19410405122455,
+    19410506060950, 19410606103912, 19410707210304, 19410808064552,
+    19410908092348, 19411009003812, 19411108032403, 19411207195558,
+    # 1942
+    19420106070218, 19420204184834, 19420306130920, 19420405182350,
+    19420506120650, 19420606163231, 19420708025146, 19420808123018,
+    19420908150607, 19421009062142, 19421108091107, 19421208014647,
+    # 1943
+    19430106125450, 19430205004004, 19430306185830, 19430406001110,
+    19430506175321, 19430606221857, 19430708083850, 19430808181830,
+    19430908205508, 19431009121029, 19431108145843, 19431208073250,
+    # 1944
+    19440106183915, 19440205062255, 19440306004026, 19440405055358,
+    19440505233943, 19440606041053, 19440707143602, 19440808001851,
+    19440908025532, 19441008180843, 19441107205439, 19441207132738,
+    # 1945
+    19450106003426, 19450204121922, 19450306063759, 19450405115146,
+    19450506053635, 19450606100524, 19450707202646, 19450808060503,
+    19450908083807, 19451008234907, 19451108023411, 19451207190739,
+    # 1946
+    19460106061619, 19460204180353, 19460306122438, 19460405173832,
+    19460506112129, 19460606154842, 19460708021048, 19460808115135,
+    19460908142725, 19461009054047, 19461108082709, 19461208010011,
+    # 1947
+    19470106120620, 19470204235021, 19470306180756, 19470405232008,
+    19470506170257, 19470606213112, 19470708075548, 19470808174051,
+    19470908202103, 19471009113717, 19471108142422, 19471208065611,
+    # 1948
+    19480106180013, 19480205054200, 19480305235753, 19480405050920,
+    19480505225213, 19480606032019, 19480707134328, 19480807232617,
+    19480908020459, 19481008172016, 19481107200632, 19481207123737,
+    # 1949
+    19490105234108, 19490204112249, 19490306053916, 19490405105156,
+    19490506043634, 19490606090649, 19490707193135, 19490808051456,
+    19490908075409, 19491008231102, 19491108015946, 19491207183324,
+    # 1950
+    19500106053843, 19500204172046, 19500306113526, 19500405164427,
+    19500506102441, 19500606145100, 19500708011317, 19500808105511,
+    19500908133339, 19501009045139, 19501108074343, 19501208002140,
+    # 1951
+    19510106113022, 19510204231326, 19510306172640, 19510405223238,
+    19510506160915, 19510606203232, 19510708065351, 19510808163726,
+    19510908191810, 19511009103623, 19511108132636, 19511208060218,
+    # 1952
+    19520106170945, 19520205045254, 19520305230718, 19520405041502,
+    19520505215401, 19520606022018, 19520707124438, 19520807223057,
+    19520908011342, 19521008163225, 19521107192134, 19521207115533,
+    # 1953
+    19530105230202, 19530204104553, 19530306050226, 19530405101236,
+    19530506035218, 19530606081604, 19530707183454, 19530808041435,
+    19530908065243, 19531008221025, 19531108010057, 19531207173659,
+    # 1954
+    19540106044517, 19540204163041, 19540306104832, 19540405155910,
+    19540506093810, 19540606140049, 19540708001910, 19540808095904,
+    19540908123751, 19541009035718, 19541108065034, 19541207232829,
+    # 1955
+    19550106103552, 19550204221736, 19550306163057, 19550405213844,
+    19550506151758, 19550606194325, 19550708060552, 19550808155002,
+    19550908183146, 19551009095208, 19551108124509, 19551208052246,
+    # 1956
+    19560106163017, 19560205041155, 19560305222427, 19560405033109,
+    19560505210958, 19560606013547, 19560707115759, 19560807214012,
+    19560908001856, 19561008153553, 19561107182554, 19561207110206,
+    # 1957
+    19570105221025, 19570204095437, 19570306041007, 19570405091849,
+    19570506025822, 19570606072443, 19570707174809, 19570808033203,
+    19570908061211, 19571008212958, 19571108002001, 19571207165556,
+    # 1958
+    19580106040420, 19580204154911, 19580306100452, 19580405151221,
+    19580506084910, 19580606131211, 19580707233325, 19580808091710,
+    19580908115849, 19581009031908, 19581108061153, 19581207224935,
+    # 1959
+    19590106095818, 19590204214210, 19590306155635, 19590405210302,
+    19590506143842, 19590606190003, 19590708051952, 19590808150404,
+    19590908174754, 19591009090948, 19591108120203, 19591208043716,
+    # 1960
+    19600106154227, 19600205032309, 19600305213606, 19600405024333,
+    19600505202233, 19600606004834, 19600707111239, 19600807205944,
+    19600907234522, 19601008150839, 19601107180201, 19601207103744,
+    # 1961
+    19610105214236, 19610204092226, 19610306033439, 19610405084207,
+    19610506022116, 19610606064600, 19610707170635, 19610808024819,
+    19610908052912, 19611008205056, 19611107234611, 19611207162554,
+    # 1962
+    19620106033456, 19620204151720, 19620306092929, 19620405143414,
+    19620506080928, 19620606123115, 19620707225105, 19620808083340,
+    19620908111520, 19621009023753, 19621108053454, 19621207221639,
+    # 1963
+    19630106092626, 19630204210744, 19630306151709, 19630405201839,
+    19630506135157, 19630606181426, 19630708043737, 19630808142524,
+    19630908171150, 19631009083614, 19631108113219, 19631208041236,
+    # 1964
+    19640106152220, 19640205030455, 19640305211559, 19640405021820,
+    19640505195101, 19640606001143, 19640707103207, 19640807201609,
+    19640907225926, 19641008142130, 19641107171506, 19641207095303,
+    # 1965
+    19650105210157, 19650204084606, 19650306030038, 19650405080643,
+    19650506014132, 19650606060206, 19650707162122, 19650808020436,
+    19650908044750, 19651008201107, 19651107230632, 19651207154532,
+    # 1966
+    19660106025420, 19660204143748, 19660306085121, 19660405135629,
+    19660506073026, 19660606114937, 19660707220659, 19660808074856,
+    19660908103201, 19661009015643, 19661108045515, 19661207213745,
+    # 1967
+    19670106084819, 19670204203049, 19670306144153, 19670405194441,
+    19670506131726, 19670606173618, 19670708035319, 19670808133451,
+    19670908161742, 19671009074111, 19671108103723, 19671208031728,
+    # 1968
+    19680106142610, 19680205020723, 19680305201745, 19680405012053,
+    19680505185547, 19680605231905, 19680707094137, 19680807192711,
+    19680907221124, 19681008133423, 19681107162917, 19681207090815,
+    # 1969
+    19690105201648, 19690204075852, 19690306021034, 19690405071451,
+    19690506004947, 19690606051129, 19690707153131, 19690808011406,
+    19690908035525, 19691008191640, 19691107221120, 19691207145118,
+    # 1970
+    19700106020139, 19700204134542, 19700306075827, 19700405130144,
+    19700506063347, 19700606105213, 19700707211031, 19700808065406,
+    19700908093753, 19701009010132, 19701108035743, 19701207203719,
+    # 1971
+    19710106074506, 19710204192525, 19710306133444, 19710405183600,
+    19710506120808, 19710606162851, 19710708025107, 19710808124012,
+    19710908153012, 19711009065834, 19711108095637, 19711208023542,
+    # 1972
+    19720106134150, 19720205012013, 19720305192804, 19720405002850,
+    19720505180110, 19720605222159, 19720707084253, 19720807182829,
+    19720907211506, 19721008124145, 19721107153923, 19721207081842,
+    # 1973
+    19730105192519, 19730204070412, 19730306011236, 19730405061353,
+    19730505234623, 19730606040650, 19730707142721, 19730808001248,
+    19730908025924, 19731008182715, 19731107212738, 19731207141023,
+    # 1974
+    19740106011955, 19740204130005, 19740306070706, 19740405120500,
+    19740506053352, 19740606095139, 19740707201106, 19740808055710,
+    19740908084504, 19741009001439, 19741108031758, 19741207200437,
+    # 1975
+    19750106071730, 19750204185912, 19750306130547, 19750405180130,
+    19750506112711, 19750606154201, 19750708015924, 19750808114453,
+    19750908143317, 19751009060204, 19751108090236, 19751208014609,
+    # 1976
+    19760106125722, 19760205003928, 19760305184806, 19760404234627,
+    19760505171424, 19760605213113, 19760707075050, 19760807173821,
+    19760907202812, 19761008115803, 19761107145834, 19761207074056,
+    # 1977
+    19770105185103, 19770204063325, 19770306004409, 19770405054544,
+    19770505231600, 19770606033201, 19770707134752, 19770807233014,
+    19770908021541, 19771008174356, 19771107204549, 19771207133049,
+    # 1978
+    19780106004312, 19780204122657, 19780306063811, 19780405113920,
+    19780506050832, 19780606092305, 19780707193657, 19780808051740,
+    19780908080224, 19781008233054, 19781108023401, 19781207192001,
+    # 1979
+    19790106063133, 19790204181218, 19790306121938, 19790405171757,
+    19790506104710, 19790606150511, 19790708012437, 19790808111053,
+    19790908135945, 19791009053002, 19791108083247, 19791208011748,
+    # 1980
+    19800106122853, 19800205000928, 19800305181629, 19800404231442,
+    19800505164428, 19800605210344, 19800707072356, 19800807170830,
+    19800907195327, 19801008111914, 19801107141813, 19801207070115,
+    # 1981
+    19810105181238, 19810204055523, 19810306000507, 19810405050502,
+    19810505223447, 19810606025239, 19810707131152, 19810807225709,
+    19810908014313, 19811008170932, 19811107200829, 19811207125115,
+    # 1982
+    19820106000235, 19820204114528, 19820306055434, 19820405105241,
+    19820506041959, 19820606083553, 19820707185435, 19820808044145,
+    19820908073143, 19821008230209, 19821108020406, 19821207184805,
+    # 1983
+    19830106055842, 19830204173942, 19830306114712, 19830405164423,
+    19830506101051, 19830606142542, 19830708004313, 19830808102937,
+    19830908132003, 19831009045104, 19831108075212, 19831208003340,
+    # 1984
+    19840106114051, 19840204231844, 19840305172439, 19840404222220,
+    19840505155057, 19840605200837, 19840707062906, 19840807161753,
+    19840907190950, 19841008104235, 19841107134532, 19841207062803,
+    # 1985
+    19850105173505, 19850204051147, 19850305231621, 19850405041335,
+    19850505214232, 19850606015956, 19850707121835, 19850807220416,
+    19850908005301, 19851008162433, 19851107192929, 19851207121621,
+    # 1986
+    19860105232802, 19860204110742, 19860306051208, 19860405100607,
+    19860506033036, 19860606074423, 19860707180045, 19860808034536,
+    19860908063437, 19861008220645, 19861108011249, 19861207180056,
+    # 1987
+    19870106051300, 19870204165140, 19870306105337, 19870405154408,
+    19870506090535, 19870606131858, 19870707233839, 19870808092913,
+    19870908122407, 19871009035940, 19871108070540, 19871207235212,
+    # 1988
+    19880106110330, 19880204224249, 19880305164632, 19880404213904,
+    19880505150143, 19880605191453, 19880707053254, 19880807152015,
+    19880907181131, 19881008094430, 19881107124855, 19881207053428,
+    # 1989
+    19890105164555, 19890204042709, 19890305223408, 19890405032954,
+    19890505205355, 19890606010513, 19890707111925, 19890807210352,
+    19890907235353, 19891008152719, 19891107183332, 19891207112057,
+    # 1990
+    19900105223314, 19900204101400, 19900306041918, 19900405091256,
+    19900506023526, 19900606064618, 19900707170028, 19900808024532,
+    19900908053728, 19901008211349, 19901108002330, 19901207171410,
+    # 1991
+    19910106042807, 19910204160824, 19910306101215, 19910405150442,
+    19910506082653, 19910606123817, 19910707225259, 19910808083715,
+    19910908112721, 19911009030107, 19911108060750, 19911207225600,
+    # 1992
+    19920106100831, 19920204214817, 19920305155208, 19920404204508,
+    19920505140840, 19920605182219, 19920707044015, 19920807142724,
+    19920907171820, 19921008085129, 19921107115702, 19921207044412,
+    # 1993
+    19930105155631, 19930204033709, 19930305214232, 19930405023711,
+    19930505200143, 19930606001513, 19930707103202, 19930807201758,
+    19930907230747, 19931008144002, 19931107174533, 19931207103349,
+    # 1994
+    19940105214807, 19940204093056, 19940306033742, 19940405083148,
+    19940506015405, 19940606060452, 19940707161922, 19940808020422,
+    19940908045507, 19941008202905, 19941107233536, 19941207162253,
+    # 1995
+    19950106033405, 19950204151251, 19950306091604, 19950405140806,
+    19950506073003, 19950606114228, 19950707220100, 19950808075144,
+    19950908104834, 19951009022712, 19951108053535, 19951207222215,
+    # 1996
+    19960106093127, 19960204210754, 19960305150939, 19960404200201,
+    19960505132602, 19960605174047, 19960707040000, 19960807134849,
+    19960907164225, 19961008081842, 19961107112633, 19961207041400,
+    # 1997
+    19970105152428, 19970204030157, 19970305210407, 19970405015616,
+    19970505191926, 19970605233231, 19970707094923, 19970807193618,
+    19970907222849, 19971008140510, 19971107171438, 19971207100452,
+    # 1998
+    19980105211809, 19980204085652, 19980306025715, 19980405074457,
+    19980506010310, 19980606051322, 19980707153025, 19980808011950,
+    19980908041555, 19981008195545, 19981107230823, 19981207160135,
+    # 1999
+    19990106031709, 19990204145703, 19990306085742, 19990405134437,
+    19990506070100, 19990606110907, 19990707212459, 19990808071406,
+    19990908100959, 19991009014821, 19991108045751, 19991207214727,
+    # 2000
+    20000106090042, 20000204204024, 20000305144240, 20000404193158,
+    20000505125010, 20000605165834, 20000707031356, 20000807130259,
+    20000907155910, 20001008073813, 20001107104804, 20001207033702,
+    # 2001
+    20010105144916, 20010204022849, 20010305203228, 20010405012422,
+    20010505184450, 20010605225335, 20010707090642, 20010807185221,
+    20010907214611, 20011008132501, 20011107163652, 20011207092853,
+    # 2002
+    20020105204330, 20020204082405, 20020306022733, 20020405071817,
+    20020506003718, 20020606044446, 20020707145611, 20020808003918,
+    20020908033102, 20021008190918, 20021107222149, 20021207151414,
+    # 2003
+    20030106022743, 20030204140520, 20030306080452, 20030405125229,
+    20030506061029, 20030606101943, 20030707203539, 20030808062418,
+    20030908092014, 20031009010033, 20031108041311, 20031207210509,
+    # 2004
+    20040106081833, 20040204195613, 20040305135538, 20040404184319,
+    20040505120228, 20040605161346, 20040707023116, 20040807121936,
+    20040907151255, 20041008064918, 20041107095833, 20041207024857,
+    # 2005
+    20050105140259, 20050204014302, 20050305194510, 20050405003417,
+    20050505175250, 20050605220152, 20050707081634, 20050807180321,
+    20050907205640, 20051008123318, 20051107154226, 20051207083241,
+    # 2006
+    20060105194657, 20060204072716, 20060306012840, 20060405061531,
+    20060505233039, 20060606033659, 20060707135127, 20060807234047,
+    20060908023901, 20061008182123, 20061107213451, 20061207142649,
+    # 2007
+    20070106014010, 20070204131812, 20070306071759, 20070405120439,
+    20070506052024, 20070606092704, 20070707194144, 20070808053115,
+    20070908082929, 20071009001129, 20071108032401, 20071207201405,
+    # 2008
+    20080106072450, 20080204190024, 20080305125848, 20080404174552,
+    20080505110326, 20080605151144, 20080707012649, 20080807111610,
+    20080907141408, 20081008055638, 20081107091034, 20081207020218,
+    # 2009
+    20090105131408, 20090204004948, 20090305184731, 20090404233347,
+    20090505165050, 20090605205904, 20090707071329, 20090807170109,
+    20090907195737, 20091008114004, 20091107145616, 20091207075214,
+    # 2010
+    20100105190847, 20100204064751, 20100306004622, 20100405053030,
+    20100505224402, 20100606024924, 20100707130223, 20100807224907,
+    20100908014441, 20101008172629, 20101107204230, 20101207133823,
+    # 2011
+    20110106005437, 20110204123256, 20110306062959, 20110405111159,
+    20110506042313, 20110606082720, 20110707184200, 20110808043326,
+    20110908073414, 20111008231906, 20111108023456, 20111207192900,
+    # 2012
+    20120106064355, 20120204182224, 20120305122103, 20120404170537,
+    20120505101941, 20120605142554, 20120707004043, 20120807103033,
+    20120907132901, 20121008051143, 20121107082557, 20121207011856,
+    # 2013
+    20130105123338, 20130204001325, 20130305181451, 20130404230227,
+    20130505161810, 20130605202319, 20130707063436, 20130807162022,
+    20130907191616, 20131008105830, 20131107141353, 20131207070832,
+    # 2014
+    20140105182411, 20140204060316, 20140306000216, 20140405044640,
+    20140505215926, 20140606020302, 20140707121446, 20140807220228,
+    20140908010125, 20141008164730, 20141107200640, 20141207130405,
+    # 2015
+    20150106002032, 20150204115827, 20150306055540, 20150405103907,
+    20150506035236, 20150606075810, 20150707181215, 20150808040124,
+    20150908065934, 20151008224249, 20151108015837, 20151207185321,
+    # 2016
+    20160106060823, 20160204174603, 20160305114333, 20160404162731,
+    20160505094153, 20160605134830, 20160707000321, 20160807095301,
+    20160907125105, 20161008043323, 20161107074741, 20161207004107,
+    # 2017
+    20170105115545, 20170203233404, 20170305173243, 20170404221719,
+    20170505153102, 20170605193636, 20170707055042, 20170807154001,
+    20170907183838, 20171008102209, 20171107133749, 20171207063239,
+    # 2018
+    20180105174845, 20180204052830, 20180305232811, 20180405041247,
+    20180505212522, 20180606012909, 20180707114153, 20180807213040,
+    20180908002942, 20181008161443, 20181107193145, 20181207122555,
+    # 2019
+    20190105233858, 20190204111421, 20190306050946, 20190405095128,
+    20190506030248, 20190606070626, 20190707172033, 20190808031305,
+    20190908061654, 20191008220540, 20191108012424, 20191207181830,
+    # 2020
+    20200106053006, 20200204170319, 20200305105652, 20200404153809,
+    20200505085123, 20200605125826, 20200706231428, 20200807090611,
+    20200907120802, 20201008035516, 20201107071355, 20201207000930,
+    # 2021
+    20210105112326, 20210203225848, 20210305165342, 20210404213507,
+    20210505144711, 20210605185206, 20210707050529, 20210807145358,
+    20210907175256, 20211008093903, 20211107125847, 20211207055706,
+    # 2022
+    20220105171404, 20220204045047, 20220305224345, 20220405032014,
+    20220505202557, 20220606002549, 20220707103801, 20220807202908,
+    20220907233218, 20221008152228, 20221107184530, 20221207114616,
+    # 2023
+    20230105230451, 20230204104233, 20230306043614, 20230405091304,
+    20230506021846, 20230606061821, 20230707163041, 20230808022253,
+    20230908052643, 20231008211534, 20231108003535, 20231207173255,
+    # 2024
+    20240106044922, 20240204162707, 20240305102245, 20240404150217,
+    20240505081005, 20240605120954, 20240706222003, 20240807080916,
+    20240907111120, 20241008025957, 20241107062004, 20241206231703,
+    # 2025
+    20250105103247, 20250203221028, 20250305160718, 20250404204836,
+    20250505135713, 20250605175632, 20250707040459, 20250807135135,
+    20250907165157, 20251008084113, 20251107120404, 20251207050437,
+    # 2026
+    20260105162310, 20260204040208, 20260305215900, 20260405024000,
+    20260505194844, 20260605234821, 20260707095657, 20260807194243,
+    20260907224116, 20261008142917, 20261107175205, 20261207105232,
+    # 2027
+    20270105220958, 20270204094618, 20270306033933, 20270405081731,
+    20270506012512, 20270606052548, 20270707153703, 20270808012646,
+    20270908042828, 20271008201706, 20271107233835, 20271207163741,
+    # 2028
+    20280106035439, 20280204153113, 20280305092447, 20280404140306,
+    20280505071212, 20280605111600, 20280706213018, 20280807072111,
+    20280907102210, 20281008020831, 20281107052716, 20281206222441,
+    # 2029
+    20290105094155, 20290203212047, 20290305151737, 20290404195824,
+    20290505130746, 20290605170958, 20290707032223, 20290807131144,
+    20290907161154, 20291008075808, 20291107111646, 20291207041348,
+    # 2030
+    20300105153034, 20300204030828, 20300305210318, 20300405014101,
+    20300505184618, 20300605224430, 20300707085529, 20300807184720,
+    20300907215250, 20301008134517, 20301107170844, 20301207100737,
+    # 2031
+    20310105212309, 20310204085819, 20310306025103, 20310405072824,
+    20310506003512, 20310606043542, 20310707144851, 20310808004256,
+    20310908035011, 20311008194259, 20311107230540, 20311207160253,
+    # 2032
+    20320106031607, 20320204144859, 20320305084015, 20320404131736,
+    20320505062552, 20320605102759, 20320706204054, 20320807063244,
+    20320907093755, 20321008013025, 20321107045417, 20321206215320,
+    # 2033
+    20330105090807, 20330203204136, 20330305143222, 20330404190809,
+    20330505121347, 20330605161327, 20330707022457, 20330807121546,
+    20330907152022, 20331008071357, 20331107104105, 20331207034456,
+    # 2034
+    20340105150431, 20340204024110, 20340305203224, 20340405010615,
+    20340505180910, 20340605220641, 20340707081739, 20340807180907,
+    20340907211359, 20341008130707, 20341107163340, 20341207093649,
+    # 2035
+    20350105205543, 20350204083135, 20350306022139, 20350405065352,
+    20350505235457, 20350606035050, 20350707140111, 20350807235421,
+    20350908030230, 20351008185742, 20351107222352, 20351207152532,
+    # 2036
+    20360106024332, 20360204141957, 20360305081151, 20360404124617,
+    20360505054924, 20360605094701, 20360706195734, 20360807054857,
+    20360907085500, 20361008004900, 20361107041441, 20361206211603,
+    # 2037
+    20370105083405, 20370203201139, 20370305140613, 20370404184404,
+    20370505114929, 20370605154652, 20370707015509, 20370807114303,
+    20370907144535, 20371008063751, 20371107100406, 20371207030719,
+    # 2038
+    20380105142649, 20380204020348, 20380305195530, 20380405002929,
+    20380505173113, 20380605212539, 20380707073233, 20380807172120,
+    20380907202618, 20381008122136, 20381107155053, 20381207085624,
+    # 2039
+    20390105201641, 20390204075256, 20390306014304, 20390405061548,
+    20390505231811, 20390606031531, 20390707132611, 20390807231807,
+    20390908022404, 20391008181718, 20391107214255, 20391207144506,
+    # 2040
+    20400106020339, 20400204133956, 20400305073116, 20400404120533,
+    20400505050923, 20400605090804, 20400706191916, 20400807051005,
+    20400907081408, 20401008000534, 20401107032920, 20401206203005,
+    # 2041
+    20410105074810, 20410203192511, 20410305131752, 20410404175238,
+    20410505105433, 20410605144948, 20410707005831, 20410807104843,
+    20410907135336, 20411008054700, 20411107091308, 20411207021550,
+    # 2042
+    20420105133510, 20420204011253, 20420305190550, 20420404234041,
+    20420505164253, 20420605203815, 20420707064718, 20420807163850,
+    20420907194531, 20421008114037, 20421107150741, 20421207080916,
+    # 2043
+    20430105192523, 20430204065848, 20430306004748, 20430405052018,
+    20430505222207, 20430606021811, 20430707122753, 20430807222048,
+    20430908013013, 20431008172745, 20431107205552, 20431207135724,
+    # 2044
+    20440106011234, 20440204124421, 20440305063139, 20440404110309,
+    20440505040532, 20440605080404, 20440706181559, 20440807040840,
+    20440907071635, 20441007231322, 20441107024203, 20441206194516,
+    # 2045
+    20450105070235, 20450203183622, 20450305122506, 20450404165722,
+    20450505095935, 20450605135705, 20450707000808, 20450807095943,
+    20450907130531, 20451008050043, 20451107082955, 20451207013538,
+    # 2046
+    20460105125604, 20460204003109, 20460305181752, 20460404224503,
+    20460505154046, 20460605193219, 20460707054021, 20460807153324,
+    20460907184323, 20461008104230, 20461107141415, 20461207072122,
+    # 2047
+    20470105184227, 20470204061805, 20470306000522, 20470405043246,
+    20470505212837, 20470606012057, 20470707113034, 20470807212557,
+    20470908003815, 20471008163746, 20471107200725, 20471207131106,
+    # 2048
+    20480106002929, 20480204120444, 20480305055414, 20480404102524,
+    20480505032436, 20480605071824, 20480706172654, 20480807031858,
+    20480907062812, 20481007222650, 20481107015656, 20481206190055,
+    # 2049
+    20490105061848, 20490203175327, 20490305114301, 20490404161429,
+    20490505091244, 20490605130350, 20490706230855, 20490807085801,
+    20490907120538, 20491008040507, 20491107073830, 20491207004644,
+    # 2050
+    20500105120800, 20500203234354, 20500305173250, 20500404220321,
+    20500505150206, 20500605185457, 20500707050200, 20500807145237,
+    20500907180047, 20501008100017, 20501107133347, 20501207064154,
+    # 2051
+    20510105180218, 20510204053614, 20510305232210, 20510405034948,
+    20510505204714, 20510606004050, 20510707104934, 20510807204157,
+    20510907235126, 20511008155035, 20511107192215, 20511207122845,
+    # 2052
+    20520105234840, 20520204112305, 20520305050940, 20520404093727,
+    20520505023454, 20520605062934, 20520706164006, 20520807023322,
+    20520907054216, 20521007213956, 20521107010959, 20521206181536,
+    # 2053
+    20530105053614, 20530203171309, 20530305110324, 20530404153436,
+    20530505083340, 20530605122745, 20530706223715, 20530807083007,
+    20530907113844, 20531008033610, 20531107070615, 20531207001158,
+    # 2054
+    20540105113223, 20540203230801, 20540305165537, 20540404212310,
+    20540505141757, 20540605180735, 20540707041353, 20540807140704,
+    20540907171940, 20541008092219, 20541107125623, 20541207060330,
+    # 2055
+    20550105172240, 20550204045554, 20550305224132, 20550405030819,
+    20550505200357, 20550605235559, 20550707100519, 20550807200108,
+    20550907231538, 20551008151908, 20551107185250, 20551207115834,
+    # 2056
+    20560105231546, 20560204104714, 20560305043213, 20560404090004,
+    20560505015804, 20560605055225, 20560706160226, 20560807015609,
+    20560907050723, 20561007210911, 20561107004325, 20561206175100,
+    # 2057
+    20570105051008, 20570203164235, 20570305102705, 20570404145241,
+    20570505074643, 20570605113623, 20570706214231, 20570807073400,
+    20570907104410, 20571008024614, 20571107062252, 20571206233443,
+    # 2058
+    20580105105837, 20580203223435, 20580305161958, 20580404204403,
+    20580505133604, 20580605172449, 20580707033136, 20580807132520,
+    20580907163805, 20581008084118, 20581107121712, 20581207052710,
+    # 2059
+    20590105164915, 20590204042401, 20590305220848, 20590405023230,
+    20590505192402, 20590605231220, 20590707091853, 20590807191247,
+    20590907222638, 20591008143041, 20591107180544, 20591207111340,
+    # 2060
+    20600105223355, 20600204100814, 20600305035409, 20600404081948,
+    20600505011252, 20600605050137, 20600706150719, 20600807005912,
+    20600907041040, 20601007201334, 20601106234856, 20601206165737,
+    # 2061
+    20610105041830, 20610203155347, 20610305094142, 20610404141026,
+    20610505070633, 20610605105641, 20610706210208, 20610807065253,
+    20610907100236, 20611008020410, 20611107053955, 20611206225026,
+    # 2062
+    20620105101245, 20620203214705, 20620305153127, 20620404195529,
+    20620505124729, 20620605163449, 20620707023828, 20620807122858,
+    20620907154028, 20621008074436, 20621107112234, 20621207043431,
+    # 2063
+    20630105155716, 20630204033112, 20630305211426, 20630405013657,
+    20630505182821, 20630605221737, 20630707082530, 20630807182008,
+    20630907213335, 20631008133657, 20631107171208, 20631207102047,
+    # 2064
+    20640105214118, 20640204091452, 20640305025925, 20640404072424,
+    20640505001834, 20640605041010, 20640706141939, 20640807001422,
+    20640907032624, 20641007192801, 20641106230141, 20641206160919,
+    # 2065
+    20650105032934, 20650203150341, 20650305084910, 20650404131358,
+    20650505060527, 20650605095213, 20650706195652, 20650807054919,
+    20650907090159, 20651008010557, 20651107044237, 20651206215254,
+    # 2066
+    20660105091449, 20660203204922, 20660305143408, 20660404185746,
+    20660505114842, 20660605153554, 20660707014155, 20660807113657,
+    20660907145321, 20661008070052, 20661107103916, 20661207034830,
+    # 2067
+    20670105150705, 20670204023720, 20670305201832, 20670405004037,
+    20670505173212, 20670605212121, 20670707072910, 20670807172506,
+    20670907204219, 20671008125058, 20671107163028, 20671207094038,
+    # 2068
+    20680105205927, 20680204082903, 20680305020856, 20680404062944,
+    20680504232036, 20680605030934, 20680706131653, 20680806231109,
+    20680907022551, 20681007183305, 20681106221325, 20681206152611,
+    # 2069
+    20690105024818, 20690203142050, 20690305080234, 20690404122400,
+    20690505051443, 20690605090320, 20690706191058, 20690807050601,
+    20690907082039, 20691008002701, 20691107040728, 20691206212220,
+    # 2070
+    20700105084732, 20700203202148, 20700305140225, 20700404181947,
+    20700505110447, 20700605144801, 20700707005204, 20700807104636,
+    20700907140348, 20701008061321, 20701107095533, 20701207031045,
+    # 2071
+    20710105143555, 20710204021050, 20710305195235, 20710405001036,
+    20710505165513, 20710605203757, 20710707064247, 20710807163909,
+    20710907195757, 20711008120758, 20711107154842, 20711207090047,
+    # 2072
+    20720105202257, 20720204075700, 20720305014056, 20720404060341,
+    20720504225342, 20720605023956, 20720706124510, 20720806223920,
+    20720907015508, 20721007180316, 20721106214350, 20721206145627,
+    # 2073
+    20730105021850, 20730203135244, 20730305073642, 20730404115916,
+    20730505044747, 20730605083039, 20730706183050, 20730807042013,
+    20730907073318, 20731007234116, 20731107032405, 20731206204024,
+    # 2074
+    20740105080603, 20740203194115, 20740305132417, 20740404174507,
+    20740505103309, 20740605141740, 20740707002058, 20740807101313,
+    20740907132816, 20741008053713, 20741107091942, 20741207023425,
+    # 2075
+    20750105135751, 20750204013036, 20750305191121, 20750404233100,
+    20750505161941, 20750605200641, 20750707061328, 20750807160822,
+    20750907192356, 20751008113126, 20751107151136, 20751207082427,
+    # 2076
+    20760105194703, 20760204071952, 20760305010054, 20760404052020,
+    20760504220822, 20760605015433, 20760706120023, 20760806215433,
+    20760907010900, 20761007171452, 20761106205328, 20761206140529,
+    # 2077
+    20770105012828, 20770203130306, 20770305064650, 20770404110843,
+    20770505035803, 20770605074433, 20770706175051, 20770807034629,
+    20770907070309, 20771007231047, 20771107025015, 20771206200226,
+    # 2078
+    20780105072446, 20780203185721, 20780305123753, 20780404165605,
+    20780505094137, 20780605132445, 20780706232847, 20780807092408,
+    20780907124338, 20781008045559, 20781107083922, 20781207015245,
+    # 2079
+    20790105131329, 20790204004311, 20790305182059, 20790404223724,
+    20790505152218, 20790605190555, 20790707051143, 20790807150921,
+    20790907183017, 20791008104326, 20791107142706, 20791207074001,
+    # 2080
+    20800105185935, 20800204062757, 20800305000509, 20800404042242,
+    20800504211039, 20800605005747, 20800706110538, 20800806210306,
+    20800907002226, 20801007163420, 20801106201839, 20801206133351,
+    # 2081
+    20810105005601, 20810203122555, 20810305060243, 20810404101714,
+    20810505025957, 20810605064110, 20810706164331, 20810807023702,
+    20810907055437, 20811007220634, 20811107015247, 20811206191147,
+    # 2082
+    20820105063836, 20820203181212, 20820305115009, 20820404160308,
+    20820505084257, 20820605122210, 20820706222506, 20820807082119,
+    20820907114235, 20821008035731, 20821107074416, 20821207010134,
+    # 2083
+    20830105122610, 20830203235822, 20830305173614, 20830404215018,
+    20830505143137, 20830605181158, 20830707041550, 20830807141250,
+    20830907173430, 20831008094929, 20831107133542, 20831207065148,
+    # 2084
+    20840105181501, 20840204054637, 20840304232504, 20840404034028,
+    20840504202257, 20840605000244, 20840706100329, 20840806195622,
+    20840906231422, 20841007152715, 20841106191333, 20841206123111,
+    # 2085
+    20850104235619, 20850203112953, 20850305051031, 20850404092820,
+    20850505021303, 20850605055436, 20850706155620, 20850807014927,
+    20850907050729, 20851007212028, 20851107010738, 20851206182705,
+    # 2086
+    20860105055341, 20860203172626, 20860305110354, 20860404151738,
+    20860505075856, 20860605113840, 20860706214005, 20860807073327,
+    20860907105227, 20861008030705, 20861107065543, 20861207001554,
+    # 2087
+    20870105114235, 20870203231512, 20870305165200, 20870404210432,
+    20870505134444, 20870605172431, 20870707032759, 20870807132420,
+    20870907164423, 20871008085732, 20871107124313, 20871207060021,
+    # 2088
+    20880105172517, 20880204045809, 20880304223702, 20880404025248,
+    20880504193644, 20880604232001, 20880706092558, 20880806192337,
+    20880906224359, 20881007145621, 20881106184042, 20881206115643,
+    # 2089
+    20890104232114, 20890203105439, 20890305043440, 20890404085026,
+    20890505013151, 20890605051031, 20890706151107, 20890807010440,
+    20890907042401, 20891007203758, 20891107002448, 20891206174257,
+    # 2090
+    20900105050842, 20900203164217, 20900305102131, 20900404143613,
+    20900505071643, 20900605105458, 20900706205635, 20900807065247,
+    20900907101551, 20901008023344, 20901107062242, 20901206233950,
+    # 2091
+    20910105110157, 20910203223049, 20910305160620, 20910404202009,
+    20910505130305, 20910605164529, 20910707025053, 20910807124928,
+    20910907161325, 20911008083124, 20911107122042, 20911207053830,
+    # 2092
+    20920105170046, 20920204042849, 20920304220237, 20920404021434,
+    20920504185616, 20920604223744, 20920706084056, 20920806183600,
+    20920906215613, 20921007141139, 20921106180052, 20921206112103,
+    # 2093
+    20930104224702, 20930203101835, 20930305035424, 20930404080614,
+    20930505004619, 20930605042636, 20930706143037, 20930807002742,
+    20930907034942, 20931007200600, 20931106235546, 20931206171717,
+    # 2094
+    20940105044459, 20940203161703, 20940305095126, 20940404140001,
+    20940505063543, 20940605101158, 20940706201400, 20940807061137,
+    20940907093604, 20941008015518, 20941107054643, 20941206230806,
+    # 2095
+    20950105103502, 20950203220704, 20950305154200, 20950404195053,
+    20950505122554, 20950605160024, 20950707020100, 20950807115838,
+    20950907152327, 20951008074228, 20951107113239, 20951207045136,
+    # 2096
+    20960105161556, 20960204034651, 20960304212311, 20960404013544,
+    20960504181540, 20960604215425, 20960706075636, 20960806175325,
+    20960906211700, 20961007133523, 20961106172554, 20961206104550,
+    # 2097
+    20970104221053, 20970203094159, 20970305031819, 20970404073015,
+    20970505000812, 20970605034343, 20970706134123, 20970806233254,
+    20970907025252, 20971007191054, 20971106230352, 20971206162746,
+    # 2098
+    20980105035626, 20980203152900, 20980305090401, 20980404131317,
+    20980505054853, 20980605092323, 20980706192221, 20980807051632,
+    20980907083841, 20981008005756, 20981107045040, 20981206221254,
+    # 2099
+    20990105093916, 20990203210929, 20990305144237, 20990404185126,
+    20990505112904, 20990605150746, 20990707011141, 20990807111012,
+    20990907143409, 20991008065210, 20991107104238, 20991207040315,
+    # 2100
+    21000105152916, 21000204030017, 21000305203433, 21000405004348,
+    21000505172056, 21000605205807, 21000707065902, 21000807165405,
+    21000907201518, 21001008123113, 21001107162006, 21001207094007,
+    # 2101
+    21010105210651, 21010204083953, 21010306021650, 21010405062801,
+    21010505230507, 21010606024124, 21010707124244, 21010807223944,
+    21010908020403, 21011008182311, 21011107221413, 21011207153450,
+)
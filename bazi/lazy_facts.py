@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""按需计算的 facts 片段（compute_facts(..., lazy=True)）。
+
+请求只看某一年（/v1/analyze 带 target_year、/chat 问某一年）时，不必把 15 步大运 × 10 个流年
+全部拷贝并丰富化。LazyRecord 与普通 dict 的读法一致（[] / get / in / items ...），
+常用的索引字段（year、age 等）建表时直接给出，其余字段第一次访问时整条算出。
+
+缓存多张盘的 facts 时用紧凑模式（compute_facts(..., compact=True)）：一张盘的全部流年存成一张
+LiunianRows（每年几个整数列），luck.groups[i].liunian 的各项是只读的 LiunianView。
+完整记录按需从流年内核（已缓存）重建、丰富化后冻结（events.freeze，嵌套的事件 / 列表也只读），
+每张盘只留最近访问的 LIUNIAN_VIEW_CACHE_SIZE 条，不常驻内存。
+
+整份 facts 要序列化（jsonify / json.dumps）之前先调用 materialize_facts 换成普通 dict。
+"""
+
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .codes import JIA_ZI_PAIRS
+from .config import LIUNIAN_VIEW_CACHE_SIZE
+from .events import FrozenEvent, freeze
+
+
+class LazyRecord(MutableMapping):
+    """第一次访问非预置字段时调用 loader 算出整条记录的字典。
+
+    参数:
+        loader: 无参函数，返回完整的 dict（只调用一次）
+        known: 预置字段，必须与 loader 结果中的同名字段相等；访问它们不触发计算
+    """
+
+    __slots__ = ("_loader", "_known", "_steps", "_data")
+
+    def __init__(self, loader: Callable[[], Dict[str, Any]], known: Optional[Dict[str, Any]] = None):
+        self._loader = loader
+        self._known = known or {}
+        self._steps: List[Callable[[Dict[str, Any]], None]] = []
+        self._data: Optional[Dict[str, Any]] = None
+
+    @property
+    def loaded(self) -> bool:
+        """是否已经算出。"""
+        return self._data is not None
+
+    def then(self, step: Callable[[Dict[str, Any]], None]) -> "LazyRecord":
+        """追加一步加工（对算出的 dict 原地修改，如丰富化）；已算出时立即执行。"""
+        if self._data is None:
+            self._steps.append(step)
+        else:
+            step(self._data)
+        return self
+
+    def materialize(self) -> Dict[str, Any]:
+        """算出（如尚未算出）并返回底层 dict。"""
+        if self._data is None:
+            data = self._loader()
+            for step in self._steps:
+                step(data)
+            self._data = data
+            self._loader = None
+            self._known = {}
+            self._steps = []
+        return self._data
+
+    def __getitem__(self, key: str) -> Any:
+        if self._data is None and key in self._known:
+            return self._known[key]
+        return self.materialize()[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.materialize()[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self.materialize()[key]
+
+    def __contains__(self, key: object) -> bool:
+        if self._data is None and key in self._known:
+            return True
+        return key in self.materialize()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.materialize())
+
+    def __len__(self) -> int:
+        return len(self.materialize())
+
+    def __repr__(self) -> str:
+        if self._data is None:
+            return f"LazyRecord(<pending> {self._known!r})"
+        return f"LazyRecord({self._data!r})"
+
+
+class LiunianRows:
+    """一张盘全部流年的紧凑存储：年份、虚龄、流年 / 大运干支、大运序号各一列整数。
+
+    参数:
+        loader: loader(dayun_jz, ln_jz, year, age, dayun_index) → 完整的流年 dict（每次返回新的）
+
+    重建的记录冻结后按行号留着最近访问的 LIUNIAN_VIEW_CACHE_SIZE 条：连续读同一年的多个字段、
+    或在几年之间来回读，都只重建一次。
+    """
+
+    __slots__ = ("_loader", "_years", "_ages", "_ln_jz", "_dayun_jz", "_dayun_index", "_steps", "_records")
+
+    def __init__(self, loader: Callable[..., Dict[str, Any]]):
+        self._loader = loader
+        self._years = array("h")
+        self._ages = array("h")
+        self._ln_jz = array("b")
+        self._dayun_jz = array("b")  # 大运开始之前为 -1
+        self._dayun_index = array("b")  # 大运开始之前为 -1
+        # 大运序号（大运开始之前为 None）→ 重建后依次执行的加工步骤（如丰富化）
+        self._steps: Dict[Optional[int], List[Callable[[Dict[str, Any]], None]]] = {}
+        self._records: "OrderedDict[int, FrozenEvent]" = OrderedDict()
+
+    def append(self, dayun_jz: Optional[int], ln_jz: int, year: int, age: int, dayun_index: Optional[int]) -> "LiunianView":
+        """登记一年，返回它的只读视图。"""
+        self._years.append(year)
+        self._ages.append(age)
+        self._ln_jz.append(ln_jz)
+        self._dayun_jz.append(-1 if dayun_jz is None else dayun_jz)
+        self._dayun_index.append(-1 if dayun_index is None else dayun_index)
+        return LiunianView(self, len(self._years) - 1)
+
+    def then(self, dayun_index: Optional[int], step: Callable[[Dict[str, Any]], None]) -> None:
+        """给某步大运（None 为大运开始之前）下的流年追加一步加工；同一个 step 只登记一次。"""
+        steps = self._steps.setdefault(dayun_index, [])
+        if step not in steps:
+            steps.append(step)
+        self._records.clear()
+
+    def build(self, row: int) -> Dict[str, Any]:
+        """重建第 row 条记录（新的 dict，调用方可随意修改）。"""
+        dayun_jz = self._dayun_jz[row]
+        dayun_index = self._dayun_index[row]
+        dayun_index = None if dayun_index < 0 else dayun_index
+        data = self._loader(
+            None if dayun_jz < 0 else dayun_jz, self._ln_jz[row], self._years[row], self._ages[row], dayun_index
+        )
+        for step in self._steps.get(dayun_index, ()):
+            step(data)
+        return data
+
+    def record(self, row: int) -> FrozenEvent:
+        """第 row 条记录（冻结的只读结构；最近访问过的直接复用）。"""
+        records = self._records
+        frozen = records.get(row)
+        if frozen is None:
+            frozen = freeze(self.build(row))
+            records[row] = frozen
+            if len(records) > LIUNIAN_VIEW_CACHE_SIZE:
+                records.popitem(last=False)
+        else:
+            records.move_to_end(row)
+        return frozen
+
+    def known(self, row: int, key: str) -> Any:
+        """不需重建即可读出的字段（year / age / gan / zhi），其他字段返回 _MISSING。"""
+        if key == "year":
+            return self._years[row]
+        if key == "age":
+            return self._ages[row]
+        if key == "gan":
+            return JIA_ZI_PAIRS[self._ln_jz[row]][0]
+        if key == "zhi":
+            return JIA_ZI_PAIRS[self._ln_jz[row]][1]
+        return _MISSING
+
+
+_MISSING = object()
+
+
+class LiunianView(Mapping):
+    """LiunianRows 中一年的只读视图（读法与 dict 一致）。
+
+    写入视图或它给出的嵌套值（FrozenEvent / FrozenList）都会报 TypeError；要改先 materialize。
+    """
+
+    __slots__ = ("_rows", "_row")
+
+    def __init__(self, rows: LiunianRows, row: int):
+        self._rows = rows
+        self._row = row
+
+    def then(self, step: Callable[[Dict[str, Any]], None]) -> "LiunianView":
+        """给本年所在大运的全部流年追加一步加工（见 LiunianRows.then）。"""
+        self._rows.then(self._dayun_index(), step)
+        return self
+
+    def materialize(self) -> Dict[str, Any]:
+        """重建为普通 dict（新的，可随意修改）。"""
+        return self._rows.build(self._row)
+
+    def _dayun_index(self) -> Optional[int]:
+        dayun_index = self._rows._dayun_index[self._row]
+        return None if dayun_index < 0 else dayun_index
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._rows.known(self._row, key)
+        if value is _MISSING:
+            return self._rows.record(self._row)[key]
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        if key in ("year", "age", "gan", "zhi"):
+            return True
+        return key in self._rows.record(self._row)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows.record(self._row))
+
+    def __len__(self) -> int:
+        return len(self._rows.record(self._row))
+
+    def __repr__(self) -> str:
+        return f"LiunianView(year={self['year']}, age={self['age']})"
+
+
+def materialize(value: Any) -> Any:
+    """LazyRecord → 底层 dict，LiunianView → 重建的 dict；其他值原样返回。"""
+    if isinstance(value, (LazyRecord, LiunianView)):
+        return value.materialize()
+    return value
+
+
+def materialize_facts(facts: Dict[str, Any]) -> Dict[str, Any]:
+    """把 facts 中的惰性 / 紧凑片段（流年、索引）全部算出并换成普通 dict（原地修改，返回 facts）。"""
+    for group in facts.get("luck", {}).get("groups", []):
+        group["liunian"] = [materialize(liunian) for liunian in group.get("liunian", [])]
+    indexes = facts.get("indexes")
+    if indexes:
+        for name in list(indexes):
+            indexes[name] = materialize(indexes[name])
+    return facts
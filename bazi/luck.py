@@ -3,32 +3,37 @@
 
 from dataclasses import dataclass, asdict, field
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
-
-from lunar_python import Solar  # 依赖：pip install lunar_python
-
-from .config import GAN_WUXING, ZHI_WUXING, ZHI_CHONG, POSITION_WEIGHTS
-from .clash import detect_branch_clash
+from functools import lru_cache, partial
+from typing import List, Dict, Any, FrozenSet, Iterable, Mapping, Optional, Set, Tuple
+
+from .calendar import year_jiazi
+from .chart_context import ChartContext, ensure_context
+from .codes import (
+    GAN_ELEMENT,
+    JIA_ZI,
+    JIA_ZI_PAIRS,
+    ZHI_CHONG_OF,
+    ZHI_ELEMENT,
+    decode_bazi,
+    split_jiazi,
+    yongshen_elements_of,
+    yongshen_flags,
+    yongshen_key,
+)
+from .config import (
+    DAYUN_CACHE_SIZE,
+    ELEMENTS,
+    LIUNIAN_CACHE_SIZE,
+    NATAL_CACHE_SIZE,
+    ZHI_WUXING,
+    POSITION_WEIGHTS,
+)
 from .shishen import get_branch_shishen, get_shishen, get_branch_main_gan
-from .harmony import detect_flow_harmonies, detect_sanhe_complete, detect_sanhui_complete
-from .punishment import detect_branch_punishments
-from .patterns import detect_liunian_patterns
-
-
-def _split_ganzhi(gz: str) -> Tuple[Optional[str], Optional[str]]:
-    """把 '癸亥' 拆成 ('癸','亥')。
-
-    注意：lunar_python 有些大运/流年会返回空字符串 ''，
-    代表“还没起运前的阶段”之类，这里直接返回 (None, None)，上层跳过。
-    """
-    if gz is None:
-        return None, None
-    s = str(gz).strip()
-    if not s:
-        return None, None
-    if len(s) < 2:
-        raise ValueError(f"不合法的干支: {gz!r}")
-    return s[0], s[1]
+from .harmony import detect_sanhe_complete, detect_sanhui_complete
+from .events import FrozenEvent, freeze, thaw
+from .lazy_facts import LazyRecord, LiunianRows
+from .natal_response import get_response_table
+from .pattern_table import get_pattern_table
 
 
 def _get_active_pillar(age: int) -> str:
@@ -236,10 +241,18 @@ def _compute_lineyun_bonus(
     }
     或 None（未触发）
     """
+    return _lineyun_bonus_for_pillar(_get_active_pillar(age), base_events, static_activation_events)
+
+
+def _lineyun_bonus_for_pillar(
+    active_pillar: str,
+    base_events: List[Dict[str, Any]],
+    static_activation_events: Optional[List[Dict[str, Any]]] = None,
+) -> Optional[Dict[str, Any]]:
+    """_compute_lineyun_bonus 的主体：线运宫位已由虚龄换算好（流年内核按宫位缓存）。"""
     if static_activation_events is None:
         static_activation_events = []
     
-    active_pillar = _get_active_pillar(age)
     trigger_events_gan: List[Dict[str, Any]] = []
     trigger_events_zhi: List[Dict[str, Any]] = []
     
@@ -470,93 +483,1091 @@ class LiunianLuck:
     clashes_dayun: List[Dict[str, Any]] = field(default_factory=list)   # 流年支 与 所在大运支的冲
 
 
-def analyze_luck(
-    birth_dt: datetime,
-    is_male: bool,
-    yongshen_elements: List[str],
-    max_dayun: int = 10,
+def evaluate_dayun(
+    bazi_key: Tuple[int, ...],
+    dayun_jz: int,
+    yong_key: Tuple[int, ...],
 ) -> Dict[str, Any]:
-    """综合分析大运 / 流年：好运 / 坏运 + 冲的信息。
+    """一步大运的大运层结果（与具体起运年份 / 第几步无关的部分）。
 
-    当前版本仅实现：
-    - 用神标记：大运/流年的干支是否落在 `yongshen_elements` 中；
-    - 冲信息：大运支 / 流年支 与命局地支的冲，以及大运支 ↔ 流年支 的简单相冲事件。
+    只取决于 八字 × 大运干支 × 用神五行，按这三者缓存（见 dayun_cache_info）：
+    同一张盘的 10 步 / 15 步两种口径、以及重复出现的命盘都直接复用。
 
-    返回结构按大运分组：
+    参数:
+        bazi_key: codes.encode_bazi 的 8 个整数
+        dayun_jz: 大运干支的甲子序号
+        yong_key: codes.yongshen_key(用神列表)
+
+    返回（新的字典，可随意修改）:
     {
-      "groups": [
-        {
-          "dayun": {...DayunLuck...},
-          "liunian": [{...LiunianLuck...}, ...]   # 该大运下的十年
-        },
-        ...
-      ]
+      "gan", "zhi", "label", "gan_element", "zhi_element", "gan_good", "zhi_good",
+      "is_good_old": 旧规则的好坏（以地支为主）,
+      "clash_natal": 大运与原局的冲（flow_year 为 None）或 None,
+      "punishments_natal": 大运与原局的刑（已去掉既冲又刑的，flow_year 为 None）,
+      "dayun_patterns": detect_dayun_patterns 原始结果,
+      "dayun_pattern_index": dayun_patterns 的静态模式索引（_static_pattern_index，供流年 §9 静态激活查表）,
+      "pattern_events": 大运模式事件,
+      "risk_dayun_zhi", "risk_dayun_gan", "risk_dayun_total", "dayun_label", "is_very_good",
+      "harmonies_natal": 大运与原局的合（flow_year 为 None）,
+      "sanhe_complete", "sanhui_complete": 大运 + 原局的完整三合 / 三会（dayun_index 为 None）,
     }
+    起运年份与大运序号由 _stamp_dayun 叠加（analyze_luck 直接取缓存的只读结果再叠加，不经过这里）。
     """
+    return thaw(_evaluate_dayun_cached(tuple(bazi_key), dayun_jz, tuple(yong_key)))
 
-    solar = Solar(birth_dt.year, birth_dt.month, birth_dt.day,
-                  birth_dt.hour, birth_dt.minute, birth_dt.second)
-    lunar = solar.getLunar()
-    ec = lunar.getEightChar()
-
-    # 本命四柱（供地支冲识别用）
-    bazi = {
-        "year":  {"gan": ec.getYearGan(),  "zhi": ec.getYearZhi()},
-        "month": {"gan": ec.getMonthGan(), "zhi": ec.getMonthZhi()},
-        "day":   {"gan": ec.getDayGan(),   "zhi": ec.getDayZhi()},
-        "hour":  {"gan": ec.getTimeGan(),  "zhi": ec.getTimeZhi()},
-    }
+
+def dayun_cache_info():
+    """大运层缓存的命中 / 未命中 / 容量 / 当前条目数（functools 的 CacheInfo）。"""
+    return _evaluate_dayun_cached.cache_info()
+
+
+def clear_dayun_cache() -> None:
+    """清空大运层缓存（同时清零命中计数）。"""
+    _evaluate_dayun_cached.cache_clear()
+
+
+@lru_cache(maxsize=DAYUN_CACHE_SIZE)
+def _evaluate_dayun_cached(
+    bazi_key: Tuple[int, ...],
+    dayun_jz: int,
+    yong_key: Tuple[int, ...],
+) -> FrozenEvent:
+    from .clash import detect_branch_clash
+    from .harmony import detect_flow_harmonies
+    from .patterns import detect_dayun_patterns
+    from .punishment import detect_branch_punishments
+
+    bazi = decode_bazi(bazi_key)
+    day_gan = bazi["day"]["gan"]
+    yong_gan_flags, yong_zhi_flags = yongshen_flags(yongshen_elements_of(yong_key))
+
+    gan_code_dy, zhi_code_dy = split_jiazi(dayun_jz)
+    gan_dy, zhi_dy = JIA_ZI_PAIRS[dayun_jz]
+    gz_dy = JIA_ZI[dayun_jz]
+
+    gan_el_dy = ELEMENTS[GAN_ELEMENT[gan_code_dy]]
+    zhi_el_dy = ELEMENTS[ZHI_ELEMENT[zhi_code_dy]]
+
+    gan_good_dy = yong_gan_flags[gan_code_dy]
+    zhi_good_dy = yong_zhi_flags[zhi_code_dy]
+
+    # 旧规则（保留以兼容）：以地支为主判断好运/坏运
+    # 新规则（§8）会在后面根据 risk_dayun_total 和用神情况计算 dayun_label
+    if zhi_good_dy and (not gan_good_dy):
+        is_good_dy_old = True
+    elif gan_good_dy and (not zhi_good_dy):
+        is_good_dy_old = False
+    elif zhi_good_dy and gan_good_dy:
+        is_good_dy_old = True
+    else:
+        is_good_dy_old = False
+
+    # ===== §8.2 大运危险系数计算 =====
+    # 大运支 与 命局地支 的冲（天干用于天克地冲检测）
+    clash_dy_natal = detect_branch_clash(bazi, zhi_dy, "dayun", None, gz_dy, flow_gan=gan_dy)
     
-    day_gan = bazi["day"]["gan"]  # 用于模式检测
+    # 大运支 与 命局地支 的刑
+    punishments_dy = detect_branch_punishments(bazi, zhi_dy, "dayun", None, gz_dy)
     
-    # 原局静态模式（用于 §9 静态模式激活检测）
-    from .patterns import detect_natal_patterns
-    natal_patterns = detect_natal_patterns(bazi, day_gan)
-
-    # sex 参数：以 lunar 官方 demo 习惯，1=男, 0=女
-    yun = ec.getYun(1 if is_male else 0)
-    dayun_objs = yun.getDaYun()
+    # 过滤掉既冲又刑的情况（按规则只算冲）
+    punishments_dy_filtered: List[Dict[str, Any]] = []
+    if clash_dy_natal:
+        clash_target = clash_dy_natal.get("target_branch")
+        for punish_ev in punishments_dy:
+            if punish_ev.get("target_branch") != clash_target:
+                punishments_dy_filtered.append(punish_ev)
+    else:
+        punishments_dy_filtered = punishments_dy
+    
+    # 大运干/支 与 命局干/支 的模式（静态，用于展示和风险计算）
+    dayun_patterns = detect_dayun_patterns(bazi, day_gan, gan_dy, zhi_dy)
+    
+    # 计算大运模式事件的风险（只计算大运 vs 命局的结构性模式）
+    # 注意：这里需要检测大运干/支与命局干/支的模式，但不包括流年
+    # 由于 detect_dayun_patterns 只返回静态模式列表，我们需要计算风险
+    # 实际上，大运层的模式是静态的，不直接计分，但我们需要检测是否有模式重叠在冲上
+    
+    # 检查大运模式是否与冲重叠（类似流年的逻辑）
+    dayun_pattern_events: List[Dict[str, Any]] = []
+    clash_pattern_bonus_dy = 0.0
+    
+    # 遍历大运模式，检查是否有地支层模式与冲重叠
+    for pattern_group in dayun_patterns:
+        pattern_type = pattern_group.get("pattern_type")
+        pairs = pattern_group.get("pairs", [])
+        for pair in pairs:
+            pos1 = pair.get("pos1", {})
+            pos2 = pair.get("pos2", {})
+            kind = pos1.get("kind")
+            
+            # 只处理地支层模式（天干层模式单独计算）
+            if kind == "zhi" and clash_dy_natal:
+                clash_target_branch = clash_dy_natal.get("target_branch")
+                clash_flow_branch = clash_dy_natal.get("flow_branch")
+                
+                # 检查是否与冲重叠
+                dayun_char = pos1.get("char") if pos1.get("source") == "dayun" else pos2.get("char")
+                other_char = pos2.get("char") if pos1.get("source") == "dayun" else pos1.get("char")
+                other_pillar = pos2.get("pillar") if pos1.get("source") == "dayun" else pos1.get("pillar")
+                
+                if (dayun_char == clash_flow_branch and 
+                    other_char == clash_target_branch and
+                    other_pillar in ("year", "month", "day", "hour")):
+                    # 重叠！在冲上+10%
+                    clash_pattern_bonus_dy = 10.0
+                    old_risk = clash_dy_natal.get("risk_percent", 0.0)
+                    clash_dy_natal["risk_percent"] = old_risk + clash_pattern_bonus_dy
+                    clash_dy_natal["pattern_bonus_percent"] = clash_pattern_bonus_dy
+                    clash_dy_natal["is_pattern_overlap"] = True
+                    clash_dy_natal["overlap_pattern_type"] = pattern_type
+                else:
+                    # 不重叠，单独计算模式风险
+                    risk = 15.0
+                    # 如果涉及命局月支，则风险为25%
+                    other_pos = pos2 if pos1.get("source") == "dayun" else pos1
+                    if (other_pos.get("source") == "natal" and 
+                        other_pillar == "month" and 
+                        other_pos.get("kind") == "zhi"):
+                        risk = 25.0
+                    dayun_pattern_events.append({
+                        "type": "pattern",
+                        "pattern_type": pattern_type,
+                        "kind": "zhi",
+                        "risk_percent": risk,
+                        "pos1": pos1,
+                        "pos2": pos2,
+                    })
+            elif kind == "gan":
+                # 天干层模式，单独计算
+                risk = 15.0
+                dayun_pattern_events.append({
+                    "type": "pattern",
+                    "pattern_type": pattern_type,
+                    "kind": "gan",
+                    "risk_percent": risk,
+                    "pos1": pos1,
+                    "pos2": pos2,
+                })
+    
+    # 计算 risk_dayun_zhi（大运地支参与的事件）
+    risk_dayun_zhi = 0.0
+    if clash_dy_natal:
+        risk_dayun_zhi += clash_dy_natal.get("risk_percent", 0.0)
+    for punish_ev in punishments_dy_filtered:
+        risk_dayun_zhi += punish_ev.get("risk_percent", 0.0)
+    for pat_ev in dayun_pattern_events:
+        if pat_ev.get("kind") == "zhi":
+            risk_dayun_zhi += pat_ev.get("risk_percent", 0.0)
+    
+    # 计算 risk_dayun_gan（大运天干参与的事件）
+    risk_dayun_gan = 0.0
+    for pat_ev in dayun_pattern_events:
+        if pat_ev.get("kind") == "gan":
+            risk_dayun_gan += pat_ev.get("risk_percent", 0.0)
+    
+    # 计算 risk_dayun_total
+    risk_dayun_total = risk_dayun_zhi + risk_dayun_gan
+    
+    # ===== §8.4 大运好坏判定逻辑 =====
+    is_dayun_zhi_yongshen = zhi_good_dy
+    is_dayun_gan_yongshen = gan_good_dy
+    
+    if is_dayun_zhi_yongshen:
+        if risk_dayun_total < 30.0:
+            dayun_label = "好运"
+        else:
+            dayun_label = "坏运（用神过旺/变动过大）"
+        
+        # 检查是否"非常好运"
+        is_very_good = False
+        if is_dayun_zhi_yongshen and is_dayun_gan_yongshen and risk_dayun_total < 30.0:
+            is_very_good = True
+    else:
+        if risk_dayun_total <= 15.0:
+            dayun_label = "一般"
+        elif risk_dayun_total <= 30.0:
+            dayun_label = "一般（有变动）"
+        else:
+            dayun_label = "坏运"
+        is_very_good = False
 
-    groups: List[Dict[str, Any]] = []
+    # 大运支与原局的六合/三合（只解释，不计分）
+    harmonies_dy = detect_flow_harmonies(bazi, zhi_dy, "dayun", None, gz_dy)
     
-    # ===== 大运开始之前的流年处理 =====
+    # 检测大运+原局的完整三合局
+    sanhe_dy = detect_sanhe_complete(
+        bazi=bazi,
+        dayun_branch=zhi_dy,
+        dayun_label=gz_dy,
+        dayun_index=None,
+    )
+    
+    # 检测大运+原局的完整三会局
+    sanhui_dy = detect_sanhui_complete(
+        bazi=bazi,
+        dayun_branch=zhi_dy,
+        dayun_label=gz_dy,
+        dayun_index=None,
+    )
+
+    # 缓存结果只读（流年内核直接读取，evaluate_dayun 解冻后返回）
+    return freeze({
+        "gan": gan_dy,
+        "zhi": zhi_dy,
+        "label": gz_dy,
+        "gan_element": gan_el_dy,
+        "zhi_element": zhi_el_dy,
+        "gan_good": gan_good_dy,
+        "zhi_good": zhi_good_dy,
+        "is_good_old": is_good_dy_old,
+        "clash_natal": clash_dy_natal,
+        "punishments_natal": punishments_dy_filtered,
+        "dayun_patterns": dayun_patterns,
+        "dayun_pattern_index": _static_pattern_index(dayun_patterns),
+        "pattern_events": dayun_pattern_events,
+        "risk_dayun_zhi": risk_dayun_zhi,
+        "risk_dayun_gan": risk_dayun_gan,
+        "risk_dayun_total": risk_dayun_total,
+        "dayun_label": dayun_label,
+        "is_very_good": is_very_good,
+        "harmonies_natal": harmonies_dy,
+        "sanhe_complete": sanhe_dy,
+        "sanhui_complete": sanhui_dy,
+    })
+
+
+def _stamp_dayun(result: FrozenEvent, index: int, start_year: int) -> Dict[str, Any]:
+    """缓存的大运层结果（只读）→ 这一步大运：以 overlay 叠加起运年份与大运序号，解冻成新的普通 dict。"""
+    fields: Dict[str, Any] = {}
+    clash = result["clash_natal"]
+    if clash is not None:
+        fields["clash_natal"] = clash.overlay(flow_year=start_year)
+    for field_name in ("punishments_natal", "harmonies_natal"):
+        fields[field_name] = [ev.overlay(flow_year=start_year) for ev in result[field_name]]
+    for field_name in ("sanhe_complete", "sanhui_complete"):
+        fields[field_name] = [
+            ev.overlay(
+                dayun_index=index,
+                sources=[
+                    source.overlay(index=index) if source["source_type"] == "dayun" else source
+                    for source in ev["sources"]
+                ],
+            )
+            for ev in result[field_name]
+        ]
+    return thaw(result.overlay(**fields))
+
+
+# 流年风险分项（_evaluate_liunian_cached 返回的分项元组顺序，risk_vector 按此建分项数组）：
+# 命局冲 / 运年相冲的基础力量、墓库加成、天克地冲（含静态天克）、刑、模式（含冲叠模式 +10%）、
+# 静态冲 / 刑 / 模式激活、线运加成、三合 / 三会逢冲
+RISK_COMPONENTS = (
+    "clash",
+    "grave",
+    "tkdc",
+    "punishment",
+    "pattern",
+    "static_activation",
+    "lineyun",
+    "sanhe_clash",
+)
+
+
+# 流年结果中带 flow_year 的事件列表（_stamp_liunian 逐个叠加年份）
+_LIUNIAN_EVENT_FIELDS = (
+    "clashes_natal",
+    "clashes_dayun",
+    "punishments_natal",
+    "patterns_liunian",
+    "patterns_static_activation",
+    "harmonies_natal",
+    "harmonies_dayun",
+    "all_events",
+)
+
+
+def evaluate_liunian(
+    bazi_key: Tuple[int, ...],
+    dayun_jz: Optional[int],
+    ln_jz: int,
+    year: int,
+    age: int,
+    dayun_index: Optional[int],
+    yong_key: Tuple[int, ...],
+) -> Dict[str, Any]:
+    """一个流年的完整结果（analyze_luck 中 liunian 列表的一项）。
+
+    计分只取决于 八字 × 大运干支 × 流年干支 × 线运宫位（由虚龄决定）× 用神五行，
+    按这些缓存（见 liunian_cache_info）；年份、虚龄、大运序号在取出后叠加到只读模板上，
+    再解冻成新的普通 dict 返回（可随意修改，不会写回缓存）。
+    大运开始之前的流年传 dayun_jz=None、dayun_index=None。
+    """
+    template, _ = _evaluate_liunian_cached(
+        tuple(bazi_key), dayun_jz, ln_jz, _get_active_pillar(age), tuple(yong_key)
+    )
+    return _stamp_liunian(template, year, age, dayun_index)
+
+
+def liunian_cache_info():
+    """流年缓存的命中 / 未命中 / 容量 / 当前条目数（functools 的 CacheInfo）。"""
+    return _evaluate_liunian_cached.cache_info()
+
+
+def clear_liunian_cache() -> None:
+    """清空流年缓存（同时清零命中计数）。"""
+    _evaluate_liunian_cached.cache_clear()
+
+
+def _stamp_liunian(
+    template: Dict[str, Any],
+    year: int,
+    age: int,
+    dayun_index: Optional[int],
+) -> Dict[str, Any]:
+    """只读的流年模板 → 当年结果（facts 的出口）。
+
+    年份、虚龄和各事件的 flow_year 以 overlay 叠加在模板上（不改模板），最后整体解冻成新的
+    普通 dict：事件及其 targets / pos 等嵌套结构每年都是新的，调用方改了也不会写回缓存。
+    同一个事件在多个列表中出现（如 clashes_natal 与 all_events）时，解冻后仍是同一个对象。
+    """
+    stamped: Dict[int, FrozenEvent] = {}
+
+    def stamp_event(ev: FrozenEvent) -> FrozenEvent:
+        done = stamped.get(id(ev))
+        if done is None:
+            fields: Dict[str, Any] = {}
+            if "flow_year" in ev:
+                fields["flow_year"] = year
+            # 静态激活事件里引用了触发它的流年模式事件
+            for trigger_field in ("liunian_pairs_trigger_gan", "liunian_pairs_trigger_zhi"):
+                if trigger_field in ev:
+                    fields[trigger_field] = [stamp_event(t) for t in ev[trigger_field]]
+            done = ev.overlay(**fields) if fields else ev
+            stamped[id(ev)] = done
+        return done
+
+    fields: Dict[str, Any] = {"hints": [], "year": year, "age": age}
+    for field_name in _LIUNIAN_EVENT_FIELDS:
+        fields[field_name] = [stamp_event(ev) for ev in template[field_name]]
+    if template["sanhe_sanhui_clash_bonus_event"] is not None:
+        fields["sanhe_sanhui_clash_bonus_event"] = stamp_event(template["sanhe_sanhui_clash_bonus_event"])
+    for field_name in ("sanhe_complete", "sanhui_complete"):
+        fields[field_name] = [_stamp_group_event(ev, year, dayun_index) for ev in template[field_name]]
+    return thaw(template.overlay(**fields))
+
+
+def _stamp_group_event(ev: FrozenEvent, year: int, dayun_index: Optional[int]) -> FrozenEvent:
+    """三合 / 三会局事件：叠加流年年份与大运序号（含 sources 中对应的来源）。"""
+    sources = []
+    for source in ev["sources"]:
+        if source["source_type"] == "liunian":
+            source = source.overlay(year=year)
+        elif source["source_type"] == "dayun":
+            source = source.overlay(index=dayun_index)
+        sources.append(source)
+    return ev.overlay(sources=sources, dayun_index=dayun_index, liunian_year=year)
+
+
+@lru_cache(maxsize=NATAL_CACHE_SIZE)
+def _natal_pattern_index(bazi_key: Tuple[int, ...]) -> FrozenEvent:
+    # 原局模式取自原局缓存（analyze_natal），不再单独检测一份
+    from .lunar_engine import analyze_natal
+
+    return freeze(_static_pattern_index(analyze_natal(bazi_key)["natal_patterns"]))
+
+
+def _pattern_pair_key(pattern_type: str, kind: str, pair: Dict[str, Any]) -> Tuple[str, str, FrozenSet[str]]:
+    return (pattern_type, kind, frozenset((pair["pos1"]["char"], pair["pos2"]["char"])))
+
+
+def _static_pattern_index(
+    pattern_groups: List[Dict[str, Any]],
+) -> Dict[Tuple[str, str, FrozenSet[str]], List[Dict[str, Any]]]:
+    """静态模式 pair 按 (pattern_type, kind, 两个字的集合) 建索引。
+
+    §9 静态激活只看流年 pair 与静态 pair 的两个字是否相同，每年查表即可。
+    同一键下的 pair 保持原顺序，内容相同的只保留一个（与逐对比较时「只记录一次」一致）。
+    """
+    index: Dict[Tuple[str, str, FrozenSet[str]], List[Dict[str, Any]]] = {}
+    for pattern_group in pattern_groups:
+        pattern_type = pattern_group.get("pattern_type")
+        for pair in pattern_group.get("pairs", []):
+            key = _pattern_pair_key(pattern_type, pair.get("pos1", {}).get("kind"), pair)
+            bucket = index.setdefault(key, [])
+            if pair not in bucket:
+                bucket.append(pair)
+    return index
+
+
+def _activated_static_pairs(
+    index: Mapping[Tuple[str, str, FrozenSet[str]], List[Dict[str, Any]]],
+    pattern_type: str,
+    kind: str,
+    liunian_pairs: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """被流年 pair 激活的静态 pair（按流年 pair 顺序，每个静态 pair 只记录一次；只读，随模板一起冻结）。"""
+    activated: List[Dict[str, Any]] = []
+    seen: Set[Tuple[str, str, FrozenSet[str]]] = set()
+    for liunian_pair in liunian_pairs:
+        key = _pattern_pair_key(pattern_type, kind, liunian_pair)
+        if key not in seen:
+            seen.add(key)
+            activated.extend(index.get(key, ()))
+    return activated
+
+
+def _liunian_entry(
+    bazi_key: Tuple[int, ...],
+    dayun_jz: Optional[int],
+    ln_jz: int,
+    year: int,
+    age: int,
+    dayun_index: Optional[int],
+    yong_key: Tuple[int, ...],
+    lazy: bool,
+    rows: Optional[LiunianRows] = None,
+) -> Dict[str, Any]:
+    """analyze_luck 中 liunian 列表的一项：立即盖章，lazy 时包成 LazyRecord，紧凑模式下登记到 rows。"""
+    if rows is not None:
+        return rows.append(dayun_jz, ln_jz, year, age, dayun_index)
+    if not lazy:
+        return evaluate_liunian(bazi_key, dayun_jz, ln_jz, year, age, dayun_index, yong_key)
+    gan, zhi = JIA_ZI_PAIRS[ln_jz]
+    return LazyRecord(
+        partial(evaluate_liunian, bazi_key, dayun_jz, ln_jz, year, age, dayun_index, yong_key),
+        known={"year": year, "age": age, "gan": gan, "zhi": zhi},
+    )
+
+
+def _liunian_total_risk(
+    bazi_key: Tuple[int, ...],
+    dayun_jz: Optional[int],
+    ln_jz: int,
+    age: int,
+    yong_key: Tuple[int, ...],
+) -> float:
+    """流年总风险（直接读缓存模板，不拷贝；供大运平均风险用）。"""
+    template, _ = _evaluate_liunian_cached(
+        tuple(bazi_key), dayun_jz, ln_jz, _get_active_pillar(age), tuple(yong_key)
+    )
+    return template["total_risk_percent"]
+
+
+@lru_cache(maxsize=LIUNIAN_CACHE_SIZE)
+def _evaluate_liunian_cached(
+    bazi_key: Tuple[int, ...],
+    dayun_jz: Optional[int],
+    ln_jz: int,
+    active_pillar: str,
+    yong_key: Tuple[int, ...],
+) -> Tuple[FrozenEvent, Tuple[float, ...]]:
+    """流年计分内核（year / age / 大运序号留空，由 _stamp_liunian 叠加）。模板冻结后缓存（只读）。
+
+    返回 (流年模板, 风险分项)，分项按 RISK_COMPONENTS 顺序。
+
+    大运开始之前的流年与大运内的流年共用这一条流程：dayun_jz 为 None 时没有运年相冲、
+    大运静态冲 / 刑 / 模式激活，合局检测也不带大运。
+    """
+    bazi = decode_bazi(bazi_key)
+    day_gan = bazi["day"]["gan"]
+    yongshen_elements = yongshen_elements_of(yong_key)
+    yong_gan_flags, yong_zhi_flags = yongshen_flags(yongshen_elements)
+
+    # 原局对流支 / 流柱的响应表、原局静态模式索引（均按八字缓存）
+    response = get_response_table(bazi_key)
+    natal_pattern_index = _natal_pattern_index(bazi_key)
+
+    # 所在大运（只读，不拷贝）；大运开始之前没有大运
+    if dayun_jz is None:
+        zhi_code_dy = gan_dy = zhi_dy = gz_dy = None
+        clash_dy_natal = None
+        punishments_dy_filtered: List[Dict[str, Any]] = []
+        dayun_pattern_index: Dict[Tuple[str, str, FrozenSet[str]], List[Dict[str, Any]]] = {}
+    else:
+        dy_eval = _evaluate_dayun_cached(bazi_key, dayun_jz, yong_key)
+        zhi_code_dy = dayun_jz % 12
+        gan_dy = dy_eval["gan"]
+        zhi_dy = dy_eval["zhi"]
+        gz_dy = dy_eval["label"]
+        clash_dy_natal = dy_eval["clash_natal"]
+        punishments_dy_filtered = dy_eval["punishments_natal"]
+        dayun_pattern_index = dy_eval["dayun_pattern_index"]
+
+    gan_code_ln, zhi_code_ln = split_jiazi(ln_jz)
+    gan_ln, zhi_ln = JIA_ZI_PAIRS[ln_jz]
+    gz_ln = JIA_ZI[ln_jz]
+
+    gan_el_ln = ELEMENTS[GAN_ELEMENT[gan_code_ln]]
+    zhi_el_ln = ELEMENTS[ZHI_ELEMENT[zhi_code_ln]]
+
+    gan_good_ln = yong_gan_flags[gan_code_ln]
+    zhi_good_ln = yong_zhi_flags[zhi_code_ln]
+
+    # 流年：天干管开始，地支管后来
+    start_good = gan_good_ln
+    later_good = zhi_good_ln
+
+    # 流年支 与 命局地支 的冲（天干用于天克地冲检测）
+    clash_ln_natal = response.clash(ln_jz, "liunian", None, gz_ln)
+
+    # 流年支 与 命局地支 的刑
+    punishments_ln = response.punishments(zhi_code_ln, "liunian", None, gz_ln)
+
+    # 大运支 与 流年支 之间的冲（需要计算风险）
+    clash_dayun_liunian = None
+    if zhi_code_dy is not None and ZHI_CHONG_OF[zhi_code_ln] == zhi_code_dy:
+        # 运年相冲：基础风险为 10%（固定值，不涉及宫位）
+        base_risk = 10.0
+
+        # 检查是否为墓库冲（辰戌、丑未）
+        from .clash import _is_grave_clash
+        is_grave_clash = _is_grave_clash(zhi_dy, zhi_ln)
+        grave_bonus = 0.0
+        if is_grave_clash:
+            # 墓库加成：+5%（运年相冲固定5%，因为不涉及命局柱数）
+            grave_bonus = 5.0
+
+        # 检测运年天克地冲（大运天干与流年天干互克，且地支互冲）
+        from .clash import _check_tian_ke_di_chong
+        tkdc_bonus = 0.0
+        is_tkdc = False
+        if _check_tian_ke_di_chong(gan_dy, zhi_dy, gan_ln, zhi_ln):
+            # 运年天克地冲：在天克地冲的基础上额外+10%
+            # 即：基础天克地冲+10%，运年天克地冲再+10%，总共+20%
+            tkdc_bonus = 20.0  # 10%（天克地冲）+ 10%（运年天克地冲额外）
+            is_tkdc = True
+
+        total_risk = base_risk + grave_bonus + tkdc_bonus
+
+        clash_dayun_liunian = {
+                "type": "dayun_liunian_branch_clash",
+            "role": "base",  # 标记为基础事件，用于线运计算
+                "dayun_branch": zhi_dy,
+                "liunian_branch": zhi_ln,
+            "dayun_gan": gan_dy,
+            "liunian_gan": gan_ln,
+            "dayun_shishen": get_branch_shishen(bazi, zhi_dy),
+            "liunian_shishen": get_branch_shishen(bazi, zhi_ln),
+            "base_risk_percent": base_risk,
+            "grave_bonus_percent": grave_bonus,
+            "tkdc_bonus_percent": tkdc_bonus,
+            "is_tian_ke_di_chong": is_tkdc,
+            "risk_percent": total_risk,
+            "flow_year": None,
+            "flow_label": gz_ln,
+            # 注意：运年相冲不涉及命局宫位，所以 targets 为空
+            "targets": [],
+        }
+
+    clashes_dayun: List[Dict[str, Any]] = [clash_dayun_liunian] if clash_dayun_liunian else []
+
+    # ===== 静态冲/刑激活检测 =====
+    # 当流年与命局相冲/刑时，如果大运与命局之间也有静态冲/刑（且涉及相同的命局地支），则静态冲/刑被激活
+    static_clash_activation_risk = 0.0  # 静态冲的地支部分（base_power的一半）
+    static_tkdc_activation_risk_zhi = 0.0  # 静态天克地冲的地支部分（tkdc的一半）
+    static_tkdc_activation_risk_gan = 0.0  # 静态天克地冲的天干部分（天克的一半）
+    static_punish_activation_risk = 0.0
+
+    # 检查静态冲激活：有两种触发方式
+    # 1. 流年地支与命局地支相冲，且大运与命局之间也有静态冲（涉及相同的命局地支）
+    # 2. 流年地支与大运地支相冲，且大运与命局之间也有静态冲（激活大运静态冲）
+    if clash_dy_natal:
+        should_activate_clash = False
+
+        # 情况1：流年与命局相冲，且涉及相同的命局地支
+        if clash_ln_natal:
+            clash_ln_target = clash_ln_natal.get("target_branch")
+            clash_dy_target = clash_dy_natal.get("target_branch")
+            if clash_ln_target == clash_dy_target:
+                should_activate_clash = True
+
+        # 情况2：流年与大运相冲，激活大运与命局之间的静态冲
+        if clash_dayun_liunian:
+            should_activate_clash = True
+
+        if should_activate_clash:
+            # 静态冲被激活：每个被冲的柱都算一半
+            # 根据用户说明：墓库冲的力量是15%每次（base_power 10% + grave_bonus 5%）
+            # 如果有两个柱，就是两次，激活时每个算一半，所以是 15% * 0.5 * 2 = 15%
+            targets = clash_dy_natal.get("targets", [])
+            base_power_percent = clash_dy_natal.get("base_power_percent", 0.0)
+            grave_bonus_percent = clash_dy_natal.get("grave_bonus_percent", 0.0)
+
+            # 计算每个柱的完整风险（base_power + grave_bonus）
+            # base_power_percent 是所有柱的权重累加，需要按柱数分配
+            if len(targets) > 0:
+                # 每个柱的base_power（平均分配）
+                pillar_base_power = base_power_percent / len(targets)
+                # 每个柱的完整风险 = base_power + grave_bonus
+                pillar_full_risk = pillar_base_power + grave_bonus_percent
+                # 每个柱的激活风险 = 完整风险的一半
+                for target in targets:
+                    static_clash_activation_risk += pillar_full_risk * 0.5
+
+            # 静态天克地冲：如果大运静态冲有天克地冲，则静态天克地冲也被激活
+            static_tkdc_bonus = clash_dy_natal.get("tkdc_bonus_percent", 0.0)
+            if static_tkdc_bonus > 0.0:
+                # 静态天克地冲激活：每个柱的天克地冲10%的一半 = 5%
+                # 其中天克（天干）5%，冲（地支）0%（因为冲的部分已经包含在静态冲激活中）
+                static_tkdc_activation_risk_total = static_tkdc_bonus * 0.5
+                # 拆分：天克（天干）全部，冲（地支）0%
+                static_tkdc_activation_risk_gan += static_tkdc_activation_risk_total
+                static_tkdc_activation_risk_zhi += 0.0  # 冲的部分已经包含在static_clash_activation_risk中
+
+    # 检查静态刑激活：有三种触发方式
+    # 1. 流年地支与命局地支相刑，且大运与命局之间也有静态刑（涉及相同的命局地支）
+    # 2. 流年地支与大运地支相刑，且大运与命局之间也有静态刑（激活大运静态刑）
+    # 3. 流年地支与命局地支相刑，且原局内部也有静态刑（激活原局内部静态刑）
+
+    # 原局内部的静态刑（响应表建表时已算好）
+    natal_punishments = response.natal_static.get("punishments", [])
+
+    should_activate_punish = False
+    activated_punish_evs = []
+
+    # 情况1：流年与命局相刑，且大运与命局之间也有静态刑（涉及相同的命局地支）
+    if punishments_dy_filtered and punishments_ln:
+        ln_punish_targets = {ev.get("target_branch") for ev in punishments_ln}
+        for punish_ev in punishments_dy_filtered:
+            dy_punish_target = punish_ev.get("target_branch")
+            if dy_punish_target in ln_punish_targets:
+                should_activate_punish = True
+                activated_punish_evs.append(punish_ev)
+
+    # 情况2：流年与大运相刑，激活大运与命局之间的静态刑
+    if punishments_dy_filtered:
+        from .punishment import _get_punish_targets
+        liunian_punish_targets = _get_punish_targets(zhi_ln)
+        if zhi_dy in liunian_punish_targets:
+            should_activate_punish = True
+            # 激活所有大运静态刑
+            for punish_ev in punishments_dy_filtered:
+                if punish_ev not in activated_punish_evs:
+                    activated_punish_evs.append(punish_ev)
+
+    # 情况3：流年与命局相刑，且原局内部也有静态刑（激活原局内部静态刑）
+    # 大运开始之前不做静态刑激活
+    if dayun_jz is not None and punishments_ln and natal_punishments:
+        # 检查流年刑是否与原局内部刑相同
+        ln_punish_pairs = {(ev.get("flow_branch"), ev.get("target_branch")) for ev in punishments_ln}
+        for natal_punish_ev in natal_punishments:
+            # 原局内部刑的格式：flow_branch 和 target_branch 是原局的两个柱
+            natal_flow = natal_punish_ev.get("flow_branch")
+            natal_target = natal_punish_ev.get("target_branch")
+            # 检查是否与流年刑相同（流年地支与原局内部刑的其中一个地支相同）
+            if (zhi_ln == natal_flow and natal_target in {ev.get("target_branch") for ev in punishments_ln}) or \
+               (zhi_ln == natal_target and natal_flow in {ev.get("target_branch") for ev in punishments_ln}):
+                should_activate_punish = True
+                activated_punish_evs.append(natal_punish_ev)
+
+    if should_activate_punish:
+        # 静态刑被激活，风险为原风险的一半
+        for punish_ev in activated_punish_evs:
+            static_punish_risk_per_event = punish_ev.get("risk_percent", 0.0) * 0.5
+            static_punish_activation_risk += static_punish_risk_per_event
+
+    # 流年支与原局的六合/三合（只解释，不计分）
+    harmonies_ln = response.harmonies(zhi_code_ln, "liunian", None, gz_ln)
+
+    # 检测流年+原局的完整三合局，以及大运+流年+原局的完整三合局
+    sanhe_ln = detect_sanhe_complete(
+        bazi=bazi,
+        dayun_branch=zhi_dy,
+        dayun_label=gz_dy,
+        dayun_index=None,
+        liunian_branch=zhi_ln,
+        liunian_year=None,
+        liunian_label=gz_ln,
+    )
+
+    # 检测流年+原局的完整三会局，以及大运+流年+原局的完整三会局
+    sanhui_ln = detect_sanhui_complete(
+        bazi=bazi,
+        dayun_branch=zhi_dy,
+        dayun_label=gz_dy,
+        dayun_index=None,
+        liunian_branch=zhi_ln,
+        liunian_year=None,
+        liunian_label=gz_ln,
+    )
+
+    # ===== §5.3.3 流年模式检测（按八字缓存的流年模式表，已带 flow_year 和 flow_label）=====
+    pattern_events_ln = get_pattern_table(bazi_key).events(dayun_jz, ln_jz, yong_key, None, gz_ln)
+
+    # ===== §6.2 检查模式是否与冲事件重叠 =====
+    # 如果同一对地支既是冲又是模式，在冲上+10%，不单独计模式
+    pattern_events_filtered: List[Dict[str, Any]] = []
+    clash_pattern_bonus = 0.0  # 冲+模式的额外加成
+
+    if clash_ln_natal:
+        clash_target_branch = clash_ln_natal.get("target_branch")
+        clash_flow_branch = clash_ln_natal.get("flow_branch")
+
+        for pat_ev in pattern_events_ln:
+            # 只检查地支层模式（天干层模式不会与地支冲重叠）
+            if pat_ev.get("kind") != "zhi":
+                pattern_events_filtered.append(pat_ev)
+                continue
+
+            # 检查模式的两个位置是否与冲的一对地支匹配
+            pos1 = pat_ev.get("pos1", {})
+            pos2 = pat_ev.get("pos2", {})
+
+            # 流年地支应该等于 clash_flow_branch
+            # 另一个位置应该是命局中的 clash_target_branch
+            liunian_char = pos1.get("char") if pos1.get("source") == "liunian" else pos2.get("char")
+            other_char = pos2.get("char") if pos1.get("source") == "liunian" else pos1.get("char")
+            other_pillar = pos2.get("pillar") if pos1.get("source") == "liunian" else pos1.get("pillar")
+
+            if (liunian_char == clash_flow_branch and 
+                other_char == clash_target_branch and
+                other_pillar in ("year", "month", "day", "hour")):
+                # 重叠！在冲上+10%，不单独计模式
+                clash_pattern_bonus = 10.0
+                # 更新冲事件的风险（响应表的事件只读，以 overlay 叠加）
+                old_risk = clash_ln_natal.get("risk_percent", 0.0)
+                clash_ln_natal = clash_ln_natal.overlay(
+                    risk_percent=old_risk + clash_pattern_bonus,
+                    pattern_bonus_percent=clash_pattern_bonus,
+                    is_pattern_overlap=True,
+                    overlap_pattern_type=pat_ev.get("pattern_type"),
+                )
+            else:
+                pattern_events_filtered.append(pat_ev)
+    else:
+        pattern_events_filtered = pattern_events_ln
+
+    # 收集基础事件（用于线运计算）
+    base_events: List[Dict[str, Any]] = []
+    if clash_ln_natal:
+        base_events.append(clash_ln_natal)
+    # 运年相冲也是基础事件
+    if clash_dayun_liunian:
+        base_events.append(clash_dayun_liunian)
+    # 刑事件也是基础事件
+    for punish_ev in punishments_ln:
+        # 过滤掉既冲又刑的情况（按规则只算冲）
+        if clash_ln_natal:
+            # 检查是否与冲事件重叠（同一对地支）
+            clash_target = clash_ln_natal.get("target_branch")
+            if punish_ev.get("target_branch") == clash_target:
+                continue  # 跳过，只算冲
+        base_events.append(punish_ev)
+    # 模式事件也是基础事件（已过滤掉与冲重叠的）
+    base_events.extend(pattern_events_filtered)
+
+    # ===== §9 静态模式被流年激活检测 =====
+    from .config import PATTERN_GAN_RISK_STATIC, PATTERN_ZHI_RISK_STATIC
+
+    # 按模式类型分组流年模式事件
+    liunian_patterns_by_type: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    for pat_ev in pattern_events_filtered:
+        pattern_type = pat_ev.get("pattern_type")
+        kind = pat_ev.get("kind")
+        if pattern_type not in liunian_patterns_by_type:
+            liunian_patterns_by_type[pattern_type] = {"gan": [], "zhi": []}
+        liunian_patterns_by_type[pattern_type][kind].append(pat_ev)
+
+    # 检测静态模式激活并计算风险（原局 / 大运静态模式按八字 / 大运缓存索引，每个流年 pair 查一次表）
+    static_activation_events: List[Dict[str, Any]] = []
+
+    for pattern_type in ["hurt_officer", "pianyin_eatgod"]:
+        liunian_gan_pairs = liunian_patterns_by_type.get(pattern_type, {}).get("gan", [])
+        liunian_zhi_pairs = liunian_patterns_by_type.get(pattern_type, {}).get("zhi", [])
+
+        # 天干层激活检测
+        activated_natal_gan_pairs = _activated_static_pairs(natal_pattern_index, pattern_type, "gan", liunian_gan_pairs)
+        activated_dayun_gan_pairs = _activated_static_pairs(dayun_pattern_index, pattern_type, "gan", liunian_gan_pairs)
+
+        # 地支层激活检测
+        activated_natal_zhi_pairs = _activated_static_pairs(natal_pattern_index, pattern_type, "zhi", liunian_zhi_pairs)
+        activated_dayun_zhi_pairs = _activated_static_pairs(dayun_pattern_index, pattern_type, "zhi", liunian_zhi_pairs)
+
+        # 计算静态激活风险
+        # 枭神夺食和伤官见官静态按5%算，其他模式按10%算
+        if pattern_type in ("pianyin_eatgod", "hurt_officer"):
+            static_risk_gan = 5.0 * (len(activated_natal_gan_pairs) + len(activated_dayun_gan_pairs))
+            static_risk_zhi = 5.0 * (len(activated_natal_zhi_pairs) + len(activated_dayun_zhi_pairs))
+        else:
+            static_risk_gan = PATTERN_GAN_RISK_STATIC * (len(activated_natal_gan_pairs) + len(activated_dayun_gan_pairs))
+            static_risk_zhi = PATTERN_ZHI_RISK_STATIC * (len(activated_natal_zhi_pairs) + len(activated_dayun_zhi_pairs))
+
+        # 如果有激活的静态模式，生成汇总事件
+        if static_risk_gan > 0.0 or static_risk_zhi > 0.0:
+            static_activation_events.append({
+                "type": "pattern_static_activation",
+                "pattern_type": pattern_type,
+                "risk_percent": static_risk_gan + static_risk_zhi,
+                "risk_from_gan": static_risk_gan,
+                "risk_from_zhi": static_risk_zhi,
+                "activated_natal_gan_pairs": activated_natal_gan_pairs,
+                "activated_dayun_gan_pairs": activated_dayun_gan_pairs,
+                "activated_natal_zhi_pairs": activated_natal_zhi_pairs,
+                "activated_dayun_zhi_pairs": activated_dayun_zhi_pairs,
+                "liunian_pairs_trigger_gan": liunian_gan_pairs,
+                "liunian_pairs_trigger_zhi": liunian_zhi_pairs,
+                "flow_year": None,
+                "flow_label": gz_ln,
+            })
+
+    # 计算线运加成（§11.3：天干侧和地支侧分开计算，考虑静态影响）
+    lineyun_event = _lineyun_bonus_for_pillar(active_pillar, base_events, static_activation_events)
+    lineyun_bonus = lineyun_event.get("risk_percent", 0.0) if lineyun_event else 0.0
+    lineyun_bonus_gan = lineyun_event.get("lineyun_bonus_gan", 0.0) if lineyun_event else 0.0
+    lineyun_bonus_zhi = lineyun_event.get("lineyun_bonus_zhi", 0.0) if lineyun_event else 0.0
+
+    # ===== 三合/三会逢冲额外加分 =====
+    # 收集当年的所有冲事件
+    clash_events_for_bonus: List[Dict[str, Any]] = []
+    if clash_ln_natal:
+        clash_events_for_bonus.append(clash_ln_natal)
+    if clash_dayun_liunian:
+        clash_events_for_bonus.append(clash_dayun_liunian)
+
+    # 检测三合/三会逢冲额外加分
+    sanhe_sanhui_clash_bonus_event = _detect_sanhe_sanhui_clash_bonus(
+        clash_events=clash_events_for_bonus,
+        sanhe_events=sanhe_ln,
+        sanhui_events=sanhui_ln,
+        yongshen_elements=yongshen_elements,
+        flow_year=None,
+    )
+    sanhe_sanhui_clash_bonus = sanhe_sanhui_clash_bonus_event.get("risk_percent", 0.0) if sanhe_sanhui_clash_bonus_event else 0.0
+
+    # ===== §6.1 风险拆分：天干算天干的，地支算地支的 =====
+    # risk_from_zhi：流年地支引起的风险
+    risk_from_zhi = 0.0
+    # risk_from_gan：流年天干引起的风险
+    risk_from_gan = 0.0
+
+    # 天克地冲风险单独计算（不归入上半年或下半年）
+    tkdc_risk = 0.0
+
+    # 分项小计（RISK_COMPONENTS，只作拆解，不参与上面两项的累加）
+    clash_risk = 0.0
+    grave_risk = 0.0
+    punish_risk = 0.0
+    pattern_risk = 0.0
+    static_risk = 0.0
+
+    # 流年与命局相冲
+    if clash_ln_natal:
+        # 冲的基础部分（base_power + grave_bonus）计入 risk_from_zhi
+        base_power = clash_ln_natal.get("base_power_percent", 0.0)
+        grave_bonus = clash_ln_natal.get("grave_bonus_percent", 0.0)
+        pattern_bonus = clash_ln_natal.get("pattern_bonus_percent", 0.0)  # 模式重叠+10%
+        risk_from_zhi += base_power + grave_bonus + pattern_bonus
+        clash_risk += base_power
+        grave_risk += grave_bonus
+        pattern_risk += pattern_bonus
+
+        # 天克地冲单独计入 tkdc_risk（不再计入 risk_from_gan）
+        tkdc_bonus = clash_ln_natal.get("tkdc_bonus_percent", 0.0)
+        if tkdc_bonus > 0.0:
+            tkdc_risk += tkdc_bonus
+
+    # 运年相冲的风险
+    if clash_dayun_liunian:
+        # 运年相冲的基础部分（base_risk + grave_bonus）计入 risk_from_zhi
+        base_risk = clash_dayun_liunian.get("base_risk_percent", 0.0)
+        grave_bonus = clash_dayun_liunian.get("grave_bonus_percent", 0.0)
+        risk_from_zhi += base_risk + grave_bonus
+        clash_risk += base_risk
+        grave_risk += grave_bonus
+
+        # 运年天克地冲单独计入 tkdc_risk（不再计入 risk_from_gan）
+        tkdc_bonus = clash_dayun_liunian.get("tkdc_bonus_percent", 0.0)
+        if tkdc_bonus > 0.0:
+            tkdc_risk += tkdc_bonus
+
+    # 静态冲激活风险（base_power的一半）计入 risk_from_zhi
+    risk_from_zhi += static_clash_activation_risk
+
+    # 静态天克地冲风险单独计入 tkdc_risk（不再计入 risk_from_gan）
+    tkdc_risk += static_tkdc_activation_risk_gan
+    # 静态天克地冲的"冲"部分（地支）计入 risk_from_zhi（这部分是0，因为冲已经包含在static_clash_activation_risk中）
+    risk_from_zhi += static_tkdc_activation_risk_zhi
+
+    # 静态刑激活风险计入 risk_from_zhi
+    risk_from_zhi += static_punish_activation_risk
+    static_risk += static_clash_activation_risk + static_tkdc_activation_risk_zhi + static_punish_activation_risk
+
+    # 刑的风险全部计入 risk_from_zhi
+    for punish_ev in punishments_ln:
+        # 过滤掉既冲又刑的情况
+        if clash_ln_natal:
+            clash_target = clash_ln_natal.get("target_branch")
+            if punish_ev.get("target_branch") == clash_target:
+                continue
+        risk_from_zhi += punish_ev.get("risk_percent", 0.0)
+        punish_risk += punish_ev.get("risk_percent", 0.0)
+
+    # 地支层模式风险计入 risk_from_zhi（不包括与冲重叠的，因为已经加到冲上了）
+    # 天干层模式风险计入 risk_from_gan
+    for pat_ev in pattern_events_filtered:
+        if pat_ev.get("kind") == "zhi":
+            risk_from_zhi += pat_ev.get("risk_percent", 0.0)
+            pattern_risk += pat_ev.get("risk_percent", 0.0)
+        elif pat_ev.get("kind") == "gan":
+            risk_from_gan += pat_ev.get("risk_percent", 0.0)
+            pattern_risk += pat_ev.get("risk_percent", 0.0)
+
+    # 静态模式激活风险（§9.5）
+    for static_ev in static_activation_events:
+        # 静态模式激活事件包含 risk_from_gan 和 risk_from_zhi 字段
+        risk_from_gan += static_ev.get("risk_from_gan", 0.0)
+        risk_from_zhi += static_ev.get("risk_from_zhi", 0.0)
+        static_risk += static_ev.get("risk_from_gan", 0.0) + static_ev.get("risk_from_zhi", 0.0)
+
+    # 线运加成（天干侧和地支侧分开）
+    risk_from_gan += lineyun_bonus_gan
+    risk_from_zhi += lineyun_bonus_zhi
+
+    # 三合/三会逢冲额外加分计入 risk_from_zhi（因为冲是地支事件）
+    risk_from_zhi += sanhe_sanhui_clash_bonus
+
+    # 年度总风险 = risk_from_gan + risk_from_zhi + tkdc_risk（不封顶，可>100）
+    # 注意：sanhe_sanhui_clash_bonus 已经包含在 risk_from_zhi 中
+    total_risk_percent = risk_from_gan + risk_from_zhi + tkdc_risk
+
+    # ===== §4.4 流年好运判断（简单规则：用神+风险≤15%） =====
+    # 如果天干或地支的五行中至少有一个落在用神列表中，且 total_risk_percent ≤ 15，则标记为"好运"
+    is_good_ln = False
+    if (gan_good_ln or zhi_good_ln) and total_risk_percent <= 15.0:
+        is_good_ln = True
+
+    # 删除不再使用的标签计算函数调用
+    # first_half_label, second_half_label, year_label 已删除
+
+    # 构建年度事件列表
+    all_events: List[Dict[str, Any]] = []
+    if clash_ln_natal:
+        all_events.append(clash_ln_natal)
+    # 添加刑事件（过滤掉既冲又刑的情况）
+    for punish_ev in punishments_ln:
+        if clash_ln_natal:
+            clash_target = clash_ln_natal.get("target_branch")
+            if punish_ev.get("target_branch") == clash_target:
+                continue
+        all_events.append(punish_ev)
+    # 添加模式事件（已过滤掉与冲重叠的）
+    all_events.extend(pattern_events_filtered)
+    # 添加静态模式激活事件
+    all_events.extend(static_activation_events)
+    # 添加静态冲/刑激活事件（如果有）
+    if static_clash_activation_risk > 0.0:
+        all_events.append({
+            "type": "static_clash_activation",
+            "role": "base",
+            "risk_percent": static_clash_activation_risk,
+            "flow_year": None,
+            "flow_label": gz_ln,
+            "source": "dayun_natal_clash",
+        })
+    if static_punish_activation_risk > 0.0:
+        all_events.append({
+            "type": "static_punish_activation",
+            "role": "base",
+            "risk_percent": static_punish_activation_risk,
+            "flow_year": None,
+            "flow_label": gz_ln,
+            "source": "dayun_natal_punish",
+        })
+    if lineyun_event:
+        all_events.append(lineyun_event)
+    if sanhe_sanhui_clash_bonus_event:
+        all_events.append(sanhe_sanhui_clash_bonus_event)
+
+    # ===== 计算十神信息（供前端展示）=====
+    gan_shishen_ln = get_shishen(day_gan, gan_ln) if gan_ln else None
+    zhi_main_gan_ln = get_branch_main_gan(zhi_ln) if zhi_ln else None
+    zhi_shishen_ln = get_shishen(day_gan, zhi_main_gan_ln) if zhi_main_gan_ln else None
+
+    liunian_dict = {
+        "hints": [],  # 初始化为空列表，enrich_liunian 会填充
+        "year": None,
+        "age": None,
+        "gan": gan_ln,
+        "zhi": zhi_ln,
+        "gan_element": gan_el_ln,
+        "zhi_element": zhi_el_ln,
+        "gan_shishen": gan_shishen_ln,  # 天干十神
+        "zhi_shishen": zhi_shishen_ln,  # 地支主气十神
+        "is_gan_yongshen": gan_good_ln,  # 天干是否用神
+        "is_zhi_yongshen": zhi_good_ln,  # 地支是否用神
+        "start_good": start_good,  # 开始（天干）是否用神
+        "later_good": later_good,  # 后来（地支）是否用神
+        "is_good": is_good_ln,  # §4.4 流年好运判断（用神+风险≤15%）
+        "risk_from_gan": risk_from_gan,  # §6.1 天干引起的风险（不包含天克地冲）
+        "risk_from_zhi": risk_from_zhi,  # §6.1 地支引起的风险
+        "tkdc_risk_percent": tkdc_risk,  # 天克地冲危险系数（单独列出）
+        "clashes_natal": [clash_ln_natal] if clash_ln_natal else [],
+        "clashes_dayun": clashes_dayun,
+        "punishments_natal": punishments_ln,  # 流年支 与 命局地支 的刑
+        "patterns_liunian": pattern_events_filtered,  # 流年模式事件（已过滤掉与冲重叠的）
+        "patterns_static_activation": static_activation_events,  # §9 静态模式被流年激活的事件
+        "harmonies_natal": harmonies_ln,  # 流年与原局的六合/三合/半合/三会（只解释，不计分）
+        "harmonies_dayun": [],  # 流年与大运的合类（目前为空，后续可扩展）
+        "sanhe_complete": sanhe_ln,  # 完整三合局（流年+原局，或大运+流年+原局）
+        "sanhui_complete": sanhui_ln,  # 完整三会局（流年+原局，或大运+流年+原局）
+        "lineyun_bonus": lineyun_bonus,  # 总加成（天干侧+地支侧）
+        "lineyun_bonus_gan": lineyun_bonus_gan,  # §11.3 天干侧线运加成
+        "lineyun_bonus_zhi": lineyun_bonus_zhi,  # §11.3 地支侧线运加成
+        "sanhe_sanhui_clash_bonus": sanhe_sanhui_clash_bonus,  # 三合/三会逢冲额外加分
+        "sanhe_sanhui_clash_bonus_event": sanhe_sanhui_clash_bonus_event,  # 三合/三会逢冲额外加分事件详情
+        "total_risk_percent": total_risk_percent,
+        "all_events": all_events,
+    }
+
+    components = (
+        clash_risk,
+        grave_risk,
+        tkdc_risk,
+        punish_risk,
+        pattern_risk,
+        static_risk,
+        lineyun_bonus_gan + lineyun_bonus_zhi,
+        sanhe_sanhui_clash_bonus,
+    )
+    # 模板在请求之间共享：冻结后任何原地修改都会报 TypeError，取用时由 _stamp_liunian 解冻
+    return freeze(liunian_dict), components
+
+
+def _pre_dayun_years(birth_year: int, dayun_steps: List[Dict[str, Any]], max_dayun: int) -> List[int]:
+    """大运开始之前的流年年份（analyze_luck 中 dayun 为 None 的组；没有则为空列表）。"""
     # 检查第一个大运是否有效（干支不为空）
     first_valid_dayun_idx = None
     first_valid_dayun_start_year = None
-    first_dayun = dayun_objs[0] if dayun_objs else None
-    first_dayun_start_year = first_dayun.getStartYear() if first_dayun else None
+    first_dayun = dayun_steps[0] if dayun_steps else None
+    first_dayun_start_year = first_dayun["start_year"] if first_dayun else None
     
     # 找到第一个有效的大运（干支不为空）
-    for idx, dy in enumerate(dayun_objs[:max_dayun]):
-        gz_dy = dy.getGanZhi()
-        gan_dy, zhi_dy = _split_ganzhi(gz_dy)
-        if gan_dy is not None and zhi_dy is not None:
+    for idx, dy in enumerate(dayun_steps[:max_dayun]):
+        if dy["jiazi"] is not None:
             first_valid_dayun_idx = idx
-            first_valid_dayun_start_year = dy.getStartYear()
+            first_valid_dayun_start_year = dy["start_year"]
             break
     
     # 生成大运开始之前的流年，有两种情况：
     # 1. 第一个大运从出生年份开始但被跳过（干支为空），需要生成第一个大运对应的流年
     # 2. 第一个有效大运的起始年份 > 出生年份，生成出生年份到第一个有效大运起始年份之间的流年
     should_generate_pre_dayun = False
-    pre_dayun_start_year = birth_dt.year
+    pre_dayun_start_year = birth_year
     pre_dayun_end_year = None
     use_first_dayun_liunian = False
     first_dayun_ln_objs = None
     
-    if first_dayun_start_year == birth_dt.year and first_dayun:
+    if first_dayun_start_year == birth_year and first_dayun:
         # 情况1：第一个大运从出生年份开始，检查是否会被跳过
-        gz_dy = first_dayun.getGanZhi()
-        gan_dy, zhi_dy = _split_ganzhi(gz_dy)
-        if gan_dy is None or zhi_dy is None:
+        if first_dayun["jiazi"] is None:
             # 第一个大运会被跳过，但第一个大运的流年对象已经包含了这些流年
             # 直接使用第一个大运的流年对象，而不是自己生成
             should_generate_pre_dayun = True
             # 获取第一个大运的流年对象
-            first_dayun_ln_objs = first_dayun.getLiuNian()
+            first_dayun_ln_objs = first_dayun["liunian"]
             if first_dayun_ln_objs and len(first_dayun_ln_objs) > 0:
                 # 使用第一个大运的最后一个流年 + 1 作为结束年份
-                pre_dayun_end_year = first_dayun_ln_objs[-1].getYear() + 1
+                pre_dayun_end_year = first_dayun_ln_objs[-1]["year"] + 1
                 # 直接使用第一个大运的流年对象，而不是自己生成
                 # 这样可以确保流年干支与 lunar_python 返回的一致
                 use_first_dayun_liunian = True
@@ -567,399 +1578,100 @@ def analyze_luck(
             else:
                 # 如果都没有，不生成（这种情况不应该出现）
                 should_generate_pre_dayun = False
-    elif first_valid_dayun_start_year and first_valid_dayun_start_year > birth_dt.year:
+    elif first_valid_dayun_start_year and first_valid_dayun_start_year > birth_year:
         # 情况2：第一个有效大运的起始年份 > 出生年份
         should_generate_pre_dayun = True
         pre_dayun_end_year = first_valid_dayun_start_year
         use_first_dayun_liunian = False
     
-    if should_generate_pre_dayun and pre_dayun_end_year:
+    if not (should_generate_pre_dayun and pre_dayun_end_year):
+        return []
+
+    # 如果可以直接使用第一个大运的流年对象，直接使用（确保干支一致）
+    if use_first_dayun_liunian and first_dayun_ln_objs:
+        return [ln_obj["year"] for ln_obj in first_dayun_ln_objs]
+    # 否则，生成出生年份到 pre_dayun_end_year 之间的流年（不包括 pre_dayun_end_year）
+    return list(range(pre_dayun_start_year, pre_dayun_end_year))
+
+
+def analyze_luck(
+    birth_dt: datetime,
+    is_male: bool,
+    yongshen_elements: List[str],
+    max_dayun: int = 10,
+    ctx: Optional[ChartContext] = None,
+    lazy: bool = False,
+    years: Optional[Iterable[int]] = None,
+    compact: bool = False,
+) -> Dict[str, Any]:
+    """综合分析大运 / 流年：好运 / 坏运 + 冲的信息。
+
+    当前版本仅实现：
+    - 用神标记：大运/流年的干支是否落在 `yongshen_elements` 中；
+    - 冲信息：大运支 / 流年支 与命局地支的冲，以及大运支 ↔ 流年支 的简单相冲事件。
+
+    返回结构按大运分组：
+    {
+      "groups": [
+        {
+          "dayun": {...DayunLuck...},
+          "liunian": [{...LiunianLuck...}, ...]   # 该大运下的十年
+        },
+        ...
+      ]
+    }
+
+    ctx: 可选的 ChartContext（同一请求内共享的四柱 / 大运对象 / 原局模式）。
+    lazy: 为 True 时 liunian 列表的每一项是 lazy_facts.LazyRecord（year / age / gan / zhi 直接可读，
+        其余字段第一次访问时才盖章拷贝）；大运层字段照常立即给出。
+    compact: 为 True 时全部流年登记在一张 lazy_facts.LiunianRows 里，liunian 列表的每一项是只读的
+        LiunianView（按需重建并冻结，只留最近读过的几年；优先于 lazy）。
+    years: 只要这些年份时传入（见 lunar_engine.analyze_years）。liunian 列表只含这些年份；
+        大运组只保留从第一个到最后一个所在大运的连续一段（相邻关系照旧，索引的起止年不变）。
+        大运的平均风险仍按该步大运全部十年计（只取缓存的计分结果，不拷贝、不丰富化）。
+    """
+
+    # 盘面上下文：analyze_complete 会传入共享的 ctx，单独调用时在此新建
+    ctx = ensure_context(birth_dt, is_male, ctx)
+
+    dayun_steps = ctx.dayun_steps
+
+    # 大运 / 流年缓存的键（原局的冲刑合响应表、静态模式都在内核里按八字取）
+    bazi_key = ctx.bazi_key
+    yong_key = yongshen_key(yongshen_elements)
+    rows = LiunianRows(partial(evaluate_liunian, bazi_key, yong_key=yong_key)) if compact else None
+
+    # 只要部分年份时：要的年份集合，及其所在大运的连续区间
+    wanted: Optional[Set[int]] = None
+    dayun_span = (0, max_dayun)
+    if years is not None:
+        wanted = set(years)
+        parents = [
+            idx for idx, dy in enumerate(dayun_steps[:max_dayun])
+            if dy["jiazi"] is not None and any(ln["year"] in wanted for ln in dy["liunian"])
+        ]
+        dayun_span = (min(parents), max(parents) + 1) if parents else (0, 0)
+
+    groups: List[Dict[str, Any]] = []
+    
+    # ===== 大运开始之前的流年处理 =====
+    years_to_process = _pre_dayun_years(birth_dt.year, dayun_steps, max_dayun)
+    if years_to_process:
         pre_dayun_liunian_list: List[Dict[str, Any]] = []
         
-        # 准备流年年份列表和干支映射
-        years_to_process: List[int] = []
-        year_ganzhi_map: Dict[int, Tuple[str, str]] = {}  # year -> (gan, zhi)
-        
-        # 如果可以直接使用第一个大运的流年对象，直接使用（确保干支一致）
-        if use_first_dayun_liunian and first_dayun_ln_objs:
-            # 直接使用第一个大运的流年对象
-            for ln_obj in first_dayun_ln_objs:
-                year = ln_obj.getYear()
-                gz_ln = ln_obj.getGanZhi()
-                gan_ln, zhi_ln = _split_ganzhi(gz_ln)
-                if gan_ln is None or zhi_ln is None:
-                    continue
-                years_to_process.append(year)
-                year_ganzhi_map[year] = (gan_ln, zhi_ln)
-        else:
-            # 否则，生成出生年份到 pre_dayun_end_year 之间的流年（不包括 pre_dayun_end_year）
-            # 使用第一个大运的流年对象作为参考，确保干支正确
-            year_ln_map = {}  # year -> ln_obj
-            if first_dayun and first_dayun_start_year == birth_dt.year:
-                first_dayun_ln_objs_temp = first_dayun.getLiuNian()
-                if first_dayun_ln_objs_temp:
-                    for ln_obj_temp in first_dayun_ln_objs_temp:
-                        year_ln_map[ln_obj_temp.getYear()] = ln_obj_temp
-            
-            for year in range(pre_dayun_start_year, pre_dayun_end_year):
-                gan_ln = None
-                zhi_ln = None
-                gz_ln = None
-                
-                # 优先使用第一个大运的流年对象（如果有）
-                if year in year_ln_map:
-                    ln_obj = year_ln_map[year]
-                    gz_ln = ln_obj.getGanZhi()
-                    gan_ln, zhi_ln = _split_ganzhi(gz_ln)
-                    if gan_ln is None or zhi_ln is None:
-                        continue
-                else:
-                    # 否则，自己生成（使用年柱干支）
-                    try:
-                        solar = Solar(year, 1, 1, 0, 0, 0)
-                        lunar = solar.getLunar()
-                        ec_year = lunar.getEightChar()
-                        gan_ln = ec_year.getYearGan()
-                        zhi_ln = ec_year.getYearZhi()
-                    except Exception:
-                        continue
-                    
-                    if not gan_ln or not zhi_ln:
-                        continue
-                    
-                    gz_ln = gan_ln + zhi_ln
-                
-                # 确保所有变量都已设置
-                if gan_ln and zhi_ln and gz_ln:
-                    years_to_process.append(year)
-                    year_ganzhi_map[year] = (gan_ln, zhi_ln)
+        # 流年干支按立春换年（year_jiazi），不按 1 月 1 日的年柱取，避免取到上一年干支
+        year_jiazi_map: Dict[int, int] = {year: year_jiazi(year) for year in years_to_process}
         
-        # 遍历所有需要处理的年份，生成流年数据
+        if wanted is not None:
+            years_to_process = [year for year in years_to_process if year in wanted]
+
+        # 遍历所有需要处理的年份，生成流年数据（与大运内的流年同一个内核，没有大运）
         for year in years_to_process:
-            gan_ln, zhi_ln = year_ganzhi_map[year]
-            gz_ln = gan_ln + zhi_ln
-            
-            gan_el_ln = GAN_WUXING.get(gan_ln)
-            zhi_el_ln = ZHI_WUXING.get(zhi_ln)
-            
-            gan_good_ln = bool(gan_el_ln and gan_el_ln in yongshen_elements)
-            zhi_good_ln = bool(zhi_el_ln and zhi_el_ln in yongshen_elements)
-            
             # 计算虚龄（从出生年份开始计算）
             age = year - birth_dt.year + 1
-            
-            # 流年支 与 命局地支 的冲（大运开始之前，没有大运，所以没有运年相冲）
-            clash_ln_natal = detect_branch_clash(
-                bazi=bazi,
-                flow_branch=zhi_ln,
-                flow_type="liunian",
-                flow_year=year,
-                flow_label=gz_ln,
-                flow_gan=gan_ln,  # 传入天干用于天克地冲检测
-            )
-            
-            # 流年支 与 命局地支 的刑
-            punishments_ln = detect_branch_punishments(
-                bazi=bazi,
-                flow_branch=zhi_ln,
-                flow_type="liunian",
-                flow_year=year,
-                flow_label=gz_ln,
+            liunian_dict = _liunian_entry(
+                bazi_key, None, year_jiazi_map[year], year, age, None, yong_key, lazy, rows
             )
-            
-            # 大运开始之前，没有大运，所以没有运年相冲、静态冲/刑激活等
-            clash_dayun_liunian = None
-            static_clash_activation_risk = 0.0
-            static_tkdc_activation_risk_zhi = 0.0
-            static_tkdc_activation_risk_gan = 0.0
-            static_punish_activation_risk = 0.0
-            
-            # 流年支与原局的六合/三合（只解释，不计分）
-            harmonies_ln = detect_flow_harmonies(
-                bazi=bazi,
-                flow_branch=zhi_ln,
-                flow_type="liunian",
-                flow_year=year,
-                flow_label=gz_ln,
-            )
-            
-            # 检测流年+原局的完整三合局（没有大运参与）
-            sanhe_ln = detect_sanhe_complete(
-                bazi=bazi,
-                dayun_branch=None,  # 大运开始之前，没有大运
-                dayun_label=None,
-                dayun_index=None,
-                liunian_branch=zhi_ln,
-                liunian_year=year,
-                liunian_label=gz_ln,
-            )
-            
-            # 检测流年+原局的完整三会局（没有大运参与）
-            sanhui_ln = detect_sanhui_complete(
-                bazi=bazi,
-                dayun_branch=None,  # 大运开始之前，没有大运
-                dayun_label=None,
-                dayun_index=None,
-                liunian_branch=zhi_ln,
-                liunian_year=year,
-                liunian_label=gz_ln,
-            )
-            
-            # ===== §5.3.3 流年模式检测（没有大运参与） =====
-            pattern_events_ln = detect_liunian_patterns(
-                bazi=bazi,
-                day_gan=day_gan,
-                dayun_gan=None,  # 大运开始之前，没有大运
-                dayun_zhi=None,  # 大运开始之前，没有大运
-                liunian_gan=gan_ln,
-                liunian_zhi=zhi_ln,
-                yongshen_elements=yongshen_elements,
-            )
-            
-            # 为模式事件添加 flow_year 和 flow_label
-            for pat_ev in pattern_events_ln:
-                pat_ev["flow_year"] = year
-                pat_ev["flow_label"] = gz_ln
-            
-            # ===== §6.2 检查模式是否与冲事件重叠 =====
-            pattern_events_filtered: List[Dict[str, Any]] = []
-            clash_pattern_bonus = 0.0
-            
-            if clash_ln_natal:
-                clash_target_branch = clash_ln_natal.get("target_branch")
-                clash_flow_branch = clash_ln_natal.get("flow_branch")
-                
-                for pat_ev in pattern_events_ln:
-                    if pat_ev.get("kind") != "zhi":
-                        pattern_events_filtered.append(pat_ev)
-                        continue
-                    
-                    pos1 = pat_ev.get("pos1", {})
-                    pos2 = pat_ev.get("pos2", {})
-                    liunian_char = pos1.get("char") if pos1.get("source") == "liunian" else pos2.get("char")
-                    other_char = pos2.get("char") if pos1.get("source") == "liunian" else pos1.get("char")
-                    other_pillar = pos2.get("pillar") if pos1.get("source") == "liunian" else pos1.get("pillar")
-                    
-                    if (liunian_char == clash_flow_branch and 
-                        other_char == clash_target_branch and
-                        other_pillar in ("year", "month", "day", "hour")):
-                        clash_pattern_bonus = 10.0
-                        old_risk = clash_ln_natal.get("risk_percent", 0.0)
-                        clash_ln_natal["risk_percent"] = old_risk + clash_pattern_bonus
-                        clash_ln_natal["pattern_bonus_percent"] = clash_pattern_bonus
-                        clash_ln_natal["is_pattern_overlap"] = True
-                        clash_ln_natal["overlap_pattern_type"] = pat_ev.get("pattern_type")
-                    else:
-                        pattern_events_filtered.append(pat_ev)
-            else:
-                pattern_events_filtered = pattern_events_ln
-            
-            # 收集基础事件（用于线运计算）
-            base_events: List[Dict[str, Any]] = []
-            if clash_ln_natal:
-                base_events.append(clash_ln_natal)
-            for punish_ev in punishments_ln:
-                if clash_ln_natal:
-                    clash_target = clash_ln_natal.get("target_branch")
-                    if punish_ev.get("target_branch") == clash_target:
-                        continue
-                base_events.append(punish_ev)
-            base_events.extend(pattern_events_filtered)
-            
-            # ===== §9 静态模式被流年激活检测（只有原局静态模式，没有大运静态模式） =====
-            from .config import PATTERN_GAN_RISK_STATIC, PATTERN_ZHI_RISK_STATIC
-            
-            liunian_patterns_by_type: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
-            for pat_ev in pattern_events_filtered:
-                pattern_type = pat_ev.get("pattern_type")
-                kind = pat_ev.get("kind")
-                if pattern_type not in liunian_patterns_by_type:
-                    liunian_patterns_by_type[pattern_type] = {"gan": [], "zhi": []}
-                liunian_patterns_by_type[pattern_type][kind].append(pat_ev)
-            
-            natal_patterns_by_type: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
-            for pattern_group in natal_patterns:
-                pattern_type = pattern_group.get("pattern_type")
-                pairs = pattern_group.get("pairs", [])
-                if pattern_type not in natal_patterns_by_type:
-                    natal_patterns_by_type[pattern_type] = {"gan": [], "zhi": []}
-                for pair in pairs:
-                    pos1 = pair.get("pos1", {})
-                    kind = pos1.get("kind")
-                    natal_patterns_by_type[pattern_type][kind].append(pair)
-            
-            static_activation_events: List[Dict[str, Any]] = []
-            
-            for pattern_type in ["hurt_officer", "pianyin_eatgod"]:
-                liunian_gan_pairs = liunian_patterns_by_type.get(pattern_type, {}).get("gan", [])
-                liunian_zhi_pairs = liunian_patterns_by_type.get(pattern_type, {}).get("zhi", [])
-                natal_gan_pairs = natal_patterns_by_type.get(pattern_type, {}).get("gan", [])
-                natal_zhi_pairs = natal_patterns_by_type.get(pattern_type, {}).get("zhi", [])
-                
-                activated_natal_gan_pairs: List[Dict[str, Any]] = []
-                if len(liunian_gan_pairs) > 0:
-                    for liunian_pair in liunian_gan_pairs:
-                        liunian_chars = {liunian_pair["pos1"]["char"], liunian_pair["pos2"]["char"]}
-                        for natal_pair in natal_gan_pairs:
-                            natal_chars = {natal_pair["pos1"]["char"], natal_pair["pos2"]["char"]}
-                            if natal_chars == liunian_chars:
-                                if natal_pair not in activated_natal_gan_pairs:
-                                    activated_natal_gan_pairs.append(natal_pair)
-                
-                activated_natal_zhi_pairs: List[Dict[str, Any]] = []
-                if len(liunian_zhi_pairs) > 0:
-                    for liunian_pair in liunian_zhi_pairs:
-                        liunian_chars = {liunian_pair["pos1"]["char"], liunian_pair["pos2"]["char"]}
-                        for natal_pair in natal_zhi_pairs:
-                            natal_chars = {natal_pair["pos1"]["char"], natal_pair["pos2"]["char"]}
-                            if natal_chars == liunian_chars:
-                                if natal_pair not in activated_natal_zhi_pairs:
-                                    activated_natal_zhi_pairs.append(natal_pair)
-                
-                if pattern_type in ("pianyin_eatgod", "hurt_officer"):
-                    static_risk_gan = 5.0 * len(activated_natal_gan_pairs)
-                    static_risk_zhi = 5.0 * len(activated_natal_zhi_pairs)
-                else:
-                    static_risk_gan = PATTERN_GAN_RISK_STATIC * len(activated_natal_gan_pairs)
-                    static_risk_zhi = PATTERN_ZHI_RISK_STATIC * len(activated_natal_zhi_pairs)
-                
-                if static_risk_gan > 0.0 or static_risk_zhi > 0.0:
-                    static_activation_events.append({
-                        "type": "pattern_static_activation",
-                        "pattern_type": pattern_type,
-                        "risk_percent": static_risk_gan + static_risk_zhi,
-                        "risk_from_gan": static_risk_gan,
-                        "risk_from_zhi": static_risk_zhi,
-                        "activated_natal_gan_pairs": activated_natal_gan_pairs,
-                        "activated_dayun_gan_pairs": [],
-                        "activated_natal_zhi_pairs": activated_natal_zhi_pairs,
-                        "activated_dayun_zhi_pairs": [],
-                        "liunian_pairs_trigger_gan": liunian_gan_pairs,
-                        "liunian_pairs_trigger_zhi": liunian_zhi_pairs,
-                        "flow_year": year,
-                        "flow_label": gz_ln,
-                    })
-            
-            # 计算线运加成
-            lineyun_event = _compute_lineyun_bonus(age, base_events, static_activation_events)
-            lineyun_bonus = lineyun_event.get("risk_percent", 0.0) if lineyun_event else 0.0
-            lineyun_bonus_gan = lineyun_event.get("lineyun_bonus_gan", 0.0) if lineyun_event else 0.0
-            lineyun_bonus_zhi = lineyun_event.get("lineyun_bonus_zhi", 0.0) if lineyun_event else 0.0
-            
-            # ===== 三合/三会逢冲额外加分 =====
-            clash_events_for_bonus: List[Dict[str, Any]] = []
-            if clash_ln_natal:
-                clash_events_for_bonus.append(clash_ln_natal)
-            
-            sanhe_sanhui_clash_bonus_event = _detect_sanhe_sanhui_clash_bonus(
-                clash_events=clash_events_for_bonus,
-                sanhe_events=sanhe_ln,
-                sanhui_events=sanhui_ln,
-                yongshen_elements=yongshen_elements,
-                flow_year=year,
-            )
-            sanhe_sanhui_clash_bonus = sanhe_sanhui_clash_bonus_event.get("risk_percent", 0.0) if sanhe_sanhui_clash_bonus_event else 0.0
-            
-            # ===== §6.1 风险拆分 =====
-            risk_from_zhi = 0.0
-            risk_from_gan = 0.0
-            tkdc_risk = 0.0
-            
-            if clash_ln_natal:
-                base_power = clash_ln_natal.get("base_power_percent", 0.0)
-                grave_bonus = clash_ln_natal.get("grave_bonus_percent", 0.0)
-                pattern_bonus = clash_ln_natal.get("pattern_bonus_percent", 0.0)
-                risk_from_zhi += base_power + grave_bonus + pattern_bonus
-                tkdc_bonus = clash_ln_natal.get("tkdc_bonus_percent", 0.0)
-                if tkdc_bonus > 0.0:
-                    tkdc_risk += tkdc_bonus
-            
-            for punish_ev in punishments_ln:
-                if clash_ln_natal:
-                    clash_target = clash_ln_natal.get("target_branch")
-                    if punish_ev.get("target_branch") == clash_target:
-                        continue
-                risk_from_zhi += punish_ev.get("risk_percent", 0.0)
-            
-            for pat_ev in pattern_events_filtered:
-                if pat_ev.get("kind") == "zhi":
-                    risk_from_zhi += pat_ev.get("risk_percent", 0.0)
-                elif pat_ev.get("kind") == "gan":
-                    risk_from_gan += pat_ev.get("risk_percent", 0.0)
-            
-            for static_ev in static_activation_events:
-                risk_from_gan += static_ev.get("risk_from_gan", 0.0)
-                risk_from_zhi += static_ev.get("risk_from_zhi", 0.0)
-            
-            risk_from_gan += lineyun_bonus_gan
-            risk_from_zhi += lineyun_bonus_zhi
-            risk_from_zhi += sanhe_sanhui_clash_bonus
-            
-            total_risk_percent = risk_from_gan + risk_from_zhi + tkdc_risk
-            
-            # ===== §4.4 流年好运判断 =====
-            is_good_ln = False
-            if (gan_good_ln or zhi_good_ln) and total_risk_percent <= 15.0:
-                is_good_ln = True
-            
-            # 构建年度事件列表
-            all_events: List[Dict[str, Any]] = []
-            if clash_ln_natal:
-                all_events.append(clash_ln_natal)
-            for punish_ev in punishments_ln:
-                if clash_ln_natal:
-                    clash_target = clash_ln_natal.get("target_branch")
-                    if punish_ev.get("target_branch") == clash_target:
-                        continue
-                all_events.append(punish_ev)
-            all_events.extend(pattern_events_filtered)
-            all_events.extend(static_activation_events)
-            if lineyun_event:
-                all_events.append(lineyun_event)
-            if sanhe_sanhui_clash_bonus_event:
-                all_events.append(sanhe_sanhui_clash_bonus_event)
-            
-            # ===== 计算十神信息（供前端展示）=====
-            gan_shishen_ln = get_shishen(day_gan, gan_ln) if gan_ln else None
-            zhi_main_gan_ln = get_branch_main_gan(zhi_ln) if zhi_ln else None
-            zhi_shishen_ln = get_shishen(day_gan, zhi_main_gan_ln) if zhi_main_gan_ln else None
-            
-            liunian_dict = {
-                "hints": [],
-                "year": year,
-                "age": age,
-                "gan": gan_ln,
-                "zhi": zhi_ln,
-                "gan_element": gan_el_ln,
-                "zhi_element": zhi_el_ln,
-                "gan_shishen": gan_shishen_ln,  # 天干十神
-                "zhi_shishen": zhi_shishen_ln,  # 地支主气十神
-                "is_gan_yongshen": gan_good_ln,  # 天干是否用神
-                "is_zhi_yongshen": zhi_good_ln,  # 地支是否用神
-                "start_good": gan_good_ln,
-                "later_good": zhi_good_ln,
-                "is_good": is_good_ln,
-                "risk_from_gan": risk_from_gan,
-                "risk_from_zhi": risk_from_zhi,
-                "tkdc_risk_percent": tkdc_risk,
-                "clashes_natal": [clash_ln_natal] if clash_ln_natal else [],
-                "clashes_dayun": [],  # 大运开始之前，没有大运
-                "punishments_natal": punishments_ln,
-                "patterns_liunian": pattern_events_filtered,
-                "patterns_static_activation": static_activation_events,
-                "harmonies_natal": harmonies_ln,
-                "harmonies_dayun": [],
-                "sanhe_complete": sanhe_ln,
-                "sanhui_complete": sanhui_ln,
-                "lineyun_bonus": lineyun_bonus,
-                "lineyun_bonus_gan": lineyun_bonus_gan,
-                "lineyun_bonus_zhi": lineyun_bonus_zhi,
-                "sanhe_sanhui_clash_bonus": sanhe_sanhui_clash_bonus,
-                "sanhe_sanhui_clash_bonus_event": sanhe_sanhui_clash_bonus_event,
-                "total_risk_percent": total_risk_percent,
-                "all_events": all_events,
-            }
-            
             pre_dayun_liunian_list.append(liunian_dict)
         
         # 如果有大运开始之前的流年，添加一个特殊的组（dayun 为 None）
@@ -979,842 +1691,58 @@ def analyze_luck(
     # 但是，如果第一个大运的干支不为空，但流年不足10年，也可能需要处理
     # 不过，根据用户的需求，主要是处理"大运开始之前"的情况，所以先不考虑这种情况
 
-    for idx, dy in enumerate(dayun_objs[:max_dayun]):
+    for idx, dy in enumerate(dayun_steps[:max_dayun]):
         # ===== 当前这一步大运 =====
-        gz_dy = dy.getGanZhi()
-        gan_dy, zhi_dy = _split_ganzhi(gz_dy)
-        if gan_dy is None or zhi_dy is None:
+        dy_jz = dy["jiazi"]
+        if dy_jz is None or not dayun_span[0] <= idx < dayun_span[1]:
             continue
-
-        gan_el_dy = GAN_WUXING.get(gan_dy)
-        zhi_el_dy = ZHI_WUXING.get(zhi_dy)
-
-        gan_good_dy = bool(gan_el_dy and gan_el_dy in yongshen_elements)
-        zhi_good_dy = bool(zhi_el_dy and zhi_el_dy in yongshen_elements)
-
-        # 旧规则（保留以兼容）：以地支为主判断好运/坏运
-        # 新规则（§8）会在后面根据 risk_dayun_total 和用神情况计算 dayun_label
-        if zhi_good_dy and (not gan_good_dy):
-            is_good_dy_old = True
-        elif gan_good_dy and (not zhi_good_dy):
-            is_good_dy_old = False
-        elif zhi_good_dy and gan_good_dy:
-            is_good_dy_old = True
-        else:
-            is_good_dy_old = False
-
-        # ===== §8.2 大运危险系数计算 =====
-        # 大运支 与 命局地支 的冲
-        clash_dy_natal = detect_branch_clash(
-            bazi=bazi,
-            flow_branch=zhi_dy,
-            flow_type="dayun",
-            flow_year=dy.getStartYear(),
-            flow_label=gz_dy,
-            flow_gan=gan_dy,  # 传入天干用于天克地冲检测
-        )
-        
-        # 大运支 与 命局地支 的刑
-        punishments_dy = detect_branch_punishments(
-            bazi=bazi,
-            flow_branch=zhi_dy,
-            flow_type="dayun",
-            flow_year=dy.getStartYear(),
-            flow_label=gz_dy,
-        )
-        
-        # 过滤掉既冲又刑的情况（按规则只算冲）
-        punishments_dy_filtered: List[Dict[str, Any]] = []
-        if clash_dy_natal:
-            clash_target = clash_dy_natal.get("target_branch")
-            for punish_ev in punishments_dy:
-                if punish_ev.get("target_branch") != clash_target:
-                    punishments_dy_filtered.append(punish_ev)
-        else:
-            punishments_dy_filtered = punishments_dy
-        
-        # 大运干/支 与 命局干/支 的模式（静态，用于展示和风险计算）
-        from .patterns import detect_dayun_patterns
-        dayun_patterns = detect_dayun_patterns(bazi, day_gan, gan_dy, zhi_dy)
-        
-        # 计算大运模式事件的风险（只计算大运 vs 命局的结构性模式）
-        # 注意：这里需要检测大运干/支与命局干/支的模式，但不包括流年
-        # 由于 detect_dayun_patterns 只返回静态模式列表，我们需要计算风险
-        # 实际上，大运层的模式是静态的，不直接计分，但我们需要检测是否有模式重叠在冲上
-        
-        # 检查大运模式是否与冲重叠（类似流年的逻辑）
-        dayun_pattern_events: List[Dict[str, Any]] = []
-        clash_pattern_bonus_dy = 0.0
-        
-        # 遍历大运模式，检查是否有地支层模式与冲重叠
-        for pattern_group in dayun_patterns:
-            pattern_type = pattern_group.get("pattern_type")
-            pairs = pattern_group.get("pairs", [])
-            for pair in pairs:
-                pos1 = pair.get("pos1", {})
-                pos2 = pair.get("pos2", {})
-                kind = pos1.get("kind")
-                
-                # 只处理地支层模式（天干层模式单独计算）
-                if kind == "zhi" and clash_dy_natal:
-                    clash_target_branch = clash_dy_natal.get("target_branch")
-                    clash_flow_branch = clash_dy_natal.get("flow_branch")
-                    
-                    # 检查是否与冲重叠
-                    dayun_char = pos1.get("char") if pos1.get("source") == "dayun" else pos2.get("char")
-                    other_char = pos2.get("char") if pos1.get("source") == "dayun" else pos1.get("char")
-                    other_pillar = pos2.get("pillar") if pos1.get("source") == "dayun" else pos1.get("pillar")
-                    
-                    if (dayun_char == clash_flow_branch and 
-                        other_char == clash_target_branch and
-                        other_pillar in ("year", "month", "day", "hour")):
-                        # 重叠！在冲上+10%
-                        clash_pattern_bonus_dy = 10.0
-                        old_risk = clash_dy_natal.get("risk_percent", 0.0)
-                        clash_dy_natal["risk_percent"] = old_risk + clash_pattern_bonus_dy
-                        clash_dy_natal["pattern_bonus_percent"] = clash_pattern_bonus_dy
-                        clash_dy_natal["is_pattern_overlap"] = True
-                        clash_dy_natal["overlap_pattern_type"] = pattern_type
-                    else:
-                        # 不重叠，单独计算模式风险
-                        risk = 15.0
-                        # 如果涉及命局月支，则风险为25%
-                        other_pos = pos2 if pos1.get("source") == "dayun" else pos1
-                        if (other_pos.get("source") == "natal" and 
-                            other_pillar == "month" and 
-                            other_pos.get("kind") == "zhi"):
-                            risk = 25.0
-                        dayun_pattern_events.append({
-                            "type": "pattern",
-                            "pattern_type": pattern_type,
-                            "kind": "zhi",
-                            "risk_percent": risk,
-                            "pos1": pos1,
-                            "pos2": pos2,
-                        })
-                elif kind == "gan":
-                    # 天干层模式，单独计算
-                    risk = 15.0
-                    dayun_pattern_events.append({
-                        "type": "pattern",
-                        "pattern_type": pattern_type,
-                        "kind": "gan",
-                        "risk_percent": risk,
-                        "pos1": pos1,
-                        "pos2": pos2,
-                    })
-        
-        # 计算 risk_dayun_zhi（大运地支参与的事件）
-        risk_dayun_zhi = 0.0
-        if clash_dy_natal:
-            risk_dayun_zhi += clash_dy_natal.get("risk_percent", 0.0)
-        for punish_ev in punishments_dy_filtered:
-            risk_dayun_zhi += punish_ev.get("risk_percent", 0.0)
-        for pat_ev in dayun_pattern_events:
-            if pat_ev.get("kind") == "zhi":
-                risk_dayun_zhi += pat_ev.get("risk_percent", 0.0)
-        
-        # 计算 risk_dayun_gan（大运天干参与的事件）
-        risk_dayun_gan = 0.0
-        for pat_ev in dayun_pattern_events:
-            if pat_ev.get("kind") == "gan":
-                risk_dayun_gan += pat_ev.get("risk_percent", 0.0)
-        
-        # 计算 risk_dayun_total
-        risk_dayun_total = risk_dayun_zhi + risk_dayun_gan
-        
-        # ===== §8.4 大运好坏判定逻辑 =====
-        is_dayun_zhi_yongshen = zhi_good_dy
-        is_dayun_gan_yongshen = gan_good_dy
-        
-        if is_dayun_zhi_yongshen:
-            if risk_dayun_total < 30.0:
-                dayun_label = "好运"
-            else:
-                dayun_label = "坏运（用神过旺/变动过大）"
-            
-            # 检查是否"非常好运"
-            is_very_good = False
-            if is_dayun_zhi_yongshen and is_dayun_gan_yongshen and risk_dayun_total < 30.0:
-                is_very_good = True
-        else:
-            if risk_dayun_total <= 15.0:
-                dayun_label = "一般"
-            elif risk_dayun_total <= 30.0:
-                dayun_label = "一般（有变动）"
-            else:
-                dayun_label = "坏运"
-            is_very_good = False
-
-        # 大运支与原局的六合/三合（只解释，不计分）
-        harmonies_dy = detect_flow_harmonies(
-            bazi=bazi,
-            flow_branch=zhi_dy,
-            flow_type="dayun",
-            flow_year=dy.getStartYear(),
-            flow_label=gz_dy,
-        )
-        
-        # 检测大运+原局的完整三合局
-        sanhe_dy = detect_sanhe_complete(
-            bazi=bazi,
-            dayun_branch=zhi_dy,
-            dayun_label=gz_dy,
-            dayun_index=idx,
-        )
-        
-        # 检测大运+原局的完整三会局
-        sanhui_dy = detect_sanhui_complete(
-            bazi=bazi,
-            dayun_branch=zhi_dy,
-            dayun_label=gz_dy,
-            dayun_index=idx,
-        )
+        # 大运层（冲 / 刑 / 模式 / 风险 / 标签 / 合）按 八字 × 大运干支 × 用神 缓存
+        dy_eval = _stamp_dayun(_evaluate_dayun_cached(bazi_key, dy_jz, yong_key), idx, dy["start_year"])
+        gan_good_dy = dy_eval["gan_good"]
+        zhi_good_dy = dy_eval["zhi_good"]
+        clash_dy_natal = dy_eval["clash_natal"]
 
         dayun_luck = DayunLuck(
             index=idx,
-            gan=gan_dy,
-            zhi=zhi_dy,
-            gan_element=gan_el_dy,
-            zhi_element=zhi_el_dy,
-            start_year=dy.getStartYear(),
-            start_age=dy.getStartAge(),
+            gan=dy_eval["gan"],
+            zhi=dy_eval["zhi"],
+            gan_element=dy_eval["gan_element"],
+            zhi_element=dy_eval["zhi_element"],
+            start_year=dy["start_year"],
+            start_age=dy["start_age"],
             gan_good=gan_good_dy,
             zhi_good=zhi_good_dy,
-            is_good=is_good_dy_old,  # 保留旧字段以兼容（会在后面根据 §4.4 更新）
+            is_good=dy_eval["is_good_old"],  # 保留旧字段以兼容（会在后面根据 §4.4 更新）
             clashes_natal=[clash_dy_natal] if clash_dy_natal else [],
         )
 
         # ===== 这个大运下面的十个流年 =====
         liunian_list: List[LiunianLuck] = []
-        liu_arr = dy.getLiuNian()
+        liunian_risks: List[float] = []
+        liu_arr = dy["liunian"]
 
         for ln in liu_arr:
-            gz_ln = ln.getGanZhi()
-            gan_ln, zhi_ln = _split_ganzhi(gz_ln)
-            if gan_ln is None or zhi_ln is None:
-                continue
-
-            gan_el_ln = GAN_WUXING.get(gan_ln)
-            zhi_el_ln = ZHI_WUXING.get(zhi_ln)
-
-            gan_good_ln = bool(gan_el_ln and gan_el_ln in yongshen_elements)
-            zhi_good_ln = bool(zhi_el_ln and zhi_el_ln in yongshen_elements)
-
-            # 流年：天干管开始，地支管后来
-            start_good = gan_good_ln
-            later_good = zhi_good_ln
-
-            # 流年支 与 命局地支 的冲
-            clash_ln_natal = detect_branch_clash(
-                bazi=bazi,
-                flow_branch=zhi_ln,
-                flow_type="liunian",
-                flow_year=ln.getYear(),
-                flow_label=gz_ln,
-                flow_gan=gan_ln,  # 传入天干用于天克地冲检测
-            )
-            
-            # 流年支 与 命局地支 的刑
-            punishments_ln = detect_branch_punishments(
-                bazi=bazi,
-                flow_branch=zhi_ln,
-                flow_type="liunian",
-                flow_year=ln.getYear(),
-                flow_label=gz_ln,
-            )
-
-            # 大运支 与 流年支 之间的冲（需要计算风险）
-            clash_dayun_liunian = None
-            if ZHI_CHONG.get(zhi_ln) == zhi_dy:
-                # 运年相冲：基础风险为 10%（固定值，不涉及宫位）
-                base_risk = 10.0
-                
-                # 检查是否为墓库冲（辰戌、丑未）
-                from .clash import _is_grave_clash
-                is_grave_clash = _is_grave_clash(zhi_dy, zhi_ln)
-                grave_bonus = 0.0
-                if is_grave_clash:
-                    # 墓库加成：+5%（运年相冲固定5%，因为不涉及命局柱数）
-                    grave_bonus = 5.0
-                
-                # 检测运年天克地冲（大运天干与流年天干互克，且地支互冲）
-                from .clash import _check_tian_ke_di_chong
-                tkdc_bonus = 0.0
-                is_tkdc = False
-                if _check_tian_ke_di_chong(gan_dy, zhi_dy, gan_ln, zhi_ln):
-                    # 运年天克地冲：在天克地冲的基础上额外+10%
-                    # 即：基础天克地冲+10%，运年天克地冲再+10%，总共+20%
-                    tkdc_bonus = 20.0  # 10%（天克地冲）+ 10%（运年天克地冲额外）
-                    is_tkdc = True
-                
-                total_risk = base_risk + grave_bonus + tkdc_bonus
-                
-                clash_dayun_liunian = {
-                        "type": "dayun_liunian_branch_clash",
-                    "role": "base",  # 标记为基础事件，用于线运计算
-                        "dayun_branch": zhi_dy,
-                        "liunian_branch": zhi_ln,
-                    "dayun_gan": gan_dy,
-                    "liunian_gan": gan_ln,
-                    "dayun_shishen": get_branch_shishen(bazi, zhi_dy),
-                    "liunian_shishen": get_branch_shishen(bazi, zhi_ln),
-                    "base_risk_percent": base_risk,
-                    "grave_bonus_percent": grave_bonus,
-                    "tkdc_bonus_percent": tkdc_bonus,
-                    "is_tian_ke_di_chong": is_tkdc,
-                    "risk_percent": total_risk,
-                    "flow_year": ln.getYear(),
-                    "flow_label": gz_ln,
-                    # 注意：运年相冲不涉及命局宫位，所以 targets 为空
-                    "targets": [],
-                }
-            
-            clashes_dayun: List[Dict[str, Any]] = [clash_dayun_liunian] if clash_dayun_liunian else []
-            
-            # ===== 静态冲/刑激活检测 =====
-            # 当流年与命局相冲/刑时，如果大运与命局之间也有静态冲/刑（且涉及相同的命局地支），则静态冲/刑被激活
-            static_clash_activation_risk = 0.0  # 静态冲的地支部分（base_power的一半）
-            static_tkdc_activation_risk_zhi = 0.0  # 静态天克地冲的地支部分（tkdc的一半）
-            static_tkdc_activation_risk_gan = 0.0  # 静态天克地冲的天干部分（天克的一半）
-            static_punish_activation_risk = 0.0
-            
-            # 检查静态冲激活：有两种触发方式
-            # 1. 流年地支与命局地支相冲，且大运与命局之间也有静态冲（涉及相同的命局地支）
-            # 2. 流年地支与大运地支相冲，且大运与命局之间也有静态冲（激活大运静态冲）
-            if clash_dy_natal:
-                should_activate_clash = False
-                
-                # 情况1：流年与命局相冲，且涉及相同的命局地支
-                if clash_ln_natal:
-                    clash_ln_target = clash_ln_natal.get("target_branch")
-                    clash_dy_target = clash_dy_natal.get("target_branch")
-                    if clash_ln_target == clash_dy_target:
-                        should_activate_clash = True
-                
-                # 情况2：流年与大运相冲，激活大运与命局之间的静态冲
-                if clash_dayun_liunian:
-                    should_activate_clash = True
-                
-                if should_activate_clash:
-                    # 静态冲被激活：每个被冲的柱都算一半
-                    # 根据用户说明：墓库冲的力量是15%每次（base_power 10% + grave_bonus 5%）
-                    # 如果有两个柱，就是两次，激活时每个算一半，所以是 15% * 0.5 * 2 = 15%
-                    targets = clash_dy_natal.get("targets", [])
-                    base_power_percent = clash_dy_natal.get("base_power_percent", 0.0)
-                    grave_bonus_percent = clash_dy_natal.get("grave_bonus_percent", 0.0)
-                    
-                    # 计算每个柱的完整风险（base_power + grave_bonus）
-                    # base_power_percent 是所有柱的权重累加，需要按柱数分配
-                    if len(targets) > 0:
-                        # 每个柱的base_power（平均分配）
-                        pillar_base_power = base_power_percent / len(targets)
-                        # 每个柱的完整风险 = base_power + grave_bonus
-                        pillar_full_risk = pillar_base_power + grave_bonus_percent
-                        # 每个柱的激活风险 = 完整风险的一半
-                        for target in targets:
-                            static_clash_activation_risk += pillar_full_risk * 0.5
-                    
-                    # 静态天克地冲：如果大运静态冲有天克地冲，则静态天克地冲也被激活
-                    static_tkdc_bonus = clash_dy_natal.get("tkdc_bonus_percent", 0.0)
-                    if static_tkdc_bonus > 0.0:
-                        # 静态天克地冲激活：每个柱的天克地冲10%的一半 = 5%
-                        # 其中天克（天干）5%，冲（地支）0%（因为冲的部分已经包含在静态冲激活中）
-                        static_tkdc_activation_risk_total = static_tkdc_bonus * 0.5
-                        # 拆分：天克（天干）全部，冲（地支）0%
-                        static_tkdc_activation_risk_gan += static_tkdc_activation_risk_total
-                        static_tkdc_activation_risk_zhi += 0.0  # 冲的部分已经包含在static_clash_activation_risk中
-            
-            # 检查静态刑激活：有三种触发方式
-            # 1. 流年地支与命局地支相刑，且大运与命局之间也有静态刑（涉及相同的命局地支）
-            # 2. 流年地支与大运地支相刑，且大运与命局之间也有静态刑（激活大运静态刑）
-            # 3. 流年地支与命局地支相刑，且原局内部也有静态刑（激活原局内部静态刑）
-            
-            # 检测原局内部的静态刑
-            from .punishment import detect_natal_clashes_and_punishments
-            natal_static = detect_natal_clashes_and_punishments(bazi)
-            natal_punishments = natal_static.get("punishments", [])
-            
-            should_activate_punish = False
-            activated_punish_evs = []
-            
-            # 情况1：流年与命局相刑，且大运与命局之间也有静态刑（涉及相同的命局地支）
-            if punishments_dy_filtered and punishments_ln:
-                ln_punish_targets = {ev.get("target_branch") for ev in punishments_ln}
-                for punish_ev in punishments_dy_filtered:
-                    dy_punish_target = punish_ev.get("target_branch")
-                    if dy_punish_target in ln_punish_targets:
-                        should_activate_punish = True
-                        activated_punish_evs.append(punish_ev)
-            
-            # 情况2：流年与大运相刑，激活大运与命局之间的静态刑
-            if punishments_dy_filtered:
-                from .punishment import _get_punish_targets
-                liunian_punish_targets = _get_punish_targets(zhi_ln)
-                if zhi_dy in liunian_punish_targets:
-                    should_activate_punish = True
-                    # 激活所有大运静态刑
-                    for punish_ev in punishments_dy_filtered:
-                        if punish_ev not in activated_punish_evs:
-                            activated_punish_evs.append(punish_ev)
-            
-            # 情况3：流年与命局相刑，且原局内部也有静态刑（激活原局内部静态刑）
-            if punishments_ln and natal_punishments:
-                # 检查流年刑是否与原局内部刑相同
-                ln_punish_pairs = {(ev.get("flow_branch"), ev.get("target_branch")) for ev in punishments_ln}
-                for natal_punish_ev in natal_punishments:
-                    # 原局内部刑的格式：flow_branch 和 target_branch 是原局的两个柱
-                    natal_flow = natal_punish_ev.get("flow_branch")
-                    natal_target = natal_punish_ev.get("target_branch")
-                    # 检查是否与流年刑相同（流年地支与原局内部刑的其中一个地支相同）
-                    if (zhi_ln == natal_flow and natal_target in {ev.get("target_branch") for ev in punishments_ln}) or \
-                       (zhi_ln == natal_target and natal_flow in {ev.get("target_branch") for ev in punishments_ln}):
-                        should_activate_punish = True
-                        activated_punish_evs.append(natal_punish_ev)
-            
-            if should_activate_punish:
-                # 静态刑被激活，风险为原风险的一半
-                for punish_ev in activated_punish_evs:
-                    static_punish_risk_per_event = punish_ev.get("risk_percent", 0.0) * 0.5
-                    static_punish_activation_risk += static_punish_risk_per_event
-
-            # 流年支与原局的六合/三合（只解释，不计分）
-            harmonies_ln = detect_flow_harmonies(
-                bazi=bazi,
-                flow_branch=zhi_ln,
-                flow_type="liunian",
-                flow_year=ln.getYear(),
-                flow_label=gz_ln,
-            )
-            
-            # 检测流年+原局的完整三合局，以及大运+流年+原局的完整三合局
-            sanhe_ln = detect_sanhe_complete(
-                bazi=bazi,
-                dayun_branch=zhi_dy,
-                dayun_label=gz_dy,
-                dayun_index=idx,
-                liunian_branch=zhi_ln,
-                liunian_year=ln.getYear(),
-                liunian_label=gz_ln,
-            )
-            
-            # 检测流年+原局的完整三会局，以及大运+流年+原局的完整三会局
-            sanhui_ln = detect_sanhui_complete(
-                bazi=bazi,
-                dayun_branch=zhi_dy,
-                dayun_label=gz_dy,
-                dayun_index=idx,
-                liunian_branch=zhi_ln,
-                liunian_year=ln.getYear(),
-                liunian_label=gz_ln,
-            )
-
-            # ===== §5.3.3 流年模式检测 =====
-            pattern_events_ln = detect_liunian_patterns(
-                bazi=bazi,
-                day_gan=day_gan,
-                dayun_gan=gan_dy,
-                dayun_zhi=zhi_dy,
-                liunian_gan=gan_ln,
-                yongshen_elements=yongshen_elements,
-                liunian_zhi=zhi_ln,
-            )
-            
-            # 为模式事件添加 flow_year 和 flow_label
-            for pat_ev in pattern_events_ln:
-                pat_ev["flow_year"] = ln.getYear()
-                pat_ev["flow_label"] = gz_ln
-
-            # ===== §6.2 检查模式是否与冲事件重叠 =====
-            # 如果同一对地支既是冲又是模式，在冲上+10%，不单独计模式
-            pattern_events_filtered: List[Dict[str, Any]] = []
-            clash_pattern_bonus = 0.0  # 冲+模式的额外加成
-            
-            if clash_ln_natal:
-                clash_target_branch = clash_ln_natal.get("target_branch")
-                clash_flow_branch = clash_ln_natal.get("flow_branch")
-                
-                for pat_ev in pattern_events_ln:
-                    # 只检查地支层模式（天干层模式不会与地支冲重叠）
-                    if pat_ev.get("kind") != "zhi":
-                        pattern_events_filtered.append(pat_ev)
-                        continue
-                    
-                    # 检查模式的两个位置是否与冲的一对地支匹配
-                    pos1 = pat_ev.get("pos1", {})
-                    pos2 = pat_ev.get("pos2", {})
-                    
-                    # 流年地支应该等于 clash_flow_branch
-                    # 另一个位置应该是命局中的 clash_target_branch
-                    liunian_char = pos1.get("char") if pos1.get("source") == "liunian" else pos2.get("char")
-                    other_char = pos2.get("char") if pos1.get("source") == "liunian" else pos1.get("char")
-                    other_pillar = pos2.get("pillar") if pos1.get("source") == "liunian" else pos1.get("pillar")
-                    
-                    if (liunian_char == clash_flow_branch and 
-                        other_char == clash_target_branch and
-                        other_pillar in ("year", "month", "day", "hour")):
-                        # 重叠！在冲上+10%，不单独计模式
-                        clash_pattern_bonus = 10.0
-                        # 更新冲事件的风险
-                        old_risk = clash_ln_natal.get("risk_percent", 0.0)
-                        clash_ln_natal["risk_percent"] = old_risk + clash_pattern_bonus
-                        clash_ln_natal["pattern_bonus_percent"] = clash_pattern_bonus
-                        clash_ln_natal["is_pattern_overlap"] = True
-                        clash_ln_natal["overlap_pattern_type"] = pat_ev.get("pattern_type")
-                    else:
-                        pattern_events_filtered.append(pat_ev)
-            else:
-                pattern_events_filtered = pattern_events_ln
-
-            # 收集基础事件（用于线运计算）
-            base_events: List[Dict[str, Any]] = []
-            if clash_ln_natal:
-                base_events.append(clash_ln_natal)
-            # 运年相冲也是基础事件
-            if clash_dayun_liunian:
-                base_events.append(clash_dayun_liunian)
-            # 刑事件也是基础事件
-            for punish_ev in punishments_ln:
-                # 过滤掉既冲又刑的情况（按规则只算冲）
-                if clash_ln_natal:
-                    # 检查是否与冲事件重叠（同一对地支）
-                    clash_target = clash_ln_natal.get("target_branch")
-                    if punish_ev.get("target_branch") == clash_target:
-                        continue  # 跳过，只算冲
-                base_events.append(punish_ev)
-            # 模式事件也是基础事件（已过滤掉与冲重叠的）
-            base_events.extend(pattern_events_filtered)
-
-            # ===== §9 静态模式被流年激活检测 =====
-            from .config import PATTERN_GAN_RISK_STATIC, PATTERN_ZHI_RISK_STATIC
-            
-            # 按模式类型分组流年模式事件
-            liunian_patterns_by_type: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
-            for pat_ev in pattern_events_filtered:
-                pattern_type = pat_ev.get("pattern_type")
-                kind = pat_ev.get("kind")
-                if pattern_type not in liunian_patterns_by_type:
-                    liunian_patterns_by_type[pattern_type] = {"gan": [], "zhi": []}
-                liunian_patterns_by_type[pattern_type][kind].append(pat_ev)
-            
-            # 按模式类型分组原局静态模式
-            natal_patterns_by_type: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
-            for pattern_group in natal_patterns:
-                pattern_type = pattern_group.get("pattern_type")
-                pairs = pattern_group.get("pairs", [])
-                if pattern_type not in natal_patterns_by_type:
-                    natal_patterns_by_type[pattern_type] = {"gan": [], "zhi": []}
-                for pair in pairs:
-                    pos1 = pair.get("pos1", {})
-                    kind = pos1.get("kind")
-                    natal_patterns_by_type[pattern_type][kind].append(pair)
-            
-            # 按模式类型分组大运静态模式
-            dayun_patterns_by_type: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
-            for pattern_group in dayun_patterns:
-                pattern_type = pattern_group.get("pattern_type")
-                pairs = pattern_group.get("pairs", [])
-                if pattern_type not in dayun_patterns_by_type:
-                    dayun_patterns_by_type[pattern_type] = {"gan": [], "zhi": []}
-                for pair in pairs:
-                    pos1 = pair.get("pos1", {})
-                    kind = pos1.get("kind")
-                    dayun_patterns_by_type[pattern_type][kind].append(pair)
-            
-            # 检测静态模式激活并计算风险
-            static_activation_events: List[Dict[str, Any]] = []
-            
-            for pattern_type in ["hurt_officer", "pianyin_eatgod"]:
-                liunian_gan_pairs = liunian_patterns_by_type.get(pattern_type, {}).get("gan", [])
-                liunian_zhi_pairs = liunian_patterns_by_type.get(pattern_type, {}).get("zhi", [])
-                natal_gan_pairs = natal_patterns_by_type.get(pattern_type, {}).get("gan", [])
-                natal_zhi_pairs = natal_patterns_by_type.get(pattern_type, {}).get("zhi", [])
-                dayun_gan_pairs = dayun_patterns_by_type.get(pattern_type, {}).get("gan", [])
-                dayun_zhi_pairs = dayun_patterns_by_type.get(pattern_type, {}).get("zhi", [])
-                
-                # 天干层激活检测
-                activated_natal_gan_pairs: List[Dict[str, Any]] = []
-                activated_dayun_gan_pairs: List[Dict[str, Any]] = []
-                
-                if len(liunian_gan_pairs) > 0:
-                    # 对每个流年天干 pair，检查是否激活静态 pair
-                    for liunian_pair in liunian_gan_pairs:
-                        liunian_chars = {liunian_pair["pos1"]["char"], liunian_pair["pos2"]["char"]}
-                        
-                        # 检查原局静态 pair
-                        for natal_pair in natal_gan_pairs:
-                            natal_chars = {natal_pair["pos1"]["char"], natal_pair["pos2"]["char"]}
-                            if natal_chars == liunian_chars:
-                                # 激活！只记录一次
-                                if natal_pair not in activated_natal_gan_pairs:
-                                    activated_natal_gan_pairs.append(natal_pair)
-                        
-                        # 检查大运静态 pair
-                        for dayun_pair in dayun_gan_pairs:
-                            dayun_chars = {dayun_pair["pos1"]["char"], dayun_pair["pos2"]["char"]}
-                            if dayun_chars == liunian_chars:
-                                # 激活！只记录一次
-                                if dayun_pair not in activated_dayun_gan_pairs:
-                                    activated_dayun_gan_pairs.append(dayun_pair)
-                
-                # 地支层激活检测
-                activated_natal_zhi_pairs: List[Dict[str, Any]] = []
-                activated_dayun_zhi_pairs: List[Dict[str, Any]] = []
-                
-                if len(liunian_zhi_pairs) > 0:
-                    # 对每个流年地支 pair，检查是否激活静态 pair
-                    for liunian_pair in liunian_zhi_pairs:
-                        liunian_chars = {liunian_pair["pos1"]["char"], liunian_pair["pos2"]["char"]}
-                        
-                        # 检查原局静态 pair
-                        for natal_pair in natal_zhi_pairs:
-                            natal_chars = {natal_pair["pos1"]["char"], natal_pair["pos2"]["char"]}
-                            if natal_chars == liunian_chars:
-                                # 激活！只记录一次
-                                if natal_pair not in activated_natal_zhi_pairs:
-                                    activated_natal_zhi_pairs.append(natal_pair)
-                        
-                        # 检查大运静态 pair
-                        for dayun_pair in dayun_zhi_pairs:
-                            dayun_chars = {dayun_pair["pos1"]["char"], dayun_pair["pos2"]["char"]}
-                            if dayun_chars == liunian_chars:
-                                # 激活！只记录一次
-                                if dayun_pair not in activated_dayun_zhi_pairs:
-                                    activated_dayun_zhi_pairs.append(dayun_pair)
-                
-                # 计算静态激活风险
-                # 枭神夺食和伤官见官静态按5%算，其他模式按10%算
-                if pattern_type in ("pianyin_eatgod", "hurt_officer"):
-                    static_risk_gan = 5.0 * (len(activated_natal_gan_pairs) + len(activated_dayun_gan_pairs))
-                    static_risk_zhi = 5.0 * (len(activated_natal_zhi_pairs) + len(activated_dayun_zhi_pairs))
-                else:
-                    static_risk_gan = PATTERN_GAN_RISK_STATIC * (len(activated_natal_gan_pairs) + len(activated_dayun_gan_pairs))
-                    static_risk_zhi = PATTERN_ZHI_RISK_STATIC * (len(activated_natal_zhi_pairs) + len(activated_dayun_zhi_pairs))
-                
-                # 如果有激活的静态模式，生成汇总事件
-                if static_risk_gan > 0.0 or static_risk_zhi > 0.0:
-                    static_activation_events.append({
-                        "type": "pattern_static_activation",
-                        "pattern_type": pattern_type,
-                        "risk_percent": static_risk_gan + static_risk_zhi,
-                        "risk_from_gan": static_risk_gan,
-                        "risk_from_zhi": static_risk_zhi,
-                        "activated_natal_gan_pairs": activated_natal_gan_pairs,
-                        "activated_dayun_gan_pairs": activated_dayun_gan_pairs,
-                        "activated_natal_zhi_pairs": activated_natal_zhi_pairs,
-                        "activated_dayun_zhi_pairs": activated_dayun_zhi_pairs,
-                        "liunian_pairs_trigger_gan": liunian_gan_pairs,
-                        "liunian_pairs_trigger_zhi": liunian_zhi_pairs,
-                        "flow_year": ln.getYear(),
-                        "flow_label": gz_ln,
-                    })
-
-            # 计算线运加成（§11.3：天干侧和地支侧分开计算，考虑静态影响）
-            lineyun_event = _compute_lineyun_bonus(ln.getAge(), base_events, static_activation_events)
-            lineyun_bonus = lineyun_event.get("risk_percent", 0.0) if lineyun_event else 0.0
-            lineyun_bonus_gan = lineyun_event.get("lineyun_bonus_gan", 0.0) if lineyun_event else 0.0
-            lineyun_bonus_zhi = lineyun_event.get("lineyun_bonus_zhi", 0.0) if lineyun_event else 0.0
-            
-            # ===== 三合/三会逢冲额外加分 =====
-            # 收集当年的所有冲事件
-            clash_events_for_bonus: List[Dict[str, Any]] = []
-            if clash_ln_natal:
-                clash_events_for_bonus.append(clash_ln_natal)
-            if clash_dayun_liunian:
-                clash_events_for_bonus.append(clash_dayun_liunian)
-            
-            # 检测三合/三会逢冲额外加分
-            sanhe_sanhui_clash_bonus_event = _detect_sanhe_sanhui_clash_bonus(
-                clash_events=clash_events_for_bonus,
-                sanhe_events=sanhe_ln,
-                sanhui_events=sanhui_ln,
-                yongshen_elements=yongshen_elements,
-                flow_year=ln.getYear(),
-            )
-            sanhe_sanhui_clash_bonus = sanhe_sanhui_clash_bonus_event.get("risk_percent", 0.0) if sanhe_sanhui_clash_bonus_event else 0.0
-
-            # ===== §6.1 风险拆分：天干算天干的，地支算地支的 =====
-            # risk_from_zhi：流年地支引起的风险
-            risk_from_zhi = 0.0
-            # risk_from_gan：流年天干引起的风险
-            risk_from_gan = 0.0
-            
-            # 天克地冲风险单独计算（不归入上半年或下半年）
-            tkdc_risk = 0.0
-            
-            # 流年与命局相冲
-            if clash_ln_natal:
-                # 冲的基础部分（base_power + grave_bonus）计入 risk_from_zhi
-                base_power = clash_ln_natal.get("base_power_percent", 0.0)
-                grave_bonus = clash_ln_natal.get("grave_bonus_percent", 0.0)
-                pattern_bonus = clash_ln_natal.get("pattern_bonus_percent", 0.0)  # 模式重叠+10%
-                risk_from_zhi += base_power + grave_bonus + pattern_bonus
-                
-                # 天克地冲单独计入 tkdc_risk（不再计入 risk_from_gan）
-                tkdc_bonus = clash_ln_natal.get("tkdc_bonus_percent", 0.0)
-                if tkdc_bonus > 0.0:
-                    tkdc_risk += tkdc_bonus
-            
-            # 运年相冲的风险
-            if clash_dayun_liunian:
-                # 运年相冲的基础部分（base_risk + grave_bonus）计入 risk_from_zhi
-                base_risk = clash_dayun_liunian.get("base_risk_percent", 0.0)
-                grave_bonus = clash_dayun_liunian.get("grave_bonus_percent", 0.0)
-                risk_from_zhi += base_risk + grave_bonus
-                
-                # 运年天克地冲单独计入 tkdc_risk（不再计入 risk_from_gan）
-                tkdc_bonus = clash_dayun_liunian.get("tkdc_bonus_percent", 0.0)
-                if tkdc_bonus > 0.0:
-                    tkdc_risk += tkdc_bonus
-            
-            # 静态冲激活风险（base_power的一半）计入 risk_from_zhi
-            risk_from_zhi += static_clash_activation_risk
-            
-            # 静态天克地冲风险单独计入 tkdc_risk（不再计入 risk_from_gan）
-            tkdc_risk += static_tkdc_activation_risk_gan
-            # 静态天克地冲的"冲"部分（地支）计入 risk_from_zhi（这部分是0，因为冲已经包含在static_clash_activation_risk中）
-            risk_from_zhi += static_tkdc_activation_risk_zhi
-            
-            # 静态刑激活风险计入 risk_from_zhi
-            risk_from_zhi += static_punish_activation_risk
-            
-            # 刑的风险全部计入 risk_from_zhi
-            for punish_ev in punishments_ln:
-                # 过滤掉既冲又刑的情况
-                if clash_ln_natal:
-                    clash_target = clash_ln_natal.get("target_branch")
-                    if punish_ev.get("target_branch") == clash_target:
-                        continue
-                risk_from_zhi += punish_ev.get("risk_percent", 0.0)
-            
-            # 地支层模式风险计入 risk_from_zhi（不包括与冲重叠的，因为已经加到冲上了）
-            # 天干层模式风险计入 risk_from_gan
-            for pat_ev in pattern_events_filtered:
-                if pat_ev.get("kind") == "zhi":
-                    risk_from_zhi += pat_ev.get("risk_percent", 0.0)
-                elif pat_ev.get("kind") == "gan":
-                    risk_from_gan += pat_ev.get("risk_percent", 0.0)
-            
-            # 静态模式激活风险（§9.5）
-            for static_ev in static_activation_events:
-                # 静态模式激活事件包含 risk_from_gan 和 risk_from_zhi 字段
-                risk_from_gan += static_ev.get("risk_from_gan", 0.0)
-                risk_from_zhi += static_ev.get("risk_from_zhi", 0.0)
-            
-            # 线运加成（天干侧和地支侧分开）
-            risk_from_gan += lineyun_bonus_gan
-            risk_from_zhi += lineyun_bonus_zhi
-            
-            # 三合/三会逢冲额外加分计入 risk_from_zhi（因为冲是地支事件）
-            risk_from_zhi += sanhe_sanhui_clash_bonus
-
-            # 年度总风险 = risk_from_gan + risk_from_zhi + tkdc_risk（不封顶，可>100）
-            # 注意：sanhe_sanhui_clash_bonus 已经包含在 risk_from_zhi 中
-            total_risk_percent = risk_from_gan + risk_from_zhi + tkdc_risk
-            
-            # ===== §4.4 流年好运判断（简单规则：用神+风险≤15%） =====
-            # 如果天干或地支的五行中至少有一个落在用神列表中，且 total_risk_percent ≤ 15，则标记为"好运"
-            is_good_ln = False
-            if (gan_good_ln or zhi_good_ln) and total_risk_percent <= 15.0:
-                is_good_ln = True
-            
-            # 删除不再使用的标签计算函数调用
-            # first_half_label, second_half_label, year_label 已删除
-
-            # 构建年度事件列表
-            all_events: List[Dict[str, Any]] = []
-            if clash_ln_natal:
-                all_events.append(clash_ln_natal)
-            # 添加刑事件（过滤掉既冲又刑的情况）
-            for punish_ev in punishments_ln:
-                if clash_ln_natal:
-                    clash_target = clash_ln_natal.get("target_branch")
-                    if punish_ev.get("target_branch") == clash_target:
-                        continue
-                all_events.append(punish_ev)
-            # 添加模式事件（已过滤掉与冲重叠的）
-            all_events.extend(pattern_events_filtered)
-            # 添加静态模式激活事件
-            all_events.extend(static_activation_events)
-            # 添加静态冲/刑激活事件（如果有）
-            if static_clash_activation_risk > 0.0:
-                all_events.append({
-                    "type": "static_clash_activation",
-                    "role": "base",
-                    "risk_percent": static_clash_activation_risk,
-                    "flow_year": ln.getYear(),
-                    "flow_label": gz_ln,
-                    "source": "dayun_natal_clash",
-                })
-            if static_punish_activation_risk > 0.0:
-                all_events.append({
-                    "type": "static_punish_activation",
-                    "role": "base",
-                    "risk_percent": static_punish_activation_risk,
-                    "flow_year": ln.getYear(),
-                    "flow_label": gz_ln,
-                    "source": "dayun_natal_punish",
-                })
-            if lineyun_event:
-                all_events.append(lineyun_event)
-            if sanhe_sanhui_clash_bonus_event:
-                all_events.append(sanhe_sanhui_clash_bonus_event)
-
-            # ===== 计算十神信息（供前端展示）=====
-            gan_shishen_ln = get_shishen(day_gan, gan_ln) if gan_ln else None
-            zhi_main_gan_ln = get_branch_main_gan(zhi_ln) if zhi_ln else None
-            zhi_shishen_ln = get_shishen(day_gan, zhi_main_gan_ln) if zhi_main_gan_ln else None
-
-            liunian_dict = {
-                "hints": [],  # 初始化为空列表，enrich_liunian 会填充
-                "year": ln.getYear(),
-                "age": ln.getAge(),
-                "gan": gan_ln,
-                "zhi": zhi_ln,
-                "gan_element": gan_el_ln,
-                "zhi_element": zhi_el_ln,
-                "gan_shishen": gan_shishen_ln,  # 天干十神
-                "zhi_shishen": zhi_shishen_ln,  # 地支主气十神
-                "is_gan_yongshen": gan_good_ln,  # 天干是否用神
-                "is_zhi_yongshen": zhi_good_ln,  # 地支是否用神
-                "start_good": start_good,  # 开始（天干）是否用神
-                "later_good": later_good,  # 后来（地支）是否用神
-                "is_good": is_good_ln,  # §4.4 流年好运判断（用神+风险≤15%）
-                "risk_from_gan": risk_from_gan,  # §6.1 天干引起的风险（不包含天克地冲）
-                "risk_from_zhi": risk_from_zhi,  # §6.1 地支引起的风险
-                "tkdc_risk_percent": tkdc_risk,  # 天克地冲危险系数（单独列出）
-                "clashes_natal": [clash_ln_natal] if clash_ln_natal else [],
-                "clashes_dayun": clashes_dayun,
-                "punishments_natal": punishments_ln,  # 流年支 与 命局地支 的刑
-                "patterns_liunian": pattern_events_filtered,  # 流年模式事件（已过滤掉与冲重叠的）
-                "patterns_static_activation": static_activation_events,  # §9 静态模式被流年激活的事件
-                "harmonies_natal": harmonies_ln,  # 流年与原局的六合/三合/半合/三会（只解释，不计分）
-                "harmonies_dayun": [],  # 流年与大运的合类（目前为空，后续可扩展）
-                "sanhe_complete": sanhe_ln,  # 完整三合局（流年+原局，或大运+流年+原局）
-                "sanhui_complete": sanhui_ln,  # 完整三会局（流年+原局，或大运+流年+原局）
-                "lineyun_bonus": lineyun_bonus,  # 总加成（天干侧+地支侧）
-                "lineyun_bonus_gan": lineyun_bonus_gan,  # §11.3 天干侧线运加成
-                "lineyun_bonus_zhi": lineyun_bonus_zhi,  # §11.3 地支侧线运加成
-                "sanhe_sanhui_clash_bonus": sanhe_sanhui_clash_bonus,  # 三合/三会逢冲额外加分
-                "sanhe_sanhui_clash_bonus_event": sanhe_sanhui_clash_bonus_event,  # 三合/三会逢冲额外加分事件详情
-                "total_risk_percent": total_risk_percent,
-                "all_events": all_events,
-            }
-
-            liunian_list.append(liunian_dict)
+            # 流年计分按 八字 × 大运 × 流年干支 × 线运宫位 × 用神 缓存，取出后盖上年份 / 虚龄
+            ln_jz = year_jiazi(ln["year"])
+            if wanted is None or ln["year"] in wanted:
+                liunian_dict = _liunian_entry(
+                    bazi_key, dy_jz, ln_jz, ln["year"], ln["age"], idx, yong_key, lazy, rows
+                )
+                liunian_list.append(liunian_dict)
+            liunian_risks.append(_liunian_total_risk(bazi_key, dy_jz, ln_jz, ln["age"], yong_key))
 
         # 一个大运 + 对应的十个流年
         dayun_dict = asdict(dayun_luck)
-        dayun_dict["harmonies_natal"] = harmonies_dy  # 大运与原局的六合/三合/半合/三会（只解释，不计分）
-        dayun_dict["sanhe_complete"] = sanhe_dy  # 完整三合局（大运+原局）
-        dayun_dict["sanhui_complete"] = sanhui_dy  # 完整三会局（大运+原局）
+        dayun_dict["harmonies_natal"] = dy_eval["harmonies_natal"]  # 大运与原局的六合/三合/半合/三会（只解释，不计分）
+        dayun_dict["sanhe_complete"] = dy_eval["sanhe_complete"]  # 完整三合局（大运+原局）
+        dayun_dict["sanhui_complete"] = dy_eval["sanhui_complete"]  # 完整三会局（大运+原局）
         
         # ===== §4.4 大运好运判断（简单规则：用神+平均风险≤15%） =====
         # 计算该步大运下所有流年的平均风险
         total_risk_sum = 0.0
         risk_count = 0
-        for liunian_dict in liunian_list:
-            total_risk_sum += liunian_dict.get("total_risk_percent", 0.0)
+        for liunian_risk in liunian_risks:
+            total_risk_sum += liunian_risk
             risk_count += 1
         total_risk_average = total_risk_sum / risk_count if risk_count > 0 else 0.0
         
@@ -1824,22 +1752,17 @@ def analyze_luck(
             is_good_dy_simple = True
         
         # ===== §8 大运风险与好坏判定字段 =====
-        dayun_dict["risk_dayun_zhi"] = risk_dayun_zhi
-        dayun_dict["risk_dayun_gan"] = risk_dayun_gan
-        dayun_dict["risk_dayun_total"] = risk_dayun_total
+        dayun_dict["risk_dayun_zhi"] = dy_eval["risk_dayun_zhi"]
+        dayun_dict["risk_dayun_gan"] = dy_eval["risk_dayun_gan"]
+        dayun_dict["risk_dayun_total"] = dy_eval["risk_dayun_total"]
         dayun_dict["total_risk_average"] = total_risk_average  # §4.4 该步大运下所有流年的平均风险
         dayun_dict["is_good"] = is_good_dy_simple  # §4.4 大运好运判断（用神+平均风险≤15%）
-        dayun_dict["dayun_label"] = dayun_label  # §8 "好运" | "坏运" | "一般" | "一般（有变动）" | "坏运（用神过旺/变动过大）"
-        dayun_dict["is_very_good"] = is_very_good  # 是否"非常好运"（干支皆用神且风险<30%）
-        dayun_dict["punishments_natal"] = punishments_dy_filtered  # 大运支 与 命局地支 的刑
-        dayun_dict["patterns_dayun"] = dayun_pattern_events  # 大运干/支 与 命局干/支 的模式事件
+        dayun_dict["dayun_label"] = dy_eval["dayun_label"]  # §8 "好运" | "坏运" | "一般" | "一般（有变动）" | "坏运（用神过旺/变动过大）"
+        dayun_dict["is_very_good"] = dy_eval["is_very_good"]  # 是否"非常好运"（干支皆用神且风险<30%）
+        dayun_dict["punishments_natal"] = dy_eval["punishments_natal"]  # 大运支 与 命局地支 的刑
+        dayun_dict["patterns_dayun"] = dy_eval["pattern_events"]  # 大运干/支 与 命局干/支 的模式事件
         dayun_dict["hints"] = []  # 初始化为空列表，enrich_dayun 会填充
 
-        # 确保每个流年对象都有 hints 字段
-        for liunian_dict in liunian_list:
-            if "hints" not in liunian_dict:
-                liunian_dict["hints"] = []  # 初始化为空列表，enrich_liunian 会填充
-
         groups.append(
             {
                 "dayun": dayun_dict,
@@ -1,15 +1,18 @@
 # -*- coding: utf-8 -*-
-"""封装 lunar_python：排四柱 + 日主强弱 + 用神 +（示例）大运 / 流年。"""
+"""排四柱 + 日主强弱 + 用神 +（示例）大运 / 流年。"""
 
 from __future__ import annotations
 
 from dataclasses import dataclass, asdict
 from datetime import datetime
-from typing import Dict, Any, List
-
-from lunar_python import Solar  # 依赖：pip install lunar_python
-
-from .config import GAN_LIST, ZHI_LIST, GAN_WUXING, ZHI_WUXING
+from functools import lru_cache, partial
+from typing import Dict, Any, List, Optional, Tuple
+
+from .calendar import get_pillars, year_ganzhi
+from .chart_context import ChartContext, ensure_context
+from .codes import decode_bazi
+from .events import FrozenEvent, freeze, thaw
+from .config import GAN_LIST, ZHI_LIST, GAN_WUXING, ZHI_WUXING, NATAL_CACHE_SIZE
 from .strength import calc_day_master_strength
 from .yongshen import calc_global_element_distribution, determine_yongshen
 from .shishen import (
@@ -20,10 +23,10 @@ from .shishen import (
     compute_shishen_category_by_layer,
     detect_stem_pattern_summary,
 )
-from .patterns import detect_natal_patterns
 from .punishment import detect_natal_clashes_and_punishments
 from .traits import compute_dominant_traits
 from .harmony import detect_natal_harmonies
+from .patterns import detect_natal_patterns
 
 
 @dataclass
@@ -43,24 +46,16 @@ def _validate_bazi(bazi: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]
     return bazi
 
 
-def get_bazi(birth_dt: datetime) -> Dict[str, Dict[str, str]]:
-    """使用 lunar_python 根据公历出生时间排出四柱八字。
+def get_bazi(birth_dt: datetime, backend: Optional[str] = None) -> Dict[str, Dict[str, str]]:
+    """根据公历出生时间排出四柱八字。
 
     假设传入的 birth_dt 已经是出生地当地时间（例如北京时间）。
     不做任何“智能纠错时辰”，你给几点就用几点。
+
+    默认走 bazi.calendar 的节气时刻表后端；backend="lunar" 时走 lunar_python
+    （参考实现，两者结果一致）。
     """
-    solar = Solar(birth_dt.year, birth_dt.month, birth_dt.day,
-                  birth_dt.hour, birth_dt.minute, birth_dt.second)
-    lunar = solar.getLunar()
-    ec = lunar.getEightChar()
-
-    bazi = {
-        "year":  {"gan": ec.getYearGan(),  "zhi": ec.getYearZhi()},
-        "month": {"gan": ec.getMonthGan(), "zhi": ec.getMonthZhi()},
-        "day":   {"gan": ec.getDayGan(),   "zhi": ec.getDayZhi()},
-        "hour":  {"gan": ec.getTimeGan(),  "zhi": ec.getTimeZhi()},
-    }
-    return _validate_bazi(bazi)
+    return _validate_bazi(get_pillars(birth_dt, backend))
 
 
 def _compute_yongshen_explain(
@@ -209,9 +204,13 @@ def _compute_yongshen_explain(
     }
 
 
-def analyze_basic(birth_dt: datetime) -> Dict[str, Any]:
+def analyze_basic(birth_dt: datetime, ctx: Optional[ChartContext] = None) -> Dict[str, Any]:
     """综合：排盘 + 日主强弱 + 全局五行占比 + 用神五行。
 
+    ctx: 可选的 ChartContext；传入时复用其中的四柱，不再重新排盘。
+
+    排盘之后的部分只取决于八个字，交给 analyze_natal 按八字缓存。
+
     返回：
     {
       "bazi": {...},
@@ -225,7 +224,75 @@ def analyze_basic(birth_dt: datetime) -> Dict[str, Any]:
       ...
     }
     """
-    bazi = get_bazi(birth_dt)
+    ctx = ensure_context(birth_dt, ctx=ctx)
+    return analyze_natal(ctx.bazi_key)
+
+
+def analyze_natal(bazi_key: Tuple[int, ...]) -> Dict[str, Any]:
+    """原局分析（日主强弱 / 五行占比 / 用神与特殊规则 / 十神占比 / 性格 / 模式 / 冲刑合）。
+
+    bazi_key: codes.encode_bazi 的 8 个整数。结果只取决于八个字，按 bazi_key 缓存在
+    容量为 NATAL_CACHE_SIZE 的 LRU 中（命中情况见 natal_cache_info()）；
+    缓存里存的是只读结构（events.freeze），每次返回解冻后的新对象，
+    调用方可以随意修改（如 enrich 写入 hints）而不会污染缓存。
+    """
+    bazi_key = tuple(bazi_key)
+    if len(bazi_key) != 8 or any(not 0 <= c < (10 if i % 2 == 0 else 12) for i, c in enumerate(bazi_key)):
+        raise ValueError(f"八字编码异常: {bazi_key}")
+    return thaw(_analyze_natal_cached(bazi_key))
+
+
+def natal_cache_info():
+    """原局缓存的命中 / 未命中 / 容量 / 当前条目数（functools 的 CacheInfo）。"""
+    return _analyze_natal_cached.cache_info()
+
+
+def clear_natal_cache() -> None:
+    """清空原局缓存（同时清零命中计数）。"""
+    _analyze_natal_cached.cache_clear()
+
+
+@lru_cache(maxsize=NATAL_CACHE_SIZE)
+def _analyze_natal_cached(bazi_key: Tuple[int, ...]) -> FrozenEvent:
+    from .natal_table import lookup
+
+    # 数值部分优先读预计算表，表不存在 / 查不到时 _compute_natal 现场计算
+    return freeze(_compute_natal(decode_bazi(bazi_key), lookup(bazi_key)))
+
+
+# 日主五行 → 食伤五行映射（我生者）；金日主不触发（总开关排除）
+DAY_MASTER_TO_SHISHANG_ELEMENT: Dict[str, Optional[str]] = {
+    "水": "木",  # 水生木
+    "木": "火",  # 木生火
+    "火": "土",  # 火生土
+    "土": "金",  # 土生金
+    "金": None,
+}
+
+# 官杀旺阈值（从 40% 改为 35%）
+GUANSHA_THRESHOLD = 35.0
+# 财星屏蔽阈值
+CAI_BLOCK_THRESHOLD = 20.0
+
+
+def compute_natal_numbers(bazi: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+    """原局分析中的数值部分：日主强弱、全局五行占比、十神类别占比、用神与特殊规则。
+
+    这部分可以整张预先算好（见 natal_table / tools.build_natal_table），
+    analyze_natal 优先从预计算表读取，表不存在或查不到时走这里。
+
+    返回：
+    {
+      "strength": calc_day_master_strength 结果,
+      "global_dist": {五行: 占比},
+      "shishen_cat": {类别: 占比},
+      "shishen_by_layer": {类别: {"tg", "dz"}},
+      "base_yongshen_elements": [...],
+      "final_yongshen_elements": [...],   # 特殊规则补充后
+      "special_rules": [...],
+      "yongshen_sources": {...},
+    }
+    """
     strength = calc_day_master_strength(bazi)
 
     day_gan = bazi["day"]["gan"]
@@ -237,24 +304,9 @@ def analyze_basic(birth_dt: datetime) -> Dict[str, Any]:
     # 计算十神类别力量占比
     shishen_cat = compute_shishen_category_percentages(bazi)
 
-    # 天干格局提示
-    stem_patterns = detect_stem_pattern_summary(bazi)
-
-    # 主要性格：dominant_traits（只看原局，按五大类 + 子类拆分）
-    dominant_traits = compute_dominant_traits(bazi, day_gan)
-
     # 用神列表（基础用神，后续可能被特殊规则补充）
     yongshen_elements = yong["yongshen_elements"].copy()
 
-    # 原局十神模式识别
-    natal_patterns = detect_natal_patterns(bazi, day_gan)
-
-    # 原局冲刑识别
-    natal_conflicts = detect_natal_clashes_and_punishments(bazi)
-
-    # 原局六合三合识别（只解释，不计分）
-    natal_harmonies = detect_natal_harmonies(bazi)
-
     # ============================================================
     # 特殊规则：官杀旺 + 身弱 → 补食伤（及旧规则兼容）
     # ============================================================
@@ -275,20 +327,6 @@ def analyze_basic(birth_dt: datetime) -> Dict[str, Any]:
     # 用神来源标记（新增字段，记录每个用神元素的层级来源）
     yongshen_sources = {}
 
-    # 日主五行 → 食伤五行映射（我生者）
-    DAY_MASTER_TO_SHISHANG_ELEMENT = {
-        "水": "木",  # 水生木
-        "木": "火",  # 木生火
-        "火": "土",  # 火生土
-        "土": "金",  # 土生金
-        "金": None,  # 金日主不触发（总开关排除）
-    }
-
-    # 官杀旺阈值（从 40% 改为 35%）
-    GUANSHA_THRESHOLD = 35.0
-    # 财星屏蔽阈值
-    CAI_BLOCK_THRESHOLD = 20.0
-
     # ----------------------------------------------------------
     # 特殊规则1：弱水 + 官杀重 → 补木（旧规则，阈值同步为 35%）
     # ----------------------------------------------------------
@@ -348,13 +386,68 @@ def analyze_basic(birth_dt: datetime) -> Dict[str, Any]:
                         yongshen_elements.append(display_element)
                         special_rules.append(f"weak_heavy_guansha_add_shishang_{shishang_element}")
 
-    # 最终用神（包含规则补充后的）
-    final_yongshen_elements = yongshen_elements.copy()
+    return {
+        "strength": strength,
+        "global_dist": global_dist,
+        "shishen_cat": shishen_cat,
+        "shishen_by_layer": shishen_by_layer,
+        "base_yongshen_elements": base_yongshen_elements,
+        "final_yongshen_elements": yongshen_elements.copy(),
+        "special_rules": special_rules,
+        "yongshen_sources": yongshen_sources,
+    }
+
+
+def _compute_natal(
+    bazi: Dict[str, Dict[str, str]],
+    numbers: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """analyze_natal 的实际计算（不经缓存）。
+
+    numbers: compute_natal_numbers 的结果（可来自预计算表）；不传时现场计算。
+    """
+    if numbers is None:
+        numbers = compute_natal_numbers(bazi)
+    strength = numbers["strength"]
+    global_dist = numbers["global_dist"]
+    shishen_cat = numbers["shishen_cat"]
+    shishen_by_layer = numbers["shishen_by_layer"]
+    base_yongshen_elements = numbers["base_yongshen_elements"]
+    final_yongshen_elements = numbers["final_yongshen_elements"]
+    special_rules = numbers["special_rules"]
+
+    day_gan = bazi["day"]["gan"]
+    day_master_element = GAN_WUXING.get(day_gan)
+
+    # 与 determine_yongshen 的返回结构一致（yongshen_elements 为基础用神）
+    yong = {
+        "day_gan": day_gan,
+        "day_element": day_master_element,
+        "strength_percent": float(strength["strength_percent"]),
+        "global_distribution": global_dist,
+        "yongshen_elements": base_yongshen_elements.copy(),
+        "water_percent": float(global_dist.get("水", 0.0)),
+    }
+
+    # 天干格局提示
+    stem_patterns = detect_stem_pattern_summary(bazi)
+
+    # 主要性格：dominant_traits（只看原局，按五大类 + 子类拆分）
+    dominant_traits = compute_dominant_traits(bazi, day_gan)
+
+    # 原局十神模式识别
+    natal_patterns = detect_natal_patterns(bazi, day_gan)
+
+    # 原局冲刑识别
+    natal_conflicts = detect_natal_clashes_and_punishments(bazi)
+
+    # 原局六合三合识别（只解释，不计分）
+    natal_harmonies = detect_natal_harmonies(bazi)
 
     # 更新 yongshen_detail，明确 base/final
     yong["base_yongshen_elements"] = base_yongshen_elements
     yong["final_yongshen_elements"] = final_yongshen_elements
-    yong["yongshen_sources"] = yongshen_sources  # 新增：用神来源标记
+    yong["yongshen_sources"] = numbers["yongshen_sources"]  # 新增：用神来源标记
     yong["shishen_by_layer"] = shishen_by_layer  # 新增：分层十神百分比
     # 保留旧的 yongshen_elements 字段以兼容（但建议使用 base_yongshen_elements）
     # yong["yongshen_elements"] 现在等于 base_yongshen_elements
@@ -404,8 +497,8 @@ class LiuNianInfo:
     gan_zhi: str
 
 
-def get_yun_info(birth_dt: datetime, is_male: bool) -> Dict[str, Any]:
-    """示范如何从 lunar_python 里取大运 / 流年信息。
+def get_yun_info(birth_dt: datetime, is_male: bool, ctx: Optional[ChartContext] = None) -> Dict[str, Any]:
+    """示范如何取大运 / 流年信息（calendar.dayun_sequence，结果与 lunar_python Yun 一致）。
 
     当前只返回：
     - 起运时间（相对出生多久起运）
@@ -413,51 +506,41 @@ def get_yun_info(birth_dt: datetime, is_male: bool) -> Dict[str, Any]:
     - 第一步大运下的所有流年干支
 
     后续你可以基于这些结构增加自己的评分逻辑。
+    ctx: 可选的 ChartContext；传入时复用其中的大运序列。
     """
-    solar = Solar(birth_dt.year, birth_dt.month, birth_dt.day,
-                  birth_dt.hour, birth_dt.minute, birth_dt.second)
-    lunar = solar.getLunar()
-    ec = lunar.getEightChar()
-
-    # sex 参数：以 lunar 官方 demo 习惯，1=男, 0=女
-    yun = ec.getYun(1 if is_male else 0)
+    ctx = ensure_context(birth_dt, is_male, ctx)
+    yun = ctx.dayun
 
-    start_year = yun.getStartYear()
-    start_month = yun.getStartMonth()
-    start_day = yun.getStartDay()
-    start_solar = yun.getStartSolar().toYmd()
-
-    da_yun_arr = yun.getDaYun()
+    da_yun_arr = yun["dayun"]
     da_yun_list: List[DaYunInfo] = []
     for i, da_yun in enumerate(da_yun_arr):
         da_yun_list.append(
             DaYunInfo(
                 index=i,
-                start_year=da_yun.getStartYear(),
-                start_age=da_yun.getStartAge(),
-                gan_zhi=da_yun.getGanZhi(),
+                start_year=da_yun["start_year"],
+                start_age=da_yun["start_age"],
+                gan_zhi=da_yun["gan_zhi"],
             )
         )
 
     liu_nian_list: List[LiuNianInfo] = []
     if da_yun_arr:
         first_da_yun = da_yun_arr[0]
-        liu_nian_arr = first_da_yun.getLiuNian()
-        for ln in liu_nian_arr:
+        for ln in first_da_yun["liunian"]:
             liu_nian_list.append(
                 LiuNianInfo(
-                    year=ln.getYear(),
-                    age=ln.getAge(),
-                    gan_zhi=ln.getGanZhi(),
+                    year=ln["year"],
+                    age=ln["age"],
+                    gan_zhi="".join(year_ganzhi(ln["year"])),
                 )
             )
 
     return {
         "start_offset": {
-            "years": start_year,
-            "months": start_month,
-            "days": start_day,
-            "start_solar": start_solar,
+            "years": yun["start_offset"]["years"],
+            "months": yun["start_offset"]["months"],
+            "days": yun["start_offset"]["days"],
+            "start_solar": yun["start_solar"].strftime("%Y-%m-%d"),
         },
         "dayun": [asdict(x) for x in da_yun_list],
         "liunian_first_dayun": [asdict(x) for x in liu_nian_list],
@@ -468,6 +551,9 @@ def analyze_complete(
     birth_dt: datetime,
     is_male: bool,
     max_dayun: int = 10,
+    lazy: bool = False,
+    years: Optional[List[int]] = None,
+    compact: bool = False,
 ) -> Dict[str, Any]:
     """完整分析：整合 analyze_basic() + analyze_luck() + 数据丰富化。
     
@@ -477,6 +563,11 @@ def analyze_complete(
         birth_dt: 出生日期时间
         is_male: 是否男性
         max_dayun: 最大大运数量（默认10步）
+        lazy: 为 True 时流年（含丰富化）和 Relationship Index 在第一次访问时才计算，
+            见 lazy_facts；整份序列化前用 lazy_facts.materialize_facts 算全
+        compact: 为 True 时流年存成紧凑的 LiunianRows，各项是只读的 LiunianView（按需重建并冻结，
+            用于缓存大量命盘的 facts）；Relationship Index 同 lazy 按需生成
+        years: 只算这些年份（analyze_years 用；见 analyze_luck 的 years 参数）
         
     返回:
         完整的分析结果字典，包含：
@@ -486,21 +577,28 @@ def analyze_complete(
         - turning_points: 大运转折点列表
     """
     from .luck import analyze_luck
+    from .lazy_facts import LazyRecord, LiunianView
     from .enrich import (
         enrich_natal,
-        enrich_dayun,
+        enrich_dayun_cached,
         enrich_liunian,
         compute_turning_points,
     )
     
+    # 0. 一次排盘，各阶段共享
+    ctx = ChartContext(birth_dt, is_male)
+
     # 1. 基础分析
-    natal = analyze_basic(birth_dt)
+    natal = analyze_basic(birth_dt, ctx=ctx)
     bazi = natal["bazi"]
     day_gan = bazi["day"]["gan"]
     yongshen_elements = natal["yongshen_elements"]
     
     # 2. 大运/流年分析
-    luck = analyze_luck(birth_dt, is_male, yongshen_elements, max_dayun=max_dayun)
+    luck = analyze_luck(
+        birth_dt, is_male, yongshen_elements, max_dayun=max_dayun, ctx=ctx, lazy=lazy, years=years,
+        compact=compact,
+    )
     
     # 3. 丰富原局数据
     natal_enriched = enrich_natal(natal, bazi, day_gan, is_male)
@@ -510,6 +608,19 @@ def analyze_complete(
     strength_percent = natal.get("strength_percent", 50.0)
     support_percent = natal.get("support_percent", 0.0)
     
+    def enrich_liunian_step(dayun_gan: Optional[str]):
+        def step(liunian: Dict[str, Any]) -> None:
+            liunian_enriched = enrich_liunian(
+                liunian=liunian,
+                bazi=bazi,
+                day_gan=day_gan,
+                is_male=is_male,
+                dayun_gan=dayun_gan,
+            )
+            # liunian 是本次 facts 自己的 dict（缓存模板在出口处已解冻），可以原地写入
+            liunian.update(liunian_enriched)
+        return step
+
     for group in luck.get("groups", []):
         dayun = group.get("dayun")
         liunian_list = group.get("liunian", [])
@@ -517,18 +628,11 @@ def analyze_complete(
         # 如果 dayun 为 None，说明是大运开始之前的流年，只丰富流年数据
         if dayun is None:
             # 大运开始之前，没有大运，dayun_gan 为 None
-            for liunian in liunian_list:
-                liunian_enriched = enrich_liunian(
-                    liunian=liunian,
-                    bazi=bazi,
-                    day_gan=day_gan,
-                    is_male=is_male,
-                    dayun_gan=None,  # 大运开始之前，没有大运天干
-                )
-                liunian.update(liunian_enriched)
+            step = enrich_liunian_step(None)
         else:
             # 正常大运组，丰富大运和流年数据
-            dayun_enriched = enrich_dayun(
+            # 大运层丰富化只取决于 八字 × 大运干支（及命盘参数），按此缓存
+            dayun_enriched = enrich_dayun_cached(
                 dayun=dayun,
                 bazi=bazi,
                 day_gan=day_gan,
@@ -538,18 +642,14 @@ def analyze_complete(
                 is_male=is_male,
             )
             dayun.update(dayun_enriched)
-            
-            # 丰富流年数据
-            dayun_gan = dayun.get("gan", "")
-            for liunian in liunian_list:
-                liunian_enriched = enrich_liunian(
-                    liunian=liunian,
-                    bazi=bazi,
-                    day_gan=day_gan,
-                    is_male=is_male,
-                    dayun_gan=dayun_gan,
-                )
-                liunian.update(liunian_enriched)
+            step = enrich_liunian_step(dayun.get("gan", ""))
+
+        # 丰富流年数据（惰性 / 紧凑流年在重建时丰富）
+        for liunian in liunian_list:
+            if isinstance(liunian, (LazyRecord, LiunianView)):
+                liunian.then(step)
+            else:
+                step(liunian)
     
     # 5. 计算转折点
     turning_points = compute_turning_points(luck.get("groups", []))
@@ -560,13 +660,18 @@ def analyze_complete(
     # 注意：facts 为唯一真相源；任何离线快照/导出都不得作为运行时事实来源
     from datetime import datetime as dt
     current_year = dt.now().year
-    relationship_index = generate_relationship_index(
+    relationship_args = dict(
         luck_data=luck,
         bazi=bazi,
         day_gan=day_gan,
         is_male=is_male,
         current_year=current_year,
     )
+    if lazy or compact:
+        # 要扫全部流年，惰性 / 紧凑模式下第一次访问时才生成
+        relationship_index = LazyRecord(partial(generate_relationship_index, **relationship_args))
+    else:
+        relationship_index = generate_relationship_index(**relationship_args)
     
     # 7. 生成 Dayun Index (Index-3)
     from .dayun_index import generate_dayun_index
@@ -586,3 +691,34 @@ def analyze_complete(
             "relationship": relationship_index,  # Index-5: Relationship Index（感情变动窗口）
         },
     }
+
+
+def analyze_years(
+    birth_dt: datetime,
+    is_male: bool,
+    years: List[int],
+    max_dayun: int = 15,
+) -> Dict[str, Any]:
+    """只分析指定年份：返回与 analyze_complete 同结构的部分 facts。
+
+    原局层照常计算；每个年份按起运年份落到所在大运，只对这些大运和年份跑大运 / 流年内核。
+    luck.groups 只含所在大运（从第一个到最后一个的连续一段，另加大运开始之前的组，如有），
+    各组的 liunian 只含要的年份；转折点和索引按这些组计算。
+    generate_request_index / generate_year_detail / chat_api 都可直接使用，
+    不在范围内的年份按“facts 中没有该年”处理。
+
+    参数:
+        birth_dt: 出生日期时间
+        is_male: 是否男性
+        years: 要分析的年份（公历年，不可为空）
+        max_dayun: 最大大运数量（与 compute_facts 默认一致，15 步）
+
+    返回:
+        部分 facts，另加 "years": 去重排序后的年份列表
+    """
+    if not years:
+        raise ValueError("years 不能为空")
+    wanted = sorted({int(year) for year in years})
+    facts = analyze_complete(birth_dt, is_male, max_dayun=max_dayun, years=wanted)
+    facts["years"] = wanted
+    return facts
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""原局响应表：一张命盘对 12 个流支 / 60 个流柱的冲、刑、合结果。
+
+对固定的原局而言，detect_branch_clash / detect_branch_punishments / detect_flow_harmonies
+的结果只取决于流年（大运）地支，冲还取决于天干（天克地冲）。analyze_luck 原先对每步大运、
+每个流年都重新扫描四柱；NatalResponseTable 在建表时按 60 甲子 / 12 地支各算一次，
+逐年只把 flow_type / flow_year / flow_label 以 overlay 叠加到模板上。
+
+表按八字缓存、在请求之间共享，模板冻结存放（events.freeze）：查询结果是只读的 FrozenEvent，
+targets / shishens 等嵌套结构与模板共享但不能写；要改字段用 overlay，要放进对外结果时 thaw。
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from .codes import JIA_ZI_PAIRS, decode_bazi
+from .config import RESPONSE_TABLE_CACHE_SIZE, ZHI_LIST
+from .events import FrozenEvent, freeze
+
+
+def _stamp(
+    template: FrozenEvent,
+    flow_type: str,
+    flow_year: Optional[int],
+    flow_label: Optional[str],
+) -> FrozenEvent:
+    """模板 → 当年事件（叠加 flow_* 字段，不拷贝；键顺序与直接调用检测函数一致）。"""
+    return template.overlay(flow_type=flow_type, flow_year=flow_year, flow_label=flow_label)
+
+
+class NatalResponseTable:
+    """一张原局对所有流支 / 流柱的响应模板。
+
+    属性:
+        bazi: 原局四柱
+        natal_static: 原局内部的冲 / 刑（detect_natal_clashes_and_punishments 结果，只读）
+
+    查询（均返回只读事件 FrozenEvent，模板本身不会被改动）:
+        clash(jz, ...): 流柱 jz（甲子序号）与原局的冲，无冲返回 None
+        punishments(zhi_code, ...): 流支与原局的刑
+        harmonies(zhi_code, ...): 流支与原局的六合 / 三合 / 半合 / 三会
+    """
+
+    def __init__(self, bazi: Dict[str, Dict[str, str]]):
+        from .clash import detect_branch_clash
+        from .harmony import detect_flow_harmonies
+        from .punishment import detect_branch_punishments, detect_natal_clashes_and_punishments
+
+        self.bazi = bazi
+
+        # 刑 / 合：按 12 地支建表
+        self._punish: Tuple[List[FrozenEvent], ...] = tuple(
+            freeze(detect_branch_punishments(bazi, zhi, None)) for zhi in ZHI_LIST
+        )
+        self._harmony: Tuple[List[FrozenEvent], ...] = tuple(
+            freeze(detect_flow_harmonies(bazi, zhi, None)) for zhi in ZHI_LIST
+        )
+
+        # 冲：按 60 甲子建表（天干决定天克地冲）；原局没有被冲之支的地支整列为 None
+        has_clash = [detect_branch_clash(bazi, zhi, None) is not None for zhi in ZHI_LIST]
+        self._clash: Tuple[Optional[FrozenEvent], ...] = tuple(
+            freeze(detect_branch_clash(bazi, zhi, None, flow_gan=gan)) if has_clash[jz % 12] else None
+            for jz, (gan, zhi) in enumerate(JIA_ZI_PAIRS)
+        )
+
+        self.natal_static: FrozenEvent = freeze(detect_natal_clashes_and_punishments(bazi))
+
+    def clash(
+        self,
+        jz: int,
+        flow_type: str,
+        flow_year: Optional[int] = None,
+        flow_label: Optional[str] = None,
+    ) -> Optional[FrozenEvent]:
+        """等价于 detect_branch_clash(bazi, 支, flow_type, flow_year, flow_label, flow_gan=干)。"""
+        template = self._clash[jz]
+        if template is None:
+            return None
+        return _stamp(template, flow_type, flow_year, flow_label)
+
+    def punishments(
+        self,
+        zhi_code: int,
+        flow_type: str,
+        flow_year: Optional[int] = None,
+        flow_label: Optional[str] = None,
+    ) -> List[FrozenEvent]:
+        """等价于 detect_branch_punishments(bazi, 支, flow_type, flow_year, flow_label)。"""
+        return [_stamp(t, flow_type, flow_year, flow_label) for t in self._punish[zhi_code]]
+
+    def harmonies(
+        self,
+        zhi_code: int,
+        flow_type: str,
+        flow_year: Optional[int] = None,
+        flow_label: Optional[str] = None,
+    ) -> List[FrozenEvent]:
+        """等价于 detect_flow_harmonies(bazi, 支, flow_type, flow_year, flow_label)。"""
+        return [_stamp(t, flow_type, flow_year, flow_label) for t in self._harmony[zhi_code]]
+
+
+@lru_cache(maxsize=RESPONSE_TABLE_CACHE_SIZE)
+def get_response_table(bazi_key: Tuple[int, ...]) -> NatalResponseTable:
+    """按八字编码缓存的响应表（同一张盘在多次请求之间共用一张表）。"""
+    return NatalResponseTable(decode_bazi(bazi_key))
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""原局数值预计算表：所有合法八字的 compute_natal_numbers 结果，定长二进制记录，mmap 读取。
+
+原局层只取决于八字本身，而合法八字是有限的：
+60 年柱 × 12 月支（月干由五虎遁确定）× 60 日柱 × 12 时支（时干由五鼠遁确定）= 518,400 种。
+tools/build_natal_table.py 并行跑完全部组合写成 natal_table.bin（文件约 110 MB，不入库）；
+运行时 mmap 打开，按编码后的八字直接定位记录，多个 worker 进程共享同一份页缓存。
+
+头部带一份规则指纹：固定一组样本八字跑 compute_natal_numbers、打包后取 sha256。
+打开时用当前代码重算指纹，与文件里的不一致（原局规则改过而表没重建）就不用这张表。
+
+文件不存在、版本或指纹不符、或八字不在表内（如晚子时按次日日干起的时干）时 lookup 返回 None，
+由 lunar_engine 走 Python 计算。
+
+文件格式（小端）：
+    头部 HEADER：magic、版本、记录长度、记录数、规则指纹（32 字节）
+    记录 RECORD（按 chart_index 排列）：
+        26 个 float64：强弱 6 项、全局五行 5 项、十神类别 5 项、分层十神 10 项（tg, dz 交替）
+        4 + 4 个 uint8：基础用神 / 最终用神槽位（0 空；1–5 五行；6–10 天干+五行；11–15 地支+五行）
+        uint8 特殊规则位、uint8 用神来源位、uint8 有效标记
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .config import ELEMENTS, GAN_WUXING, GAN_LIST, NATAL_TABLE_PATH
+
+
+MAGIC = b"BZNATAL\0"
+VERSION = 2
+
+HEADER = struct.Struct("<8sIII32s")
+RECORD = struct.Struct("<26d4B4B3B")
+
+# 年柱 × 月支 × 日柱 × 时支
+RECORD_COUNT = 60 * 12 * 60 * 12
+
+# 规则指纹的样本：按质数步长取的 127 个记录序号，覆盖各年柱、日主与特殊规则
+FINGERPRINT_SAMPLES = range(0, RECORD_COUNT, 4099)
+
+STRENGTH_FIELDS = (
+    "strength_score_raw",
+    "strength_percent",
+    "support_score",
+    "drain_score",
+    "support_percent",
+    "drain_percent",
+)
+SHISHEN_CATEGORIES = ("比劫", "财星", "食伤", "官杀", "印星")
+
+YONGSHEN_SLOTS = 4
+_LAYER_PREFIXES = ("", "天干", "地支")
+
+# 特殊规则位（按 compute_natal_numbers 中的判断顺序）
+RULE_WEAK_WATER_ADD_WOOD = 1
+RULE_WEAK_WOOD_ADD_FIRE = 2
+RULE_ADD_SHISHANG = 4
+
+# 用神来源位（只可能是食伤五行一项）
+SOURCE_PRESENT = 1
+SOURCE_TG = 2
+SOURCE_DZ = 4
+
+# 日主五行 → 食伤五行（与 lunar_engine.DAY_MASTER_TO_SHISHANG_ELEMENT 一致）
+_SHISHANG_OF = {"水": "木", "木": "火", "火": "土", "土": "金", "金": None}
+
+
+def chart_index(key: Sequence[int]) -> Optional[int]:
+    """encode_bazi 的 8 个整数 → 记录序号；月干 / 时干不符合五虎遁 / 五鼠遁时返回 None。"""
+    year_gan, year_zhi, month_gan, month_zhi, day_gan, day_zhi, hour_gan, hour_zhi = key
+    if year_gan % 2 != year_zhi % 2 or day_gan % 2 != day_zhi % 2:
+        return None
+    if month_gan != (year_gan % 5 * 2 + 2 + (month_zhi - 2) % 12) % 10:
+        return None
+    if hour_gan != (day_gan % 5 * 2 + hour_zhi) % 10:
+        return None
+    year_jz = (6 * year_gan - 5 * year_zhi) % 60
+    day_jz = (6 * day_gan - 5 * day_zhi) % 60
+    return ((year_jz * 12 + month_zhi) * 60 + day_jz) * 12 + hour_zhi
+
+
+def chart_key(index: int) -> Tuple[int, ...]:
+    """chart_index 的逆过程：记录序号 → encode_bazi 的 8 个整数。"""
+    index, hour_zhi = divmod(index, 12)
+    index, day_jz = divmod(index, 60)
+    year_jz, month_zhi = divmod(index, 12)
+    year_gan, year_zhi = year_jz % 10, year_jz % 12
+    day_gan, day_zhi = day_jz % 10, day_jz % 12
+    month_gan = (year_gan % 5 * 2 + 2 + (month_zhi - 2) % 12) % 10
+    hour_gan = (day_gan % 5 * 2 + hour_zhi) % 10
+    return (year_gan, year_zhi, month_gan, month_zhi, day_gan, day_zhi, hour_gan, hour_zhi)
+
+
+def _encode_slots(elements: List[str]) -> List[int]:
+    if len(elements) > YONGSHEN_SLOTS:
+        raise ValueError(f"用神超过 {YONGSHEN_SLOTS} 项: {elements}")
+    slots = []
+    for item in elements:
+        prefix, element = item[:-1], item[-1]
+        if prefix not in _LAYER_PREFIXES or element not in ELEMENTS:
+            raise ValueError(f"无法编码的用神: {item}")
+        slots.append(_LAYER_PREFIXES.index(prefix) * 5 + ELEMENTS.index(element) + 1)
+    return slots + [0] * (YONGSHEN_SLOTS - len(slots))
+
+
+def _decode_slots(slots: Sequence[int]) -> List[str]:
+    return [_LAYER_PREFIXES[(s - 1) // 5] + ELEMENTS[(s - 1) % 5] for s in slots if s]
+
+
+def _check_float(value: Any) -> float:
+    # 表里只存 float64，int / None 写进去再读出来会变，直接拒绝
+    if type(value) is not float:
+        raise ValueError(f"非 float 数值无法写入预计算表: {value!r}")
+    return value
+
+
+def pack_record(day_gan: str, numbers: Dict[str, Any]) -> bytes:
+    """compute_natal_numbers 的结果 → 一条定长记录。无法无损编码时抛 ValueError。"""
+    strength = numbers["strength"]
+    by_layer = numbers["shishen_by_layer"]
+    if list(strength) != list(STRENGTH_FIELDS) or list(numbers["global_dist"]) != ELEMENTS:
+        raise ValueError("强弱 / 五行字段与表结构不符")
+    if list(numbers["shishen_cat"]) != list(SHISHEN_CATEGORIES) or list(by_layer) != list(SHISHEN_CATEGORIES):
+        raise ValueError("十神类别字段与表结构不符")
+
+    floats = [_check_float(strength[f]) for f in STRENGTH_FIELDS]
+    floats += [_check_float(numbers["global_dist"][e]) for e in ELEMENTS]
+    floats += [_check_float(numbers["shishen_cat"][c]) for c in SHISHEN_CATEGORIES]
+    for c in SHISHEN_CATEGORIES:
+        if list(by_layer[c]) != ["tg", "dz"]:
+            raise ValueError("分层十神字段与表结构不符")
+        floats += [_check_float(by_layer[c]["tg"]), _check_float(by_layer[c]["dz"])]
+
+    shishang = _SHISHANG_OF.get(GAN_WUXING[day_gan])
+    rule_names = [
+        "weak_water_heavy_guansha_add_wood",
+        "weak_wood_heavy_metal_add_fire",
+        f"weak_heavy_guansha_add_shishang_{shishang}",
+    ]
+    rules = 0
+    for name in numbers["special_rules"]:
+        if name not in rule_names:
+            raise ValueError(f"未知特殊规则: {name}")
+        rules |= 1 << rule_names.index(name)
+    if [n for i, n in enumerate(rule_names) if rules & (1 << i)] != numbers["special_rules"]:
+        raise ValueError(f"特殊规则顺序无法还原: {numbers['special_rules']}")
+
+    sources = 0
+    for element, source in numbers["yongshen_sources"].items():
+        if element != shishang or source != _source_dict(source["tg"], source["dz"], by_layer):
+            raise ValueError(f"无法编码的用神来源: {element} {source}")
+        sources = SOURCE_PRESENT | (SOURCE_TG if source["tg"] else 0) | (SOURCE_DZ if source["dz"] else 0)
+
+    return RECORD.pack(
+        *floats,
+        *_encode_slots(numbers["base_yongshen_elements"]),
+        *_encode_slots(numbers["final_yongshen_elements"]),
+        rules,
+        sources,
+        1,
+    )
+
+
+def _source_dict(tg: bool, dz: bool, by_layer: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+    return {
+        "tg": tg,
+        "dz": dz,
+        "cai_pct_tg": by_layer["财星"]["tg"],
+        "cai_pct_dz": by_layer["财星"]["dz"],
+    }
+
+
+def unpack_record(day_gan: str, record: Tuple) -> Optional[Dict[str, Any]]:
+    """RECORD.unpack 的结果 → 与 compute_natal_numbers 相同结构的字典；无效记录返回 None。"""
+    if not record[-1]:
+        return None
+    floats = record[:26]
+    base_slots = record[26:30]
+    final_slots = record[30:34]
+    rules, sources = record[34], record[35]
+
+    by_layer = {
+        c: {"tg": floats[16 + i * 2], "dz": floats[17 + i * 2]}
+        for i, c in enumerate(SHISHEN_CATEGORIES)
+    }
+    shishang = _SHISHANG_OF.get(GAN_WUXING[day_gan])
+
+    special_rules = []
+    if rules & RULE_WEAK_WATER_ADD_WOOD:
+        special_rules.append("weak_water_heavy_guansha_add_wood")
+    if rules & RULE_WEAK_WOOD_ADD_FIRE:
+        special_rules.append("weak_wood_heavy_metal_add_fire")
+    if rules & RULE_ADD_SHISHANG:
+        special_rules.append(f"weak_heavy_guansha_add_shishang_{shishang}")
+
+    yongshen_sources = {}
+    if sources & SOURCE_PRESENT:
+        yongshen_sources[shishang] = _source_dict(bool(sources & SOURCE_TG), bool(sources & SOURCE_DZ), by_layer)
+
+    return {
+        "strength": dict(zip(STRENGTH_FIELDS, floats[:6])),
+        "global_dist": dict(zip(ELEMENTS, floats[6:11])),
+        "shishen_cat": dict(zip(SHISHEN_CATEGORIES, floats[11:16])),
+        "shishen_by_layer": by_layer,
+        "base_yongshen_elements": _decode_slots(base_slots),
+        "final_yongshen_elements": _decode_slots(final_slots),
+        "special_rules": special_rules,
+        "yongshen_sources": yongshen_sources,
+    }
+
+
+def rules_fingerprint() -> bytes:
+    """当前 compute_natal_numbers 在 FINGERPRINT_SAMPLES 上的结果（打包后）的 sha256。"""
+    from .codes import decode_bazi
+    from .lunar_engine import compute_natal_numbers
+
+    digest = hashlib.sha256()
+    for index in FINGERPRINT_SAMPLES:
+        bazi = decode_bazi(chart_key(index))
+        digest.update(pack_record(bazi["day"]["gan"], compute_natal_numbers(bazi)))
+    return digest.digest()
+
+
+def header_bytes() -> bytes:
+    return HEADER.pack(MAGIC, VERSION, RECORD.size, RECORD_COUNT, rules_fingerprint())
+
+
+class NatalTable:
+    """只读打开的预计算表（mmap）。"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) != HEADER.size + RECORD.size * RECORD_COUNT:
+            self._mm.close()
+            raise ValueError(f"预计算表长度不符: {path}")
+        magic, version, record_size, record_count, fingerprint = HEADER.unpack_from(self._mm, 0)
+        if (magic, version, record_size, record_count) != (MAGIC, VERSION, RECORD.size, RECORD_COUNT):
+            self._mm.close()
+            raise ValueError(f"预计算表版本不符: {path}")
+        if fingerprint != rules_fingerprint():
+            self._mm.close()
+            raise ValueError(f"预计算表与当前原局规则不符（需重新生成）: {path}")
+        self.path = path
+
+    def lookup(self, key: Sequence[int]) -> Optional[Dict[str, Any]]:
+        """按 encode_bazi 的键读取一条记录；不在表内返回 None。"""
+        index = chart_index(key)
+        if index is None:
+            return None
+        record = RECORD.unpack_from(self._mm, HEADER.size + index * RECORD.size)
+        return unpack_record(GAN_LIST[key[4]], record)
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+_table: Optional[NatalTable] = None
+_table_loaded = False
+
+
+def get_table() -> Optional[NatalTable]:
+    """进程内的预计算表（首次调用时打开）；文件不存在或不可用时返回 None。
+
+    路径取环境变量 BAZI_NATAL_TABLE，未设置时用 config.NATAL_TABLE_PATH；设为空串可禁用。
+    """
+    global _table, _table_loaded
+    if not _table_loaded:
+        _table_loaded = True
+        path = os.environ.get("BAZI_NATAL_TABLE", NATAL_TABLE_PATH)
+        if path and os.path.exists(path):
+            try:
+                _table = NatalTable(path)
+            except (OSError, ValueError):
+                _table = None
+    return _table
+
+
+def set_table(path: Optional[str]) -> Optional[NatalTable]:
+    """切换（或以 None 关闭）预计算表，主要用于测试与工具。"""
+    global _table, _table_loaded
+    if _table is not None:
+        _table.close()
+    _table = NatalTable(path) if path else None
+    _table_loaded = True
+    return _table
+
+
+def lookup(key: Sequence[int]) -> Optional[Dict[str, Any]]:
+    """预计算表中的 compute_natal_numbers 结果；没有表或查不到时返回 None。"""
+    table = get_table()
+    if table is None:
+        return None
+    return table.lookup(key)
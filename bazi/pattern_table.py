@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""流年模式表：一张命盘在各 大运干支 × 流年干支 × 用神 下的流年模式事件（§5.3.3）。
+
+detect_liunian_patterns 每年都重新收集原局八个位置的十神、再与流年位置配对；
+对固定的原局而言，结果只取决于大运干 / 支、流年干 / 支和用神。LiunianPatternTable
+建表时把原局位置算好，大运 / 流年位置按干支编码各建一次，事件列表第一次用到时算出并记住，
+之后同一组合（不论哪一年、哪条流年路径）只把 flow_year / flow_label 以 overlay 叠加到模板上。
+
+表按八字缓存、在请求之间共享，模板冻结存放（events.freeze）：查询结果是只读的 FrozenEvent，
+pos1 / pos2 位置字典与模板共享但不能写；要放进对外结果时 thaw。
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from .codes import decode_bazi, split_jiazi, yongshen_elements_of
+from .config import GAN_LIST, PATTERN_TABLE_CACHE_SIZE, ZHI_LIST
+from .events import FrozenEvent, freeze
+from .patterns import _collect_positions, _gan_position, _pair_liunian_positions, _zhi_position
+
+
+class LiunianPatternTable:
+    """一张原局的流年模式事件模板（按需填表）。
+
+    属性:
+        bazi: 原局四柱
+
+    查询:
+        events(dayun_jz, ln_jz, yong_key, ...): 等价于 detect_liunian_patterns（大运干支、流年干支、
+            用神由编码给出；dayun_jz 为 None 表示大运开始之前），返回只读事件（FrozenEvent）列表
+    """
+
+    def __init__(self, bazi: Dict[str, Dict[str, str]]):
+        self.bazi = bazi
+        self._day_gan = bazi["day"]["gan"]
+        self._natal_gan, self._natal_zhi = _collect_positions(bazi, self._day_gan)
+        # (source, 干 / 支编码) → 位置字典或 None
+        self._gan_positions: Dict[Tuple[str, int], Optional[Dict[str, Any]]] = {}
+        self._zhi_positions: Dict[Tuple[str, int], Optional[Dict[str, Any]]] = {}
+        # (大运干, 大运支, 流年干, 流年支, 用神键) → 事件模板（冻结）
+        self._events: Dict[Tuple[Any, ...], List[FrozenEvent]] = {}
+
+    def _gan_position(self, source: str, gan_code: int) -> Optional[Dict[str, Any]]:
+        key = (source, gan_code)
+        if key not in self._gan_positions:
+            self._gan_positions[key] = _gan_position(self._day_gan, source, source, GAN_LIST[gan_code])
+        return self._gan_positions[key]
+
+    def _zhi_position(self, source: str, zhi_code: int) -> Optional[Dict[str, Any]]:
+        key = (source, zhi_code)
+        if key not in self._zhi_positions:
+            self._zhi_positions[key] = _zhi_position(self.bazi, source, source, ZHI_LIST[zhi_code])
+        return self._zhi_positions[key]
+
+    def _templates(self, dayun_jz: Optional[int], ln_jz: int, yong_key: Tuple[int, ...]) -> List[FrozenEvent]:
+        gan_code_dy, zhi_code_dy = split_jiazi(dayun_jz) if dayun_jz is not None else (None, None)
+        gan_code_ln, zhi_code_ln = split_jiazi(ln_jz)
+        key = (gan_code_dy, zhi_code_dy, gan_code_ln, zhi_code_ln, yong_key)
+        templates = self._events.get(key)
+        if templates is None:
+            # 位置顺序与 _collect_positions 一致：原局、大运、流年
+            gan_candidates = [self._gan_position("liunian", gan_code_ln)]
+            zhi_candidates = [self._zhi_position("liunian", zhi_code_ln)]
+            if dayun_jz is not None:
+                gan_candidates.insert(0, self._gan_position("dayun", gan_code_dy))
+                zhi_candidates.insert(0, self._zhi_position("dayun", zhi_code_dy))
+            gan_positions = self._natal_gan + [pos for pos in gan_candidates if pos is not None]
+            zhi_positions = self._natal_zhi + [pos for pos in zhi_candidates if pos is not None]
+            templates = freeze(_pair_liunian_positions(gan_positions, zhi_positions, yongshen_elements_of(yong_key)))
+            self._events[key] = templates
+        return templates
+
+    def events(
+        self,
+        dayun_jz: Optional[int],
+        ln_jz: int,
+        yong_key: Tuple[int, ...],
+        flow_year: Optional[int] = None,
+        flow_label: Optional[str] = None,
+    ) -> List[FrozenEvent]:
+        """流年模式事件（已叠加 flow_year / flow_label，键顺序与直接检测后再盖章一致）。"""
+        return [
+            template.overlay(flow_year=flow_year, flow_label=flow_label)
+            for template in self._templates(dayun_jz, ln_jz, yong_key)
+        ]
+
+
+@lru_cache(maxsize=PATTERN_TABLE_CACHE_SIZE)
+def get_pattern_table(bazi_key: Tuple[int, ...]) -> LiunianPatternTable:
+    """按八字编码缓存的流年模式表（同一张盘在多次请求之间共用一张表）。"""
+    return LiunianPatternTable(decode_bazi(bazi_key))
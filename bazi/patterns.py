@@ -31,6 +31,34 @@ def _is_pattern_match(shishen1: str, shishen2: str) -> Optional[str]:
     return PATTERN_MATCHES.get(key)
 
 
+def _gan_position(day_gan: str, source: str, pillar: str, gan: str) -> Optional[Dict[str, Any]]:
+    """一个天干位置（含十神）；十神查不到时返回 None。"""
+    shishen = get_shishen(day_gan, gan)
+    if not shishen:
+        return None
+    return {
+        "source": source,
+        "pillar": pillar,
+        "kind": "gan",
+        "char": gan,
+        "shishen": shishen,
+    }
+
+
+def _zhi_position(bazi: Dict[str, Dict[str, str]], source: str, pillar: str, zhi: str) -> Optional[Dict[str, Any]]:
+    """一个地支位置（以主气计十神）；十神查不到时返回 None。"""
+    branch_info = get_branch_shishen(bazi, zhi)
+    if not (branch_info and branch_info.get("shishen")):
+        return None
+    return {
+        "source": source,
+        "pillar": pillar,
+        "kind": "zhi",
+        "char": zhi,
+        "shishen": branch_info["shishen"],
+    }
+
+
 def _collect_positions(
     bazi: Dict[str, Dict[str, str]],
     day_gan: str,
@@ -52,83 +80,28 @@ def _collect_positions(
             "shishen": "正官" | "伤官" 等,
         }
     """
-    gan_positions: List[Dict[str, Any]] = []
-    zhi_positions: List[Dict[str, Any]] = []
-    
-    # 命局天干
-    for pillar in ("year", "month", "day", "hour"):
-        gan = bazi[pillar]["gan"]
-        shishen = get_shishen(day_gan, gan)
-        if shishen:
-            gan_positions.append({
-                "source": "natal",
-                "pillar": pillar,
-                "kind": "gan",
-                "char": gan,
-                "shishen": shishen,
-            })
-    
-    # 命局地支（主气）
-    for pillar in ("year", "month", "day", "hour"):
-        zhi = bazi[pillar]["zhi"]
-        branch_info = get_branch_shishen(bazi, zhi)
-        if branch_info and branch_info.get("shishen"):
-            zhi_positions.append({
-                "source": "natal",
-                "pillar": pillar,
-                "kind": "zhi",
-                "char": zhi,
-                "shishen": branch_info["shishen"],
-            })
-    
-    # 大运天干
+    # 命局天干、命局地支（主气）
+    candidates_gan = [
+        _gan_position(day_gan, "natal", pillar, bazi[pillar]["gan"])
+        for pillar in ("year", "month", "day", "hour")
+    ]
+    candidates_zhi = [
+        _zhi_position(bazi, "natal", pillar, bazi[pillar]["zhi"])
+        for pillar in ("year", "month", "day", "hour")
+    ]
+
+    # 大运、流年
     if dayun_gan:
-        shishen = get_shishen(day_gan, dayun_gan)
-        if shishen:
-            gan_positions.append({
-                "source": "dayun",
-                "pillar": "dayun",
-                "kind": "gan",
-                "char": dayun_gan,
-                "shishen": shishen,
-            })
-    
-    # 大运地支（主气）
+        candidates_gan.append(_gan_position(day_gan, "dayun", "dayun", dayun_gan))
     if dayun_zhi:
-        branch_info = get_branch_shishen(bazi, dayun_zhi)
-        if branch_info and branch_info.get("shishen"):
-            zhi_positions.append({
-                "source": "dayun",
-                "pillar": "dayun",
-                "kind": "zhi",
-                "char": dayun_zhi,
-                "shishen": branch_info["shishen"],
-            })
-    
-    # 流年天干
+        candidates_zhi.append(_zhi_position(bazi, "dayun", "dayun", dayun_zhi))
     if liunian_gan:
-        shishen = get_shishen(day_gan, liunian_gan)
-        if shishen:
-            gan_positions.append({
-                "source": "liunian",
-                "pillar": "liunian",
-                "kind": "gan",
-                "char": liunian_gan,
-                "shishen": shishen,
-            })
-    
-    # 流年地支（主气）
+        candidates_gan.append(_gan_position(day_gan, "liunian", "liunian", liunian_gan))
     if liunian_zhi:
-        branch_info = get_branch_shishen(bazi, liunian_zhi)
-        if branch_info and branch_info.get("shishen"):
-            zhi_positions.append({
-                "source": "liunian",
-                "pillar": "liunian",
-                "kind": "zhi",
-                "char": liunian_zhi,
-                "shishen": branch_info["shishen"],
-            })
-    
+        candidates_zhi.append(_zhi_position(bazi, "liunian", "liunian", liunian_zhi))
+
+    gan_positions = [pos for pos in candidates_gan if pos is not None]
+    zhi_positions = [pos for pos in candidates_zhi if pos is not None]
     return gan_positions, zhi_positions
 
 
@@ -279,7 +252,15 @@ def detect_liunian_patterns(
         dayun_gan=dayun_gan, dayun_zhi=dayun_zhi,
         liunian_gan=liunian_gan, liunian_zhi=liunian_zhi
     )
-    
+    return _pair_liunian_positions(gan_positions, zhi_positions, yongshen_elements)
+
+
+def _pair_liunian_positions(
+    gan_positions: List[Dict[str, Any]],
+    zhi_positions: List[Dict[str, Any]],
+    yongshen_elements: Optional[List[str]],
+) -> List[Dict[str, Any]]:
+    """流年位置与其他位置配对并计风险（detect_liunian_patterns 的配对部分）。"""
     events: List[Dict[str, Any]] = []
     
     # 天干层：流年天干与其他天干配对
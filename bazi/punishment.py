@@ -1,47 +1,28 @@
 # -*- coding: utf-8 -*-
 """地支刑：检测刑的组合、区分普通刑与墓库刑。"""
 
-from typing import Dict, Any, List, Optional, Set, Tuple
-
-from .config import POSITION_WEIGHTS, PILLAR_PALACE, ZHI_CHONG
+from typing import Dict, Any, List, Optional
+
+# 刑的组合定义在 config 中（与冲、合的定义放在一起），这里继续导出以兼容旧的导入路径
+from .config import (  # noqa: F401
+    POSITION_WEIGHTS,
+    PILLAR_PALACE,
+    ALL_PUNISH_PAIRS,
+    GRAVE_PUNISH_PAIRS,
+    NORMAL_PUNISH_PAIRS,
+    SELF_PUNISH_PAIRS,
+)
+from .relations import (
+    REL_CHONG,
+    REL_PUNISH,
+    REL_PUNISH_GRAVE,
+    REL_PUNISH_SELF,
+    punish_targets,
+    zhi_relation,
+)
 from .shishen import get_branch_shishen
 
 
-# 普通刑的组合（子卯、寅巳、巳申、申寅）
-NORMAL_PUNISH_PAIRS: Set[Tuple[str, str]] = {
-    ("子", "卯"),
-    ("卯", "子"),
-    ("寅", "巳"),
-    ("巳", "寅"),
-    ("巳", "申"),
-    ("申", "巳"),
-    ("申", "寅"),
-    ("寅", "申"),
-}
-
-# 墓库刑的组合（丑戌未三刑）
-# 注意：辰未不刑，所以不包含 ("辰","未") 和 ("未","辰")
-# 丑戌未三刑：丑-戌、戌-未、未-丑
-GRAVE_PUNISH_PAIRS: Set[Tuple[str, str]] = {
-    ("丑", "戌"),
-    ("戌", "丑"),
-    ("戌", "未"),
-    ("未", "戌"),
-    ("未", "丑"),
-    ("丑", "未"),
-}
-
-# 自刑的组合（辰辰、午午、酉酉、亥亥）
-SELF_PUNISH_PAIRS: Set[Tuple[str, str]] = {
-    ("辰", "辰"),
-    ("午", "午"),
-    ("酉", "酉"),
-    ("亥", "亥"),
-}
-
-# 所有刑的组合
-ALL_PUNISH_PAIRS = NORMAL_PUNISH_PAIRS | GRAVE_PUNISH_PAIRS | SELF_PUNISH_PAIRS
-
 # 刑的风险系数
 PUNISHMENT_NORMAL_RISK = 5.0  # 普通刑
 PUNISHMENT_GRAVE_RISK = 6.0   # 墓库刑（丑戌未三刑）
@@ -53,17 +34,13 @@ STATIC_PUNISH_GRAVE_RISK = PUNISHMENT_GRAVE_RISK * 0.5    # 3.0
 
 
 def _is_grave_punishment(flow_branch: str, target_branch: str) -> bool:
-    """是否属于墓库刑（基于 GRAVE_PUNISH_PAIRS membership）。"""
-    return (flow_branch, target_branch) in GRAVE_PUNISH_PAIRS
+    """是否属于墓库刑（GRAVE_PUNISH_PAIRS 的查表形式）。"""
+    return bool(zhi_relation(flow_branch, target_branch) & REL_PUNISH_GRAVE)
 
 
 def _get_punish_targets(flow_branch: str) -> List[str]:
-    """根据流年地支，返回所有可能被刑的目标地支列表。"""
-    targets = []
-    for pair in ALL_PUNISH_PAIRS:
-        if pair[0] == flow_branch:
-            targets.append(pair[1])
-    return list(set(targets))  # 去重
+    """根据流年地支，返回所有可能被刑的目标地支列表（按地支顺序）。"""
+    return list(punish_targets(flow_branch))
 
 
 def detect_branch_punishments(
@@ -111,16 +88,12 @@ def detect_branch_punishments(
         if not target_pillars:
             continue
 
-        # 检查是否同时满足"冲"（如果既冲又刑，应该被过滤掉，但这里先检测）
-        clash_target = ZHI_CHONG.get(flow_branch)
-        if clash_target == target_branch:
-            # 既冲又刑，按规则应该只算冲，不算刑
-            # 这里仍然生成事件，但上层会过滤
-            pass
+        # 既冲又刑时按规则只算冲，不算刑；这里仍然生成事件，由上层过滤
+        relation = zhi_relation(flow_branch, target_branch)
 
         # 判断刑的类型
-        is_grave = _is_grave_punishment(flow_branch, target_branch)
-        is_self = (flow_branch, target_branch) in SELF_PUNISH_PAIRS
+        is_grave = bool(relation & REL_PUNISH_GRAVE)
+        is_self = bool(relation & REL_PUNISH_SELF)
         
         # 风险系数（固定值，不按命中柱位数倍增）
         if is_grave:
@@ -196,8 +169,7 @@ def detect_natal_clashes_and_punishments(
         for pillar2 in pillars[i + 1 :]:
             zhi1 = bazi[pillar1]["zhi"]
             zhi2 = bazi[pillar2]["zhi"]
-            clash_target = ZHI_CHONG.get(zhi1)
-            if clash_target == zhi2:
+            if zhi_relation(zhi1, zhi2) & REL_CHONG:
                 clash_ev = detect_branch_clash(
                     bazi, zhi1, "natal", None, f"{pillar1}-{pillar2}"
                 )
@@ -212,16 +184,16 @@ def detect_natal_clashes_and_punishments(
         for pillar2 in pillars[i + 1 :]:
             zhi1 = bazi[pillar1]["zhi"]
             zhi2 = bazi[pillar2]["zhi"]
-            if (zhi1, zhi2) in ALL_PUNISH_PAIRS:
+            relation = zhi_relation(zhi1, zhi2)
+            if relation & REL_PUNISH:
                 # 检查是否同时满足"冲"（如果既冲又刑，只算冲）
-                clash_target = ZHI_CHONG.get(zhi1)
-                if clash_target == zhi2:
+                if relation & REL_CHONG:
                     continue  # 跳过，只算冲
 
                 # 直接生成一个刑事件，不调用 detect_branch_punishments（避免重复）
                 # 判断刑的类型
-                is_grave = _is_grave_punishment(zhi1, zhi2)
-                is_self = (zhi1, zhi2) in SELF_PUNISH_PAIRS
+                is_grave = bool(relation & REL_PUNISH_GRAVE)
+                is_self = bool(relation & REL_PUNISH_SELF)
                 
                 # 对于自刑，如果已经处理过这个地支，跳过（只检测第一次出现的自刑）
                 if is_self:
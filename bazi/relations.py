@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""干支关系矩阵：import 时由 config 中的定义一次性生成，检测函数按编码 O(1) 查表。
+
+- 地支 12×12：ZHI_RELATION[a][b] 为位掩码（冲 / 刑 / 墓库刑 / 自刑 / 六合 / 三合 / 三会）
+- 天干 10×10：GAN_WUHE_NAME[a][b] 为五合名称（不合为 None），GAN_KE[a][b] 表示 a 克 b
+- 三合 / 三会按局编号：ZHI_SANHE_GROUP[z] → 局号，SANHE_GROUPS[局号] → 成员列表
+
+下标均为 codes 中的天干 / 地支编码；关系的“定义”仍以 config 中的字典 / 集合为准，
+这里只是它们的查表形式（tests/regression/test_relations.py 逐格校验）。
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+from .codes import GAN_CODE, ZHI_CODE
+from .config import (
+    ALL_PUNISH_PAIRS,
+    GAN_LIST,
+    GAN_WUHE,
+    GAN_WUXING,
+    GRAVE_PUNISH_PAIRS,
+    KE_MAP,
+    SELF_PUNISH_PAIRS,
+    ZHI_CHONG,
+    ZHI_LIST,
+    ZHI_LIUHE,
+    ZHI_SANHE,
+    ZHI_SANHUI,
+)
+
+
+# 地支关系位
+REL_CHONG = 1          # 六冲
+REL_PUNISH = 2         # 刑（含墓库刑、自刑）
+REL_PUNISH_GRAVE = 4   # 墓库刑（丑戌未）
+REL_PUNISH_SELF = 8    # 自刑（辰辰、午午、酉酉、亥亥）
+REL_LIUHE = 16         # 六合
+REL_SANHE = 32         # 同属一个三合局（不同的两支）
+REL_SANHUI = 64        # 同属一个三会局（不同的两支）
+
+
+def _unique_groups(group_map) -> Tuple[List[str], ...]:
+    """按首次出现顺序去重的局列表（保留 config 中的原列表对象）。"""
+    groups: List[List[str]] = []
+    for group in group_map.values():
+        if not any(group == g for g in groups):
+            groups.append(group)
+    return tuple(groups)
+
+
+def _build_zhi_relation() -> Tuple[Tuple[int, ...], ...]:
+    rows = [[0] * 12 for _ in range(12)]
+
+    def mark(a: str, b: str, bit: int) -> None:
+        rows[ZHI_CODE[a]][ZHI_CODE[b]] |= bit
+
+    for a, b in ZHI_CHONG.items():
+        mark(a, b, REL_CHONG)
+    for a, b in ALL_PUNISH_PAIRS:
+        mark(a, b, REL_PUNISH)
+    for a, b in GRAVE_PUNISH_PAIRS:
+        mark(a, b, REL_PUNISH_GRAVE)
+    for a, b in SELF_PUNISH_PAIRS:
+        mark(a, b, REL_PUNISH_SELF)
+    for a, b in ZHI_LIUHE.items():
+        mark(a, b, REL_LIUHE)
+    for a, group in ZHI_SANHE.items():
+        for b in group:
+            if b != a:
+                mark(a, b, REL_SANHE)
+    for a, group in ZHI_SANHUI.items():
+        for b in group:
+            if b != a:
+                mark(a, b, REL_SANHUI)
+    return tuple(tuple(row) for row in rows)
+
+
+def _group_index(groups: Tuple[List[str], ...]) -> Tuple[Optional[int], ...]:
+    index: List[Optional[int]] = [None] * 12
+    for i, group in enumerate(groups):
+        for zhi in group:
+            index[ZHI_CODE[zhi]] = i
+    return tuple(index)
+
+
+ZHI_RELATION: Tuple[Tuple[int, ...], ...] = _build_zhi_relation()
+
+# 六合对象：ZHI_LIUHE_OF[z] → 与 z 六合的地支编码
+ZHI_LIUHE_OF: Tuple[int, ...] = tuple(ZHI_CODE[ZHI_LIUHE[z]] for z in ZHI_LIST)
+
+# 刑的对象：PUNISH_TARGETS[z] → 被 z 刑的地支（按地支顺序，结果稳定）
+PUNISH_TARGETS: Tuple[Tuple[str, ...], ...] = tuple(
+    tuple(ZHI_LIST[b] for b in range(12) if ZHI_RELATION[a][b] & REL_PUNISH)
+    for a in range(12)
+)
+
+# 三合局 / 三会局：按 config 中首次出现的顺序编号（申子辰、亥卯未、寅午戌、巳酉丑 / 寅卯辰、巳午未、申酉戌、亥子丑）
+SANHE_GROUPS: Tuple[List[str], ...] = _unique_groups(ZHI_SANHE)
+SANHUI_GROUPS: Tuple[List[str], ...] = _unique_groups(ZHI_SANHUI)
+ZHI_SANHE_GROUP: Tuple[Optional[int], ...] = _group_index(SANHE_GROUPS)
+ZHI_SANHUI_GROUP: Tuple[Optional[int], ...] = _group_index(SANHUI_GROUPS)
+
+# 天干五合名称 / 天干相克
+GAN_WUHE_NAME: Tuple[Tuple[Optional[str], ...], ...] = tuple(
+    tuple(GAN_WUHE.get(frozenset({a, b})) for b in GAN_LIST) for a in GAN_LIST
+)
+GAN_KE: Tuple[Tuple[bool, ...], ...] = tuple(
+    tuple(KE_MAP[GAN_WUXING[a]] == GAN_WUXING[b] for b in GAN_LIST) for a in GAN_LIST
+)
+
+
+def zhi_relation(zhi1: str, zhi2: str) -> int:
+    """两个地支（zhi1 对 zhi2）的关系位掩码；未知地支返回 0。"""
+    a = ZHI_CODE.get(zhi1)
+    b = ZHI_CODE.get(zhi2)
+    if a is None or b is None:
+        return 0
+    return ZHI_RELATION[a][b]
+
+
+def is_chong(zhi1: str, zhi2: str) -> bool:
+    return bool(zhi_relation(zhi1, zhi2) & REL_CHONG)
+
+
+def is_punish(zhi1: str, zhi2: str) -> bool:
+    return bool(zhi_relation(zhi1, zhi2) & REL_PUNISH)
+
+
+def punish_targets(zhi: str) -> Tuple[str, ...]:
+    """被 zhi 刑的地支列表（可能为空）。"""
+    code = ZHI_CODE.get(zhi)
+    return PUNISH_TARGETS[code] if code is not None else ()
+
+
+def liuhe_partner(zhi: str) -> Optional[str]:
+    code = ZHI_CODE.get(zhi)
+    return ZHI_LIST[ZHI_LIUHE_OF[code]] if code is not None else None
+
+
+def sanhe_group_index(zhi: str) -> Optional[int]:
+    code = ZHI_CODE.get(zhi)
+    return ZHI_SANHE_GROUP[code] if code is not None else None
+
+
+def sanhui_group_index(zhi: str) -> Optional[int]:
+    code = ZHI_CODE.get(zhi)
+    return ZHI_SANHUI_GROUP[code] if code is not None else None
+
+
+def gan_wuhe_name(gan1: str, gan2: str) -> Optional[str]:
+    """两个天干的五合名称（如 "乙庚合金"）；不合返回 None。"""
+    a = GAN_CODE.get(gan1)
+    b = GAN_CODE.get(gan2)
+    if a is None or b is None:
+        return None
+    return GAN_WUHE_NAME[a][b]
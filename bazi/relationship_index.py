@@ -6,6 +6,7 @@ A. 冲到婚姻宫/夫妻宫
 B. 天干争合官杀/财星
 """
 
+from collections.abc import Mapping
 from typing import Any, Dict, List, Set, Optional
 from datetime import datetime
 
@@ -113,8 +114,8 @@ def _check_competing_combine_hits_spouse_star(
         
         # 检查 few_side 的天干是否是配偶星X（官杀或财星）
         for pos in few_side:
-            # pos 可能是 dict（已序列化）或 GanPosition（未序列化）
-            if isinstance(pos, dict):
+            # pos 可能是 dict / 冻结的 FrozenEvent（已序列化）或 GanPosition（未序列化）
+            if isinstance(pos, Mapping):
                 pos_gan = pos.get("gan", "")
                 pos_shishen = pos.get("shishen", "")
             else:
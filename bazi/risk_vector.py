@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""整张盘逐年风险的向量化计分（numpy）。
+
+年度风险是若干加项之和（冲的基础力量、墓库、天克地冲、刑、模式、静态激活、线运、三合 / 三会逢冲），
+按天干 / 地支拆成 risk_from_gan / risk_from_zhi。score_luck 把一张盘的全部流年（约 150 年）
+按整数编码排成数组：流年干支、所在大运、线运宫位 → 组合编码，每种组合查一次流年内核
+（luck._evaluate_liunian_cached，按八字缓存），其余的总风险、好运判断、大运平均风险都是数组运算。
+
+事件明细（analyze_luck 中每年的 dict）只在调用方真正要展示的年份上用 liunian_details 生成。
+
+score_charts 对 N 张盘 × Y 个年份一次算出二维数组（分析 / 批量预计算用），
+规则同样来自流年内核，大运排布按 calendar.dayun_sequence 的算术规则展开。
+
+依赖：pip install numpy（可选依赖，只有本模块需要）。
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .chart_context import ChartContext, ensure_context
+from .codes import yongshen_elements_of, yongshen_flags, yongshen_key
+from .luck import (
+    RISK_COMPONENTS,
+    _evaluate_liunian_cached,
+    _pre_dayun_years,
+    evaluate_liunian,
+)
+
+# 线运宫位（luck._get_active_pillar）：虚龄 ≤16 / ≤32 / ≤48 / 其后
+_PILLAR_AGE_LIMITS = (16, 32, 48)
+_PILLARS = ("year", "month", "day", "hour")
+
+# ChartContext 排大运用 calendar.dayun_sequence 的默认步数（含第 0 步「起运前」）
+_DAYUN_SEQUENCE_STEPS = 10
+
+# 半年判词（request_index._calc_half_year_label），score_charts 返回其下标，-1 为不在范围内
+HALF_YEAR_LABELS = ("好运", "一般", "有轻微变动", "凶（棘手/意外）")
+
+
+def score_luck(
+    birth_dt: datetime,
+    is_male: bool,
+    yongshen_elements: List[str],
+    max_dayun: int = 15,
+    ctx: Optional[ChartContext] = None,
+) -> Dict[str, Any]:
+    """整张盘逐年风险（与 analyze_luck 的年份范围、数值完全一致）。
+
+    返回:
+        {
+          "years", "ages": 每个流年（按 analyze_luck 的顺序）,
+          "dayun_index": 所在大运序号（大运开始之前为 -1）,
+          "liunian_jiazi": 流年甲子序号,
+          "components": (年数, len(RISK_COMPONENTS)) 风险分项, "component_names": RISK_COMPONENTS,
+          "risk_from_gan", "risk_from_zhi", "tkdc_risk_percent", "total_risk_percent", "is_good",
+          "dayun": {"index", "jiazi", "start_year", "total_risk_average", "is_good"},
+          "bazi_key", "yong_key": 供 liunian_details 生成明细
+        }
+        除 bazi_key / yong_key / component_names 外均为 numpy 数组。
+    """
+    import numpy as np  # 依赖：pip install numpy
+
+    ctx = ensure_context(birth_dt, is_male, ctx)
+    bazi_key = ctx.bazi_key
+    yong_key = yongshen_key(yongshen_elements)
+    gan_flags, zhi_flags = (np.asarray(flags, dtype=bool) for flags in yongshen_flags(yongshen_elements))
+
+    # ===== 逐年布局（与 analyze_luck 相同：大运开始之前的流年，再逐步大运的流年）=====
+    years: List[int] = list(_pre_dayun_years(birth_dt.year, ctx.dayun_steps, max_dayun))
+    ages: List[int] = [year - birth_dt.year + 1 for year in years]
+    dayun_pos: List[int] = [-1] * len(years)  # 在有效大运列表中的位置
+    dayun_col: List[int] = [0] * len(years)   # 在该步大运内的第几年
+    dayuns = [(idx, dy) for idx, dy in enumerate(ctx.dayun_steps[:max_dayun]) if dy["jiazi"] is not None]
+    for pos, (_, dy) in enumerate(dayuns):
+        for col, ln in enumerate(dy["liunian"]):
+            years.append(ln["year"])
+            ages.append(ln["age"])
+            dayun_pos.append(pos)
+            dayun_col.append(col)
+
+    year_arr = np.asarray(years, dtype=np.int64)
+    age_arr = np.asarray(ages, dtype=np.int64)
+    pos_arr = np.asarray(dayun_pos, dtype=np.int64)
+    dayun_jz = np.asarray([dy["jiazi"] for _, dy in dayuns] + [-1], dtype=np.int64)
+    dayun_idx = np.asarray([idx for idx, _ in dayuns] + [-1], dtype=np.int64)
+
+    ln_jz = (year_arr - 4) % 60  # calendar.year_jiazi
+    dy_jz = dayun_jz[pos_arr]    # 位置 -1 取到末尾的 -1（没有大运）
+    pillar = np.searchsorted(np.asarray(_PILLAR_AGE_LIMITS), age_arr, side="left")
+
+    # ===== 每种 (大运干支, 流年干支, 宫位) 组合查一次内核 =====
+    rows = _kernel_rows(np.zeros_like(ln_jz), dy_jz, ln_jz, pillar, [bazi_key], [yong_key])
+
+    # ===== 逐年总风险与好运判断（§6.1 / §4.4）=====
+    risk_from_gan = rows[:, 0]
+    risk_from_zhi = rows[:, 1]
+    tkdc_risk = rows[:, 2]
+    total_risk = risk_from_gan + risk_from_zhi + tkdc_risk
+    is_good = (gan_flags[ln_jz % 10] | zhi_flags[ln_jz % 12]) & (total_risk <= 15.0)
+
+    # ===== 大运平均风险（§4.4）=====
+    # 按 (大运, 年) 排成矩阵后 cumsum 逐年累加，与逐年相加的浮点结果一致（np.sum 是两两相加）
+    in_dayun = pos_arr >= 0
+    counts = np.bincount(pos_arr[in_dayun], minlength=len(dayuns))
+    width = int(counts.max()) if len(dayuns) else 0
+    risk_matrix = np.zeros((len(dayuns), width), dtype=np.float64)
+    risk_matrix[pos_arr[in_dayun], np.asarray(dayun_col, dtype=np.int64)[in_dayun]] = total_risk[in_dayun]
+    risk_sums = np.cumsum(risk_matrix, axis=1)[:, -1] if width else np.zeros(len(dayuns))
+    average = np.divide(risk_sums, counts, out=np.zeros(len(dayuns)), where=counts > 0)
+    dayun_jz_valid = dayun_jz[:-1]
+    dayun_good = (gan_flags[dayun_jz_valid % 10] | zhi_flags[dayun_jz_valid % 12]) & (average <= 15.0)
+
+    return {
+        "years": year_arr,
+        "ages": age_arr,
+        "dayun_index": dayun_idx[pos_arr],
+        "liunian_jiazi": ln_jz,
+        "components": rows[:, 3:],
+        "component_names": RISK_COMPONENTS,
+        "risk_from_gan": risk_from_gan,
+        "risk_from_zhi": risk_from_zhi,
+        "tkdc_risk_percent": tkdc_risk,
+        "total_risk_percent": total_risk,
+        "is_good": is_good,
+        "dayun": {
+            "index": dayun_idx[:-1],
+            "jiazi": dayun_jz_valid,
+            "start_year": np.asarray([dy["start_year"] for _, dy in dayuns], dtype=np.int64),
+            "total_risk_average": average,
+            "is_good": dayun_good,
+        },
+        "bazi_key": bazi_key,
+        "yong_key": yong_key,
+    }
+
+
+def batch_charts(birth_dts: Iterable[datetime], is_males: Iterable[bool]) -> Dict[str, Any]:
+    """逐张排盘，整理成 score_charts 的输入数组（bazi_keys / is_male / birth_years / qiyun_years）。"""
+    import numpy as np  # 依赖：pip install numpy
+
+    keys: List[Tuple[int, ...]] = []
+    males: List[bool] = []
+    birth_years: List[int] = []
+    qiyun_years: List[int] = []
+    for birth_dt, is_male in zip(birth_dts, is_males):
+        ctx = ChartContext(birth_dt, bool(is_male))
+        keys.append(ctx.bazi_key)
+        males.append(bool(is_male))
+        birth_years.append(birth_dt.year)
+        qiyun_years.append(ctx.dayun_steps[1]["start_year"])
+    return {
+        "bazi_keys": np.asarray(keys, dtype=np.int64).reshape(-1, 8),
+        "is_male": np.asarray(males, dtype=bool),
+        "birth_years": np.asarray(birth_years, dtype=np.int64),
+        "qiyun_years": np.asarray(qiyun_years, dtype=np.int64),
+    }
+
+
+def score_charts(
+    bazi_keys,
+    is_male,
+    birth_years,
+    qiyun_years,
+    years,
+    max_dayun: int = 15,
+) -> Dict[str, Any]:
+    """N 张盘 × Y 个年份的逐年风险（与逐张 analyze_luck 的数值一致）。
+
+    参数:
+        bazi_keys: (N, 8) 八字编码（codes.encode_bazi）
+        is_male: (N,) 性别（与年干阴阳一起决定大运顺逆）
+        birth_years: (N,) 出生公历年
+        qiyun_years: (N,) 起运年（第 1 步大运的起始年，calendar.dayun_sequence 的 start_year）
+        years: (Y,) 年份轴（公历年）
+        max_dayun: 与 analyze_luck 相同的大运步数上限
+
+    大运序列按 calendar._build_dayun_steps 的算术规则展开：出生年至起运前一年为「大运开始之前」，
+    其后每十年一步，干支从月柱顺 / 逆推。用神取原局层（按八字缓存 / 预计算表）。
+
+    返回 (N, Y) 数组：
+        "risk_from_gan", "risk_from_zhi", "tkdc_risk_percent", "total_risk_percent"（范围外为 NaN），
+        "is_good"（范围外为 False），"start_label" / "later_label"（HALF_YEAR_LABELS 下标，范围外为 -1），
+        "covered"（该盘是否排到这一年），以及 "years": 年份轴。
+    """
+    import numpy as np  # 依赖：pip install numpy
+    from .lunar_engine import _analyze_natal_cached
+
+    keys = np.asarray(bazi_keys, dtype=np.int64).reshape(-1, 8)
+    males = np.asarray(is_male, dtype=bool)
+    birth = np.asarray(birth_years, dtype=np.int64)[:, None]
+    qiyun = np.asarray(qiyun_years, dtype=np.int64)[:, None]
+    year_axis = np.asarray(years, dtype=np.int64)
+    grid = np.broadcast_to(year_axis[None, :], (len(keys), len(year_axis)))
+
+    # 用神（原局层）：内核键 + 干支用神标记
+    key_tuples = [tuple(row) for row in keys.tolist()]
+    yong_keys = [yongshen_key(_analyze_natal_cached(key)["yongshen_elements"]) for key in key_tuples]
+    flags = [yongshen_flags(yongshen_elements_of(yong)) for yong in yong_keys]
+    gan_flags = np.asarray([gan for gan, _ in flags], dtype=bool).reshape(-1, 10)
+    zhi_flags = np.asarray([zhi for _, zhi in flags], dtype=bool).reshape(-1, 12)
+
+    # 大运排布：第 0 步为起运前，第 k 步起于 起运年 + (k - 1) * 10
+    n_steps = min(max_dayun, _DAYUN_SEQUENCE_STEPS)
+    step = np.where(grid >= qiyun, (grid - qiyun) // 10 + 1, 0)
+    covered = (grid >= birth) & (step < n_steps)
+    month_jz = (6 * keys[:, 2] - 5 * keys[:, 3]) % 60
+    forward = (keys[:, 0] % 2 == 0) == males
+    sign = np.where(forward, 1, -1)[:, None]
+    dy_jz = np.where(step > 0, (month_jz[:, None] + sign * step) % 60, -1)
+    ln_jz = (grid - 4) % 60
+    age = grid - birth + 1
+    pillar = np.searchsorted(np.asarray(_PILLAR_AGE_LIMITS), age, side="left")
+    chart = np.broadcast_to(np.arange(len(keys))[:, None], grid.shape)
+
+    rows = _kernel_rows(
+        chart[covered], dy_jz[covered], ln_jz[covered], pillar[covered], key_tuples, yong_keys
+    )
+
+    shape = grid.shape
+    risk_from_gan = np.full(shape, np.nan)
+    risk_from_zhi = np.full(shape, np.nan)
+    tkdc_risk = np.full(shape, np.nan)
+    risk_from_gan[covered] = rows[:, 0]
+    risk_from_zhi[covered] = rows[:, 1]
+    tkdc_risk[covered] = rows[:, 2]
+    total_risk = risk_from_gan + risk_from_zhi + tkdc_risk
+
+    gan_good = gan_flags[chart, ln_jz % 10]
+    zhi_good = zhi_flags[chart, ln_jz % 12]
+    is_good = covered & (gan_good | zhi_good) & (total_risk <= 15.0)
+
+    return {
+        "years": year_axis,
+        "covered": covered,
+        "risk_from_gan": risk_from_gan,
+        "risk_from_zhi": risk_from_zhi,
+        "tkdc_risk_percent": tkdc_risk,
+        "total_risk_percent": total_risk,
+        "is_good": is_good,
+        "start_label": _half_year_codes(np, risk_from_gan, gan_good),
+        "later_label": _half_year_codes(np, risk_from_zhi, zhi_good),
+    }
+
+
+def _half_year_codes(np, risk, is_yongshen):
+    """request_index._calc_half_year_label 的数组版：返回 HALF_YEAR_LABELS 下标（NaN → -1）。"""
+    codes = np.select(
+        [risk <= 10.0, risk < 20.0, risk >= 20.0],
+        [np.where(is_yongshen, 0, 1), 2, 3],
+        default=-1,
+    )
+    return codes.astype(np.int8)
+
+
+def _kernel_rows(chart, dy_jz, ln_jz, pillar, bazi_keys, yong_keys):
+    """(盘, 大运干支, 流年干支, 宫位) 组合去重后逐个查流年内核，按输入顺序取回各行。
+
+    chart 为 bazi_keys / yong_keys 的下标，dy_jz 为 -1 表示没有大运（大运开始之前）。
+    每行为 [risk_from_gan, risk_from_zhi, tkdc_risk_percent, *RISK_COMPONENTS]。
+    """
+    import numpy as np  # 依赖：pip install numpy
+
+    combo = ((chart * 61 + dy_jz + 1) * 60 + ln_jz) * len(_PILLARS) + pillar
+    unique_combo, inverse = np.unique(combo, return_inverse=True)
+    table = np.empty((len(unique_combo), 3 + len(RISK_COMPONENTS)), dtype=np.float64)
+    for row, code in enumerate(unique_combo.tolist()):
+        rest, pillar_code = divmod(code, len(_PILLARS))
+        rest, ln_code = divmod(rest, 60)
+        chart_code, dy_code = divmod(rest, 61)
+        template, components = _evaluate_liunian_cached(
+            bazi_keys[chart_code],
+            dy_code - 1 if dy_code else None,
+            ln_code,
+            _PILLARS[pillar_code],
+            yong_keys[chart_code],
+        )
+        table[row, 0] = template["risk_from_gan"]
+        table[row, 1] = template["risk_from_zhi"]
+        table[row, 2] = template["tkdc_risk_percent"]
+        table[row, 3:] = components
+    return table[inverse.reshape(-1)]
+
+
+def liunian_details(scores: Dict[str, Any], years: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """只为要展示的年份生成 analyze_luck 同款的流年 dict（含事件明细）。不在范围内的年份跳过。"""
+    wanted = set(years)
+    details: Dict[int, Dict[str, Any]] = {}
+    dayun_jz_by_index = dict(zip(scores["dayun"]["index"].tolist(), scores["dayun"]["jiazi"].tolist()))
+    rows = zip(
+        scores["years"].tolist(),
+        scores["ages"].tolist(),
+        scores["dayun_index"].tolist(),
+        scores["liunian_jiazi"].tolist(),
+    )
+    for year, age, dayun_index, ln_jz in rows:
+        if year not in wanted:
+            continue
+        if dayun_index < 0:
+            details[year] = evaluate_liunian(scores["bazi_key"], None, ln_jz, year, age, None, scores["yong_key"])
+        else:
+            details[year] = evaluate_liunian(
+                scores["bazi_key"], dayun_jz_by_index[dayun_index], ln_jz, year, age, dayun_index, scores["yong_key"]
+            )
+    return details
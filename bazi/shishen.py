@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 """十神计算：日主天干 → 其它干 / 支对应的十神。"""
 
-from typing import Optional, Dict, List, Any
+from types import MappingProxyType
+from typing import Optional, Dict, List, Any, Mapping
 
-from .config import GAN_WUXING, POSITION_WEIGHTS
+from .codes import SHISHEN_NAMES, shishen_code
+from .config import GAN_LIST, ZHI_LIST, POSITION_WEIGHTS
 
 # 天干阴阳
 GAN_YINYANG: Dict[str, str] = {
@@ -48,40 +50,34 @@ ZHI_MAIN_GAN: Dict[str, str] = {
     "亥": "壬",
 }
 
+# ===== 十神查表（import 时生成，逐次调用只做两次字典查找） =====
 
-def get_shishen(day_gan: str, other_gan: str) -> Optional[str]:
-    """计算“其它天干”对日主的十神名称。"""
-    if day_gan not in GAN_WUXING or other_gan not in GAN_WUXING:
-        return None
-
-    self_wx = GAN_WUXING[day_gan]
-    other_wx = GAN_WUXING[other_gan]
-
-    self_yin = GAN_YINYANG.get(day_gan)
-    other_yin = GAN_YINYANG.get(other_gan)
-    same_yin_yang = (self_yin == other_yin)
-
-    # 1. 同五行：比 / 劫
-    if other_wx == self_wx:
-        return "比肩" if same_yin_yang else "劫财"
-
-    # 2. 我生他：食神 / 伤官
-    if WUXING_SHENG.get(self_wx) == other_wx:
-        return "食神" if same_yin_yang else "伤官"
+# SHISHEN[日干][其它天干] → 十神名称（10×10）
+SHISHEN: Dict[str, Dict[str, str]] = {
+    day: {other: SHISHEN_NAMES[shishen_code(d, o)] for o, other in enumerate(GAN_LIST)}
+    for d, day in enumerate(GAN_LIST)
+}
 
-    # 3. 他生我：印（同阴阳偏印，异阴阳正印）
-    if WUXING_SHENG.get(other_wx) == self_wx:
-        return "偏印" if same_yin_yang else "正印"
+# BRANCH_SHISHEN[日干][地支] → {"gan": 主气天干, "shishen": 十神}（10×12）
+# 条目是只读映射（进程内所有命盘共用），get_branch_shishen 每次返回新字典
+BRANCH_SHISHEN: Dict[str, Dict[str, Mapping[str, str]]] = {
+    day: {
+        zhi: MappingProxyType({"gan": ZHI_MAIN_GAN[zhi], "shishen": SHISHEN[day][ZHI_MAIN_GAN[zhi]]})
+        for zhi in ZHI_LIST
+    }
+    for day in GAN_LIST
+}
 
-    # 4. 我克他：财（同阴阳偏财，异阴阳正财）
-    if WUXING_KE.get(self_wx) == other_wx:
-        return "偏财" if same_yin_yang else "正财"
 
-    # 5. 他克我：官杀（同阴阳七杀，异阴阳正官）
-    if WUXING_KE.get(other_wx) == self_wx:
-        return "七杀" if same_yin_yang else "正官"
+def get_shishen(day_gan: str, other_gan: str) -> Optional[str]:
+    """计算“其它天干”对日主的十神名称（查 SHISHEN 表）。
 
-    return None
+    表由天干编码算术生成（见 codes.shishen_code），结果与按五行生克 / 阴阳逐条判断一致。
+    """
+    row = SHISHEN.get(day_gan)
+    if row is None:
+        return None
+    return row.get(other_gan)
 
 
 def get_branch_main_gan(zhi: str) -> Optional[str]:
@@ -96,20 +92,14 @@ def get_branch_shishen(
 
     返回：
       {"gan": "辛", "shishen": "正官"}  或 None
-    """
-    day_gan = bazi["day"]["gan"]
-    main_gan = get_branch_main_gan(zhi)
-    if not main_gan:
-        return None
 
-    ss = get_shishen(day_gan, main_gan)
-    if not ss:
+    查 BRANCH_SHISHEN 表，返回条目的拷贝（可以直接放进事件）。
+    """
+    row = BRANCH_SHISHEN.get(bazi["day"]["gan"])
+    if row is None:
         return None
-
-    return {
-        "gan": main_gan,
-        "shishen": ss,
-    }
+    entry = row.get(zhi)
+    return dict(entry) if entry is not None else None
 
 
 def get_branch_ten_god(
@@ -138,6 +128,16 @@ SHISHEN_CATEGORY_MAP: Dict[str, str] = {
     "偏印": "印星",
 }
 
+# SHISHEN_CATEGORY[日干][其它天干] / BRANCH_SHISHEN_CATEGORY[日干][地支] → 五大类别
+SHISHEN_CATEGORY: Dict[str, Dict[str, str]] = {
+    day: {other: SHISHEN_CATEGORY_MAP[ss] for other, ss in row.items()}
+    for day, row in SHISHEN.items()
+}
+BRANCH_SHISHEN_CATEGORY: Dict[str, Dict[str, str]] = {
+    day: {zhi: SHISHEN_CATEGORY_MAP[info["shishen"]] for zhi, info in row.items()}
+    for day, row in BRANCH_SHISHEN.items()
+}
+
 # ===== 十神标签词库（固定映射） =====
 # 映射：(十神名称, 是否用神) -> 标签字符串（用/分隔，不含空格）
 SHISHEN_LABEL_MAP: Dict[tuple[str, bool], str] = {
@@ -197,6 +197,8 @@ def compute_shishen_category_percentages(bazi: Dict[str, Dict[str, str]]) -> Dic
     raw_scores = {c: 0.0 for c in categories}
 
     day_gan = bazi["day"]["gan"]
+    gan_categories = SHISHEN_CATEGORY.get(day_gan, {})
+    zhi_categories = BRANCH_SHISHEN_CATEGORY.get(day_gan, {})
 
     # 1. 天干：year_gan, month_gan, day_gan, hour_gan
     for pillar in ("year", "month", "day", "hour"):
@@ -206,11 +208,7 @@ def compute_shishen_category_percentages(bazi: Dict[str, Dict[str, str]]) -> Dic
         if w <= 0:
             continue
 
-        ss = get_shishen(day_gan, gan)
-        if not ss:
-            continue
-
-        cat = classify_shishen_category(ss)
+        cat = gan_categories.get(gan)
         if not cat:
             continue
 
@@ -224,11 +222,7 @@ def compute_shishen_category_percentages(bazi: Dict[str, Dict[str, str]]) -> Dic
         if w <= 0:
             continue
 
-        tg = get_branch_shishen(bazi, zhi)
-        if not tg:
-            continue
-
-        cat = classify_shishen_category(tg["shishen"])
+        cat = zhi_categories.get(zhi)
         if not cat:
             continue
 
@@ -258,6 +252,8 @@ def compute_shishen_category_by_layer(bazi: Dict[str, Dict[str, str]]) -> Dict[s
     dz_scores = {c: 0.0 for c in categories}
 
     day_gan = bazi["day"]["gan"]
+    gan_categories = SHISHEN_CATEGORY.get(day_gan, {})
+    zhi_categories = BRANCH_SHISHEN_CATEGORY.get(day_gan, {})
 
     # 1. 天干层级
     for pillar in ("year", "month", "day", "hour"):
@@ -267,11 +263,7 @@ def compute_shishen_category_by_layer(bazi: Dict[str, Dict[str, str]]) -> Dict[s
         if w <= 0:
             continue
 
-        ss = get_shishen(day_gan, gan)
-        if not ss:
-            continue
-
-        cat = classify_shishen_category(ss)
+        cat = gan_categories.get(gan)
         if not cat:
             continue
 
@@ -285,11 +277,7 @@ def compute_shishen_category_by_layer(bazi: Dict[str, Dict[str, str]]) -> Dict[s
         if w <= 0:
             continue
 
-        tg = get_branch_shishen(bazi, zhi)
-        if not tg:
-            continue
-
-        cat = classify_shishen_category(tg["shishen"])
+        cat = zhi_categories.get(zhi)
         if not cat:
             continue
 
@@ -5,6 +5,7 @@
 """
 
 from typing import Any, Dict, List, Optional
+from .hint_codes import render_hints
 from .shishen import get_shishen, get_branch_main_gan, get_shishen_label
 
 
@@ -73,9 +74,7 @@ def generate_year_detail(
     )
     
     # 4. 提示汇总
-    hint_summary_lines = target_liunian.get("hints", [])
-    if hint_summary_lines is None:
-        hint_summary_lines = []
+    hint_summary_lines = render_hints(target_liunian.get("hints"))
     
     # 5. 大运简述
     dayun_brief = _build_dayun_brief(parent_dayun, yongshen_elements)
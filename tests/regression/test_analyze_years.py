@@ -0,0 +1,81 @@
+"""
+Regression tests for year-range analysis (lunar_engine.analyze_years).
+
+Requested years must match the whole-life facts exactly, their parent
+dayuns must carry the same fields, and the request index / year detail /
+chat API must accept the partial document.
+"""
+
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from bazi.chat_api import chat_api
+from bazi.compute_facts import compute_facts
+from bazi.lunar_engine import analyze_years
+from bazi.request_index import generate_request_index
+from bazi.year_detail import generate_year_detail
+
+BIRTHS = [
+    (datetime(2005, 9, 20, 10, 0), True),
+    (datetime(1990, 5, 17, 9, 30), False),
+    (datetime(1962, 12, 1, 23, 40), True),
+]
+
+
+def _by_year(facts):
+    return {
+        ln["year"]: (group["dayun"], ln)
+        for group in facts["luck"]["groups"]
+        for ln in group["liunian"]
+    }
+
+
+class TestAnalyzeYears(unittest.TestCase):
+    """Partial facts for a set of years."""
+
+    def test_years_match_full_facts(self):
+        year_sets = [[2025], [2021, 2022, 2023, 2024, 2025], [2030, 2001, 2030], [2060, 2010]]
+        for birth, is_male in BIRTHS:
+            full = _by_year(compute_facts(birth, is_male))
+            for years in year_sets:
+                partial = analyze_years(birth, is_male, years)
+                self.assertEqual(partial["years"], sorted(set(years)))
+                got = _by_year(partial)
+                self.assertEqual(set(got), {y for y in years if y in full})
+                for year, (dayun, liunian) in got.items():
+                    self.assertEqual(liunian, full[year][1], (birth, year))
+                    self.assertEqual(dayun, full[year][0], (birth, year))
+
+    def test_dayun_groups_are_contiguous(self):
+        birth = datetime(1990, 5, 17, 9, 30)
+        partial = analyze_years(birth, False, [2000, 2040])
+        indexes = [g["dayun"]["index"] for g in partial["luck"]["groups"] if g["dayun"] is not None]
+        self.assertEqual(indexes, list(range(indexes[0], indexes[-1] + 1)))
+        self.assertGreater(len(indexes), 2)
+
+    def test_consumers_accept_partial_facts(self):
+        birth = datetime(2005, 9, 20, 10, 0)
+        full = compute_facts(birth, True)
+        partial = analyze_years(birth, True, range(2021, 2028))
+        full_index = generate_request_index(full, 2025)
+        partial_index = generate_request_index(partial, 2025)
+        self.assertEqual(partial_index["year_grade"], full_index["year_grade"])
+        self.assertEqual(partial_index["dayun"]["current_dayun_ref"], full_index["dayun"]["current_dayun_ref"])
+        self.assertEqual(generate_year_detail(partial, 2026), generate_year_detail(full, 2026))
+        self.assertIsNone(generate_year_detail(partial, 2040))
+        response = chat_api("最近几年整体怎么样", partial, base_year=2025)
+        self.assertIsNone(response["error"])
+
+    def test_rejects_empty_years(self):
+        with self.assertRaises(ValueError):
+            analyze_years(datetime(2005, 9, 20, 10, 0), True, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Regression tests for vectorized batch pillars (bazi.calendar.batch_pillars).
+
+batch_pillars must agree row-by-row with the scalar table engine
+(and therefore with get_bazi), including jie boundaries and the zi hour.
+"""
+
+import random
+import sys
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖
+    np = None
+
+from bazi.calendar import BATCH_PILLAR_FIELDS, batch_pillars, get_pillars
+from bazi.config import GAN_LIST, ZHI_LIST
+from bazi.jieqi_table import JIE_FIRST_YEAR, JIE_TABLE
+
+
+def _key_to_datetime(key: int) -> datetime:
+    s = str(key)
+    return datetime(int(s[:4]), int(s[4:6]), int(s[6:8]), int(s[8:10]), int(s[10:12]), int(s[12:]))
+
+
+def _row_to_bazi(row) -> dict:
+    return {
+        pillar: {"gan": GAN_LIST[int(row[f"{pillar}_gan"])], "zhi": ZHI_LIST[int(row[f"{pillar}_zhi"])]}
+        for pillar in ("year", "month", "day", "hour")
+    }
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestCalendarBatch(unittest.TestCase):
+    """batch_pillars vs get_pillars."""
+
+    def assertBatchMatches(self, dts):
+        result = batch_pillars(np.array(dts, dtype="datetime64[s]"))
+        self.assertEqual(result.dtype.names, BATCH_PILLAR_FIELDS)
+        for dt, row in zip(dts, result):
+            self.assertEqual(_row_to_bazi(row), get_pillars(dt), f"pillars differ at {dt}")
+
+    def test_random_instants(self):
+        rng = random.Random(20240503)
+        start = datetime(1900, 1, 1)
+        span = int((datetime(2100, 12, 31, 23, 59, 59) - start).total_seconds())
+        self.assertBatchMatches([start + timedelta(seconds=rng.randrange(span)) for _ in range(5000)])
+
+    def test_jie_boundaries(self):
+        dts = []
+        for year in (1900, 1969, 1970, 2005, 2024, 2100):
+            base = (year - JIE_FIRST_YEAR) * 12
+            for key in JIE_TABLE[base:base + 12]:
+                t = _key_to_datetime(key)
+                dts.extend(t + timedelta(seconds=delta) for delta in (-1, 0, 1))
+        self.assertBatchMatches(dts)
+
+    def test_zi_hour_and_subsecond(self):
+        dts = [
+            datetime(1960, 5, 5, 23, 0), datetime(1960, 5, 6, 0, 59, 59),
+            datetime(2023, 12, 31, 23, 30), datetime(2024, 1, 1, 1, 0),
+        ]
+        self.assertBatchMatches(dts)
+        ms = np.array(["1950-03-01T22:59:59.900"], dtype="datetime64[ms]")
+        self.assertEqual(_row_to_bazi(batch_pillars(ms)[0]), get_pillars(datetime(1950, 3, 1, 22, 59, 59)))
+
+    def test_out_of_range(self):
+        with self.assertRaises(ValueError):
+            batch_pillars(np.array(["1850-01-01T00:00:00"], dtype="datetime64[s]"))
+
+
+if __name__ == "__main__":
+    unittest.main()
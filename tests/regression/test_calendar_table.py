@@ -0,0 +1,160 @@
+"""
+Regression tests for the table-driven pillar engine (bazi.calendar).
+
+The table backend must agree with the lunar_python reference backend:
+- random instants across 1900–2100
+- one second before / at / after every jie boundary of a few sample years
+- late-zi hour (23:00) and early-zi hour (00:xx) boundaries
+"""
+
+import random
+import sys
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from bazi.calendar import (
+    BACKEND_LUNAR,
+    BACKEND_TABLE,
+    JIA_ZI,
+    dayun_sequence,
+    get_pillars,
+    in_table_range,
+    lichun_year,
+    pillar_jiazi,
+    year_ganzhi,
+)
+from bazi.jieqi_table import JIE_FIRST_YEAR, JIE_TABLE
+from bazi.lunar_engine import get_bazi
+
+
+def _key_to_datetime(key: int) -> datetime:
+    s = str(key)
+    return datetime(int(s[:4]), int(s[4:6]), int(s[6:8]), int(s[8:10]), int(s[10:12]), int(s[12:]))
+
+
+class TestCalendarTable(unittest.TestCase):
+    """Table backend vs lunar_python reference backend."""
+
+    def assertSamePillars(self, dt: datetime):
+        self.assertEqual(
+            get_pillars(dt, BACKEND_TABLE),
+            get_pillars(dt, BACKEND_LUNAR),
+            f"pillars differ at {dt}",
+        )
+
+    def test_jie_table_sorted(self):
+        self.assertEqual(len(JIE_TABLE) % 12, 0)
+        self.assertEqual(list(JIE_TABLE), sorted(set(JIE_TABLE)))
+
+    def test_random_instants(self):
+        rng = random.Random(20240501)
+        start = datetime(1900, 1, 1)
+        span = int((datetime(2100, 12, 31, 23, 59, 59) - start).total_seconds())
+        for _ in range(300):
+            self.assertSamePillars(start + timedelta(seconds=rng.randrange(span)))
+
+    def test_jie_boundaries(self):
+        for year in (1900, 1949, 1984, 2005, 2007, 2024, 2100):
+            base = (year - JIE_FIRST_YEAR) * 12
+            for key in JIE_TABLE[base:base + 12]:
+                t = _key_to_datetime(key)
+                for delta in (-1, 0, 1):
+                    self.assertSamePillars(t + timedelta(seconds=delta))
+
+    def test_zi_hour_boundaries(self):
+        for day in (datetime(1990, 2, 3), datetime(2000, 1, 1), datetime(2023, 12, 31)):
+            for hm in ((22, 59), (23, 0), (23, 59), (0, 0), (0, 59), (1, 0)):
+                self.assertSamePillars(day.replace(hour=hm[0], minute=hm[1]))
+
+    def test_get_bazi_default_backend(self):
+        dt = datetime(2005, 9, 20, 10, 0)
+        self.assertEqual(get_bazi(dt), get_bazi(dt, backend=BACKEND_LUNAR))
+        year_jz, month_jz, day_jz, hour_jz = pillar_jiazi(dt)
+        self.assertEqual(
+            [JIA_ZI[year_jz], JIA_ZI[month_jz], JIA_ZI[day_jz], JIA_ZI[hour_jz]],
+            ["乙酉", "乙酉", "丁未", "乙巳"],
+        )
+
+    def test_out_of_range_falls_back(self):
+        dt = datetime(1850, 6, 1, 12, 0)
+        self.assertFalse(in_table_range(dt))
+        self.assertEqual(get_pillars(dt), get_pillars(dt, BACKEND_LUNAR))
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            get_pillars(datetime(2000, 1, 1), "unknown")
+
+
+class TestYearGanzhi(unittest.TestCase):
+    """year_ganzhi / lichun_year: sexagenary year by Lichun."""
+
+    def test_known_years(self):
+        self.assertEqual(year_ganzhi(1984), ("甲", "子"))
+        self.assertEqual(year_ganzhi(2024), ("甲", "辰"))
+        self.assertEqual(year_ganzhi(1900), ("庚", "子"))
+
+    def test_january_before_lichun(self):
+        # 2024 立春：2024-02-04 16:27:07；之前仍属 癸卯 年
+        self.assertEqual(lichun_year(datetime(2024, 1, 15, 12, 0)), 2023)
+        self.assertEqual(lichun_year(datetime(2024, 2, 4, 16, 27, 6)), 2023)
+        self.assertEqual(lichun_year(datetime(2024, 2, 4, 16, 27, 7)), 2024)
+        self.assertEqual(year_ganzhi(lichun_year(datetime(2024, 1, 15))), ("癸", "卯"))
+
+    def test_lichun_year_matches_year_pillar(self):
+        rng = random.Random(7)
+        for year in range(1900, 2101, 7):
+            dt = datetime(year, rng.randint(1, 3), rng.randint(1, 28), rng.randint(0, 23))
+            pillar = get_pillars(dt, BACKEND_LUNAR)["year"]
+            self.assertEqual(year_ganzhi(lichun_year(dt)), (pillar["gan"], pillar["zhi"]), dt)
+
+    def test_matches_lunar_liunian(self):
+        from lunar_python import Solar
+
+        for dt, is_male in ((datetime(2005, 9, 20, 10, 0), True), (datetime(1990, 1, 20, 8, 0), False)):
+            ec = Solar(dt.year, dt.month, dt.day, dt.hour, dt.minute, 0).getLunar().getEightChar()
+            for dy in ec.getYun(1 if is_male else 0).getDaYun():
+                for ln in dy.getLiuNian():
+                    self.assertEqual("".join(year_ganzhi(ln.getYear())), ln.getGanZhi())
+
+
+class TestDayunSequence(unittest.TestCase):
+    """dayun_sequence vs lunar_python Yun / DaYun / LiuNian."""
+
+    def assertSameDayun(self, dt: datetime, is_male: bool):
+        bazi = get_pillars(dt)
+        month_gz = bazi["month"]["gan"] + bazi["month"]["zhi"]
+        self.assertEqual(
+            dayun_sequence(month_gz, bazi["year"]["gan"], is_male, dt),
+            dayun_sequence(month_gz, bazi["year"]["gan"], is_male, dt, backend=BACKEND_LUNAR),
+            f"dayun differs at {dt} male={is_male}",
+        )
+
+    def test_random_births(self):
+        rng = random.Random(20240502)
+        start = datetime(1900, 2, 1)
+        span = int((datetime(2100, 11, 30) - start).total_seconds())
+        for _ in range(150):
+            dt = start + timedelta(seconds=rng.randrange(span))
+            self.assertSameDayun(dt, True)
+            self.assertSameDayun(dt, False)
+
+    def test_edge_births(self):
+        cases = [
+            datetime(2005, 9, 20, 10, 0),
+            datetime(2000, 2, 29, 12, 0),   # 闰日出生，起运加年需截断到 2 月 28 日
+            datetime(1996, 2, 29, 23, 0),   # 晚子时按亥时计时辰差
+            datetime(2004, 1, 31, 5, 0),    # 加月后月末截断
+            datetime(2024, 2, 4, 16, 27, 7),  # 恰在立春交接时刻
+        ]
+        for dt in cases:
+            self.assertSameDayun(dt, True)
+            self.assertSameDayun(dt, False)
+
+
+if __name__ == "__main__":
+    unittest.main()
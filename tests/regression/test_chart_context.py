@@ -0,0 +1,51 @@
+"""
+Regression tests for ChartContext sharing.
+
+analyze_basic / analyze_luck / get_yun_info must return the same results
+whether they build their own context or share one created per request.
+"""
+
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from bazi.chart_context import ChartContext
+from bazi.luck import analyze_luck
+from bazi.lunar_engine import analyze_basic, get_bazi, get_yun_info
+
+
+class TestChartContext(unittest.TestCase):
+    """Shared context vs independent conversions."""
+
+    CASES = [
+        (datetime(2005, 9, 20, 10, 0), True),
+        (datetime(2007, 1, 28, 12, 0), True),
+        (datetime(2006, 3, 22, 14, 0), False),
+    ]
+
+    def test_context_builds_once(self):
+        ctx = ChartContext(datetime(2005, 9, 20, 10, 0), True)
+        self.assertEqual(ctx.bazi, get_bazi(ctx.birth_dt))
+        self.assertIs(ctx.dayun, ctx.dayun)
+        self.assertIs(ctx.dayun_steps, ctx.dayun["dayun"])
+
+    def test_shared_context_matches_independent(self):
+        for dt, is_male in self.CASES:
+            ctx = ChartContext(dt, is_male)
+            basic = analyze_basic(dt)
+            self.assertEqual(analyze_basic(dt, ctx=ctx), basic)
+            yongshen = basic["yongshen_elements"]
+            self.assertEqual(
+                analyze_luck(dt, is_male, yongshen, max_dayun=15, ctx=ctx),
+                analyze_luck(dt, is_male, yongshen, max_dayun=15),
+            )
+            self.assertEqual(get_yun_info(dt, is_male, ctx=ctx), get_yun_info(dt, is_male))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+"""
+Regression tests for the integer stem/branch encoding (bazi.codes).
+
+Encoded tables must agree with the character-keyed definitions in
+config.py / shishen.py for every stem, branch and element.
+"""
+
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from bazi.codes import (
+    GAN_ELEMENT,
+    JIA_ZI,
+    SHISHEN_NAMES,
+    ZHI_CHONG_OF,
+    ZHI_ELEMENT,
+    ZHI_MAIN_GAN_CODE,
+    decode_bazi,
+    decode_ganzhi,
+    elements_clash,
+    encode_bazi,
+    encode_gan,
+    encode_ganzhi,
+    encode_zhi,
+    shishen_code,
+    yongshen_flags,
+)
+from bazi.config import ELEMENTS, GAN_LIST, GAN_WUXING, KE_MAP, ZHI_CHONG, ZHI_LIST, ZHI_WUXING
+from bazi.lunar_engine import get_bazi
+from bazi.shishen import (
+    BRANCH_SHISHEN,
+    BRANCH_SHISHEN_CATEGORY,
+    GAN_YINYANG,
+    SHISHEN,
+    SHISHEN_CATEGORY,
+    SHISHEN_CATEGORY_MAP,
+    WUXING_KE,
+    WUXING_SHENG,
+    ZHI_MAIN_GAN,
+    get_branch_shishen,
+    get_shishen,
+)
+
+
+def _shishen_by_rules(day_gan: str, other_gan: str) -> str:
+    """按五行生克 + 阴阳逐条判断的十神（编码前的定义）。"""
+    self_wx = GAN_WUXING[day_gan]
+    other_wx = GAN_WUXING[other_gan]
+    same = GAN_YINYANG[day_gan] == GAN_YINYANG[other_gan]
+    if other_wx == self_wx:
+        return "比肩" if same else "劫财"
+    if WUXING_SHENG[self_wx] == other_wx:
+        return "食神" if same else "伤官"
+    if WUXING_SHENG[other_wx] == self_wx:
+        return "偏印" if same else "正印"
+    if WUXING_KE[self_wx] == other_wx:
+        return "偏财" if same else "正财"
+    return "七杀" if same else "正官"
+
+
+class TestCodes(unittest.TestCase):
+    """Integer encoding vs character tables."""
+
+    def test_round_trip(self):
+        for jz in range(60):
+            gan, zhi = decode_ganzhi(jz)
+            self.assertEqual(encode_ganzhi(gan, zhi), jz)
+            self.assertEqual(gan + zhi, JIA_ZI[jz])
+        bazi = get_bazi(datetime(2005, 9, 20, 10, 0))
+        self.assertEqual(decode_bazi(encode_bazi(bazi)), bazi)
+
+    def test_invalid_codes(self):
+        with self.assertRaises(ValueError):
+            encode_gan("子")
+        with self.assertRaises(ValueError):
+            encode_zhi("甲")
+        with self.assertRaises(ValueError):
+            encode_ganzhi("甲", "丑")
+
+    def test_element_tables(self):
+        for i, gan in enumerate(GAN_LIST):
+            self.assertEqual(ELEMENTS[GAN_ELEMENT[i]], GAN_WUXING[gan])
+        for i, zhi in enumerate(ZHI_LIST):
+            self.assertEqual(ELEMENTS[ZHI_ELEMENT[i]], ZHI_WUXING[zhi])
+            self.assertEqual(ZHI_LIST[ZHI_CHONG_OF[i]], ZHI_CHONG[zhi])
+            self.assertEqual(GAN_LIST[ZHI_MAIN_GAN_CODE[i]], ZHI_MAIN_GAN[zhi])
+
+    def test_elements_clash(self):
+        for e1 in range(5):
+            for e2 in range(5):
+                expected = KE_MAP[ELEMENTS[e1]] == ELEMENTS[e2] or KE_MAP[ELEMENTS[e2]] == ELEMENTS[e1]
+                self.assertEqual(elements_clash(e1, e2), expected)
+
+    def test_shishen_code(self):
+        for d, day_gan in enumerate(GAN_LIST):
+            for o, other_gan in enumerate(GAN_LIST):
+                self.assertEqual(SHISHEN_NAMES[shishen_code(d, o)], _shishen_by_rules(day_gan, other_gan))
+
+    def test_yongshen_flags(self):
+        gan_flags, zhi_flags = yongshen_flags(["木", "火"])
+        self.assertEqual([GAN_LIST[i] for i in range(10) if gan_flags[i]], ["甲", "乙", "丙", "丁"])
+        self.assertEqual([ZHI_LIST[i] for i in range(12) if zhi_flags[i]], ["寅", "卯", "巳", "午"])
+
+
+class TestShishenTables(unittest.TestCase):
+    """SHISHEN / BRANCH_SHISHEN lookup tables vs rule-based definition."""
+
+    def test_stem_table(self):
+        for day_gan in GAN_LIST:
+            for other_gan in GAN_LIST:
+                expected = _shishen_by_rules(day_gan, other_gan)
+                self.assertEqual(SHISHEN[day_gan][other_gan], expected)
+                self.assertEqual(get_shishen(day_gan, other_gan), expected)
+                self.assertEqual(SHISHEN_CATEGORY[day_gan][other_gan], SHISHEN_CATEGORY_MAP[expected])
+        self.assertIsNone(get_shishen("子", "甲"))
+        self.assertIsNone(get_shishen("甲", "子"))
+
+    def test_branch_table(self):
+        for day_gan in GAN_LIST:
+            bazi = {"day": {"gan": day_gan, "zhi": "子"}}
+            for zhi in ZHI_LIST:
+                expected = {"gan": ZHI_MAIN_GAN[zhi], "shishen": _shishen_by_rules(day_gan, ZHI_MAIN_GAN[zhi])}
+                self.assertEqual(BRANCH_SHISHEN[day_gan][zhi], expected)
+                self.assertEqual(get_branch_shishen(bazi, zhi), expected)
+                self.assertEqual(BRANCH_SHISHEN_CATEGORY[day_gan][zhi], SHISHEN_CATEGORY_MAP[expected["shishen"]])
+            self.assertIsNone(get_branch_shishen(bazi, "甲"))
+
+    def test_branch_table_read_only(self):
+        bazi = {"day": {"gan": "甲", "zhi": "子"}}
+        with self.assertRaises(TypeError):
+            BRANCH_SHISHEN["甲"]["子"]["shishen"] = "changed"
+        info = get_branch_shishen(bazi, "子")
+        info["shishen"] = "changed"
+        self.assertEqual(get_branch_shishen(bazi, "子"), {"gan": "癸", "shishen": "正印"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Regression tests for compact facts (compute_facts(..., compact=True)).
+
+Compact liunian rows must materialize to exactly the eager document,
+existing consumers must read the read-only views (nested values frozen,\nrecently read years kept) unchanged, and a cached
+compact document must hold markedly fewer resident bytes than the eager one.
+"""
+
+import gc
+import sys
+import tracemalloc
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from bazi.chat_api import chat_api
+from bazi.compute_facts import compute_facts
+from bazi.extract_findings import extract_findings_from_facts
+from bazi.lazy_facts import LiunianView, materialize_facts
+from bazi.request_index import generate_request_index
+from bazi.year_detail import generate_year_detail
+
+BIRTHS = [
+    (datetime(2005, 9, 20, 10, 0), True),
+    (datetime(1990, 5, 17, 9, 30), False),
+    (datetime(1962, 12, 1, 23, 40), True),
+]
+
+
+def _liunian_entries(facts):
+    return [ln for group in facts["luck"]["groups"] for ln in group["liunian"]]
+
+
+def _resident_bytes(birth, is_male, **kwargs):
+    compute_facts(birth, is_male, **kwargs)  # 先把各层缓存填好，只量 facts 本身
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = [compute_facts(birth, is_male, **kwargs) for _ in range(3)]
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return current
+
+
+class TestCompactFacts(unittest.TestCase):
+    """LiunianRows / LiunianView in compute_facts."""
+
+    def test_materialized_equals_eager(self):
+        for birth, is_male in BIRTHS:
+            eager = compute_facts(birth, is_male)
+            compact = compute_facts(birth, is_male, compact=True)
+            entries = _liunian_entries(compact)
+            self.assertTrue(all(isinstance(ln, LiunianView) for ln in entries))
+            self.assertEqual([ln["year"] for ln in entries], [ln["year"] for ln in _liunian_entries(eager)])
+            self.assertEqual(entries[3], _liunian_entries(eager)[3])
+            self.assertEqual(materialize_facts(compact), eager, birth)
+            self.assertTrue(all(type(ln) is dict for ln in _liunian_entries(compact)))
+
+    def test_consumers_read_views(self):
+        for birth, is_male in BIRTHS:
+            eager = compute_facts(birth, is_male)
+            compact = compute_facts(birth, is_male, compact=True)
+            self.assertEqual(generate_request_index(compact, 2025), generate_request_index(eager, 2025))
+            self.assertEqual(generate_year_detail(compact, 2030), generate_year_detail(eager, 2030))
+            self.assertEqual(extract_findings_from_facts(compact), extract_findings_from_facts(eager))
+        response = chat_api("最近几年整体怎么样", compact, base_year=2025)
+        self.assertIsNone(response["error"])
+
+    def test_views_are_read_only(self):
+        compact = compute_facts(datetime(2005, 9, 20, 10, 0), True, compact=True)
+        view = _liunian_entries(compact)[0]
+        with self.assertRaises(TypeError):
+            view["hints"] = []
+        copy = view.materialize()
+        copy["hints"].append("x")
+        self.assertNotIn("x", view["hints"])
+        with self.assertRaises((TypeError, AttributeError)):
+            view["hints"].append("x")
+        for event in view["all_events"]:
+            with self.assertRaises(TypeError):
+                event["type"] = "x"
+
+    def test_alternating_views_reuse_records(self):
+        compact = compute_facts(datetime(1990, 5, 17, 9, 30), False, compact=True)
+        first, second = _liunian_entries(compact)[:2]
+        rows = first._rows
+        years = []
+        loader = rows._loader
+
+        def counting_loader(dayun_jz, ln_jz, year, age, dayun_index):
+            years.append(year)
+            return loader(dayun_jz, ln_jz, year, age, dayun_index)
+
+        rows._loader = counting_loader
+        for _ in range(3):
+            first["all_events"], second["all_events"]
+        self.assertEqual(years, [first["year"], second["year"]])
+
+    def test_fewer_resident_bytes(self):
+        birth, is_male = BIRTHS[1]
+        eager = _resident_bytes(birth, is_male)
+        compact = _resident_bytes(birth, is_male, compact=True)
+        self.assertLess(compact * 3, eager)
+
+
+if __name__ == "__main__":
+    unittest.main()
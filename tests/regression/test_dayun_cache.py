@@ -0,0 +1,118 @@
+"""
+Regression tests for the dayun-level cache (luck.evaluate_dayun).
+
+Cached dayun results must equal a direct detector run, be reused across
+horizons and repeated charts, and be returned as copies.
+"""
+
+import random
+import sys
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from bazi.chart_context import ChartContext
+from bazi.clash import detect_branch_clash
+from bazi.codes import JIA_ZI, JIA_ZI_PAIRS, yongshen_key
+from bazi.enrich import enrich_dayun, enrich_dayun_cached
+from bazi.harmony import detect_flow_harmonies, detect_sanhe_complete
+from bazi.luck import _evaluate_dayun_cached, _stamp_dayun, analyze_luck, clear_dayun_cache, dayun_cache_info, evaluate_dayun
+from bazi.lunar_engine import analyze_basic
+from bazi.punishment import detect_branch_punishments
+
+
+def _sample_births(count, seed=20240620):
+    rng = random.Random(seed)
+    start = datetime(1950, 1, 1)
+    return [start + timedelta(hours=rng.randrange(24 * 365 * 60)) for _ in range(count)]
+
+
+class TestDayunCache(unittest.TestCase):
+    """evaluate_dayun LRU cache."""
+
+    def setUp(self):
+        clear_dayun_cache()
+
+    def test_matches_detectors(self):
+        for birth in _sample_births(10):
+            ctx = ChartContext(birth, True)
+            yongshen = analyze_basic(birth, ctx=ctx)["yongshen_elements"]
+            for idx, dy in enumerate(ctx.dayun_steps[:10]):
+                if dy["jiazi"] is None:
+                    continue
+                gan, zhi = JIA_ZI_PAIRS[dy["jiazi"]]
+                label = JIA_ZI[dy["jiazi"]]
+                result = _stamp_dayun(
+                    _evaluate_dayun_cached(ctx.bazi_key, dy["jiazi"], yongshen_key(yongshen)), idx, dy["start_year"]
+                )
+                clash = detect_branch_clash(ctx.bazi, zhi, "dayun", dy["start_year"], label, flow_gan=gan)
+                if result["clash_natal"] is None or "pattern_bonus_percent" not in result["clash_natal"]:
+                    self.assertEqual(result["clash_natal"], clash)
+                punish = detect_branch_punishments(ctx.bazi, zhi, "dayun", dy["start_year"], label)
+                if clash:
+                    punish = [ev for ev in punish if ev["target_branch"] != clash["target_branch"]]
+                self.assertEqual(result["punishments_natal"], punish)
+                self.assertEqual(
+                    result["harmonies_natal"],
+                    detect_flow_harmonies(ctx.bazi, zhi, "dayun", dy["start_year"], label),
+                )
+                self.assertEqual(
+                    result["sanhe_complete"],
+                    detect_sanhe_complete(ctx.bazi, dayun_branch=zhi, dayun_label=label, dayun_index=idx),
+                )
+
+    def test_horizons_share_cache(self):
+        birth = datetime(1990, 5, 17, 9, 30)
+        yongshen = analyze_basic(birth)["yongshen_elements"]
+        first = analyze_luck(birth, True, yongshen, max_dayun=10)
+        misses = dayun_cache_info().misses
+        second = analyze_luck(birth, True, yongshen, max_dayun=15)
+        info = dayun_cache_info()
+        self.assertGreaterEqual(info.hits, 9)
+        self.assertLessEqual(info.misses - misses, 5)
+        self.assertEqual(first["groups"], second["groups"][:len(first["groups"])])
+
+    def test_warm_equals_cold(self):
+        birth = datetime(2005, 9, 20, 10, 0)
+        yongshen = analyze_basic(birth)["yongshen_elements"]
+        cold = analyze_luck(birth, False, yongshen)
+        warm = analyze_luck(birth, False, yongshen)
+        self.assertEqual(cold, warm)
+        self.assertGreater(dayun_cache_info().hits, 0)
+
+    def test_returns_copies(self):
+        ctx = ChartContext(datetime(2005, 9, 20, 10, 0), True)
+        dy_jz = next(dy["jiazi"] for dy in ctx.dayun_steps if dy["jiazi"] is not None)
+        first = evaluate_dayun(ctx.bazi_key, dy_jz, (0, 1))
+        first["pattern_events"].append({})
+        first["risk_dayun_total"] = -1.0
+        second = evaluate_dayun(ctx.bazi_key, dy_jz, (0, 1))
+        self.assertNotIn({}, second["pattern_events"])
+        self.assertNotEqual(second["risk_dayun_total"], -1.0)
+
+    def test_enrich_dayun_cached(self):
+        for birth in _sample_births(5, seed=7):
+            ctx = ChartContext(birth, False)
+            natal = analyze_basic(birth, ctx=ctx)
+            for dy in ctx.dayun_steps[:10]:
+                if dy["jiazi"] is None:
+                    continue
+                gan, zhi = JIA_ZI_PAIRS[dy["jiazi"]]
+                args = dict(
+                    dayun={"gan": gan, "zhi": zhi},
+                    bazi=ctx.bazi,
+                    day_gan=ctx.day_gan,
+                    strength_percent=natal["strength_percent"],
+                    support_percent=natal["support_percent"],
+                    yongshen_elements=natal["yongshen_elements"],
+                    is_male=False,
+                )
+                self.assertEqual(enrich_dayun_cached(**args), enrich_dayun(**args))
+
+
+if __name__ == "__main__":
+    unittest.main()
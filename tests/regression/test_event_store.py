@@ -0,0 +1,75 @@
+"""
+Regression tests for packed facts (bazi.event_store).
+
+Packed facts must hold every liunian event once in the top-level event
+table, survive a JSON round trip, expand back to exactly the existing JSON
+contract for eager, lazy and compact facts, serialize smaller, and leave
+the input facts untouched.
+"""
+
+import json
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from bazi.compute_facts import compute_facts
+from bazi.event_store import EventStore, expand_facts, pack_facts
+
+BIRTHS = [
+    (datetime(2005, 9, 20, 10, 0), True),
+    (datetime(1990, 5, 17, 9, 30), False),
+]
+
+
+def _dumps(facts):
+    return json.dumps(facts, ensure_ascii=False)
+
+
+class TestEventStore(unittest.TestCase):
+    """pack_facts / expand_facts."""
+
+    def test_round_trip(self):
+        for birth, is_male in BIRTHS:
+            expected = _dumps(compute_facts(birth, is_male))
+            for kwargs in ({}, {"lazy": True}, {"compact": True}):
+                packed = json.loads(_dumps(pack_facts(compute_facts(birth, is_male, **kwargs))))
+                self.assertEqual(_dumps(expand_facts(packed)), expected, (birth, kwargs))
+
+    def test_events_stored_once(self):
+        facts = compute_facts(*BIRTHS[1])
+        packed = pack_facts(facts)
+        self.assertLess(len(_dumps(packed)), len(_dumps(facts)))
+        events = packed["events"]
+        contents = [_dumps(event) for event in events]
+        self.assertEqual(len(contents), len(set(contents)))
+        checked = 0
+        for group in packed["luck"]["groups"]:
+            for liunian in group["liunian"]:
+                for field_name in ("clashes_natal", "punishments_natal", "patterns_liunian"):
+                    self.assertTrue(set(liunian[field_name]) <= set(liunian["all_events"]))
+                    checked += len(liunian[field_name])
+                self.assertTrue(all(0 <= event_id < len(events) for event_id in liunian["all_events"]))
+        self.assertGreater(checked, 0)
+
+    def test_input_untouched(self):
+        facts = compute_facts(*BIRTHS[0])
+        before = _dumps(facts)
+        pack_facts(facts)
+        self.assertEqual(_dumps(facts), before)
+
+    def test_store_dedups(self):
+        store = EventStore()
+        event = {"type": "branch_clash", "risk_percent": 10.0}
+        self.assertEqual(store.add(event), store.add(event))
+        self.assertEqual(store.add(dict(event)), 0)
+        self.assertEqual(store.add({"type": "punishment", "risk_percent": 5.0}), 1)
+        self.assertEqual(len(store.events), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Regression tests for read-only event records (bazi.events).
+
+Frozen records must read like the original dicts, reject writes, express
+per-year changes as overlays without touching the shared base, and thaw
+back to equal plain dicts / lists (keeping shared identity). Cached layers
+must hand out thawed copies.
+"""
+
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from bazi.chart_context import ChartContext
+from bazi.events import FrozenEvent, FrozenList, freeze, thaw
+from bazi.lunar_engine import analyze_natal
+
+
+class TestFrozenEvent(unittest.TestCase):
+    """FrozenEvent / freeze / thaw."""
+
+    def test_reads_like_dict(self):
+        target = {"pillar": "day", "palace": "婚姻宫"}
+        event = {"type": "branch_clash", "risk_percent": 10.0, "targets": [target, target], "pair": ("子", "午")}
+        frozen = freeze(event)
+        self.assertIsInstance(frozen, FrozenEvent)
+        self.assertIsInstance(frozen["targets"], FrozenList)
+        self.assertEqual(frozen, event)
+        self.assertEqual(list(frozen), list(event))
+        self.assertEqual(frozen.get("missing", 1), 1)
+        self.assertIs(frozen["targets"][0], frozen["targets"][1])
+        with self.assertRaises(TypeError):
+            frozen["risk_percent"] = 0.0
+        with self.assertRaises(AttributeError):
+            frozen["targets"].append({})
+
+        thawed = thaw(frozen)
+        self.assertEqual(thawed, event)
+        self.assertEqual(repr(thawed), repr(event))
+        self.assertIs(thawed["targets"][0], thawed["targets"][1])
+        thawed["targets"][0]["palace"] = "x"
+        self.assertEqual(frozen["targets"][0]["palace"], "婚姻宫")
+
+    def test_overlay(self):
+        base = freeze({"type": "pattern", "flow_year": None, "risk_percent": 15.0})
+        stamped = base.overlay(flow_year=2024, pattern_bonus_percent=10.0)
+        self.assertEqual(stamped["flow_year"], 2024)
+        self.assertIsNone(base["flow_year"])
+        self.assertEqual(list(stamped), ["type", "flow_year", "risk_percent", "pattern_bonus_percent"])
+        self.assertEqual(len(stamped), 4)
+        again = stamped.overlay(flow_year=2025)
+        self.assertEqual(again.to_dict(), {
+            "type": "pattern", "flow_year": 2025, "risk_percent": 15.0, "pattern_bonus_percent": 10.0,
+        })
+        self.assertEqual(stamped["flow_year"], 2024)
+
+    def test_cached_layers_hand_out_copies(self):
+        ctx = ChartContext(datetime(1990, 5, 17, 9, 30), True)
+        first = analyze_natal(ctx.bazi_key)
+        self.assertIs(type(first), dict)
+        self.assertIs(type(first["yongshen_elements"]), list)
+        first["yongshen_elements"].append("x")
+        first["hints"] = ["x"]
+        second = analyze_natal(ctx.bazi_key)
+        self.assertNotIn("x", second["yongshen_elements"])
+        self.assertNotEqual(second.get("hints"), ["x"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Regression tests for hint codes (bazi.hint_codes).
+
+Facts must carry hints as compact codes, the renderer must reproduce the
+original prose verbatim (including the marriage-wuhe hint_text and the
+yongshen swap line), and rendering facts must leave the input untouched.
+"""
+
+import json
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from bazi.compute_facts import compute_facts
+from bazi.hint_codes import HINT_TEMPLATES, make_hint, render_facts_hints, render_hint, render_hints
+from bazi.year_detail import generate_year_detail
+
+BIRTHS = [
+    (datetime(2005, 9, 20, 10, 0), True),
+    (datetime(1990, 5, 17, 9, 30), False),
+    (datetime(1962, 12, 1, 23, 40), True),
+]
+
+
+def _liunian_entries(facts):
+    return [ln for group in facts["luck"]["groups"] for ln in group["liunian"]]
+
+
+class TestHintCodes(unittest.TestCase):
+    """make_hint / render_hint / render_facts_hints."""
+
+    def test_render_matches_prose(self):
+        self.assertEqual(
+            render_hint(make_hint("risk_options")),
+            "风险管理选项（供参考）：保险/预案；投机回撤风险更高；合规优先；职业变动成本更高；情绪波动时更易误判；重大决定适合拉长周期",
+        )
+        self.assertEqual(
+            render_hint(make_hint("palace_harmony", palace="夫妻宫")),
+            "提示：夫妻宫引动（单身：更容易出现暧昧/推进；有伴侣：关系推进或波动）",
+        )
+        self.assertEqual(render_hint(make_hint("family_change")), "提示：家庭变动（搬家/换工作/家庭节奏变化）")
+        self.assertEqual(
+            render_hint(make_hint("wuhe_change_contested", star="官杀星", wuhe_name="乙庚合")),
+            "婚恋变化提醒（如恋爱）：天干官杀星被争合，乙庚合合走官杀星：感情竞争/第三者介入的风险上升",
+        )
+        self.assertEqual(
+            render_hint(make_hint(
+                "yongshen_swap", yongshen_list="木、火", shen_status="身弱", support_percent=41.6,
+                dayun_zhi="午", yun_type="火", target_industry="金、水",
+            )),
+            "【用神互换提示】原局用神：木、火；身弱；生扶力量=42%；运支=午(火) → 更匹配的行业方向：金、水。职业路径上更可能出现调整/变动窗口。",
+        )
+        self.assertEqual(render_hints(["旧文案", make_hint("yuanfen_gan")]), ["旧文案", "提示：缘分（天干）：暧昧推进"])
+        self.assertEqual(render_hints(None), [])
+        self.assertIs(render_hint(make_hint("love_clash")), render_hint(make_hint("love_clash")))
+        with self.assertRaises(ValueError):
+            make_hint("no_such_code")
+
+    def test_facts_store_codes(self):
+        codes = set()
+        for birth, is_male in BIRTHS:
+            facts = compute_facts(birth, is_male)
+            for liunian in _liunian_entries(facts):
+                for hint in liunian["hints"]:
+                    self.assertIn(hint["code"], HINT_TEMPLATES)
+                    codes.add(hint["code"])
+                wuhe_texts = [hint["hint_text"] for hint in liunian["marriage_wuhe_hints"]]
+                rendered = [text for text in render_hints(liunian["hints"]) if text.startswith("婚恋变化提醒")]
+                self.assertEqual(rendered, [f"婚恋变化提醒（如恋爱）：{text}" for text in wuhe_texts])
+        self.assertIn("risk_options", codes)
+
+    def test_render_facts(self):
+        for birth, is_male in BIRTHS:
+            facts = compute_facts(birth, is_male)
+            before = json.dumps(facts, ensure_ascii=False)
+            rendered = render_facts_hints(facts)
+            self.assertEqual(json.dumps(facts, ensure_ascii=False), before)
+            for liunian in _liunian_entries(rendered):
+                self.assertTrue(all(isinstance(hint, str) for hint in liunian["hints"]))
+            compact = render_facts_hints(compute_facts(birth, is_male, compact=True))
+            self.assertEqual(compact, rendered)
+            detail = generate_year_detail(facts, 2030)
+            self.assertTrue(all(isinstance(line, str) for line in detail["hint_summary_lines"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
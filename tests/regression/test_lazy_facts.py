@@ -0,0 +1,78 @@
+"""
+Regression tests for lazy facts (compute_facts(..., lazy=True)).
+
+Lazy liunian entries must materialize to exactly the eager document, the
+request index / year detail must work on the lazy document, and a single
+year lookup must not materialize the other years.
+"""
+
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from bazi.compute_facts import compute_facts
+from bazi.extract_findings import extract_findings_from_facts
+from bazi.lazy_facts import LazyRecord, materialize_facts
+from bazi.request_index import generate_request_index
+from bazi.year_detail import generate_year_detail
+
+BIRTHS = [
+    (datetime(2005, 9, 20, 10, 0), True),
+    (datetime(1990, 5, 17, 9, 30), False),
+    (datetime(1977, 8, 4, 5, 20), True),
+]
+
+
+def _liunian_entries(facts):
+    return [ln for group in facts["luck"]["groups"] for ln in group["liunian"]]
+
+
+class TestLazyFacts(unittest.TestCase):
+    """LazyRecord liunian entries in compute_facts."""
+
+    def test_materialized_equals_eager(self):
+        for birth, is_male in BIRTHS:
+            eager = compute_facts(birth, is_male)
+            lazy = compute_facts(birth, is_male, lazy=True)
+            self.assertTrue(all(isinstance(ln, LazyRecord) for ln in _liunian_entries(lazy)))
+            self.assertEqual(materialize_facts(lazy), eager, birth)
+            self.assertTrue(all(type(ln) is dict for ln in _liunian_entries(lazy)))
+
+    def test_indexes_on_lazy_facts(self):
+        for birth, is_male in BIRTHS:
+            eager = compute_facts(birth, is_male)
+            lazy = compute_facts(birth, is_male, lazy=True)
+            self.assertEqual(generate_request_index(lazy, 2025), generate_request_index(eager, 2025))
+            self.assertEqual(extract_findings_from_facts(lazy), extract_findings_from_facts(eager))
+            self.assertEqual(dict(lazy["indexes"]["relationship"]), eager["indexes"]["relationship"])
+
+    def test_single_year_stays_lazy(self):
+        birth = datetime(2005, 9, 20, 10, 0)
+        eager = compute_facts(birth, True)
+        lazy = compute_facts(birth, True, lazy=True)
+        self.assertEqual(generate_year_detail(lazy, 2030), generate_year_detail(eager, 2030))
+        loaded = [ln["year"] for ln in _liunian_entries(lazy) if ln.loaded]
+        self.assertEqual(loaded, [2030])
+        self.assertFalse(lazy["indexes"]["relationship"].loaded)
+
+    def test_record_steps_and_writes(self):
+        calls = []
+        record = LazyRecord(lambda: calls.append(1) or {"year": 2020, "gan": "庚"}, known={"year": 2020})
+        record.then(lambda d: d.update(hints=["a"]))
+        self.assertEqual(record["year"], 2020)
+        self.assertIn("year", record)
+        self.assertEqual(calls, [])
+        self.assertEqual(record.get("hints"), ["a"])
+        record["hints"].append("b")
+        record.then(lambda d: d.update(extra=1))
+        self.assertEqual(dict(record), {"year": 2020, "gan": "庚", "hints": ["a", "b"], "extra": 1})
+        self.assertEqual(calls, [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,244 @@
+"""
+Regression tests for the liunian evaluation kernel cache (luck.evaluate_liunian).
+
+A warm cache must reproduce a cold run exactly (including the stamped
+years / ages / dayun indexes), and stamped results must not share any
+state, nested fields included, with the cached template. Indexed §9 static activation
+must pick the same static pairs, in the same order, as the pairwise scan.
+The per-chart wuhe / marriage-hint lookup used by enrich_liunian must match
+a direct detect_gan_wuhe + detect_marriage_wuhe_hints run.
+"""
+
+import json
+import random
+import sys
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from bazi.calendar import year_jiazi
+from bazi.chart_context import ChartContext
+from bazi.codes import yongshen_key
+from bazi.compute_facts import compute_facts
+from bazi.config import GAN_LIST
+from bazi.enrich import _liunian_wuhe, _serialize_gan_wuhe_events
+from bazi.gan_wuhe import GanPosition, detect_gan_wuhe
+from bazi.luck import (
+    _activated_static_pairs,
+    _static_pattern_index,
+    analyze_luck,
+    clear_dayun_cache,
+    clear_liunian_cache,
+    evaluate_liunian,
+    liunian_cache_info,
+)
+from bazi.lunar_engine import analyze_basic
+from bazi.marriage_wuhe import detect_marriage_wuhe_hints
+from bazi.patterns import detect_natal_patterns
+from bazi.shishen import get_shishen
+
+
+def _clear():
+    clear_dayun_cache()
+    clear_liunian_cache()
+
+
+class TestLiunianCache(unittest.TestCase):
+    """evaluate_liunian LRU cache."""
+
+    def setUp(self):
+        _clear()
+
+    def test_warm_equals_cold(self):
+        rng = random.Random(20240702)
+        start = datetime(1940, 1, 1)
+        for i in range(12):
+            birth = start + timedelta(hours=rng.randrange(24 * 365 * 70))
+            yongshen = analyze_basic(birth)["yongshen_elements"]
+            _clear()
+            cold = analyze_luck(birth, bool(i % 2), yongshen, max_dayun=15)
+            warm = analyze_luck(birth, bool(i % 2), yongshen, max_dayun=15)
+            self.assertEqual(cold, warm, birth)
+
+    def test_stamped_fields(self):
+        ctx = ChartContext(datetime(2005, 9, 20, 10, 0), True)
+        yongshen = analyze_basic(ctx.birth_dt, ctx=ctx)["yongshen_elements"]
+        luck = analyze_luck(ctx.birth_dt, True, yongshen, ctx=ctx)
+        for group in luck["groups"]:
+            if group["dayun"] is None:
+                continue
+            for liunian in group["liunian"]:
+                year = liunian["year"]
+                for ev in liunian["all_events"]:
+                    if "flow_year" in ev:
+                        self.assertEqual(ev["flow_year"], year)
+                for ev in liunian["sanhe_complete"] + liunian["sanhui_complete"]:
+                    self.assertEqual(ev["liunian_year"], year)
+                    self.assertEqual(ev["dayun_index"], group["dayun"]["index"])
+
+    def test_pre_dayun_years(self):
+        birth = datetime(1990, 5, 17, 9, 30)
+        ctx = ChartContext(birth, True)
+        yongshen = analyze_basic(birth, ctx=ctx)["yongshen_elements"]
+        luck = analyze_luck(birth, True, yongshen, ctx=ctx)
+        pre = luck["groups"][0]
+        self.assertIsNone(pre["dayun"])
+        self.assertTrue(pre["liunian"])
+        for liunian in pre["liunian"]:
+            self.assertEqual(liunian["age"], liunian["year"] - birth.year + 1)
+            self.assertEqual(liunian["clashes_dayun"], [])
+            for ev in liunian["patterns_static_activation"]:
+                self.assertEqual(ev["activated_dayun_gan_pairs"], [])
+                self.assertEqual(ev["activated_dayun_zhi_pairs"], [])
+            for ev in liunian["sanhe_complete"] + liunian["sanhui_complete"]:
+                self.assertIsNone(ev["dayun_index"])
+                self.assertNotIn("dayun", [s["source_type"] for s in ev["sources"]])
+            direct = evaluate_liunian(
+                ctx.bazi_key, None, year_jiazi(liunian["year"]), liunian["year"], liunian["age"], None,
+                yongshen_key(yongshen),
+            )
+            self.assertEqual(direct, liunian)
+
+    def test_hits_and_copies(self):
+        ctx = ChartContext(datetime(1990, 5, 17, 9, 30), True)
+        key = yongshen_key(["木", "火"])
+        dy = next(dy for dy in ctx.dayun_steps if dy["jiazi"] is not None)
+        ln = dy["liunian"][0]
+        args = (ctx.bazi_key, dy["jiazi"], year_jiazi(ln["year"]))
+        first = evaluate_liunian(*args, ln["year"], ln["age"], 0, key)
+        first["hints"].append("x")
+        first["all_events"].append({"type": "x"})
+        first["total_risk_percent"] = -1.0
+        # 六十年后干支相同，但虚龄对应的线运宫位不同，不命中
+        second = evaluate_liunian(*args, ln["year"] + 60, ln["age"] + 60, 0, key)
+        self.assertEqual(liunian_cache_info().hits, 0)
+        third = evaluate_liunian(*args, ln["year"], ln["age"], 0, key)
+        self.assertEqual(liunian_cache_info().hits, 1)
+        self.assertEqual(third["hints"], [])
+        self.assertNotIn({"type": "x"}, third["all_events"])
+        self.assertNotEqual(third["total_risk_percent"], -1.0)
+        self.assertEqual(second["year"], ln["year"] + 60)
+
+    def test_nested_fields_not_shared(self):
+        birth = datetime(1990, 5, 6, 7, 8)
+        expected = json.dumps(compute_facts(birth, True), ensure_ascii=False)
+
+        def poison(value):
+            if isinstance(value, dict):
+                for key in list(value):
+                    if key == "palace":
+                        value[key] = "POISONED"
+                    else:
+                        poison(value[key])
+                value["poisoned"] = True
+            elif isinstance(value, list):
+                for item in value:
+                    poison(item)
+
+        facts = compute_facts(birth, True)
+        for group in facts["luck"]["groups"]:
+            for liunian in group["liunian"]:
+                for field_name in ("all_events", "clashes_natal", "harmonies_natal", "sanhe_complete"):
+                    poison(liunian[field_name])
+        self.assertIn("POISONED", json.dumps(facts, ensure_ascii=False))
+        self.assertEqual(json.dumps(compute_facts(birth, True), ensure_ascii=False), expected)
+
+    def test_static_pattern_index(self):
+        def pairs_of(groups, pattern_type, kind):
+            return [
+                pair
+                for group in groups
+                if group["pattern_type"] == pattern_type
+                for pair in group["pairs"]
+                if pair["pos1"]["kind"] == kind
+            ]
+
+        def pairwise(static_pairs, liunian_pairs):
+            activated = []
+            for liunian_pair in liunian_pairs:
+                chars = {liunian_pair["pos1"]["char"], liunian_pair["pos2"]["char"]}
+                for pair in static_pairs:
+                    if {pair["pos1"]["char"], pair["pos2"]["char"]} == chars and pair not in activated:
+                        activated.append(pair)
+            return activated
+
+        rng = random.Random(7)
+        charts = []
+        for _ in range(40):
+            ctx = ChartContext(datetime(1940, 1, 1) + timedelta(hours=rng.randrange(24 * 365 * 70)), True)
+            charts.append(detect_natal_patterns(ctx.bazi, ctx.day_gan))
+        checked = 0
+        for static_groups, flow_groups in zip(charts, charts[1:] + charts[:1]):
+            index = _static_pattern_index(static_groups)
+            for pattern_type in ("hurt_officer", "pianyin_eatgod"):
+                for kind in ("gan", "zhi"):
+                    liunian_pairs = pairs_of(flow_groups + static_groups, pattern_type, kind)
+                    expected = pairwise(pairs_of(static_groups, pattern_type, kind), liunian_pairs)
+                    self.assertEqual(_activated_static_pairs(index, pattern_type, kind, liunian_pairs), expected)
+                    checked += len(expected)
+        self.assertGreater(checked, 0)
+
+
+def _direct_liunian_wuhe(bazi, day_gan, is_male, dayun_gan, liunian_gan):
+    """Uncached reference: the inline enrich_liunian code before the lookup existed."""
+    pillars = ("year", "month", "day", "hour")
+    wuhe_events = []
+    if liunian_gan:
+        labels = {"year": "年干", "month": "月干", "day": "日干", "hour": "时干"}
+        positions = [
+            GanPosition(source="natal", label=labels[p], gan=bazi[p]["gan"],
+                        shishen=get_shishen(day_gan, bazi[p]["gan"]) or "-")
+            for p in pillars
+        ]
+        if dayun_gan:
+            positions.append(GanPosition(source="dayun", label="大运天干", gan=dayun_gan,
+                                         shishen=get_shishen(day_gan, dayun_gan) or "-"))
+        positions.append(GanPosition(source="liunian", label="流年天干", gan=liunian_gan,
+                                     shishen=get_shishen(day_gan, liunian_gan) or "-"))
+        wuhe_events = _serialize_gan_wuhe_events([
+            ev for ev in detect_gan_wuhe(positions)
+            if any(pos.source == "liunian" for pos in ev["many_side"] + ev["few_side"])
+        ])
+
+    gans = [bazi[p]["gan"] for p in pillars]
+    if dayun_gan:
+        gans.append(dayun_gan)
+    if liunian_gan:
+        gans.append(liunian_gan)
+    hints = detect_marriage_wuhe_hints(
+        gan_list=gans,
+        day_gan=day_gan,
+        is_male=is_male,
+        trigger_gans=[liunian_gan] if liunian_gan else None,
+    )
+    return wuhe_events, hints
+
+
+class TestLiunianWuheLookup(unittest.TestCase):
+    """enrich._liunian_wuhe per-chart lookup."""
+
+    def test_matches_direct_detection(self):
+        rng = random.Random(11)
+        start = datetime(1950, 1, 1)
+        found = 0
+        for i in range(6):
+            ctx = ChartContext(start + timedelta(hours=rng.randrange(24 * 365 * 60)), bool(i % 2))
+            for dayun_gan in [None] + GAN_LIST:
+                for liunian_gan in GAN_LIST:
+                    expected = _direct_liunian_wuhe(ctx.bazi, ctx.day_gan, ctx.is_male, dayun_gan, liunian_gan)
+                    got = _liunian_wuhe(ctx.bazi, ctx.day_gan, ctx.is_male, dayun_gan, liunian_gan)
+                    self.assertEqual(got, expected)
+                    found += len(got[0]) + len(got[1])
+                    if got[0]:
+                        got[0][0]["pos_a"].clear()
+                        again = _liunian_wuhe(ctx.bazi, ctx.day_gan, ctx.is_male, dayun_gan, liunian_gan)
+                        self.assertEqual(again, expected)
+        self.assertGreater(found, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Regression tests for the natal analysis cache (lunar_engine.analyze_natal).
+
+Cached results must equal a fresh computation, count hits / misses, and be
+returned as copies so callers cannot corrupt the cache.
+"""
+
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from bazi.codes import encode_bazi
+from bazi.lunar_engine import (
+    _compute_natal,
+    analyze_basic,
+    analyze_natal,
+    clear_natal_cache,
+    get_bazi,
+    natal_cache_info,
+)
+
+
+class TestNatalCache(unittest.TestCase):
+    """analyze_natal LRU cache."""
+
+    def setUp(self):
+        clear_natal_cache()
+
+    def test_matches_uncached(self):
+        for dt in (datetime(2005, 9, 20, 10, 0), datetime(1990, 1, 20, 8, 0), datetime(2006, 3, 22, 14, 0)):
+            bazi = get_bazi(dt)
+            self.assertEqual(analyze_basic(dt), _compute_natal(bazi))
+            self.assertEqual(analyze_natal(encode_bazi(bazi)), _compute_natal(bazi))
+
+    def test_hit_miss_counters(self):
+        key = encode_bazi(get_bazi(datetime(2005, 9, 20, 10, 0)))
+        analyze_natal(key)
+        analyze_natal(key)
+        analyze_natal(list(key))
+        info = natal_cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (2, 1, 1))
+
+    def test_returns_copies(self):
+        key = encode_bazi(get_bazi(datetime(2005, 9, 20, 10, 0)))
+        first = analyze_natal(key)
+        first["hints"].append("x")
+        first["yongshen_elements"].clear()
+        first["bazi"]["day"]["gan"] = "?"
+        second = analyze_natal(key)
+        self.assertEqual(second["hints"], [])
+        self.assertTrue(second["yongshen_elements"])
+        self.assertNotEqual(second["bazi"]["day"]["gan"], "?")
+
+    def test_invalid_key(self):
+        with self.assertRaises(ValueError):
+            analyze_natal((0, 0, 0, 0, 0, 0, 0))
+        with self.assertRaises(ValueError):
+            analyze_natal((10, 0, 0, 0, 0, 0, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
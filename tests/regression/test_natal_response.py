@@ -0,0 +1,75 @@
+"""
+Regression tests for the per-chart flow response table (bazi.natal_response).
+
+For every flow jiazi / branch, the stamped templates must equal a direct
+call of detect_branch_clash / detect_branch_punishments / detect_flow_harmonies.
+"""
+
+import random
+import sys
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from bazi.clash import detect_branch_clash
+from bazi.codes import JIA_ZI, JIA_ZI_PAIRS, encode_ganzhi
+from bazi.events import thaw
+from bazi.harmony import detect_flow_harmonies
+from bazi.lunar_engine import get_bazi
+from bazi.natal_response import NatalResponseTable
+from bazi.punishment import detect_branch_punishments, detect_natal_clashes_and_punishments
+
+
+class TestNatalResponseTable(unittest.TestCase):
+    """Response table vs direct detector calls."""
+
+    def assertTableMatches(self, bazi):
+        table = NatalResponseTable(bazi)
+        self.assertEqual(table.natal_static, detect_natal_clashes_and_punishments(bazi))
+        for jz, (gan, zhi) in enumerate(JIA_ZI_PAIRS):
+            for flow_type, year in (("liunian", 2000 + jz), ("dayun", 1990 + jz)):
+                label = JIA_ZI[jz]
+                self.assertEqual(
+                    table.clash(jz, flow_type, year, label),
+                    detect_branch_clash(bazi, zhi, flow_type, year, label, flow_gan=gan),
+                    (bazi, label),
+                )
+                self.assertEqual(
+                    table.punishments(jz % 12, flow_type, year, label),
+                    detect_branch_punishments(bazi, zhi, flow_type, year, label),
+                )
+                self.assertEqual(
+                    table.harmonies(jz % 12, flow_type, year, label),
+                    detect_flow_harmonies(bazi, zhi, flow_type, year, label),
+                )
+
+    def test_sample_charts(self):
+        rng = random.Random(20240508)
+        start = datetime(1940, 1, 1)
+        for _ in range(40):
+            self.assertTableMatches(get_bazi(start + timedelta(hours=rng.randrange(24 * 365 * 80))))
+
+    def test_copies_are_independent(self):
+        bazi = {p: {"gan": "甲", "zhi": z} for p, z in zip(("year", "month", "day", "hour"), "子午卯酉")}
+        table = NatalResponseTable(bazi)
+        jz = encode_ganzhi("甲", "午")  # 甲午冲年支子
+        first = table.clash(jz, "liunian", 2014, JIA_ZI[jz])
+        self.assertIsNotNone(first)
+        with self.assertRaises(TypeError):
+            first["risk_percent"] += 10.0
+        with self.assertRaises(TypeError):
+            first["targets"][0]["palace"] = "x"
+        bumped = first.overlay(risk_percent=first["risk_percent"] + 10.0)
+        copied = thaw(first)
+        copied["targets"][0]["palace"] = "x"
+        second = table.clash(jz, "liunian", 2014, JIA_ZI[jz])
+        self.assertEqual(second, detect_branch_clash(bazi, "午", "liunian", 2014, JIA_ZI[jz], flow_gan="甲"))
+        self.assertEqual(bumped["risk_percent"], second["risk_percent"] + 10.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
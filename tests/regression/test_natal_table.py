@@ -0,0 +1,141 @@
+"""
+Regression tests for the precomputed natal table (bazi.natal_table).
+
+Records must round-trip compute_natal_numbers exactly, the chart index must
+cover every valid chart, and analyze_natal must give the same result with
+or without a table file. A table built under different natal rules must be
+refused.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from bazi import natal_table
+from bazi.codes import decode_bazi, encode_bazi, encode_ganzhi
+from bazi.lunar_engine import (
+    _compute_natal,
+    analyze_natal,
+    clear_natal_cache,
+    compute_natal_numbers,
+    get_bazi,
+)
+from bazi.natal_table import HEADER, MAGIC, RECORD, RECORD_COUNT, VERSION, chart_index, chart_key, pack_record, unpack_record
+from tools.build_natal_table import build_table
+
+
+def _sample_charts(count, seed=20240611):
+    rng = random.Random(seed)
+    start = datetime(1940, 1, 1)
+    return [get_bazi(start + timedelta(hours=rng.randrange(24 * 365 * 80))) for _ in range(count)]
+
+
+class TestNatalTable(unittest.TestCase):
+    """Record encoding, chart index and table lookups."""
+
+    def test_chart_index(self):
+        for index in range(0, RECORD_COUNT, 997):
+            self.assertEqual(chart_index(chart_key(index)), index)
+        for bazi in _sample_charts(50):
+            key = encode_bazi(bazi)
+            index = chart_index(key)
+            if index is None:
+                # 只有晚子时（时干按次日日干起）不在表内
+                self.assertEqual(key[7], 0, bazi)
+                self.assertEqual(key[6], ((key[4] + 1) % 5 * 2) % 10, bazi)
+                continue
+            self.assertEqual(chart_key(index), key)
+        # 甲子年 丙寅月 → 月干改成丁就不在表内
+        self.assertIsNone(chart_index((0, 0, 3, 2, 0, 0, 0, 0)))
+        self.assertIsNone(chart_index((0, 0, 2, 2, 0, 0, 1, 0)))
+
+    def test_record_round_trip(self):
+        for bazi in _sample_charts(300):
+            numbers = compute_natal_numbers(bazi)
+            record = RECORD.unpack(pack_record(bazi["day"]["gan"], numbers))
+            self.assertEqual(unpack_record(bazi["day"]["gan"], record), numbers, bazi)
+
+    def test_special_rules_round_trip(self):
+        # 壬日主身弱官杀重：规则 1 与规则 3 同时出现，顺序要保留
+        seen = set()
+        for index in range(0, RECORD_COUNT, 37):
+            bazi = decode_bazi(chart_key(index))
+            numbers = compute_natal_numbers(bazi)
+            if not numbers["special_rules"]:
+                continue
+            seen.update(numbers["special_rules"])
+            record = RECORD.unpack(pack_record(bazi["day"]["gan"], numbers))
+            self.assertEqual(unpack_record(bazi["day"]["gan"], record), numbers, bazi)
+        self.assertIn("weak_water_heavy_guansha_add_wood", seen)
+        self.assertIn("weak_wood_heavy_metal_add_fire", seen)
+
+    def test_built_table(self):
+        year_jz = encode_ganzhi("庚", "午")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "natal_table.bin")
+            build_table(path, year_jz=[year_jz], processes=1)
+            table = natal_table.NatalTable(path)
+            try:
+                for index in range(year_jz * 8640, (year_jz + 1) * 8640, 53):
+                    key = chart_key(index)
+                    self.assertEqual(table.lookup(key), compute_natal_numbers(decode_bazi(key)))
+                # 未生成的年柱为无效记录
+                self.assertIsNone(table.lookup(chart_key(0)))
+            finally:
+                table.close()
+
+            clear_natal_cache()
+            natal_table.set_table(path)
+            try:
+                key = chart_key(year_jz * 8640 + 1234)
+                self.assertEqual(analyze_natal(key), _compute_natal(decode_bazi(key)))
+            finally:
+                natal_table.set_table(None)
+                clear_natal_cache()
+
+    def test_rejects_foreign_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "natal_table.bin")
+            with open(path, "wb") as f:
+                f.write(b"\0" * 64)
+            with self.assertRaises(ValueError):
+                natal_table.NatalTable(path)
+
+    def test_rejects_stale_rules(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "natal_table.bin")
+            with open(path, "wb") as f:
+                f.write(natal_table.header_bytes())
+                f.truncate(HEADER.size + RECORD.size * RECORD_COUNT)
+            natal_table.NatalTable(path).close()
+
+            # 旧规则生成的表：指纹与当前 compute_natal_numbers 不一致
+            with open(path, "r+b") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, RECORD_COUNT, b"\1" * 32))
+            with self.assertRaises(ValueError):
+                natal_table.NatalTable(path)
+
+            old_env = os.environ.get("BAZI_NATAL_TABLE")
+            os.environ["BAZI_NATAL_TABLE"] = path
+            try:
+                natal_table.set_table(None)
+                natal_table._table_loaded = False
+                self.assertIsNone(natal_table.get_table())
+            finally:
+                if old_env is None:
+                    del os.environ["BAZI_NATAL_TABLE"]
+                else:
+                    os.environ["BAZI_NATAL_TABLE"] = old_env
+                natal_table.set_table(None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Regression tests for the per-chart liunian pattern table (bazi.pattern_table).
+
+For every dayun jiazi (or none) x liunian jiazi, the stamped events must
+equal a direct call of detect_liunian_patterns followed by stamping, and
+lookups must be read-only so the shared table cannot be modified.
+"""
+
+import random
+import sys
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from bazi.codes import JIA_ZI, JIA_ZI_PAIRS, encode_bazi, yongshen_key
+from bazi.events import thaw
+from bazi.lunar_engine import get_bazi
+from bazi.pattern_table import LiunianPatternTable, get_pattern_table
+from bazi.patterns import detect_liunian_patterns
+
+YONGSHEN_SETS = [["木", "火"], ["金"], []]
+
+
+def _direct(bazi, dayun_jz, ln_jz, yongshen, year, label):
+    dayun_gan, dayun_zhi = JIA_ZI_PAIRS[dayun_jz] if dayun_jz is not None else (None, None)
+    gan, zhi = JIA_ZI_PAIRS[ln_jz]
+    events = detect_liunian_patterns(
+        bazi, bazi["day"]["gan"], dayun_gan, dayun_zhi, gan, zhi, yongshen_elements=yongshen
+    )
+    for event in events:
+        event["flow_year"] = year
+        event["flow_label"] = label
+    return events
+
+
+class TestLiunianPatternTable(unittest.TestCase):
+    """Pattern table vs direct detect_liunian_patterns calls."""
+
+    def test_sample_charts(self):
+        rng = random.Random(20240719)
+        start = datetime(1940, 1, 1)
+        found = 0
+        for i in range(12):
+            bazi = get_bazi(start + timedelta(hours=rng.randrange(24 * 365 * 80)))
+            table = LiunianPatternTable(bazi)
+            yongshen = YONGSHEN_SETS[i % len(YONGSHEN_SETS)]
+            yong_key = yongshen_key(yongshen)
+            for dayun_jz in [None] + list(range(60)):
+                for ln_jz in range(60):
+                    got = table.events(dayun_jz, ln_jz, yong_key, 2000 + ln_jz, JIA_ZI[ln_jz])
+                    expected = _direct(bazi, dayun_jz, ln_jz, yongshen, 2000 + ln_jz, JIA_ZI[ln_jz])
+                    self.assertEqual(got, expected, (bazi, dayun_jz, ln_jz))
+                    self.assertEqual([list(e) for e in got], [list(e) for e in expected])
+                    found += len(got)
+        self.assertGreater(found, 0)
+
+    def test_lookups_are_read_only(self):
+        bazi = get_bazi(datetime(1990, 5, 17, 9, 30))
+        table = get_pattern_table(encode_bazi(bazi))
+        yong_key = yongshen_key(["木"])
+        dayun_jz, ln_jz = next(
+            (dy, ln) for dy in range(60) for ln in range(60) if table.events(dy, ln, yong_key)
+        )
+        first = table.events(dayun_jz, ln_jz, yong_key, 2001, JIA_ZI[ln_jz])
+        with self.assertRaises(TypeError):
+            first[0]["risk_percent"] = -1.0
+        with self.assertRaises(TypeError):
+            first[0]["pos1"]["char"] = "x"
+        thaw(first[0])["pos1"]["char"] = "x"
+        second = table.events(dayun_jz, ln_jz, yong_key, 2061, JIA_ZI[ln_jz])
+        self.assertNotEqual(second[0]["pos1"]["char"], "x")
+        self.assertEqual(second[0]["flow_year"], 2061)
+        self.assertEqual(first[0]["flow_year"], 2001)
+
+
+if __name__ == "__main__":
+    unittest.main()
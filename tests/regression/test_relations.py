@@ -0,0 +1,89 @@
+"""
+Regression tests for the precomputed relation matrices (bazi.relations).
+
+Every cell of the 12×12 branch matrix and the 10×10 stem tables must agree
+with the dict / set definitions in config.py.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from bazi.config import (
+    ALL_PUNISH_PAIRS,
+    GAN_LIST,
+    GAN_WUHE,
+    GAN_WUXING,
+    GRAVE_PUNISH_PAIRS,
+    KE_MAP,
+    SELF_PUNISH_PAIRS,
+    ZHI_CHONG,
+    ZHI_LIST,
+    ZHI_LIUHE,
+    ZHI_SANHE,
+    ZHI_SANHUI,
+)
+from bazi.relations import (
+    GAN_KE,
+    GAN_WUHE_NAME,
+    REL_CHONG,
+    REL_LIUHE,
+    REL_PUNISH,
+    REL_PUNISH_GRAVE,
+    REL_PUNISH_SELF,
+    REL_SANHE,
+    REL_SANHUI,
+    SANHE_GROUPS,
+    SANHUI_GROUPS,
+    ZHI_LIUHE_OF,
+    ZHI_RELATION,
+    ZHI_SANHE_GROUP,
+    ZHI_SANHUI_GROUP,
+    punish_targets,
+    zhi_relation,
+)
+
+
+class TestRelations(unittest.TestCase):
+    """Relation matrices vs config definitions."""
+
+    def test_branch_matrix(self):
+        for a, za in enumerate(ZHI_LIST):
+            for b, zb in enumerate(ZHI_LIST):
+                rel = ZHI_RELATION[a][b]
+                self.assertEqual(zhi_relation(za, zb), rel)
+                self.assertEqual(bool(rel & REL_CHONG), ZHI_CHONG.get(za) == zb, (za, zb))
+                self.assertEqual(bool(rel & REL_PUNISH), (za, zb) in ALL_PUNISH_PAIRS, (za, zb))
+                self.assertEqual(bool(rel & REL_PUNISH_GRAVE), (za, zb) in GRAVE_PUNISH_PAIRS, (za, zb))
+                self.assertEqual(bool(rel & REL_PUNISH_SELF), (za, zb) in SELF_PUNISH_PAIRS, (za, zb))
+                self.assertEqual(bool(rel & REL_LIUHE), ZHI_LIUHE.get(za) == zb, (za, zb))
+                self.assertEqual(bool(rel & REL_SANHE), za != zb and zb in ZHI_SANHE[za], (za, zb))
+                self.assertEqual(bool(rel & REL_SANHUI), za != zb and zb in ZHI_SANHUI[za], (za, zb))
+
+    def test_branch_lookups(self):
+        for a, za in enumerate(ZHI_LIST):
+            self.assertEqual(ZHI_LIST[ZHI_LIUHE_OF[a]], ZHI_LIUHE[za])
+            self.assertEqual(SANHE_GROUPS[ZHI_SANHE_GROUP[a]], ZHI_SANHE[za])
+            self.assertEqual(SANHUI_GROUPS[ZHI_SANHUI_GROUP[a]], ZHI_SANHUI[za])
+            expected = sorted({t for f, t in ALL_PUNISH_PAIRS if f == za}, key=ZHI_LIST.index)
+            self.assertEqual(list(punish_targets(za)), expected)
+        self.assertEqual(punish_targets("?"), ())
+        self.assertEqual(zhi_relation("?", "子"), 0)
+
+    def test_group_order(self):
+        self.assertEqual([g[0] for g in SANHE_GROUPS], ["申", "亥", "寅", "巳"])
+        self.assertEqual([g[0] for g in SANHUI_GROUPS], ["寅", "巳", "申", "亥"])
+
+    def test_stem_tables(self):
+        for a, ga in enumerate(GAN_LIST):
+            for b, gb in enumerate(GAN_LIST):
+                self.assertEqual(GAN_WUHE_NAME[a][b], GAN_WUHE.get(frozenset({ga, gb})), (ga, gb))
+                self.assertEqual(GAN_KE[a][b], KE_MAP[GAN_WUXING[ga]] == GAN_WUXING[gb], (ga, gb))
+
+
+if __name__ == "__main__":
+    unittest.main()
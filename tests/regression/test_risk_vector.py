@@ -0,0 +1,115 @@
+"""
+Regression tests for vectorized risk scoring (bazi.risk_vector).
+
+score_luck must reproduce analyze_luck's yearly totals, is_good flags and
+dayun averages exactly, its components must add up to the total, and
+liunian_details must rebuild the same per-year dicts. score_charts must
+agree with per-chart analyze_luck on a sampled corpus (values, covered years
+and half-year labels).
+"""
+
+import random
+import sys
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖
+    np = None
+
+from bazi.chart_context import ChartContext
+from bazi.luck import analyze_luck
+from bazi.lunar_engine import analyze_basic
+from bazi.request_index import _calc_half_year_label
+
+
+def _sample_births(count, seed=20240705):
+    rng = random.Random(seed)
+    start = datetime(1935, 1, 1)
+    return [start + timedelta(hours=rng.randrange(24 * 365 * 85)) for _ in range(count)]
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestRiskVector(unittest.TestCase):
+    """score_luck vs analyze_luck."""
+
+    def test_matches_analyze_luck(self):
+        from bazi.risk_vector import liunian_details, score_luck
+
+        for i, birth in enumerate(_sample_births(25)):
+            is_male = bool(i % 2)
+            ctx = ChartContext(birth, is_male)
+            yongshen = analyze_basic(birth, ctx=ctx)["yongshen_elements"]
+            luck = analyze_luck(birth, is_male, yongshen, max_dayun=15, ctx=ctx)
+            scores = score_luck(birth, is_male, yongshen, max_dayun=15, ctx=ctx)
+
+            liunian = [ln for group in luck["groups"] for ln in group["liunian"]]
+            self.assertEqual(scores["years"].tolist(), [ln["year"] for ln in liunian], birth)
+            self.assertEqual(scores["ages"].tolist(), [ln["age"] for ln in liunian])
+            self.assertEqual(scores["total_risk_percent"].tolist(), [ln["total_risk_percent"] for ln in liunian])
+            self.assertEqual(scores["risk_from_gan"].tolist(), [ln["risk_from_gan"] for ln in liunian])
+            self.assertEqual(scores["risk_from_zhi"].tolist(), [ln["risk_from_zhi"] for ln in liunian])
+            self.assertEqual(scores["is_good"].tolist(), [ln["is_good"] for ln in liunian])
+            np.testing.assert_allclose(scores["components"].sum(axis=1), scores["total_risk_percent"], atol=1e-9)
+
+            dayuns = [group["dayun"] for group in luck["groups"] if group["dayun"] is not None]
+            self.assertEqual(scores["dayun"]["index"].tolist(), [dy["index"] for dy in dayuns])
+            self.assertEqual(
+                scores["dayun"]["total_risk_average"].tolist(), [dy["total_risk_average"] for dy in dayuns]
+            )
+            self.assertEqual(scores["dayun"]["is_good"].tolist(), [dy["is_good"] for dy in dayuns])
+
+            picked = [liunian[0]["year"], liunian[len(liunian) // 2]["year"], liunian[-1]["year"]]
+            details = liunian_details(scores, picked)
+            self.assertEqual(sorted(details), sorted(set(picked)))
+            for ln in liunian:
+                if ln["year"] in details:
+                    self.assertEqual(details[ln["year"]], ln)
+
+    def test_score_charts_matches_analyze_luck(self):
+        from bazi.risk_vector import HALF_YEAR_LABELS, batch_charts, score_charts
+
+        births = _sample_births(30, seed=20240712)
+        is_males = [bool(i % 2) for i in range(len(births))]
+        years = list(range(1930, 2131))
+        batch = batch_charts(births, is_males)
+        grid = score_charts(years=years, **batch)
+        self.assertEqual(grid["total_risk_percent"].shape, (len(births), len(years)))
+
+        for row, (birth, is_male) in enumerate(zip(births, is_males)):
+            ctx = ChartContext(birth, is_male)
+            yongshen = analyze_basic(birth, ctx=ctx)["yongshen_elements"]
+            luck = analyze_luck(birth, is_male, yongshen, max_dayun=15, ctx=ctx)
+            liunian = {ln["year"]: ln for group in luck["groups"] for ln in group["liunian"]}
+
+            covered = [year for year, flag in zip(years, grid["covered"][row]) if flag]
+            self.assertEqual(covered, sorted(y for y in liunian if y in years), birth)
+            for col, year in enumerate(years):
+                if year not in liunian:
+                    self.assertTrue(np.isnan(grid["total_risk_percent"][row, col]))
+                    self.assertEqual(grid["start_label"][row, col], -1)
+                    continue
+                ln = liunian[year]
+                self.assertEqual(grid["risk_from_gan"][row, col], ln["risk_from_gan"], (birth, year))
+                self.assertEqual(grid["risk_from_zhi"][row, col], ln["risk_from_zhi"], (birth, year))
+                self.assertEqual(grid["tkdc_risk_percent"][row, col], ln["tkdc_risk_percent"], (birth, year))
+                self.assertEqual(grid["total_risk_percent"][row, col], ln["total_risk_percent"], (birth, year))
+                self.assertEqual(bool(grid["is_good"][row, col]), ln["is_good"], (birth, year))
+                self.assertEqual(
+                    HALF_YEAR_LABELS[grid["start_label"][row, col]],
+                    _calc_half_year_label(ln["risk_from_gan"], ln["start_good"]),
+                )
+                self.assertEqual(
+                    HALF_YEAR_LABELS[grid["later_label"][row, col]],
+                    _calc_half_year_label(ln["risk_from_zhi"], ln["later_good"]),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+JieQi Table Builder
+用 lunar_python 预先算出 1899–2101 每年 12 个「节」的交接时刻，写入 bazi/jieqi_table.py。
+
+bazi.calendar 的表驱动排盘只依赖这张表；lunar_python 只在生成表（以及作为参考后端）时使用。
+时刻取 lunar_python Solar.fromJulianDay 的结果（秒级），与 EightChar 内部比较所用的时刻完全一致。
+
+用法：
+    python -m tools.build_jieqi_table
+    python -m tools.build_jieqi_table --output=bazi/jieqi_table.py
+"""
+
+import sys
+import os
+from typing import List
+
+from lunar_python import LunarYear, Solar  # 依赖：pip install lunar_python
+
+# 每年 12 个节，依次对应月支 丑 寅 卯 … 子
+JIE_NAMES = ("小寒", "立春", "惊蛰", "清明", "立夏", "芒种", "小暑", "立秋", "白露", "寒露", "立冬", "大雪")
+
+FIRST_YEAR = 1899
+LAST_YEAR = 2101
+
+DEFAULT_OUTPUT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bazi", "jieqi_table.py"
+)
+
+
+def _solar_key(solar: Solar) -> int:
+    """Solar → YYYYMMDDhhmmss 整数（与 toYmdHms 字符串同序）。"""
+    return (
+        solar.getYear() * 10000000000
+        + solar.getMonth() * 100000000
+        + solar.getDay() * 1000000
+        + solar.getHour() * 10000
+        + solar.getMinute() * 100
+        + solar.getSecond()
+    )
+
+
+def build_year(year: int) -> List[int]:
+    """某公历年 12 个节（小寒 … 大雪）的交接时刻。
+
+    LunarYear.getJieQiJulianDays() 对应 Lunar.JIE_QI_IN_USE：
+    下标 0 为上一年大雪，下标 2, 4, …, 24 依次为本年小寒 … 大雪。
+    """
+    julian_days = LunarYear.fromYear(year).getJieQiJulianDays()
+    return [_solar_key(Solar.fromJulianDay(julian_days[i])) for i in range(2, 25, 2)]
+
+
+def build_table() -> List[int]:
+    table: List[int] = []
+    for year in range(FIRST_YEAR, LAST_YEAR + 1):
+        table.extend(build_year(year))
+    for prev, cur in zip(table, table[1:]):
+        if prev >= cur:
+            raise ValueError(f"节气时刻未严格递增: {prev} >= {cur}")
+    return table
+
+
+def render_module(table: List[int]) -> str:
+    lines = [
+        "# -*- coding: utf-8 -*-",
+        '"""节气交接时刻表（自动生成，请勿手工修改）。',
+        "",
+        "由 tools/build_jieqi_table.py 用 lunar_python 生成。",
+        f"覆盖 {FIRST_YEAR}–{LAST_YEAR} 年，每年 12 个节：" + "、".join(JIE_NAMES) + "。",
+        "每个元素为 YYYYMMDDhhmmss 形式的整数（北京时间，秒级）。",
+        '"""',
+        "",
+        f"JIE_FIRST_YEAR = {FIRST_YEAR}",
+        f"JIE_LAST_YEAR = {LAST_YEAR}",
+        "",
+        "JIE_TABLE = (",
+    ]
+    for i in range(0, len(table), 12):
+        year = FIRST_YEAR + i // 12
+        row = table[i:i + 12]
+        lines.append(f"    # {year}")
+        for j in range(0, 12, 4):
+            lines.append("    " + " ".join(f"{v}," for v in row[j:j + 4]))
+    lines.append(")")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="JieQi Table Builder")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="输出模块路径")
+    args = parser.parse_args()
+
+    table = build_table()
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(render_module(table))
+
+    print(f"JieQi table generated: {args.output}", file=sys.stderr)
+    print(f"Total entries: {len(table)}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Natal Table Builder
+对全部 518,400 个合法八字（60 年柱 × 12 月支 × 60 日柱 × 12 时支）跑 compute_natal_numbers，
+写成 bazi/natal_table.bin 供 bazi.natal_table mmap 读取。
+
+按年柱分块，多进程并行；每块 8,640 条记录。生成的文件约 110 MB，不入库。
+
+用法：
+    python -m tools.build_natal_table
+    python -m tools.build_natal_table --output=/data/natal_table.bin --processes=8
+"""
+
+import os
+import sys
+from multiprocessing import Pool
+from typing import Iterable, Optional
+
+from bazi.codes import decode_bazi
+from bazi.config import NATAL_TABLE_PATH
+from bazi.lunar_engine import compute_natal_numbers
+from bazi.natal_table import RECORD, RECORD_COUNT, HEADER, chart_key, header_bytes, pack_record
+
+# 每个年柱的记录数
+CHUNK = RECORD_COUNT // 60
+
+
+def build_chunk(year_jz: int) -> bytes:
+    """某个年柱下 12 × 60 × 12 条记录（按 chart_index 顺序）。"""
+    parts = []
+    for index in range(year_jz * CHUNK, (year_jz + 1) * CHUNK):
+        bazi = decode_bazi(chart_key(index))
+        parts.append(pack_record(bazi["day"]["gan"], compute_natal_numbers(bazi)))
+    return b"".join(parts)
+
+
+def build_table(path: str, year_jz: Optional[Iterable[int]] = None, processes: Optional[int] = None) -> None:
+    """写出预计算表。year_jz 只算部分年柱（其余记录保持全零，即无效、走 Python 计算）。"""
+    years = list(range(60) if year_jz is None else year_jz)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header_bytes())
+        f.truncate(HEADER.size + RECORD.size * RECORD_COUNT)
+        if processes == 1 or len(years) == 1:
+            chunks = map(build_chunk, years)
+            for year, data in zip(years, chunks):
+                f.seek(HEADER.size + year * CHUNK * RECORD.size)
+                f.write(data)
+        else:
+            with Pool(processes) as pool:
+                for year, data in zip(years, pool.imap(build_chunk, years)):
+                    f.seek(HEADER.size + year * CHUNK * RECORD.size)
+                    f.write(data)
+    os.replace(tmp_path, path)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Natal Table Builder")
+    parser.add_argument("--output", default=NATAL_TABLE_PATH, help="输出文件路径")
+    parser.add_argument("--processes", type=int, default=None, help="进程数（默认 CPU 核数）")
+    args = parser.parse_args()
+
+    build_table(args.output, processes=args.processes)
+
+    print(f"Natal table generated: {args.output}", file=sys.stderr)
+    print(f"Total records: {RECORD_COUNT} x {RECORD.size} bytes", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()